@@ -0,0 +1,75 @@
+"""Add stock_daily_booking_count table, maintained by a trigger on booking"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# pre/post deployment: pre
+# revision identifiers, used by Alembic.
+revision = "60c0739cb4a6"
+down_revision = "a703309b6657"
+branch_labels: tuple[str] | None = None
+depends_on: list[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stock_daily_booking_count",
+        sa.Column("stockId", sa.BigInteger(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("bookingCount", sa.Integer(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(["stockId"], ["stock.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("stockId", "day"),
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION update_stock_daily_booking_count()
+        RETURNS TRIGGER AS $$
+        DECLARE
+            old_is_counted boolean := TG_OP != 'INSERT' AND OLD.status != 'CANCELLED';
+            new_is_counted boolean := TG_OP != 'DELETE' AND NEW.status != 'CANCELLED';
+        BEGIN
+        IF TG_OP = 'UPDATE'
+            AND old_is_counted = new_is_counted
+            AND OLD."stockId" = NEW."stockId"
+            AND OLD."dateCreated"::date = NEW."dateCreated"::date
+        THEN
+            RETURN NULL;
+        END IF;
+
+        IF old_is_counted THEN
+            UPDATE stock_daily_booking_count
+            SET "bookingCount" = "bookingCount" - 1
+            WHERE "stockId" = OLD."stockId" AND day = OLD."dateCreated"::date;
+        END IF;
+
+        IF new_is_counted THEN
+            INSERT INTO stock_daily_booking_count ("stockId", day, "bookingCount")
+            VALUES (NEW."stockId", NEW."dateCreated"::date, 1)
+            ON CONFLICT ("stockId", day)
+            DO UPDATE SET "bookingCount" = stock_daily_booking_count."bookingCount" + 1;
+        END IF;
+
+        RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    # Existing bookings are counted by a post-deployment migration
+    # (see 1f5c6e2a9b37), so that the booking table is only locked
+    # while the trigger is created.
+    op.execute(
+        """
+        CREATE TRIGGER booking_update_stock_daily_count
+        AFTER INSERT OR DELETE OR UPDATE OF status, "stockId", "dateCreated"
+        ON booking
+        FOR EACH ROW
+        EXECUTE PROCEDURE update_stock_daily_booking_count()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS booking_update_stock_daily_count ON booking")
+    op.execute("DROP FUNCTION IF EXISTS update_stock_daily_booking_count")
+    op.drop_table("stock_daily_booking_count", if_exists=True)
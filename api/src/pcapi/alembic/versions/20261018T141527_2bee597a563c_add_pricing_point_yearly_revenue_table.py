@@ -0,0 +1,104 @@
+"""Add pricing_point_yearly_revenue table, maintained by triggers on pricing and booking"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# pre/post deployment: pre
+# revision identifiers, used by Alembic.
+revision = "2bee597a563c"
+down_revision = "60c0739cb4a6"
+branch_labels: tuple[str] | None = None
+depends_on: list[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "pricing_point_yearly_revenue",
+        sa.Column("pricingPointId", sa.BigInteger(), nullable=False),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Numeric(12, 2), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(["pricingPointId"], ["venue.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("pricingPointId", "year"),
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION update_pricing_point_yearly_revenue()
+        RETURNS TRIGGER AS $$
+        DECLARE
+            booking_amount numeric;
+        BEGIN
+        IF TG_OP != 'INSERT' AND OLD."bookingId" IS NOT NULL AND OLD.status != 'cancelled' THEN
+            SELECT amount * quantity INTO booking_amount FROM booking WHERE id = OLD."bookingId";
+            UPDATE pricing_point_yearly_revenue
+            SET revenue = revenue - booking_amount
+            WHERE
+                "pricingPointId" = OLD."pricingPointId"
+                AND year = date_part('year', (OLD."valueDate" AT TIME ZONE 'UTC') AT TIME ZONE 'Europe/Paris');
+        END IF;
+
+        IF TG_OP != 'DELETE' AND NEW."bookingId" IS NOT NULL AND NEW.status != 'cancelled' THEN
+            SELECT amount * quantity INTO booking_amount FROM booking WHERE id = NEW."bookingId";
+            INSERT INTO pricing_point_yearly_revenue ("pricingPointId", year, revenue)
+            VALUES (
+                NEW."pricingPointId",
+                date_part('year', (NEW."valueDate" AT TIME ZONE 'UTC') AT TIME ZONE 'Europe/Paris'),
+                booking_amount
+            )
+            ON CONFLICT ("pricingPointId", year)
+            DO UPDATE SET revenue = pricing_point_yearly_revenue.revenue + EXCLUDED.revenue;
+        END IF;
+
+        RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION update_pricing_point_yearly_revenue_on_booking_amount()
+        RETURNS TRIGGER AS $$
+        BEGIN
+        UPDATE pricing_point_yearly_revenue
+        SET revenue = pricing_point_yearly_revenue.revenue + (NEW.amount * NEW.quantity) - (OLD.amount * OLD.quantity)
+        FROM pricing
+        WHERE
+            pricing."bookingId" = NEW.id
+            AND pricing.status != 'cancelled'
+            AND pricing_point_yearly_revenue."pricingPointId" = pricing."pricingPointId"
+            AND pricing_point_yearly_revenue.year = date_part('year', (pricing."valueDate" AT TIME ZONE 'UTC') AT TIME ZONE 'Europe/Paris');
+        RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    # Existing pricings are summed by a post-deployment migration (see
+    # 8d2e4b7c1a90), so that the pricing and booking tables are only
+    # locked while the triggers are created.
+    op.execute(
+        """
+        CREATE TRIGGER pricing_update_pricing_point_yearly_revenue
+        AFTER INSERT OR DELETE OR UPDATE OF status, "bookingId", "pricingPointId", "valueDate"
+        ON pricing
+        FOR EACH ROW
+        EXECUTE PROCEDURE update_pricing_point_yearly_revenue()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER booking_update_pricing_point_yearly_revenue
+        AFTER UPDATE OF amount, quantity
+        ON booking
+        FOR EACH ROW
+        WHEN (OLD.amount * OLD.quantity IS DISTINCT FROM NEW.amount * NEW.quantity)
+        EXECUTE PROCEDURE update_pricing_point_yearly_revenue_on_booking_amount()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS booking_update_pricing_point_yearly_revenue ON booking")
+    op.execute("DROP TRIGGER IF EXISTS pricing_update_pricing_point_yearly_revenue ON pricing")
+    op.execute("DROP FUNCTION IF EXISTS update_pricing_point_yearly_revenue_on_booking_amount")
+    op.execute("DROP FUNCTION IF EXISTS update_pricing_point_yearly_revenue")
+    op.drop_table("pricing_point_yearly_revenue", if_exists=True)
@@ -0,0 +1,65 @@
+"""Fill stock_daily_booking_count with recent bookings"""
+
+import datetime
+
+import sqlalchemy as sa
+from alembic import op
+
+from pcapi import settings
+
+
+# pre/post deployment: post
+# revision identifiers, used by Alembic.
+revision = "1f5c6e2a9b37"
+down_revision = "b90c18ffd1a8"
+branch_labels: tuple[str] | None = None
+depends_on: list[str] | None = None
+
+# See `bookings.constants.DAILY_BOOKING_COUNT_RETENTION_DAYS`
+DAYS = 32
+
+
+def upgrade() -> None:
+    # Bookings are counted day by day, each in its own short
+    # transaction. The trigger created by the pre-deployment migration
+    # has already counted bookings created or modified since then, so
+    # the count of a day replaces the counts that it has kept. The table
+    # is locked while a day is counted: the trigger waits until the day
+    # is committed, and then applies its change on top of it.
+    # `WIP_ENABLE_STOCK_DAILY_BOOKING_COUNT` may be enabled once this
+    # migration has run.
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    with op.get_context().autocommit_block():
+        op.execute("SET SESSION statement_timeout='300s'")
+        for days_ago in range(DAYS, -1, -1):
+            day = today - datetime.timedelta(days=days_ago)
+            op.execute("BEGIN")
+            op.execute("SET LOCAL lock_timeout = '60s'")
+            op.execute("LOCK TABLE stock_daily_booking_count IN SHARE MODE")
+            # Bookings that existed before the trigger was created and
+            # have since been cancelled may have left negative counts.
+            op.execute(
+                sa.text('UPDATE stock_daily_booking_count SET "bookingCount" = 0 WHERE day = :day').bindparams(day=day)
+            )
+            op.execute(
+                sa.text(
+                    """
+                    INSERT INTO stock_daily_booking_count ("stockId", day, "bookingCount")
+                    SELECT "stockId", "dateCreated"::date, count(*)
+                    FROM booking
+                    WHERE
+                        "dateCreated" >= :day
+                        AND "dateCreated" < :next_day
+                        AND status != 'CANCELLED'
+                    GROUP BY "stockId", "dateCreated"::date
+                    ON CONFLICT ("stockId", day)
+                    DO UPDATE SET "bookingCount" = excluded."bookingCount"
+                    """
+                ).bindparams(day=day, next_day=day + datetime.timedelta(days=1))
+            )
+            op.execute("COMMIT")
+        op.execute(f"SET SESSION statement_timeout={settings.DATABASE_STATEMENT_TIMEOUT}")
+
+
+def downgrade() -> None:
+    pass
@@ -0,0 +1,72 @@
+"""Fill pricing_point_yearly_revenue with existing pricings"""
+
+import sqlalchemy as sa
+from alembic import op
+
+from pcapi import settings
+
+
+# pre/post deployment: post
+# revision identifiers, used by Alembic.
+revision = "8d2e4b7c1a90"
+down_revision = "1f5c6e2a9b37"
+branch_labels: tuple[str] | None = None
+depends_on: list[str] | None = None
+
+BATCH_SIZE = 100
+
+
+def upgrade() -> None:
+    # Revenues are summed by batch of pricing points, each in its own
+    # short transaction. The triggers created by the pre-deployment
+    # migration have already counted pricings created or modified since
+    # then, so the sum of a batch replaces the revenues that they have
+    # counted. The table is locked while a batch is summed: triggers
+    # that would change its revenues wait until the batch is committed,
+    # and then apply their change on top of it. Revenues should be
+    # checked with the `check_pricing_point_yearly_revenues` command
+    # before `WIP_ENABLE_PRICING_POINT_YEARLY_REVENUE` is enabled.
+    with op.get_context().autocommit_block():
+        op.execute("SET SESSION statement_timeout='300s'")
+        max_id = op.get_bind().execute(sa.text('SELECT max("pricingPointId") FROM pricing')).scalar() or 0
+        for start in range(0, max_id + 1, BATCH_SIZE):
+            op.execute("BEGIN")
+            op.execute("SET LOCAL lock_timeout = '60s'")
+            op.execute("LOCK TABLE pricing_point_yearly_revenue IN SHARE MODE")
+            # Pricings that existed before the triggers were created and
+            # have since been cancelled may have left negative revenues.
+            op.execute(
+                sa.text(
+                    """
+                    UPDATE pricing_point_yearly_revenue
+                    SET revenue = 0
+                    WHERE "pricingPointId" >= :start AND "pricingPointId" < :end
+                    """
+                ).bindparams(start=start, end=start + BATCH_SIZE)
+            )
+            op.execute(
+                sa.text(
+                    """
+                    INSERT INTO pricing_point_yearly_revenue ("pricingPointId", year, revenue)
+                    SELECT
+                        pricing."pricingPointId",
+                        date_part('year', (pricing."valueDate" AT TIME ZONE 'UTC') AT TIME ZONE 'Europe/Paris'),
+                        sum(booking.amount * booking.quantity)
+                    FROM pricing
+                    JOIN booking ON booking.id = pricing."bookingId"
+                    WHERE
+                        pricing."pricingPointId" >= :start
+                        AND pricing."pricingPointId" < :end
+                        AND pricing.status != 'cancelled'
+                    GROUP BY 1, 2
+                    ON CONFLICT ("pricingPointId", year)
+                    DO UPDATE SET revenue = excluded.revenue
+                    """
+                ).bindparams(start=start, end=start + BATCH_SIZE)
+            )
+            op.execute("COMMIT")
+        op.execute(f"SET SESSION statement_timeout={settings.DATABASE_STATEMENT_TIMEOUT}")
+
+
+def downgrade() -> None:
+    pass
@@ -1,22 +1,15 @@
-import itertools
 import logging
-import time
-from typing import Sequence
-
-from sqlalchemy import exc as sa_exc
 
+from pcapi.connectors.big_query.importer.base import BulkImporter
 from pcapi.connectors.big_query.queries.artist import ArtistScoresModel
 from pcapi.connectors.big_query.queries.artist import ArtistScoresQuery
 from pcapi.core import search
-from pcapi.core.artist import models as artist_models
-from pcapi.models import db
-from pcapi.utils.repository import transaction
 
 
 logger = logging.getLogger(__name__)
 
 
-class ArtistScoresImporter:
+class ArtistScoresImporter(BulkImporter[ArtistScoresModel, str]):
     """
     Imports ranking scores to improve artist search for the "App Jeune" and "Portail Pro".
 
@@ -24,55 +17,41 @@ class ArtistScoresImporter:
     https://www.notion.so/passcultureapp/Artistes-Qualit-Scoring-2e9ad4e0ff988063b4b0e9df0b18d290
     """
 
+    staging_table = "artist_score_import"
+    staging_columns = {
+        "id": "TEXT",
+        "app_search_score": "DOUBLE PRECISION",
+        "pro_search_score": "DOUBLE PRECISION",
+    }
+    # Scores of missing artists are ignored.
+    apply_statement = f"""
+        UPDATE artist
+        SET app_search_score = staging.app_search_score, pro_search_score = staging.pro_search_score
+        FROM {staging_table} AS staging
+        WHERE artist.id = staging.id
+        AND (
+            artist.app_search_score IS DISTINCT FROM staging.app_search_score
+            OR artist.pro_search_score IS DISTINCT FROM staging.pro_search_score
+        )
+        RETURNING artist.id
+    """
+
     def run_scores_update(self, batch_size: int = 1000) -> None:
         logger.info("Starting artist scores update...")
 
         query = ArtistScoresQuery()
-        total_processed = 0
-
-        for batch in itertools.batched(query.execute(), batch_size):
-            self._process_batch(batch)
-            total_processed += len(batch)
-
-        logger.info("Finished artist scores update", extra={"total_processed": total_processed})
-
-    def _process_batch(self, batch: Sequence[ArtistScoresModel]) -> None:
-        if not batch:
-            return
-
-        start_time = time.perf_counter()
-        try:
-            with transaction():
-                self._apply_updates(batch)
-
-            duration = time.perf_counter() - start_time
-            logger.info(
-                "Successfully updated artists batch scores", extra={"batch_size": len(batch), "duration": duration}
-            )
+        result = self._import(query.execute(page_size=batch_size), page_size=batch_size)
 
-        except sa_exc.SQLAlchemyError as exc:
-            duration = time.perf_counter() - start_time
-            logger.warning("Batch update failed. Retrying one by one", extra={"duration": duration, "error": str(exc)})
-            self._process_one_by_one(batch)
+        logger.info(
+            "Finished artist scores update",
+            extra={"total_processed": result.imported, "total_updated": result.changed},
+        )
 
-        search.async_index_artist_ids([item.id for item in batch], reason=search.IndexationReason.ARTIST_EDITION)
+    def _get_values(self, row: ArtistScoresModel) -> tuple:
+        return (row.id, row.app_search_score, row.pro_search_score)
 
-    def _process_one_by_one(self, batch: Sequence[ArtistScoresModel]) -> None:
-        for item in batch:
-            try:
-                with transaction():
-                    self._apply_updates([item])
-            except sa_exc.SQLAlchemyError as exc:
-                logger.error("Failed to update scores for artist", extra={"artist_id": item.id, "error": str(exc)})
+    def _get_checkpoint(self, row: ArtistScoresModel) -> str:
+        return row.id
 
-    def _apply_updates(self, items: Sequence[ArtistScoresModel]) -> None:
-        ids = [item.id for item in items]
-        existing_artists = db.session.query(artist_models.Artist).filter(artist_models.Artist.id.in_(ids)).all()
-        artist_map = {artist.id: artist for artist in existing_artists}
-        for item in items:
-            artist = artist_map.get(item.id)
-            if artist:
-                artist.app_search_score = item.app_search_score
-                artist.pro_search_score = item.pro_search_score
-            else:
-                logger.info("Skipping scores update for missing artist", extra={"artist_id": item.id})
+    def _reindex(self, ids: list[str]) -> None:
+        search.async_index_artist_ids(ids, reason=search.IndexationReason.ARTIST_EDITION)
@@ -0,0 +1,127 @@
+import csv
+import io
+import itertools
+import logging
+import time
+import typing
+from dataclasses import dataclass
+
+import psycopg2.extensions
+import pydantic
+import sqlalchemy as sa
+
+from pcapi.models import db
+from pcapi.utils.repository import transaction
+
+
+logger = logging.getLogger(__name__)
+
+
+REINDEX_BATCH_SIZE = 10_000
+# Number of rows copied and applied in each transaction
+CHUNK_SIZE = 100_000
+STATEMENT_TIMEOUT = "300s"
+
+
+@dataclass(frozen=True, slots=True)
+class BulkImportResult:
+    imported: int
+    changed: int
+
+
+class BulkImporter[Row: pydantic.BaseModel, Id]:
+    """Base of importers that write BigQuery rows to Postgres in bulk.
+
+    BigQuery rows are streamed, page by page, into a temporary staging
+    table through COPY. A single statement (`apply_statement`) then
+    writes them to the destination table, and must return the ids of
+    the rows that it has actually changed: only these are reindexed.
+
+    Rows are imported by chunks of `chunk_size`, each in its own
+    transaction. The id of the last row of each applied chunk is logged,
+    so that an interrupted import can be resumed from there.
+    """
+
+    # name and SQL type of the columns of the staging table, in the order
+    # of the values returned by `_get_values()`
+    staging_columns: dict[str, str]
+    chunk_size = CHUNK_SIZE
+
+    @property
+    def staging_table(self) -> str:
+        raise NotImplementedError()
+
+    @property
+    def apply_statement(self) -> str:
+        """SQL statement that writes the rows of `staging_table` and returns changed ids."""
+        raise NotImplementedError()
+
+    def _get_values(self, row: Row) -> tuple:
+        raise NotImplementedError()
+
+    def _reindex(self, ids: list[Id]) -> None:
+        raise NotImplementedError()
+
+    def _get_checkpoint(self, row: Row) -> Id:
+        """Id logged after each chunk, from which an interrupted import can be resumed."""
+        raise NotImplementedError()
+
+    def _import(self, rows: typing.Iterable[Row], page_size: int) -> BulkImportResult:
+        start = time.perf_counter()
+        imported = 0
+        changed = 0
+        rows_iterator = iter(rows)
+        while (first_row := next(rows_iterator, None)) is not None:
+            chunk = itertools.chain([first_row], itertools.islice(rows_iterator, self.chunk_size - 1))
+            chunk_imported, changed_ids, last_row = self._import_chunk(chunk, page_size)
+            imported += chunk_imported
+            changed += len(changed_ids)
+
+            for ids in itertools.batched(changed_ids, REINDEX_BATCH_SIZE):
+                self._reindex(list(ids))
+
+            logger.info(
+                "Applied chunk of rows from staging table",
+                extra={
+                    "staging_table": self.staging_table,
+                    "imported": imported,
+                    "changed": changed,
+                    "last_processed_id": self._get_checkpoint(last_row),
+                    "duration": time.perf_counter() - start,
+                },
+            )
+
+        return BulkImportResult(imported=imported, changed=changed)
+
+    def _import_chunk(self, chunk: typing.Iterable[Row], page_size: int) -> tuple[int, typing.Sequence[Id], Row]:
+        imported = 0
+        last_row: Row | None = None
+        with transaction():
+            # Do not depend on the default timeout of the session, which
+            # is meant for web requests.
+            db.session.execute(sa.text(f"SET LOCAL statement_timeout = '{STATEMENT_TIMEOUT}'"))
+            columns = ", ".join(f"{name} {type_}" for name, type_ in self.staging_columns.items())
+            db.session.execute(sa.text(f"CREATE TEMPORARY TABLE {self.staging_table} ({columns}) ON COMMIT DROP"))
+            copy_statement = (
+                f"COPY {self.staging_table} ({', '.join(self.staging_columns)}) FROM STDIN WITH (FORMAT csv)"
+            )
+            cursor = typing.cast(psycopg2.extensions.cursor, db.session.connection().connection.cursor())
+            try:
+                for page in itertools.batched(chunk, page_size):
+                    buffer = io.StringIO()
+                    csv.writer(buffer).writerows(self._get_values(row) for row in page)
+                    buffer.seek(0)
+                    cursor.copy_expert(copy_statement, buffer)
+                    imported += len(page)
+                    last_row = page[-1]
+            finally:
+                cursor.close()
+            # Temporary tables are not analyzed automatically.
+            db.session.execute(sa.text(f"ANALYZE {self.staging_table}"))
+            changed_ids = db.session.execute(sa.text(self.apply_statement)).scalars().all()
+            # `ON COMMIT DROP` is not enough: within an enclosing transaction
+            # (or in tests), `transaction()` only releases a savepoint, and
+            # the next chunk would not be able to create the table.
+            db.session.execute(sa.text(f"DROP TABLE {self.staging_table}"))
+        assert last_row is not None  # chunks are never empty
+        return imported, changed_ids, last_row
@@ -1,8 +1,22 @@
+import datetime
+import hashlib
+import json
+import logging
+import time
 import typing
 
 import pydantic as pydantic_v2
 
 import pcapi.connectors.clickhouse as clickhouse_connector
+from pcapi import settings
+from pcapi.utils import date as date_utils
+from pcapi.utils.redis import get_redis_client
+
+
+logger = logging.getLogger(__name__)
+
+
+CACHE_KEY_TEMPLATE = "cache:clickhouse:%(query)s:%(hash)s"
 
 
 class ClickHouseBaseModel(pydantic_v2.BaseModel):
@@ -12,6 +26,27 @@ class ClickHouseBaseModel(pydantic_v2.BaseModel):
     )
 
 
+def _normalize_param(value: typing.Any) -> typing.Any:
+    # Collections are only used in `IN` clauses: neither their order
+    # nor duplicates change the result.
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sorted(set(value), key=str)
+    return value
+
+
+def get_cache_expiration(now: datetime.datetime | None = None) -> int:
+    """Return the number of seconds during which results can be cached.
+
+    Results are not kept beyond the next daily refresh of the
+    analytics tables, to show up-to-date figures once it is done.
+    """
+    now = now or date_utils.get_naive_utc_now()
+    next_refresh = now.replace(hour=settings.CLICKHOUSE_ANALYTICS_REFRESH_HOUR, minute=0, second=0, microsecond=0)
+    if next_refresh <= now:
+        next_refresh += datetime.timedelta(days=1)
+    return min(settings.CLICKHOUSE_QUERY_CACHE_DURATION, int((next_refresh - now).total_seconds()))
+
+
 class BaseQuery[ModelType: ClickHouseBaseModel, Row]:
     def __init__(self) -> None:
         self.backend = clickhouse_connector.get_backend()
@@ -30,6 +65,43 @@ class BaseQuery[ModelType: ClickHouseBaseModel, Row]:
     def _serialize_row(self, row: Row) -> ModelType:
         return self.model.model_validate(row)
 
-    def execute(self, params: dict) -> list[ModelType]:
+    def _get_cache_key(self, params: dict) -> str:
+        normalized_params = {name: _normalize_param(value) for name, value in params.items()}
+        digest = hashlib.sha256(self.raw_query.encode())
+        digest.update(json.dumps(normalized_params, sort_keys=True, default=str).encode())
+        return CACHE_KEY_TEMPLATE % {"query": type(self).__name__, "hash": digest.hexdigest()}
+
+    def _execute(self, params: dict) -> list[ModelType]:
         rows = self._get_rows(params)
         return [self._serialize_row(row) for row in rows]
+
+    def execute(self, params: dict) -> list[ModelType]:
+        """Run the query, or return its cached results.
+
+        Results are cached under the query and its parameters (see
+        `get_cache_expiration()`), so that pros refreshing their
+        dashboards do not run the same query again and again.
+        """
+        expire = get_cache_expiration()
+        if not expire:
+            return self._execute(params)
+
+        start = time.perf_counter()
+        redis_client = get_redis_client()
+        key = self._get_cache_key(params)
+        cached = redis_client.get(key)
+        if cached is not None:
+            results = [self.model.model_validate(item) for item in json.loads(cached)]
+        else:
+            results = self._execute(params)
+            data = json.dumps([result.model_dump(mode="json") for result in results])
+            redis_client.set(key, data, ex=expire)
+        logger.info(
+            "Executed ClickHouse query",
+            extra={
+                "query": type(self).__name__,
+                "cache_hit": cached is not None,
+                "duration": round((time.perf_counter() - start) * 1000),  # milliseconds
+            },
+        )
+        return results
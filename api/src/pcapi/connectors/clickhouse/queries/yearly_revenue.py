@@ -23,6 +23,10 @@ class _Row:
 
 
 class AggregatedCollectiveRevenueQuery(BaseQuery[AggregatedCollectiveRevenueModel, _Row]):
+    @property
+    def model(self) -> type[AggregatedCollectiveRevenueModel]:
+        return AggregatedCollectiveRevenueModel
+
     def _serialize_row(self, row: _Row) -> AggregatedCollectiveRevenueModel:
         return AggregatedCollectiveRevenueModel(
             year=row.year,
@@ -59,6 +63,10 @@ class AggregatedIndividualRevenueModel(ClickHouseBaseModel):
 
 
 class AggregatedIndividualRevenueQuery(BaseQuery[AggregatedIndividualRevenueModel, _Row]):
+    @property
+    def model(self) -> type[AggregatedIndividualRevenueModel]:
+        return AggregatedIndividualRevenueModel
+
     def _serialize_row(self, row: _Row) -> AggregatedIndividualRevenueModel:
         return AggregatedIndividualRevenueModel(
             year=row.year,
@@ -97,6 +105,10 @@ class AggregatedTotalRevenueModel(ClickHouseBaseModel):
 
 
 class AggregatedTotalRevenueQuery(BaseQuery[AggregatedTotalRevenueModel, _Row]):
+    @property
+    def model(self) -> type[AggregatedTotalRevenueModel]:
+        return AggregatedTotalRevenueModel
+
     def _serialize_row(self, row: _Row) -> AggregatedTotalRevenueModel:
         return AggregatedTotalRevenueModel(
             year=row.year,
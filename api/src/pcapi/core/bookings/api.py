@@ -1310,6 +1310,22 @@ def get_individual_bookings_from_stock(
     yield from query.yield_per(1_000)
 
 
+def delete_old_stock_daily_booking_counts() -> None:
+    """Delete rows of `StockDailyBookingCount` that are too old to be
+    read (see `search.get_offers_booking_count_by_id()`).
+    """
+    oldest_day = date_utils.get_naive_utc_now().date() - datetime.timedelta(
+        days=constants.DAILY_BOOKING_COUNT_RETENTION_DAYS
+    )
+    number_deleted = (
+        db.session.query(models.StockDailyBookingCount)
+        .filter(models.StockDailyBookingCount.day < oldest_day)
+        .delete(synchronize_session=False)
+    )
+    db.session.commit()
+    logger.info("Deleted old daily booking counts", extra={"count": number_deleted})
+
+
 def archive_old_bookings() -> None:
     date_condition = models.Booking.dateCreated < date_utils.get_naive_utc_now() - constants.ARCHIVE_DELAY
 
@@ -8,6 +8,8 @@ class RedisExternalBookingType(str, enum.Enum):
 
 
 ARCHIVE_DELAY = datetime.timedelta(days=30)
+# Number of days kept in `StockDailyBookingCount`
+DAILY_BOOKING_COUNT_RETENTION_DAYS = 32
 CONFIRM_BOOKING_AFTER_CREATION_DELAY = datetime.timedelta(hours=48)
 CONFIRM_BOOKING_BEFORE_EVENT_DELAY = datetime.timedelta(hours=48)
 BOOKINGS_AUTO_EXPIRY_DELAY = datetime.timedelta(days=30)
@@ -1,5 +1,6 @@
 import decimal
 import enum
+from datetime import date
 from datetime import datetime
 from decimal import Decimal
 from typing import TYPE_CHECKING
@@ -666,6 +667,72 @@ trig_update_cancellationDate_on_isCancelled_ddl = sa.DDL(f"""
 sa_event.listen(Booking.__table__, "after_create", trig_update_cancellationDate_on_isCancelled_ddl)
 
 
+class StockDailyBookingCount(Model):
+    """The number of non-cancelled bookings of a stock, per day of
+    creation of the bookings (in UTC).
+
+    This table is maintained by the `booking_update_stock_daily_count`
+    trigger below, so that the number of recent bookings of an offer
+    can be computed without scanning the `booking` table. Rows are
+    kept per stock (and not per offer) because stocks are already
+    locked when they are booked: the trigger never waits for a lock
+    that the booking transaction does not already hold.
+
+    Old rows are deleted by `api.delete_old_stock_daily_booking_counts()`.
+    """
+
+    __tablename__ = "stock_daily_booking_count"
+    stockId: sa_orm.Mapped[int] = sa_orm.mapped_column(
+        sa.BigInteger, sa.ForeignKey("stock.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: sa_orm.Mapped[date] = sa_orm.mapped_column(sa.Date, primary_key=True)
+    bookingCount: sa_orm.Mapped[int] = sa_orm.mapped_column(sa.Integer, nullable=False, server_default="0")
+
+
+trig_update_stock_daily_booking_count_ddl = sa.DDL(f"""
+    CREATE OR REPLACE FUNCTION update_stock_daily_booking_count()
+    RETURNS TRIGGER AS $$
+    DECLARE
+        old_is_counted boolean := TG_OP != 'INSERT' AND OLD.status != '{BookingStatus.CANCELLED.value}';
+        new_is_counted boolean := TG_OP != 'DELETE' AND NEW.status != '{BookingStatus.CANCELLED.value}';
+    BEGIN
+    IF TG_OP = 'UPDATE'
+        AND old_is_counted = new_is_counted
+        AND OLD."stockId" = NEW."stockId"
+        AND OLD."dateCreated"::date = NEW."dateCreated"::date
+    THEN
+        RETURN NULL;
+    END IF;
+
+    IF old_is_counted THEN
+        UPDATE stock_daily_booking_count
+        SET "bookingCount" = "bookingCount" - 1
+        WHERE "stockId" = OLD."stockId" AND day = OLD."dateCreated"::date;
+    END IF;
+
+    IF new_is_counted THEN
+        INSERT INTO stock_daily_booking_count ("stockId", day, "bookingCount")
+        VALUES (NEW."stockId", NEW."dateCreated"::date, 1)
+        ON CONFLICT ("stockId", day)
+        DO UPDATE SET "bookingCount" = stock_daily_booking_count."bookingCount" + 1;
+    END IF;
+
+    RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS booking_update_stock_daily_count ON booking;
+
+    CREATE TRIGGER booking_update_stock_daily_count
+    AFTER INSERT OR DELETE OR UPDATE OF status, "stockId", "dateCreated"
+    ON booking
+    FOR EACH ROW
+    EXECUTE PROCEDURE update_stock_daily_booking_count()
+    """)
+
+sa_event.listen(Booking.__table__, "after_create", trig_update_stock_daily_booking_count_ddl)
+
+
 class FraudulentBookingTag(PcObject, Model):
     __tablename__ = "fraudulent_booking_tag"
     dateCreated: sa_orm.Mapped[datetime] = sa_orm.mapped_column(
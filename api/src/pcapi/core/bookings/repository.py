@@ -1,10 +1,14 @@
+import codecs
 import csv
+import itertools
+import tempfile
 import typing
 from collections.abc import Sequence
 from datetime import date
 from datetime import datetime
 from datetime import time
 from datetime import timedelta
+from datetime import tzinfo
 from decimal import Decimal
 from io import BytesIO
 from io import StringIO
@@ -35,6 +39,10 @@ from pcapi.utils.token import random_token
 
 
 DUO_QUANTITY = 2
+# Number of bookings fetched from the database, and written to the
+# response, at once by streamed exports.
+EXPORT_CHUNK_SIZE = 1000
+EXCEL_EXPORT_READ_SIZE = 64 * 1024
 
 
 BOOKING_STATUS_LABELS = {
@@ -361,28 +369,43 @@ def _create_export_query(offer_id: int, event_beginning_date: date) -> sa_orm.Qu
     return query.distinct(models.Booking.id)
 
 
-def export_validated_bookings_by_offer_id(
-    offer_id: int, event_beginning_date: date, export_type: models.BookingExportType
-) -> str | bytes:
-    offer_validated_bookings_query = _create_export_query(offer_id, event_beginning_date)
-    offer_validated_bookings_query = offer_validated_bookings_query.filter(
-        sa.or_(
-            sa.and_(models.Booking.isConfirmed.is_(True), models.Booking.status != models.BookingStatus.CANCELLED),
-            models.Booking.status == models.BookingStatus.USED,
+def _create_export_by_offer_query(offer_id: int, event_beginning_date: date, validated_only: bool) -> sa_orm.Query:
+    query = _create_export_query(offer_id, event_beginning_date)
+    if validated_only:
+        query = query.filter(
+            sa.or_(
+                sa.and_(models.Booking.isConfirmed.is_(True), models.Booking.status != models.BookingStatus.CANCELLED),
+                models.Booking.status == models.BookingStatus.USED,
+            )
         )
-    )
-    if export_type == models.BookingExportType.EXCEL:
-        return _write_bookings_to_excel(offer_validated_bookings_query)
-    return _write_bookings_to_csv(offer_validated_bookings_query)
-
-
-def export_bookings_by_offer_id(
-    offer_id: int, event_beginning_date: date, export_type: models.BookingExportType
-) -> str | bytes:
-    offer_bookings_query = _create_export_query(offer_id, event_beginning_date)
+    return query
+
+
+def stream_bookings_by_offer_id(
+    offer_id: int,
+    event_beginning_date: date,
+    export_type: models.BookingExportType,
+    validated_only: bool = False,
+) -> typing.Iterator[bytes]:
+    """Yield the export of the bookings of an offer, chunk by chunk,
+    so that it can be sent as a streamed HTTP response.
+
+    Bookings are fetched by chunks (with keyset pagination, each chunk
+    with its own query) and written as they come, so that the whole
+    export is never held in memory. CSV exports are encoded in UTF-8
+    with a BOM, so that Excel detects the encoding.
+
+    Excel exports are a zip archive that cannot be sent before it is
+    complete: all bookings are fetched and written to a temporary file
+    when the first chunk is requested, then the file is streamed.
+    """
+    query = _create_export_by_offer_query(offer_id, event_beginning_date, validated_only=validated_only)
     if export_type == models.BookingExportType.EXCEL:
-        return _write_bookings_to_excel(offer_bookings_query)
-    return _write_bookings_to_csv(offer_bookings_query)
+        yield from _iter_bookings_excel(query)
+        return
+    yield codecs.BOM_UTF8
+    for chunk in _iter_bookings_csv(query):
+        yield chunk.encode("utf-8")
 
 
 def get_export(
@@ -678,46 +701,127 @@ def get_booking_price(booking: schemas.ExportBookingsQueryResult) -> Decimal:
     return booking.amount
 
 
-def _write_bookings_to_csv(query: sa_orm.Query) -> str:
-    output = StringIO()
-    writer = csv.writer(output, dialect=csv.excel, delimiter=";", quoting=csv.QUOTE_NONNUMERIC)
-    writer.writerow(booking_export_header())
-    for booking in query.yield_per(1000):
-        booking = typing.cast(schemas.ExportBookingsQueryResult, booking)
+class _FormattedExportBooking(typing.NamedTuple):
+    """Values of an export row that are computed from the booking."""
 
-        if booking.quantity == DUO_QUANTITY:
-            _write_csv_row(writer, booking, "DUO 1")
-            _write_csv_row(writer, booking, "DUO 2")
-        else:
-            _write_csv_row(writer, booking, "Non")
+    stockBeginningDatetime: datetime | None
+    bookedAt: datetime | None
+    usedAt: datetime | None
+    reimbursedAt: datetime | None
+    token: str | None
+    price: Decimal
+    status: str
 
-    return output.getvalue()
+
+def _format_export_bookings(
+    bookings: Sequence[schemas.ExportBookingsQueryResult],
+) -> list[_FormattedExportBooking]:
+    """Compute the values of the export rows of a chunk of bookings.
+
+    Timezones are resolved once per department for the whole chunk,
+    then dates are converted column by column.
+    """
+    tzinfos: dict[str, tzinfo | None] = {}
+    department_codes = [utils.get_booking_department_code(booking) for booking in bookings]
+    for department_code in set(department_codes):
+        if department_code is not None:
+            tzinfos[department_code] = utils.get_departement_tzinfo(department_code)
+
+    def convert(dates: typing.Iterable[datetime | None]) -> list[datetime | None]:
+        return [
+            date_.astimezone(tzinfos[department_code]) if date_ is not None and department_code is not None else None
+            for date_, department_code in zip(dates, department_codes)
+        ]
+
+    return [
+        _FormattedExportBooking(*values)
+        for values in zip(
+            convert(booking.stockBeginningDatetime for booking in bookings),
+            convert(booking.bookedAt for booking in bookings),
+            convert(booking.usedAt for booking in bookings),
+            convert(booking.reimbursedAt for booking in bookings),
+            (
+                get_booking_token(booking.token, booking.status, booking.isExternal, booking.stockBeginningDatetime)
+                for booking in bookings
+            ),
+            (get_booking_price(booking) for booking in bookings),
+            (_get_booking_status(booking.status, booking.isConfirmed) for booking in bookings),
+        )
+    ]
+
+
+def _iter_export_chunks(
+    query: sa_orm.Query,
+) -> typing.Iterator[list[tuple[schemas.ExportBookingsQueryResult, _FormattedExportBooking]]]:
+    for chunk in itertools.batched(query.yield_per(EXPORT_CHUNK_SIZE), EXPORT_CHUNK_SIZE):
+        bookings = typing.cast(Sequence[schemas.ExportBookingsQueryResult], chunk)
+        yield list(zip(bookings, _format_export_bookings(bookings)))
+
+
+def _iter_export_chunks_by_keyset(
+    query: sa_orm.Query,
+) -> typing.Iterator[list[tuple[schemas.ExportBookingsQueryResult, _FormattedExportBooking]]]:
+    """Same as `_iter_export_chunks()` for queries ordered by booking id
+    (see `_create_export_query()`), but each chunk is fetched by its
+    own query, instead of a server-side cursor that would be kept open
+    until the last chunk has been consumed.
+    """
+    last_id = 0
+    while True:
+        bookings = typing.cast(
+            Sequence[schemas.ExportBookingsQueryResult],
+            query.filter(models.Booking.id > last_id).limit(EXPORT_CHUNK_SIZE).all(),
+        )
+        if not bookings:
+            return
+        yield list(zip(bookings, _format_export_bookings(bookings)))
+        if len(bookings) < EXPORT_CHUNK_SIZE:
+            return
+        last_id = bookings[-1].id
 
 
-def _write_csv_row(csv_writer: typing.Any, booking: schemas.ExportBookingsQueryResult, booking_duo_column: str) -> None:
-    booking_price = get_booking_price(booking)
+def _iter_bookings_csv(query: sa_orm.Query) -> typing.Iterator[str]:
+    output = StringIO()
+    writer = csv.writer(output, dialect=csv.excel, delimiter=";", quoting=csv.QUOTE_NONNUMERIC)
+    writer.writerow(booking_export_header())
+    for chunk in _iter_export_chunks_by_keyset(query):
+        for booking, formatted in chunk:
+            if booking.quantity == DUO_QUANTITY:
+                _write_csv_row(writer, booking, formatted, "DUO 1")
+                _write_csv_row(writer, booking, formatted, "DUO 2")
+            else:
+                _write_csv_row(writer, booking, formatted, "Non")
+
+        yield output.getvalue()
+        output.seek(0)
+        output.truncate()
+
+    yield output.getvalue()
+
+
+def _write_csv_row(
+    csv_writer: typing.Any,
+    booking: schemas.ExportBookingsQueryResult,
+    formatted: _FormattedExportBooking,
+    booking_duo_column: str,
+) -> None:
     row: tuple[typing.Any, ...] = (
         booking.venueName,
         booking.offerName,
         f"{booking.locationName} - {booking.locationStreet} {booking.locationPostalCode} {booking.locationCity}",
-        utils.convert_booking_dates_utc_to_venue_timezone(booking.stockBeginningDatetime, booking),
+        formatted.stockBeginningDatetime,
         booking.ean,
         booking.beneficiaryFirstName,
         booking.beneficiaryLastName,
         booking.beneficiaryEmail,
         booking.beneficiaryPhoneNumber,
-        utils.convert_booking_dates_utc_to_venue_timezone(booking.bookedAt, booking),
-        utils.convert_booking_dates_utc_to_venue_timezone(booking.usedAt, booking),
-        get_booking_token(
-            booking.token,
-            booking.status,
-            booking.isExternal,
-            booking.stockBeginningDatetime,
-        ),
+        formatted.bookedAt,
+        formatted.usedAt,
+        formatted.token,
         booking.priceCategoryLabel or "",
-        booking_price,
-        _get_booking_status(booking.status, booking.isConfirmed),
-        utils.convert_booking_dates_utc_to_venue_timezone(booking.reimbursedAt, booking),
+        formatted.price,
+        formatted.status,
+        formatted.reimbursedAt,
         serialize_offer_type_educational_or_individual(offer_is_educational=False),
         booking.beneficiaryPostalCode or "",
         booking_duo_column,
@@ -725,9 +829,20 @@ def _write_csv_row(csv_writer: typing.Any, booking: schemas.ExportBookingsQueryR
     csv_writer.writerow(row)
 
 
-def _write_bookings_to_excel(query: sa_orm.Query) -> bytes:
-    output = BytesIO()
-    workbook = xlsxwriter.Workbook(output)
+def _iter_bookings_excel(query: sa_orm.Query) -> typing.Iterator[bytes]:
+    # An XLSX file is a zip archive, that cannot be sent before it is
+    # complete. In "constant_memory" mode, xlsxwriter flushes each row
+    # to a temporary file instead of keeping all cells in memory. The
+    # archive itself is also built in a temporary file.
+    with tempfile.TemporaryFile() as output:
+        _write_bookings_excel_workbook(query, output)
+        output.seek(0)
+        while chunk := output.read(EXCEL_EXPORT_READ_SIZE):
+            yield chunk
+
+
+def _write_bookings_excel_workbook(query: sa_orm.Query, output: typing.IO[bytes]) -> None:
+    workbook = xlsxwriter.Workbook(output, {"constant_memory": True})
 
     bold = workbook.add_format(utils_export.EXCEL_BOLD_FORMAT)
     currency_format_eur = workbook.add_format(utils_export.EXCEL_CURRENCY_FORMAT)
@@ -742,113 +857,76 @@ def _write_bookings_to_excel(query: sa_orm.Query) -> bytes:
         worksheet.set_column(col_num, col_num, col_width)
 
     row = 1
-    for booking in query.yield_per(1000):
-        booking = typing.cast(schemas.ExportBookingsQueryResult, booking)
-
-        if booking.quantity == DUO_QUANTITY:
-            _write_excel_row(
-                worksheet,
-                row,
-                booking,
-                currency_format_cfp if getattr(booking, "is_caledonian", False) else currency_format_eur,
-                "DUO 1",
-            )
+    for chunk in _iter_export_chunks_by_keyset(query):
+        for booking, formatted in chunk:
+            currency_format = currency_format_cfp if getattr(booking, "is_caledonian", False) else currency_format_eur
+            if booking.quantity == DUO_QUANTITY:
+                _write_excel_row(worksheet, row, booking, formatted, currency_format, "DUO 1")
+                row += 1
+                _write_excel_row(worksheet, row, booking, formatted, currency_format, "DUO 2")
+            else:
+                _write_excel_row(worksheet, row, booking, formatted, currency_format, "Non")
             row += 1
-            _write_excel_row(
-                worksheet,
-                row,
-                booking,
-                currency_format_cfp if getattr(booking, "is_caledonian", False) else currency_format_eur,
-                "DUO 2",
-            )
-        else:
-            _write_excel_row(
-                worksheet,
-                row,
-                booking,
-                currency_format_cfp if getattr(booking, "is_caledonian", False) else currency_format_eur,
-                "Non",
-            )
-        row += 1
     workbook.close()
-    return output.getvalue()
 
 
 def _write_excel_row(
-    worksheet: Worksheet, row: int, booking: schemas.ExportBookingsQueryResult, currency_format: Format, duo_column: str
+    worksheet: Worksheet,
+    row: int,
+    booking: schemas.ExportBookingsQueryResult,
+    formatted: _FormattedExportBooking,
+    currency_format: Format,
+    duo_column: str,
 ) -> None:
-    booking_price = get_booking_price(booking)
     worksheet.write(row, 0, booking.venueName)
     worksheet.write(row, 1, booking.offerName)
-    worksheet.write(
-        row, 2, str(utils.convert_booking_dates_utc_to_venue_timezone(booking.stockBeginningDatetime, booking))
-    )
+    worksheet.write(row, 2, str(formatted.stockBeginningDatetime))
     worksheet.write(row, 3, booking.ean)
     worksheet.write(row, 4, booking.beneficiaryFirstName)
     worksheet.write(row, 5, booking.beneficiaryLastName)
     worksheet.write(row, 6, booking.beneficiaryEmail)
     worksheet.write(row, 7, booking.beneficiaryPhoneNumber)
-    worksheet.write(row, 8, str(utils.convert_booking_dates_utc_to_venue_timezone(booking.bookedAt, booking)))
-    worksheet.write(row, 9, str(utils.convert_booking_dates_utc_to_venue_timezone(booking.usedAt, booking)))
-    worksheet.write(
-        row,
-        10,
-        get_booking_token(
-            booking.token,
-            booking.status,
-            booking.isExternal,
-            booking.stockBeginningDatetime,
-        ),
-    )
+    worksheet.write(row, 8, str(formatted.bookedAt))
+    worksheet.write(row, 9, str(formatted.usedAt))
+    worksheet.write(row, 10, formatted.token)
     worksheet.write(row, 11, booking.priceCategoryLabel)
-    worksheet.write(row, 12, booking_price, currency_format)
-    worksheet.write(row, 13, _get_booking_status(booking.status, booking.isConfirmed))
-    worksheet.write(row, 14, str(utils.convert_booking_dates_utc_to_venue_timezone(booking.reimbursedAt, booking)))
+    worksheet.write(row, 12, formatted.price, currency_format)
+    worksheet.write(row, 13, formatted.status)
+    worksheet.write(row, 14, str(formatted.reimbursedAt))
     worksheet.write(row, 15, serialize_offer_type_educational_or_individual(offer_is_educational=False))
     worksheet.write(row, 16, booking.beneficiaryPostalCode)
-    worksheet.write(
-        row,
-        17,
-        duo_column,
-    )
+    worksheet.write(row, 17, duo_column)
 
 
 def _serialize_csv_report(query: sa_orm.Query) -> str:
     output = StringIO()
     writer = csv.writer(output, dialect=csv.excel, delimiter=";", quoting=csv.QUOTE_NONNUMERIC)
     writer.writerow(booking_export_header())
-    for booking in query.yield_per(1000):
-        booking = typing.cast(schemas.ExportBookingsQueryResult, booking)
-
-        booking_price = get_booking_price(booking)
-        row: tuple[typing.Any, ...] = (
-            booking.venueName,
-            booking.offerName,
-            f"{booking.locationName} - {booking.locationStreet} {booking.locationPostalCode} {booking.locationCity}",
-            utils.convert_booking_dates_utc_to_venue_timezone(booking.stockBeginningDatetime, booking),
-            booking.ean,
-            booking.beneficiaryFirstName,
-            booking.beneficiaryLastName,
-            booking.beneficiaryEmail,
-            booking.beneficiaryPhoneNumber,
-            utils.convert_booking_dates_utc_to_venue_timezone(booking.bookedAt, booking),
-            utils.convert_booking_dates_utc_to_venue_timezone(booking.usedAt, booking),
-            get_booking_token(
-                booking.token,
-                booking.status,
-                booking.isExternal,
-                booking.stockBeginningDatetime,
-            ),
-            booking.priceCategoryLabel or "",
-            booking_price,
-            _get_booking_status(booking.status, booking.isConfirmed),
-            utils.convert_booking_dates_utc_to_venue_timezone(booking.reimbursedAt, booking),
-            # This method is still used in the old Payment model
-            serialize_offer_type_educational_or_individual(offer_is_educational=False),
-            booking.beneficiaryPostalCode or "",
-            "Oui" if booking.quantity == DUO_QUANTITY else "Non",
-        )
-        writer.writerow(row)
+    for chunk in _iter_export_chunks(query):
+        for booking, formatted in chunk:
+            row: tuple[typing.Any, ...] = (
+                booking.venueName,
+                booking.offerName,
+                f"{booking.locationName} - {booking.locationStreet} {booking.locationPostalCode} {booking.locationCity}",
+                formatted.stockBeginningDatetime,
+                booking.ean,
+                booking.beneficiaryFirstName,
+                booking.beneficiaryLastName,
+                booking.beneficiaryEmail,
+                booking.beneficiaryPhoneNumber,
+                formatted.bookedAt,
+                formatted.usedAt,
+                formatted.token,
+                booking.priceCategoryLabel or "",
+                formatted.price,
+                formatted.status,
+                formatted.reimbursedAt,
+                # This method is still used in the old Payment model
+                serialize_offer_type_educational_or_individual(offer_is_educational=False),
+                booking.beneficiaryPostalCode or "",
+                "Oui" if booking.quantity == DUO_QUANTITY else "Non",
+            )
+            writer.writerow(row)
 
     return output.getvalue()
 
@@ -870,38 +948,36 @@ def _serialize_excel_report(query: sa_orm.Query) -> bytes:
         worksheet.set_column(col_num, col_num, col_width)
     row = 1
     data: tuple[typing.Any, ...]
-    for booking in query.yield_per(1000):
-        booking = typing.cast(schemas.ExportBookingsQueryResult, booking)
-
-        booking_price = get_booking_price(booking)
-        if hasattr(booking, "is_caledonian") and booking.is_caledonian:
-            currency_format = currency_format_cfp
-        else:
-            currency_format = currency_format_eur
-        data = (
-            booking.venueName,
-            booking.offerName,
-            f"{booking.locationName} - {booking.locationStreet} {booking.locationPostalCode} {booking.locationCity}",
-            str(utils.convert_booking_dates_utc_to_venue_timezone(booking.stockBeginningDatetime, booking)),
-            booking.ean,
-            booking.beneficiaryFirstName,
-            booking.beneficiaryLastName,
-            booking.beneficiaryEmail,
-            booking.beneficiaryPhoneNumber,
-            str(utils.convert_booking_dates_utc_to_venue_timezone(booking.bookedAt, booking)),
-            str(utils.convert_booking_dates_utc_to_venue_timezone(booking.usedAt, booking)),
-            get_booking_token(booking.token, booking.status, booking.isExternal, booking.stockBeginningDatetime),
-            booking.priceCategoryLabel,
-            booking_price,
-            _get_booking_status(booking.status, booking.isConfirmed),
-            str(utils.convert_booking_dates_utc_to_venue_timezone(booking.reimbursedAt, booking)),
-            serialize_offer_type_educational_or_individual(offer_is_educational=False),
-            booking.beneficiaryPostalCode,
-            "Oui" if booking.quantity == DUO_QUANTITY else "Non",
-        )
-        worksheet.write_row(row, 0, data)
-        worksheet.set_column(13, 13, cell_format=currency_format)
-        row += 1
+    for chunk in _iter_export_chunks(query):
+        for booking, formatted in chunk:
+            if hasattr(booking, "is_caledonian") and booking.is_caledonian:
+                currency_format = currency_format_cfp
+            else:
+                currency_format = currency_format_eur
+            data = (
+                booking.venueName,
+                booking.offerName,
+                f"{booking.locationName} - {booking.locationStreet} {booking.locationPostalCode} {booking.locationCity}",
+                str(formatted.stockBeginningDatetime),
+                booking.ean,
+                booking.beneficiaryFirstName,
+                booking.beneficiaryLastName,
+                booking.beneficiaryEmail,
+                booking.beneficiaryPhoneNumber,
+                str(formatted.bookedAt),
+                str(formatted.usedAt),
+                formatted.token,
+                booking.priceCategoryLabel,
+                formatted.price,
+                formatted.status,
+                str(formatted.reimbursedAt),
+                serialize_offer_type_educational_or_individual(offer_is_educational=False),
+                booking.beneficiaryPostalCode,
+                "Oui" if booking.quantity == DUO_QUANTITY else "Non",
+            )
+            worksheet.write_row(row, 0, data)
+            worksheet.set_column(13, 13, cell_format=currency_format)
+            row += 1
 
     workbook.close()
     return output.getvalue()
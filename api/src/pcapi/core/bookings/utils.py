@@ -2,6 +2,7 @@ import hmac
 import typing
 from datetime import datetime
 from datetime import timedelta
+from datetime import tzinfo
 from decimal import Decimal
 from hashlib import sha256
 
@@ -69,22 +70,28 @@ def generate_ed25519_signature(data: str, private_key: str, password: str | None
     return deserialized_key.sign(data.encode("utf-8")).hex()
 
 
+def get_departement_tzinfo(departement_code: str | None) -> tzinfo | None:
+    return tz.gettz(date_utils.get_department_timezone(departement_code))
+
+
 def _apply_departement_timezone(naive_datetime: datetime | None, departement_code: str | None) -> datetime | None:
     if naive_datetime is None or departement_code is None:
         return None
-    departement_tz = tz.gettz(date_utils.get_department_timezone(departement_code))
-    return naive_datetime.astimezone(departement_tz)
+    return naive_datetime.astimezone(get_departement_tzinfo(departement_code))
+
+
+def get_booking_department_code(
+    booking: "schemas.ExportBookingsQueryResult | schemas.GetBookingsQueryResult",
+) -> str | None:
+    return booking.offerDepartmentCode or booking.venueDepartmentCode
 
 
 def convert_booking_dates_utc_to_venue_timezone(
     date_without_timezone: datetime | None,
     booking: "schemas.ExportBookingsQueryResult | schemas.GetBookingsQueryResult",
 ) -> datetime | None:
-    if booking.offerDepartmentCode:
-        department_code = booking.offerDepartmentCode
-        return _apply_departement_timezone(naive_datetime=date_without_timezone, departement_code=department_code)
     return _apply_departement_timezone(
-        naive_datetime=date_without_timezone, departement_code=booking.venueDepartmentCode
+        naive_datetime=date_without_timezone, departement_code=get_booking_department_code(booking)
     )
 
 
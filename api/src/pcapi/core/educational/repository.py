@@ -23,6 +23,7 @@ from pcapi.core.users.models import User
 from pcapi.models import db
 from pcapi.models import offer_mixin
 from pcapi.utils import date as date_utils
+from pcapi.utils import db as db_utils
 from pcapi.utils.clean_accents import clean_accents
 
 
@@ -1444,18 +1445,15 @@ def find_pending_booking_confirmation_limit_date_in_3_days() -> list[models.Coll
     return query.all()
 
 
-def get_paginated_active_collective_offer_template_ids(batch_size: int, page: int = 1) -> list[int]:
-    query = (
-        db.session.query(models.CollectiveOfferTemplate)
-        .with_entities(models.CollectiveOfferTemplate.id)
-        .filter(
-            models.CollectiveOfferTemplate.isActive.is_(True),
-        )
-        .order_by(models.CollectiveOfferTemplate.id)
-        .offset((page - 1) * batch_size)  # first page is 1, not 0
-        .limit(batch_size)
+def get_paginated_active_collective_offer_template_ids(
+    batch_size: int,
+    start_id: int | None = None,
+    start_page: int = 1,
+) -> typing.Iterator[list[int]]:
+    query = sa.select(models.CollectiveOfferTemplate.id).filter(models.CollectiveOfferTemplate.isActive.is_(True))
+    yield from db_utils.yield_id_batches_by_keyset(
+        query, models.CollectiveOfferTemplate.id, batch_size, start_id, start_page
     )
-    return [offer_id for (offer_id,) in query]
 
 
 def get_educational_institution_public(
@@ -23,12 +23,15 @@ details).
   which should be rare.
 """
 
+import collections
 import csv
 import datetime
 import decimal
 import itertools
 import logging
 import math
+import multiprocessing
+import multiprocessing.pool
 import pathlib
 import secrets
 import tempfile
@@ -277,10 +280,17 @@ def cancel_latest_event(
 def price_events(
     min_date: datetime.datetime = MIN_DATE_TO_PRICE,
     batch_size: int = PRICE_EVENTS_BATCH_SIZE,
+    processes: int = 1,
 ) -> None:
     """Price finance events that are ready to be priced.
 
     This function is normally called by a cron job.
+
+    If ``processes`` is greater than 1, events are partitioned by
+    pricing point, and each pricing point is handled by one of
+    ``processes`` worker processes. Events of the same pricing point
+    are always priced by a single process, in the same order as a
+    serial run (see note in module docstring).
     """
     # The upper bound on `pricingOrderingDate` avoids selecting a very
     # recent event that may have been COMMITed to the database just
@@ -289,13 +299,69 @@ def price_events(
     threshold = date_utils.get_naive_utc_now() - datetime.timedelta(minutes=1)
     window = (min_date, threshold)
 
+    # Custom reimbursement rules are loaded once for the whole run.
+    rule_finder = reimbursement_rules.CustomRuleFinder()
+
+    if processes <= 1:
+        _price_events_in_window(window, batch_size, rule_finder=rule_finder)
+        return
+
+    pricing_point_ids = [
+        pricing_point_id
+        for (pricing_point_id,) in _filter_events_to_price(
+            db.session.query(models.FinanceEvent.pricingPointId).distinct(),
+            window,
+        )
+    ]
+    logger.info(
+        "Pricing events in parallel",
+        extra={"pricing_points": len(pricing_point_ids), "processes": processes},
+    )
+    # Make sure that no connection is inherited by child processes.
+    db.session.close()
+    db.engine.dispose()
+    price_pricing_point_events = partial(_price_pricing_point_events, window, batch_size, rule_finder)
+    with multiprocessing.get_context("fork").Pool(processes, initializer=_init_worker_process) as pool:
+        for _ in pool.imap_unordered(price_pricing_point_events, pricing_point_ids):
+            pass
+
+
+def _init_worker_process() -> None:
+    # Connections must not be shared with the parent process, see
+    # https://docs.sqlalchemy.org/en/20/core/pooling.html#using-connection-pools-with-multiprocessing-or-os-fork
+    db.engine.dispose(close=False)
+
+
+def _price_pricing_point_events(
+    window: tuple[datetime.datetime, datetime.datetime],
+    batch_size: int,
+    rule_finder: reimbursement_rules.CustomRuleFinder,
+    pricing_point_id: int,
+) -> None:
+    try:
+        _price_events_in_window(window, batch_size, pricing_point_id=pricing_point_id, rule_finder=rule_finder)
+    finally:
+        # Workers price many pricing points: do not keep the objects
+        # of the previous ones in the session.
+        db.session.close()
+
+
+def _price_events_in_window(
+    window: tuple[datetime.datetime, datetime.datetime],
+    batch_size: int,
+    pricing_point_id: int | None = None,
+    rule_finder: reimbursement_rules.CustomRuleFinder | None = None,
+) -> None:
     errored_pricing_point_ids = set()
+    rule_finder = rule_finder or reimbursement_rules.CustomRuleFinder()
 
     # This is a quick hack to avoid fetching all events at once,
     # resulting in a very large session that is updated on each
     # commit, which takes a lot of time (up to 1 or 2 seconds per
     # commit).
     event_query = _get_events_to_price(window)
+    if pricing_point_id is not None:
+        event_query = event_query.filter(models.FinanceEvent.pricingPointId == pricing_point_id)
     loops = math.ceil(event_query.count() / batch_size)
 
     def _get_loop_query(
@@ -328,7 +394,7 @@ def price_events(
                     "pricing_point": event.pricingPointId,
                 }
                 with log_elapsed(logger, "Priced event", extra):
-                    price_event(event)
+                    price_event(event, rule_finder=rule_finder)
             except Exception as exc:
                 errored_pricing_point_ids.add(event.pricingPointId)
                 logger.info(
@@ -381,10 +447,12 @@ def get_pricing_point_link(
     raise ValueError(f"Could not find pricing point for booking {booking.id}")
 
 
-def _get_events_to_price(window: tuple[datetime.datetime, datetime.datetime]) -> sa_orm.Query:
+def _filter_events_to_price(
+    query: sa_orm.Query,
+    window: tuple[datetime.datetime, datetime.datetime],
+) -> sa_orm.Query:
     return (
-        db.session.query(models.FinanceEvent)
-        .filter(
+        query.filter(
             models.FinanceEvent.pricingPointId.is_not(None),
             models.FinanceEvent.status == models.FinanceEventStatus.READY,
             models.FinanceEvent.pricingOrderingDate.between(*window),
@@ -393,6 +461,12 @@ def _get_events_to_price(window: tuple[datetime.datetime, datetime.datetime]) ->
         .filter(
             models.Pricing.id.is_(None) | (models.Pricing.status == models.PricingStatus.CANCELLED),
         )
+    )
+
+
+def _get_events_to_price(window: tuple[datetime.datetime, datetime.datetime]) -> sa_orm.Query:
+    return (
+        _filter_events_to_price(db.session.query(models.FinanceEvent), window)
         .order_by(models.FinanceEvent.pricingOrderingDate, models.FinanceEvent.id)
         .options(
             sa_orm.joinedload(models.FinanceEvent.booking),
@@ -425,7 +499,10 @@ def lock_bank_account(bank_account_id: int) -> None:
     return db_utils.acquire_lock(f"bank-account-{bank_account_id}")
 
 
-def price_event(event: models.FinanceEvent) -> models.Pricing | None:
+def price_event(
+    event: models.FinanceEvent,
+    rule_finder: reimbursement_rules.CustomRuleFinder | None = None,
+) -> models.Pricing | None:
     assert event.pricingPointId  # helps mypy
     with transaction():
         lock_pricing_point(event.pricingPointId)
@@ -503,18 +580,22 @@ def price_event(event: models.FinanceEvent) -> models.Pricing | None:
 
         _delete_dependent_pricings(event, "Deleted pricings priced too early")
 
-        pricing = _price_event(event)
+        pricing = _price_event(event, rule_finder)
         db.session.add(pricing)
         event.status = models.FinanceEventStatus.PRICED
         db.session.commit()
     return pricing
 
 
+def _get_revenue_year(value_date: datetime.datetime) -> int:
+    return value_date.replace(tzinfo=pytz.utc).astimezone(utils.ACCOUNTING_TIMEZONE).year
+
+
 def _get_revenue_period(value_date: datetime.datetime) -> tuple[datetime.datetime, datetime.datetime]:
     """Return a datetime (year) period for the given value date, i.e. the
     first and last seconds of the year of the ``value_date``.
     """
-    year = value_date.replace(tzinfo=pytz.utc).astimezone(utils.ACCOUNTING_TIMEZONE).year
+    year = _get_revenue_year(value_date)
     first_second = utils.ACCOUNTING_TIMEZONE.localize(
         datetime.datetime.combine(
             datetime.date(year, 1, 1),
@@ -533,28 +614,106 @@ def _get_revenue_period(value_date: datetime.datetime) -> tuple[datetime.datetim
 def _get_current_revenue(event: models.FinanceEvent) -> int:
     """Return the current year revenue for the pricing point of an
     event, NOT including the given event.
+
+    The revenue is read from `PricingPointYearlyRevenue`, which is
+    maintained by database triggers, once it has been filled with
+    existing pricings (see `WIP_ENABLE_PRICING_POINT_YEARLY_REVENUE`).
+    Otherwise, it is summed from pricings.
     """
-    revenue_period = _get_revenue_period(event.valueDate)
-    # Collective bookings must not be included in revenue.
-    current_revenue = (
-        db.session.query(bookings_models.Booking)
-        .join(models.Pricing)
-        .filter(
-            models.Pricing.pricingPointId == event.pricingPointId,
-            # The following filter is not strictly necessary, because
-            # this function is called before we create the pricing for
-            # this event.
-            models.Pricing.bookingId != event.bookingId,
-            models.Pricing.valueDate.between(*revenue_period),
-            models.Pricing.status != models.PricingStatus.CANCELLED,
+    # Collective bookings are not included in revenue (see
+    # `PricingPointYearlyRevenue`).
+    if FeatureToggle.WIP_ENABLE_PRICING_POINT_YEARLY_REVENUE.is_active():
+        # This function is called before we create the pricing for
+        # this event, so it cannot be included.
+        current_revenue = (
+            db.session.query(models.PricingPointYearlyRevenue.revenue)
+            .filter(
+                models.PricingPointYearlyRevenue.pricingPointId == event.pricingPointId,
+                models.PricingPointYearlyRevenue.year == _get_revenue_year(event.valueDate),
+            )
+            .scalar()
+        )
+    else:
+        current_revenue = (
+            db.session.query(bookings_models.Booking)
+            .join(models.Pricing)
+            .filter(
+                models.Pricing.pricingPointId == event.pricingPointId,
+                # The following filter is not strictly necessary, because
+                # this function is called before we create the pricing for
+                # this event.
+                models.Pricing.bookingId != event.bookingId,
+                models.Pricing.valueDate.between(*_get_revenue_period(event.valueDate)),
+                models.Pricing.status != models.PricingStatus.CANCELLED,
+            )
+            .with_entities(sa.func.sum(bookings_models.Booking.amount * bookings_models.Booking.quantity))
+            .scalar()
         )
-        .with_entities(sa.func.sum(bookings_models.Booking.amount * bookings_models.Booking.quantity))
-        .scalar()
-    )
     return utils.to_cents(current_revenue or 0)
 
 
-def _price_event(event: models.FinanceEvent) -> models.Pricing:
+class PricingPointYearlyRevenueDiscrepancy(typing.NamedTuple):
+    pricing_point_id: int
+    year: int
+    stored_revenue: decimal.Decimal
+    actual_revenue: decimal.Decimal
+
+
+def get_pricing_point_yearly_revenue_discrepancies(
+    year: int | None = None,
+) -> list[PricingPointYearlyRevenueDiscrepancy]:
+    """Compare the revenues stored in `PricingPointYearlyRevenue` with
+    the revenues computed from pricings, and return those that differ.
+    """
+    pricing_year = sa.cast(
+        sa.func.date_part(
+            "year",
+            sa.func.timezone(utils.ACCOUNTING_TIMEZONE.zone, sa.func.timezone("UTC", models.Pricing.valueDate)),
+        ),
+        sa.Integer,
+    )
+    actual_query = (
+        sa.select(
+            models.Pricing.pricingPointId.label("pricingPointId"),
+            pricing_year.label("year"),
+            sa.func.sum(bookings_models.Booking.amount * bookings_models.Booking.quantity).label("revenue"),
+        )
+        .join(bookings_models.Booking, bookings_models.Booking.id == models.Pricing.bookingId)
+        .where(models.Pricing.status != models.PricingStatus.CANCELLED)
+        .group_by(models.Pricing.pricingPointId, pricing_year)
+    )
+    stored_query = sa.select(models.PricingPointYearlyRevenue)
+    if year is not None:
+        actual_query = actual_query.where(
+            models.Pricing.valueDate.between(*_get_revenue_period(datetime.datetime(year, 7, 1)))
+        )
+        stored_query = stored_query.where(models.PricingPointYearlyRevenue.year == year)
+    actual = actual_query.subquery()
+    stored = stored_query.subquery()
+
+    pricing_point_id = sa.func.coalesce(stored.c.pricingPointId, actual.c.pricingPointId)
+    revenue_year = sa.func.coalesce(stored.c.year, actual.c.year)
+    stored_revenue = sa.func.coalesce(stored.c.revenue, 0)
+    actual_revenue = sa.func.coalesce(actual.c.revenue, 0)
+    rows = db.session.execute(
+        sa.select(pricing_point_id, revenue_year, stored_revenue, actual_revenue)
+        .select_from(
+            stored.join(
+                actual,
+                sa.and_(stored.c.pricingPointId == actual.c.pricingPointId, stored.c.year == actual.c.year),
+                full=True,
+            )
+        )
+        .where(stored_revenue != actual_revenue)
+        .order_by(pricing_point_id, revenue_year)
+    )
+    return [PricingPointYearlyRevenueDiscrepancy(*row) for row in rows]
+
+
+def _price_event(
+    event: models.FinanceEvent,
+    rule_finder: reimbursement_rules.CustomRuleFinder | None = None,
+) -> models.Pricing:
     new_revenue = _get_current_revenue(event)
     individual_booking = event.bookingFinanceIncident.booking if event.bookingFinanceIncident else event.booking
     collective_booking = (
@@ -584,7 +743,7 @@ def _price_event(event: models.FinanceEvent) -> models.Pricing:
         models.FinanceEventMotive.BOOKING_USED,
         models.FinanceEventMotive.BOOKING_USED_AFTER_CANCELLATION,
     ):
-        rule_finder = reimbursement_rules.CustomRuleFinder()
+        rule_finder = rule_finder or reimbursement_rules.CustomRuleFinder()
         rule = reimbursement_rules.get_reimbursement_rule(booking, rule_finder, new_revenue)
         amount = -rule.apply(booking)  # outgoing, thus negative
         offerer_revenue_amount = -utils.to_cents(booking.total_amount)
@@ -899,8 +1058,8 @@ def update_finance_event_pricing_date(stock: offers_models.Stock) -> None:
         force_event_repricing(first_event, models.PricingLogReason.CHANGE_DATE)
 
 
-def generate_cashflows_and_payment_files(cutoff: datetime.datetime) -> models.CashflowBatch:
-    batch = generate_cashflows(cutoff)
+def generate_cashflows_and_payment_files(cutoff: datetime.datetime, processes: int = 1) -> models.CashflowBatch:
+    batch = generate_cashflows(cutoff, processes=processes)
     generate_payment_files(batch)
     return batch
 
@@ -919,89 +1078,113 @@ def _get_next_cashflow_batch_label() -> str:
     return CASHFLOW_BATCH_LABEL_PREFIX + str(next_number)
 
 
-def generate_cashflows(cutoff: datetime.datetime) -> models.CashflowBatch:
+def generate_cashflows(cutoff: datetime.datetime, processes: int = 1) -> models.CashflowBatch:
     """Generate a new CashflowBatch and a new cashflow for each
     reimbursement point for which there is money to transfer.
+
+    If the previous generation has been interrupted, its batch is
+    resumed instead (and ``cutoff`` is ignored): cashflows that have
+    already been generated are kept, and only the bank accounts that
+    have not been processed yet are.
+
+    If ``processes`` is greater than 1, bank accounts are processed by
+    ``processes`` worker processes.
     """
-    get_redis_client().set(conf.REDIS_GENERATE_CASHFLOW_LOCK, "1", ex=conf.REDIS_GENERATE_CASHFLOW_LOCK_TIMEOUT)
-    batch = models.CashflowBatch(cutoff=cutoff, label=_get_next_cashflow_batch_label())
-    db.session.add(batch)
-    db.session.commit()
-    _generate_cashflows(batch)
+    redis_client = get_redis_client()
+    with redis_client.pipeline() as pipeline:
+        pipeline.set(conf.REDIS_GENERATE_CASHFLOW_LOCK, "1", ex=conf.REDIS_GENERATE_CASHFLOW_LOCK_TIMEOUT)
+        # Until pending venues have been computed again, all venues are pending.
+        pipeline.delete(conf.REDIS_GENERATE_CASHFLOW_PENDING_VENUES, conf.REDIS_GENERATE_CASHFLOW_PENDING_VENUES_KNOWN)
+        pipeline.execute()
+    batch = _get_interrupted_cashflow_batch()
+    if batch:
+        logger.warning(
+            "Resuming interrupted generation of cashflows",
+            extra={"batch": batch.id, "cutoff": batch.cutoff.isoformat(), "requested_cutoff": cutoff.isoformat()},
+        )
+    else:
+        batch = models.CashflowBatch(cutoff=cutoff, label=_get_next_cashflow_batch_label())
+        db.session.add(batch)
+        db.session.commit()
+        redis_client.set(conf.REDIS_GENERATE_CASHFLOW_BATCH, batch.id, ex=conf.REDIS_GENERATE_CASHFLOW_BATCH_TIMEOUT)
+    _generate_cashflows(batch, processes=processes)
     # if the script fail we want to keep the lock to forbid backoffice to modify the data
-    get_redis_client().delete(conf.REDIS_GENERATE_CASHFLOW_LOCK)
+    redis_client.delete(
+        conf.REDIS_GENERATE_CASHFLOW_BATCH,
+        conf.REDIS_GENERATE_CASHFLOW_PENDING_VENUES,
+        conf.REDIS_GENERATE_CASHFLOW_PENDING_VENUES_KNOWN,
+        conf.REDIS_GENERATE_CASHFLOW_LOCK,
+    )
+    return batch
+
+
+def _get_interrupted_cashflow_batch() -> models.CashflowBatch | None:
+    """Return the batch of an interrupted generation, if it can be
+    resumed.
+
+    A batch is not resumed if it is too old, or if its payment files
+    have already been generated (e.g. by hand, after a failure): an
+    error is logged so that the batch is checked manually, and a new
+    batch is generated.
+    """
+    redis_client = get_redis_client()
+    batch_id = redis_client.get(conf.REDIS_GENERATE_CASHFLOW_BATCH)
+    if not batch_id:
+        return None
+    batch = db.session.get(models.CashflowBatch, int(batch_id))
+    if not batch:
+        logger.error("Could not resume interrupted generation of cashflows: batch not found", extra={"batch": batch_id})
+        redis_client.delete(conf.REDIS_GENERATE_CASHFLOW_BATCH)
+        return None
+    max_age = datetime.timedelta(seconds=conf.REDIS_GENERATE_CASHFLOW_BATCH_TIMEOUT)
+    if batch.creationDate < date_utils.get_naive_utc_now() - max_age:
+        logger.error(
+            "Could not resume interrupted generation of cashflows: batch is too old",
+            extra={"batch": batch.id, "creation_date": batch.creationDate.isoformat()},
+        )
+        redis_client.delete(conf.REDIS_GENERATE_CASHFLOW_BATCH)
+        return None
+    has_processed_cashflows = db.session.query(
+        sa.select(models.Cashflow.id)
+        .filter(
+            models.Cashflow.batchId == batch.id,
+            models.Cashflow.status != models.CashflowStatus.PENDING,
+        )
+        .exists()
+    ).scalar()
+    if has_processed_cashflows:
+        logger.error(
+            "Could not resume interrupted generation of cashflows: payment files have already been generated",
+            extra={"batch": batch.id},
+        )
+        redis_client.delete(conf.REDIS_GENERATE_CASHFLOW_BATCH)
+        return None
     return batch
 
 
-def _generate_cashflows(batch: models.CashflowBatch) -> None:
+def _generate_cashflows(batch: models.CashflowBatch, processes: int = 1) -> None:
     """Given an existing CashflowBatch and corresponding cutoff, generate
     a new cashflow for each bank account for which there is money to transfer.
 
-    This is a private function that you should never call directly,
-    unless the cashflow generation stopped before its end and you want
-    to proceed with an **existing** CashflowBatch.
+    Each bank account is processed in its own transaction, which is
+    what makes an interrupted generation resumable: pricings that have
+    been linked to a cashflow are not selected again.
+
+    This is a private function that you should never call directly:
+    `generate_cashflows()` resumes interrupted generations by itself.
     """
     # Store now otherwise SQLAlchemy will make a SELECT to fetch the
     # id again after each COMMIT.
     batch_id = batch.id
+    cutoff = batch.cutoff
     logger.info("Started to generate cashflows for batch %d", batch_id)
-    filters = (
-        models.Pricing.status == models.PricingStatus.VALIDATED,
-        models.Pricing.valueDate < batch.cutoff,
-        # We should not have any validated pricing with a cashflow,
-        # this is a safety belt.
-        models.CashflowPricing.pricingId.is_(None),
-        # Bookings can now be priced even if BankAccount is not ACCEPTED,
-        # but to generate cashflows we definitely need it.
-        models.BankAccount.status == models.BankAccountApplicationStatus.ACCEPTED,
-        # Even if a booking is marked as used prematurely, we should
-        # wait for the event to happen.
-        sa.or_(
-            sa.and_(
-                models.Pricing.bookingId.is_not(None),
-                sa.or_(
-                    offers_models.Stock.beginningDatetime.is_(None),
-                    offers_models.Stock.beginningDatetime < batch.cutoff,
-                ),
-            ),
-            sa.and_(
-                models.Pricing.collectiveBookingId.is_not(None),
-                educational_models.CollectiveStock.endDatetime < batch.cutoff,
-            ),
-            models.FinanceEvent.bookingFinanceIncidentId.is_not(None),
-        ),
-    )
-
-    def _mark_as_processed(pricing_ids: typing.Iterable[int]) -> None:
-        db.session.execute(
-            sa.text(
-                """
-                WITH updated AS (
-                  UPDATE pricing
-                  SET status = :processed
-                  WHERE
-                    id in :pricing_ids
-                  RETURNING id AS pricing_id
-                )
-                INSERT INTO pricing_log
-                ("pricingId", "statusBefore", "statusAfter", reason)
-                SELECT updated.pricing_id, :validated, :processed, :log_reason from updated
-            """
-            ),
-            {
-                "validated": models.PricingStatus.VALIDATED.value,
-                "processed": models.PricingStatus.PROCESSED.value,
-                "log_reason": models.PricingLogReason.GENERATE_CASHFLOW.value,
-                "pricing_ids": tuple(pricing_ids),
-            },
-        )
 
     bank_account_infos: list[sa.Row[tuple[int, typing.Sequence]]] = (
         db.session.query(
             models.BankAccount.id,
             sa_func.array_agg(models.Pricing.venueId.distinct()),
         )
-        .filter(*filters)
+        .filter(*_get_cashflow_pricing_filters(cutoff))
         .outerjoin(models.Pricing.booking)
         .outerjoin(bookings_models.Booking.stock)
         .outerjoin(models.Pricing.collectiveBooking)
@@ -1011,7 +1194,7 @@ def _generate_cashflows(batch: models.CashflowBatch) -> None:
             offerers_models.VenueBankAccountLink,
             offerers_models.VenueBankAccountLink.venueId == models.Pricing.venueId,
         )
-        .filter(offerers_models.VenueBankAccountLink.timespan.contains(batch.cutoff))
+        .filter(offerers_models.VenueBankAccountLink.timespan.contains(cutoff))
         .join(models.BankAccount, models.BankAccount.id == offerers_models.VenueBankAccountLink.bankAccountId)
         .join(offerers_models.Venue, offerers_models.Venue.id == models.Pricing.venueId)
         .execution_options(include_deleted=True)  # also join with soft deleted venues
@@ -1023,206 +1206,313 @@ def _generate_cashflows(batch: models.CashflowBatch) -> None:
         .all()
     )
 
-    for bank_account_id, venue_ids in bank_account_infos:
-        log_extra = {
-            "batch": batch_id,
-            "bank_account": bank_account_id,
-        }
-        start = time.perf_counter()
-        logger.info("Generating cashflow", extra=log_extra)
-        try:
-            with transaction():
-                pricings = (
-                    db.session.query(models.Pricing)
-                    .outerjoin(models.Pricing.booking)
-                    .outerjoin(bookings_models.Booking.stock)
-                    .outerjoin(models.Pricing.collectiveBooking)
-                    .outerjoin(educational_models.CollectiveBooking.collectiveStock)
-                    .join(models.Pricing.event)
-                    .join(
-                        models.BankAccount,
-                        models.BankAccount.id == bank_account_id,
-                    )
-                    .outerjoin(models.CashflowPricing)
-                    .filter(
-                        models.Pricing.venueId.in_(venue_ids),
-                        *filters,
-                    )
+    # The backoffice is allowed to modify the pricings of a venue as
+    # soon as its cashflow has been generated.
+    all_venue_ids = {venue_id for _bank_account_id, venue_ids in bank_account_infos for venue_id in venue_ids}
+    with get_redis_client().pipeline() as pipeline:
+        pipeline.delete(conf.REDIS_GENERATE_CASHFLOW_PENDING_VENUES)
+        if all_venue_ids:
+            pipeline.sadd(conf.REDIS_GENERATE_CASHFLOW_PENDING_VENUES, *all_venue_ids)
+            pipeline.expire(conf.REDIS_GENERATE_CASHFLOW_PENDING_VENUES, conf.REDIS_GENERATE_CASHFLOW_LOCK_TIMEOUT)
+        pipeline.set(
+            conf.REDIS_GENERATE_CASHFLOW_PENDING_VENUES_KNOWN, "1", ex=conf.REDIS_GENERATE_CASHFLOW_LOCK_TIMEOUT
+        )
+        pipeline.execute()
+
+    if processes <= 1:
+        for bank_account_id, venue_ids in bank_account_infos:
+            _generate_bank_account_cashflow(batch_id, cutoff, bank_account_id, venue_ids)
+        return
+
+    logger.info(
+        "Generating cashflows in parallel",
+        extra={"batch": batch_id, "bank_accounts": len(bank_account_infos), "processes": processes},
+    )
+    # Make sure that no connection is inherited by child processes.
+    db.session.close()
+    db.engine.dispose()
+    generate_bank_account_cashflow = partial(_generate_bank_account_cashflow_in_worker, batch_id, cutoff)
+    with multiprocessing.get_context("fork").Pool(processes, initializer=_init_worker_process) as pool:
+        for _ in pool.imap_unordered(
+            generate_bank_account_cashflow,
+            [(bank_account_id, list(venue_ids)) for bank_account_id, venue_ids in bank_account_infos],
+        ):
+            pass
+
+
+def _release_pending_venues(venue_ids: typing.Collection[int]) -> None:
+    if venue_ids:
+        get_redis_client().srem(conf.REDIS_GENERATE_CASHFLOW_PENDING_VENUES, *venue_ids)
+
+
+def _get_cashflow_pricing_filters(cutoff: datetime.datetime) -> tuple:
+    return (
+        models.Pricing.status == models.PricingStatus.VALIDATED,
+        models.Pricing.valueDate < cutoff,
+        # We should not have any validated pricing with a cashflow,
+        # this is a safety belt.
+        models.CashflowPricing.pricingId.is_(None),
+        # Bookings can now be priced even if BankAccount is not ACCEPTED,
+        # but to generate cashflows we definitely need it.
+        models.BankAccount.status == models.BankAccountApplicationStatus.ACCEPTED,
+        # Even if a booking is marked as used prematurely, we should
+        # wait for the event to happen.
+        sa.or_(
+            sa.and_(
+                models.Pricing.bookingId.is_not(None),
+                sa.or_(
+                    offers_models.Stock.beginningDatetime.is_(None),
+                    offers_models.Stock.beginningDatetime < cutoff,
+                ),
+            ),
+            sa.and_(
+                models.Pricing.collectiveBookingId.is_not(None),
+                educational_models.CollectiveStock.endDatetime < cutoff,
+            ),
+            models.FinanceEvent.bookingFinanceIncidentId.is_not(None),
+        ),
+    )
+
+
+def _mark_pricings_as_processed(pricing_ids: typing.Iterable[int]) -> None:
+    db.session.execute(
+        sa.text(
+            """
+            WITH updated AS (
+              UPDATE pricing
+              SET status = :processed
+              WHERE
+                id in :pricing_ids
+              RETURNING id AS pricing_id
+            )
+            INSERT INTO pricing_log
+            ("pricingId", "statusBefore", "statusAfter", reason)
+            SELECT updated.pricing_id, :validated, :processed, :log_reason from updated
+        """
+        ),
+        {
+            "validated": models.PricingStatus.VALIDATED.value,
+            "processed": models.PricingStatus.PROCESSED.value,
+            "log_reason": models.PricingLogReason.GENERATE_CASHFLOW.value,
+            "pricing_ids": tuple(pricing_ids),
+        },
+    )
+
+
+def _generate_bank_account_cashflow_in_worker(
+    batch_id: int,
+    cutoff: datetime.datetime,
+    bank_account_info: tuple[int, list[int]],
+) -> None:
+    try:
+        _generate_bank_account_cashflow(batch_id, cutoff, *bank_account_info)
+    finally:
+        # Workers process many bank accounts: do not keep the objects
+        # of the previous ones in the session.
+        db.session.close()
+
+
+def _generate_bank_account_cashflow(
+    batch_id: int,
+    cutoff: datetime.datetime,
+    bank_account_id: int,
+    venue_ids: typing.Collection[int],
+) -> None:
+    filters = _get_cashflow_pricing_filters(cutoff)
+    log_extra = {
+        "batch": batch_id,
+        "bank_account": bank_account_id,
+    }
+    start = time.perf_counter()
+    logger.info("Generating cashflow", extra=log_extra)
+    try:
+        with transaction():
+            pricings = (
+                db.session.query(models.Pricing)
+                .outerjoin(models.Pricing.booking)
+                .outerjoin(bookings_models.Booking.stock)
+                .outerjoin(models.Pricing.collectiveBooking)
+                .outerjoin(educational_models.CollectiveBooking.collectiveStock)
+                .join(models.Pricing.event)
+                .join(
+                    models.BankAccount,
+                    models.BankAccount.id == bank_account_id,
+                )
+                .outerjoin(models.CashflowPricing)
+                .filter(
+                    models.Pricing.venueId.in_(venue_ids),
+                    *filters,
                 )
+            )
 
-                # Don't generate cashflows if ever all of the priced bookings are free → avoid creating empty invoices
-                pricings_with_lines_amount = (
-                    pricings.join(models.Pricing.lines)
-                    .with_entities(
-                        models.Pricing.id,
-                        sa_func.count(models.PricingLine.id).label("lines_count"),
-                        sa_func.sum(sa.case((models.PricingLine.amount == 0, 1), else_=0)).label("free_lines_count"),
-                    )
-                    .group_by(models.Pricing.id)
-                    .all()
+            # Don't generate cashflows if ever all of the priced bookings are free → avoid creating empty invoices
+            pricings_with_lines_amount = (
+                pricings.join(models.Pricing.lines)
+                .with_entities(
+                    models.Pricing.id,
+                    sa_func.count(models.PricingLine.id).label("lines_count"),
+                    sa_func.sum(sa.case((models.PricingLine.amount == 0, 1), else_=0)).label("free_lines_count"),
                 )
-                pricing_ids = {e.id for e in pricings_with_lines_amount}
-                free_pricing_ids = {e.id for e in pricings_with_lines_amount if e.lines_count == e.free_lines_count}
-                if pricing_ids and (len(pricing_ids) == len(free_pricing_ids)):
-                    logger.info(
-                        "Found only free pricings, skip cashflow creation but mark pricings as processed",
-                        extra={
-                            "pricing_ids": pricing_ids,
-                            "bank_account": bank_account_id,
-                        },
-                    )
-                    _mark_as_processed(pricing_ids)
-                    continue
+                .group_by(models.Pricing.id)
+                .all()
+            )
+            pricing_ids = {e.id for e in pricings_with_lines_amount}
+            free_pricing_ids = {e.id for e in pricings_with_lines_amount if e.lines_count == e.free_lines_count}
+            if pricing_ids and (len(pricing_ids) == len(free_pricing_ids)):
+                logger.info(
+                    "Found only free pricings, skip cashflow creation but mark pricings as processed",
+                    extra={
+                        "pricing_ids": pricing_ids,
+                        "bank_account": bank_account_id,
+                    },
+                )
+                _mark_pricings_as_processed(pricing_ids)
+                return
 
-                # Check integrity by looking for bookings whose amount
-                # has been changed after they have been priced.
-                diff_query = (
-                    pricings.join(models.Pricing.lines)
-                    .filter(
-                        models.PricingLine.category == models.PricingLineCategory.OFFERER_REVENUE,
-                        models.PricingLine.amount
-                        != -100
-                        * sa.case(
-                            (
-                                bookings_models.Booking.id.is_not(None),
-                                bookings_models.Booking.amount * bookings_models.Booking.quantity,
-                            ),
-                            else_=educational_models.CollectiveStock.price,
+            # Check integrity by looking for bookings whose amount
+            # has been changed after they have been priced.
+            diff_query = (
+                pricings.join(models.Pricing.lines)
+                .filter(
+                    models.PricingLine.category == models.PricingLineCategory.OFFERER_REVENUE,
+                    models.PricingLine.amount
+                    != -100
+                    * sa.case(
+                        (
+                            bookings_models.Booking.id.is_not(None),
+                            bookings_models.Booking.amount * bookings_models.Booking.quantity,
                         ),
-                    )
-                    .with_entities(models.Pricing.id)
+                        else_=educational_models.CollectiveStock.price,
+                    ),
                 )
-                diff = {_pricing_id for (_pricing_id,) in diff_query.all()}
-                if diff:
-                    logger.error(
-                        "Found integrity error on booking prices vs. pricing lines",
-                        extra={
-                            "pricing_lines": diff,
-                            "bank_account": bank_account_id,
-                        },
-                    )
-                    continue
-                total = pricings.with_entities(sa.func.sum(models.Pricing.amount)).scalar() or 0
-
-                # The total is positive if the pro owes us more than we do.
-                if total > 0:
-                    all_current_incidents = (
-                        db.session.query(models.FinanceIncident)
-                        .join(models.FinanceIncident.booking_finance_incidents)
-                        .join(models.BookingFinanceIncident.finance_events)
-                        .join(models.FinanceEvent.pricings)
-                        .outerjoin(models.Pricing.cashflows)
-                        .filter(
-                            models.FinanceIncident.venueId.in_(venue_ids),
-                            models.FinanceIncident.status == models.IncidentStatus.VALIDATED,
-                            models.Cashflow.id.is_(None),  # exclude incidents that already have a cashflow
-                            models.Pricing.status == models.PricingStatus.VALIDATED,
-                            models.Pricing.valueDate < batch.cutoff,
-                        )
-                        .all()
+                .with_entities(models.Pricing.id)
+            )
+            diff = {_pricing_id for (_pricing_id,) in diff_query.all()}
+            if diff:
+                logger.error(
+                    "Found integrity error on booking prices vs. pricing lines",
+                    extra={
+                        "pricing_lines": diff,
+                        "bank_account": bank_account_id,
+                    },
+                )
+                return
+            total = pricings.with_entities(sa.func.sum(models.Pricing.amount)).scalar() or 0
+
+            # The total is positive if the pro owes us more than we do.
+            if total > 0:
+                all_current_incidents = (
+                    db.session.query(models.FinanceIncident)
+                    .join(models.FinanceIncident.booking_finance_incidents)
+                    .join(models.BookingFinanceIncident.finance_events)
+                    .join(models.FinanceEvent.pricings)
+                    .outerjoin(models.Pricing.cashflows)
+                    .filter(
+                        models.FinanceIncident.venueId.in_(venue_ids),
+                        models.FinanceIncident.status == models.IncidentStatus.VALIDATED,
+                        models.Cashflow.id.is_(None),  # exclude incidents that already have a cashflow
+                        models.Pricing.status == models.PricingStatus.VALIDATED,
+                        models.Pricing.valueDate < cutoff,
                     )
+                    .all()
+                )
 
-                    override_incident_debit_note = any(incident.forceDebitNote for incident in all_current_incidents)
-                    # Last cashflow where we effectively paid (successfully or not) the pro
-                    last_cashflow = (
-                        db.session.query(models.Cashflow)
-                        .filter(
-                            models.Cashflow.bankAccountId == bank_account_id,
-                            models.Cashflow.status == models.CashflowStatus.ACCEPTED,
-                        )
-                        .order_by(models.Cashflow.creationDate.desc())
-                        .first()
+                override_incident_debit_note = any(incident.forceDebitNote for incident in all_current_incidents)
+                # Last cashflow where we effectively paid (successfully or not) the pro
+                last_cashflow = (
+                    db.session.query(models.Cashflow)
+                    .filter(
+                        models.Cashflow.bankAccountId == bank_account_id,
+                        models.Cashflow.status == models.CashflowStatus.ACCEPTED,
                     )
-                    if last_cashflow:
-                        last_cashflow_age = (date_utils.get_naive_utc_now() - last_cashflow.creationDate).days
-                    else:
-                        last_cashflow_age = 0
-
-                    if (
-                        last_cashflow_age < conf.DEBIT_NOTE_AGE_THRESHOLD_FOR_CASHFLOW
-                        and not override_incident_debit_note
-                    ):
-                        for incident in all_current_incidents:
-                            history_api.add_action(
-                                history_models.ActionType.FINANCE_INCIDENT_WAIT_FOR_PAYMENT,
-                                author=None,
-                                finance_incident=incident,
-                                comment="Le montant de l’incident est supérieur au montant total des réservations validées. Donc aucun justificatif n’est généré, on attend la prochaine échéance",
-                            )
-
-                        continue
+                    .order_by(models.Cashflow.creationDate.desc())
+                    .first()
+                )
+                if last_cashflow:
+                    last_cashflow_age = (date_utils.get_naive_utc_now() - last_cashflow.creationDate).days
+                else:
+                    last_cashflow_age = 0
 
+                if last_cashflow_age < conf.DEBIT_NOTE_AGE_THRESHOLD_FOR_CASHFLOW and not override_incident_debit_note:
                     for incident in all_current_incidents:
                         history_api.add_action(
-                            history_models.ActionType.FINANCE_INCIDENT_GENERATE_DEBIT_NOTE,
+                            history_models.ActionType.FINANCE_INCIDENT_WAIT_FOR_PAYMENT,
                             author=None,
                             finance_incident=incident,
-                            comment="Une note de débit sera générée dans quelques jours",
+                            comment="Le montant de l’incident est supérieur au montant total des réservations validées. Donc aucun justificatif n’est généré, on attend la prochaine échéance",
                         )
 
-                cashflow = models.Cashflow(
-                    batchId=batch_id,
-                    bankAccountId=bank_account_id,
-                    status=models.CashflowStatus.PENDING,
-                    amount=total,
-                )
-                db.session.add(cashflow)
-                db.session.flush()
-                links = [
-                    models.CashflowPricing(
-                        cashflowId=cashflow.id,
-                        pricingId=pricing.id,
+                    return
+
+                for incident in all_current_incidents:
+                    history_api.add_action(
+                        history_models.ActionType.FINANCE_INCIDENT_GENERATE_DEBIT_NOTE,
+                        author=None,
+                        finance_incident=incident,
+                        comment="Une note de débit sera générée dans quelques jours",
                     )
-                    for pricing in pricings
-                ]
-                db.session.bulk_save_objects(links)
-                # It's possible (but unlikely) that new pricings have
-                # been added (1) between the calculation of `total`
-                # and the creation of the `CashflowPricing`s; or (2)
-                # between the creation of `CashflowPricing` and now.
-                # If (1): the cashflow amount will be wrong, which is
-                # why we check it below.
-                # If (2): calling `mark_as_processed()` on `pricings`
-                # would be wrong because it would include pricings
-                # that are not linked to any `CashflowPricing`. These
-                # pricings would then stay "processed" and never move
-                # to "invoiced".
-                cashflowed_pricings = db.session.query(models.CashflowPricing).filter_by(cashflowId=cashflow.id)
-                _mark_as_processed(
-                    {
-                        pricing_id
-                        for (pricing_id,) in cashflowed_pricings.with_entities(models.CashflowPricing.pricingId)
-                    }
+
+            cashflow = models.Cashflow(
+                batchId=batch_id,
+                bankAccountId=bank_account_id,
+                status=models.CashflowStatus.PENDING,
+                amount=total,
+            )
+            db.session.add(cashflow)
+            db.session.flush()
+            links = [
+                models.CashflowPricing(
+                    cashflowId=cashflow.id,
+                    pricingId=pricing.id,
                 )
-                total_from_pricings = (
-                    cashflowed_pricings.join(models.Pricing).with_entities(sa.func.sum(models.Pricing.amount)).scalar()
-                    or 0
+                for pricing in pricings
+            ]
+            db.session.bulk_save_objects(links)
+            # It's possible (but unlikely) that new pricings have
+            # been added (1) between the calculation of `total`
+            # and the creation of the `CashflowPricing`s; or (2)
+            # between the creation of `CashflowPricing` and now.
+            # If (1): the cashflow amount will be wrong, which is
+            # why we check it below.
+            # If (2): calling `mark_as_processed()` on `pricings`
+            # would be wrong because it would include pricings
+            # that are not linked to any `CashflowPricing`. These
+            # pricings would then stay "processed" and never move
+            # to "invoiced".
+            cashflowed_pricings = db.session.query(models.CashflowPricing).filter_by(cashflowId=cashflow.id)
+            _mark_pricings_as_processed(
+                {pricing_id for (pricing_id,) in cashflowed_pricings.with_entities(models.CashflowPricing.pricingId)}
+            )
+            total_from_pricings = (
+                cashflowed_pricings.join(models.Pricing).with_entities(sa.func.sum(models.Pricing.amount)).scalar() or 0
+            )
+            if cashflow.amount != total_from_pricings:
+                # We rollback (because we would not want such an
+                # inconsistency in the database) so there is
+                # nothing to fix... but the error is quite
+                # unlikely to happen (see comment above), so it
+                # warrants an analysis (hence the ERROR log level
+                # and not INFO).
+                logger.error(
+                    "Cashflow amount is different from the sum of its pricings, changes have been rolled back",
+                    extra={
+                        "cashflow_id": cashflow.id,
+                        "cashflow_amount": cashflow.amount,
+                        "total_from_pricings": total_from_pricings,
+                    }
+                    | log_extra,
                 )
-                if cashflow.amount != total_from_pricings:
-                    # We rollback (because we would not want such an
-                    # inconsistency in the database) so there is
-                    # nothing to fix... but the error is quite
-                    # unlikely to happen (see comment above), so it
-                    # warrants an analysis (hence the ERROR log level
-                    # and not INFO).
-                    logger.error(
-                        "Cashflow amount is different from the sum of its pricings, changes have been rolled back",
-                        extra={
-                            "cashflow_id": cashflow.id,
-                            "cashflow_amount": cashflow.amount,
-                            "total_from_pricings": total_from_pricings,
-                        }
-                        | log_extra,
-                    )
-                    db.session.rollback()
-                    continue
-                db.session.commit()
-                elapsed = time.perf_counter() - start
-                logger.info("Generated cashflow", extra=log_extra | {"elapsed": elapsed})
-        except Exception:
-            if settings.IS_RUNNING_TESTS:
-                raise
-            logger.exception("Could not generate cashflow for bank account %d", bank_account_id, extra=log_extra)
+                db.session.rollback()
+                return
+            db.session.commit()
+            elapsed = time.perf_counter() - start
+            logger.info("Generated cashflow", extra=log_extra | {"elapsed": elapsed})
+    except Exception:
+        if settings.IS_RUNNING_TESTS:
+            raise
+        logger.exception("Could not generate cashflow for bank account %d", bank_account_id, extra=log_extra)
+    finally:
+        _release_pending_venues(venue_ids)
 
 
 def generate_payment_files(batch: models.CashflowBatch) -> None:
@@ -1437,7 +1727,6 @@ def _clean_for_accounting(value: str) -> str:
 
 
 def _generate_payments_file(batch: models.CashflowBatch) -> pathlib.Path:
-    batch_id = batch.id
     header = [
         "Identifiant humanisé des coordonnées bancaires",
         "Identifiant des coordonnées bancaires",
@@ -1447,48 +1736,58 @@ def _generate_payments_file(batch: models.CashflowBatch) -> pathlib.Path:
         "Ministère",
         "Montant net offreur",
     ]
+    return _write_csv(
+        f"down_payment_{batch.label}",
+        header,
+        rows=db.session.execute(_get_payments_query(batch.id)),
+        row_formatter=_payment_details_row_formatter,
+    )
 
-    def get_individual_data(query: sa_orm.Query) -> sa_orm.Query:
-        individual_data_query = (
-            query.filter(bookings_models.Booking.amount != 0)
-            .join(bookings_models.Booking.deposit)
-            .join(models.Pricing.cashflows)
-            .join(
-                models.BankAccount,
-                models.BankAccount.id == models.Cashflow.bankAccountId,
-            )
-            .join(models.BankAccount.offerer)
-            .filter(models.Cashflow.batchId == batch_id)
-            .group_by(
-                models.BankAccount.id,
-                offerers_models.Offerer.id,
-                ORIGIN_OF_CREDIT_CASE,
-            )
-            .with_entities(
-                models.BankAccount.id.label("bank_account_id"),
-                models.BankAccount.label.label("bank_account_label"),
-                offerers_models.Offerer.name.label("offerer_name"),
-                sa.case(
-                    (offerers_models.Offerer.is_caledonian == True, offerers_models.Offerer.rid7),
-                    else_=offerers_models.Offerer.siren,
-                ).label("offerer_siren"),
-                ORIGIN_OF_CREDIT_CASE.label("origin_of_credit"),
-                sa.case((offerers_models.Offerer.is_caledonian == True, "NC"), else_=None).label("caledonian_label"),
-                sa_func.sum(models.Pricing.amount).label("pricing_amount"),
-            )
+
+def _get_payments_query(batch_id: int) -> sa.Select:
+    """Return the net amount of the batch, by bank account and by type
+    of booking (origin of credit for individual bookings, ministry or
+    program for collective bookings).
+
+    Processed pricings of the batch are selected once (in a
+    materialized CTE) and aggregated before joining bank accounts and
+    offerers, instead of joining cashflows, bank accounts and offerers
+    again for each kind of pricing.
+    """
+    batch_pricing = (
+        sa.select(
+            models.Pricing.amount,
+            models.Pricing.bookingId,
+            models.Pricing.collectiveBookingId,
+            models.Pricing.eventId,
+            models.Cashflow.bankAccountId,
+        )
+        .select_from(models.Pricing)
+        .join(models.Pricing.cashflows)
+        .where(
+            models.Cashflow.batchId == batch_id,
+            models.Pricing.status == models.PricingStatus.PROCESSED,
         )
+        .cte("batch_pricing")
+        .prefix_with("MATERIALIZED")
+    )
 
-        return individual_data_query
+    def select_individual(query: sa.Select) -> sa.Select:
+        return (
+            query.join(bookings_models.Booking.deposit)
+            .where(bookings_models.Booking.amount != 0)
+            .with_only_columns(
+                batch_pricing.c.bankAccountId.label("bank_account_id"),
+                sa.false().label("is_collective"),
+                ORIGIN_OF_CREDIT_CASE.label("booking_type"),
+                sa.null().label("ministry"),
+                batch_pricing.c.amount.label("pricing_amount"),
+            )
+        )
 
-    def get_collective_data(query: sa_orm.Query) -> sa_orm.Query:
+    def select_collective(query: sa.Select) -> sa.Select:
         return (
             query.join(educational_models.CollectiveBooking.collectiveStock)
-            .join(models.Pricing.cashflows)
-            .join(
-                models.BankAccount,
-                models.BankAccount.id == models.Cashflow.bankAccountId,
-            )
-            .join(models.BankAccount.offerer)
             .join(educational_models.CollectiveBooking.educationalInstitution)
             .join(educational_models.CollectiveBooking.educationalDeposit)
             # max 1 program because of unique constraint on EducationalInstitutionProgramAssociation.institutionId
@@ -1503,112 +1802,84 @@ def _generate_payments_file(batch: models.CashflowBatch) -> pathlib.Path:
                 ),
             )
             .outerjoin(educational_models.EducationalInstitutionProgramAssociation.program)
-            .filter(models.Cashflow.batchId == batch_id)
-            .group_by(
-                models.BankAccount.id,
-                offerers_models.Offerer.id,
-                educational_models.EducationalDeposit.ministry,
-                educational_models.EducationalInstitutionProgram.id,
-            )
-            .with_entities(
-                models.BankAccount.id.label("bank_account_id"),
-                models.BankAccount.label.label("bank_account_label"),
-                offerers_models.Offerer.name.label("offerer_name"),
-                offerers_models.Offerer.siren.label("offerer_siren"),
+            .with_only_columns(
+                batch_pricing.c.bankAccountId.label("bank_account_id"),
+                sa.true().label("is_collective"),
+                sa.literal("EACC").label("booking_type"),
                 sa.func.coalesce(
                     educational_models.EducationalInstitutionProgram.label,
                     educational_models.EducationalInstitutionProgram.name,
                     educational_models.EducationalDeposit.ministry.cast(sa.String),
                 ).label("ministry"),
-                sa_func.sum(models.Pricing.amount).label("pricing_amount"),
+                batch_pricing.c.amount.label("pricing_amount"),
             )
         )
 
-    indiv_query = get_individual_data(
-        db.session.query(models.Pricing).filter_by(status=models.PricingStatus.PROCESSED).join(models.Pricing.booking)
-    )
-
-    indiv_incident_query = get_individual_data(
-        db.session.query(models.Pricing)
-        .filter_by(status=models.PricingStatus.PROCESSED)
-        .join(models.Pricing.event)
-        .join(models.FinanceEvent.bookingFinanceIncident)
-        .join(models.BookingFinanceIncident.booking)
-    )
-
-    indiv_data: list = (
-        indiv_query.union_all(indiv_incident_query)
-        .group_by(
-            sa.column("bank_account_id"),
-            sa.column("bank_account_label"),
-            sa.column("offerer_name"),
-            sa.column("offerer_siren"),
-            sa.column("origin_of_credit"),
-            sa.column("caledonian_label"),
-        )
-        .with_entities(
-            sa.column("bank_account_id"),
-            sa.column("bank_account_label"),
-            sa.column("offerer_name"),
-            sa.column("offerer_siren"),
-            sa.column("origin_of_credit"),
-            sa.column("caledonian_label"),
-            sa_func.sum(sa.column("pricing_amount")).label("pricing_amount"),
+    def from_incident() -> sa.Select:
+        return (
+            sa.select(batch_pricing)
+            .join(models.FinanceEvent, models.FinanceEvent.id == batch_pricing.c.eventId)
+            .join(models.FinanceEvent.bookingFinanceIncident)
         )
-        .all()
-    )
 
-    collective_query = get_collective_data(
-        db.session.query(models.Pricing)
-        .filter_by(status=models.PricingStatus.PROCESSED)
-        .join(models.Pricing.collectiveBooking)
-    )
-
-    collective_incident_query = get_collective_data(
-        db.session.query(models.Pricing)
-        .filter_by(status=models.PricingStatus.PROCESSED)
-        .join(models.Pricing.event)
-        .join(models.FinanceEvent.bookingFinanceIncident)
-        .join(models.BookingFinanceIncident.collectiveBooking)
-    )
-
-    collective_data: list = (
-        collective_query.union_all(collective_incident_query)
-        .group_by(
-            sa.column("bank_account_id"),
-            sa.column("bank_account_label"),
-            sa.column("offerer_name"),
-            sa.column("offerer_siren"),
-            sa.column("ministry"),
+    pricings = sa.union_all(
+        select_individual(
+            sa.select(batch_pricing).join(
+                bookings_models.Booking, bookings_models.Booking.id == batch_pricing.c.bookingId
+            )
+        ),
+        select_individual(from_incident().join(models.BookingFinanceIncident.booking)),
+        select_collective(
+            sa.select(batch_pricing).join(
+                educational_models.CollectiveBooking,
+                educational_models.CollectiveBooking.id == batch_pricing.c.collectiveBookingId,
+            )
+        ),
+        select_collective(from_incident().join(models.BookingFinanceIncident.collectiveBooking)),
+    ).subquery("pricing_row")
+
+    amounts = (
+        sa.select(
+            pricings.c.bank_account_id,
+            pricings.c.is_collective,
+            pricings.c.booking_type,
+            pricings.c.ministry,
+            sa_func.sum(pricings.c.pricing_amount).label("pricing_amount"),
         )
-        .with_entities(
-            sa.column("bank_account_id"),
-            sa.column("bank_account_label"),
-            sa.column("offerer_name"),
-            sa.column("offerer_siren"),
-            sa.column("ministry"),
-            sa_func.sum(sa.column("pricing_amount")).label("pricing_amount"),
+        .group_by(
+            pricings.c.bank_account_id,
+            pricings.c.is_collective,
+            pricings.c.booking_type,
+            pricings.c.ministry,
         )
-        .all()
+        .subquery("bank_account_amount")
     )
 
-    return _write_csv(
-        f"down_payment_{batch.label}",
-        header,
-        rows=itertools.chain(indiv_data, collective_data),
-        row_formatter=_payment_details_row_formatter,
+    is_caledonian_individual = sa.and_(sa.not_(amounts.c.is_collective), offerers_models.Offerer.is_caledonian)
+    return (
+        sa.select(
+            amounts.c.bank_account_id,
+            models.BankAccount.label.label("bank_account_label"),
+            offerers_models.Offerer.name.label("offerer_name"),
+            sa.case(
+                (is_caledonian_individual, offerers_models.Offerer.rid7),
+                else_=offerers_models.Offerer.siren,
+            ).label("offerer_siren"),
+            amounts.c.booking_type,
+            sa.case(
+                (amounts.c.is_collective, amounts.c.ministry),
+                (is_caledonian_individual, "NC"),
+                else_=None,
+            ).label("ministry"),
+            amounts.c.pricing_amount,
+        )
+        .join(models.BankAccount, models.BankAccount.id == amounts.c.bank_account_id)
+        .join(models.BankAccount.offerer)
+        .order_by(amounts.c.is_collective, amounts.c.bank_account_id)
     )
 
 
 def _payment_details_row_formatter(sql_row: typing.Any) -> tuple:
-    if hasattr(sql_row, "ministry"):
-        booking_type = "EACC"
-    elif hasattr(sql_row, "origin_of_credit"):
-        booking_type = sql_row.origin_of_credit
-    else:
-        raise ValueError("Unknown booking type (not educational nor individual)")
-
-    ministry = getattr(sql_row, "caledonian_label", getattr(sql_row, "ministry", ""))
     net_amount = utils.cents_to_full_unit(-sql_row.pricing_amount)
 
     return (
@@ -1616,8 +1887,8 @@ def _payment_details_row_formatter(sql_row: typing.Any) -> tuple:
         str(sql_row.bank_account_id),
         _clean_for_accounting(sql_row.offerer_siren),
         _clean_for_accounting(f"{sql_row.offerer_name} - {sql_row.bank_account_label}"),
-        booking_type,
-        ministry,
+        sql_row.booking_type,
+        sql_row.ministry,
         net_amount,
     )
 
@@ -1825,8 +2096,17 @@ def _get_cashflows_by_bank_accounts(batch: models.CashflowBatch, only_debit_note
     return rows
 
 
-def generate_invoices_and_debit_notes(batch: models.CashflowBatch) -> None:
-    """Generate and store all invoices and debit notes."""
+def generate_invoices_and_debit_notes(batch: models.CashflowBatch, processes: int = 1) -> None:
+    """Generate and store all invoices and debit notes.
+
+    If ``processes`` is greater than 1, PDF files are rendered and
+    stored by ``processes`` worker processes, while the next invoices
+    are generated. An invoice is then committed before its PDF file is
+    rendered: if rendering fails, it is tried again in this process
+    and, if it fails again, the error is logged and the invoice is
+    left without PDF file (and no email is sent), see
+    `store_invoice_pdf_and_send_email()`.
+    """
     invoice_rows = [(False, row) for row in _get_cashflows_by_bank_accounts(batch)]
     debit_note_rows = [(True, row) for row in _get_cashflows_by_bank_accounts(batch, only_debit_notes=True)]
 
@@ -1835,7 +2115,38 @@ def generate_invoices_and_debit_notes(batch: models.CashflowBatch) -> None:
 
     _mark_free_pricings_as_invoiced()
 
-    for is_debit_note, row in invoice_rows + debit_note_rows:
+    start = time.perf_counter()
+    if processes <= 1:
+        count = _generate_invoices(invoice_rows + debit_note_rows)
+    else:
+        # Make sure that all workers share the same cache of assets
+        # (fonts, CSS and images) used in PDF files.
+        pdf_utils.create_shared_url_fetcher_cache()
+        with multiprocessing.get_context("fork").Pool(processes, initializer=_init_worker_process) as pool:
+            count = _generate_invoices_with_pool(
+                batch.id, invoice_rows + debit_note_rows, pool, max_in_flight=2 * processes
+            )
+    elapsed = time.perf_counter() - start
+    logger.info(
+        "Generated invoices and debit notes",
+        extra={
+            "count": count,
+            "processes": processes,
+            "duration": round(elapsed, 2),
+            "invoices_per_minute": round(60 * count / elapsed, 1) if elapsed else None,
+        },
+    )
+
+    with log_elapsed(logger, "Generated CSV invoices file"):
+        path = generate_invoice_file(batch)
+    drive_folder_name = _get_drive_folder_name(batch)
+    with log_elapsed(logger, "Uploaded CSV invoices file to Google Drive"):
+        _upload_files_to_google_drive(drive_folder_name, [path])
+
+
+def _generate_invoices(rows: list[tuple[bool, typing.Any]]) -> int:
+    count = 0
+    for is_debit_note, row in rows:
         try:
             with transaction():
                 extra = {"bank_account_id": row.bank_account_id}
@@ -1856,12 +2167,85 @@ def generate_invoices_and_debit_notes(batch: models.CashflowBatch) -> None:
                     "cashflow_ids": row.cashflow_ids,
                 },
             )
+        else:
+            count += 1
+    return count
+
+
+def _generate_invoices_with_pool(
+    batch_id: int,
+    rows: list[tuple[bool, typing.Any]],
+    pool: multiprocessing.pool.Pool,
+    max_in_flight: int,
+) -> int:
+    """Generate invoices and their HTML in this process, and render and
+    store their PDF files in ``pool``. Emails are sent from this
+    process, once the PDF file has been stored.
+    """
+    count = 0
+    in_flight: collections.deque[tuple[int, multiprocessing.pool.AsyncResult]] = collections.deque()
 
-    with log_elapsed(logger, "Generated CSV invoices file"):
-        path = generate_invoice_file(batch)
-    drive_folder_name = _get_drive_folder_name(batch)
-    with log_elapsed(logger, "Uploaded CSV invoices file to Google Drive"):
-        _upload_files_to_google_drive(drive_folder_name, [path])
+    def send_email_once_stored() -> None:
+        nonlocal count
+        invoice_id, result = in_flight.popleft()
+        try:
+            result.get()
+        except Exception:
+            logger.warning("Could not generate invoice PDF in worker process", extra={"invoice_id": invoice_id})
+            # The invoice is already committed: try again here.
+            try:
+                with transaction():
+                    invoice = db.session.get(models.Invoice, invoice_id)
+                    assert invoice  # helps mypy
+                    store_invoice_pdf_and_send_email(invoice)
+            except Exception:
+                if settings.IS_RUNNING_TESTS:
+                    raise
+                logger.exception(
+                    "Could not generate invoice PDF, run `generate_invoice_pdfs` to generate it",
+                    extra={"invoice_id": invoice_id},
+                )
+                return
+        else:
+            with transaction():
+                invoice = db.session.get(models.Invoice, invoice_id)
+                batch = db.session.get(models.CashflowBatch, batch_id)
+                assert invoice and batch  # helps mypy
+                transactional_mails.send_invoice_available_to_pro_email(invoice, batch)
+        count += 1
+
+    for is_debit_note, row in rows:
+        try:
+            with transaction():
+                generated = _generate_invoice_and_html(
+                    bank_account_id=row.bank_account_id,
+                    cashflow_ids=row.cashflow_ids,
+                    is_debit_note=is_debit_note,
+                )
+                if not generated:
+                    continue
+                invoice, _batch, invoice_html = generated
+                # Read before the commit expires the invoice.
+                invoice_id, invoice_storage_id = invoice.id, invoice.storage_object_id
+        except Exception:
+            if settings.IS_RUNNING_TESTS:
+                raise
+            logger.exception(
+                "Could not generate debit note" if is_debit_note else "Could not generate invoice",
+                extra={
+                    "bank_account_id": row.bank_account_id,
+                    "cashflow_ids": row.cashflow_ids,
+                },
+            )
+            continue
+        result = pool.apply_async(_store_invoice_pdf, (invoice_storage_id, invoice_html))
+        in_flight.append((invoice_id, result))
+        while len(in_flight) >= max_in_flight or (in_flight and in_flight[0][1].ready()):
+            send_email_once_stored()
+
+    while in_flight:
+        send_email_once_stored()
+    return count
 
 
 def generate_invoice_file(batch: models.CashflowBatch) -> pathlib.Path:
@@ -2097,28 +2481,62 @@ def _invoice_row_formatter(sql_row: typing.Any) -> tuple:
 
 
 def generate_and_store_invoice(bank_account_id: int, cashflow_ids: list[int], is_debit_note: bool = False) -> None:
+    generated = _generate_invoice_and_html(bank_account_id, cashflow_ids, is_debit_note=is_debit_note)
+    if not generated:
+        return
+    invoice, batch, invoice_html = generated
+
+    log_extra = {"bank_account": bank_account_id}
+    with log_elapsed(logger, "Generated and stored PDF invoice", log_extra):
+        _store_invoice_pdf(invoice_storage_id=invoice.storage_object_id, invoice_html=invoice_html)
+    with log_elapsed(logger, "Sent invoice", log_extra):
+        transactional_mails.send_invoice_available_to_pro_email(invoice, batch)
+
+
+def _generate_invoice_and_html(
+    bank_account_id: int, cashflow_ids: list[int], is_debit_note: bool = False
+) -> tuple[models.Invoice, models.CashflowBatch, str] | None:
     log_extra = {"bank_account": bank_account_id}
     with log_elapsed(logger, "Generated invoice model instance", log_extra):
         invoice = _generate_invoice(
             bank_account_id=bank_account_id, cashflow_ids=cashflow_ids, is_debit_note=is_debit_note
         )
         if not invoice:
-            return
+            return None
+
+    batch = _get_invoice_batch(invoice)
+    with log_elapsed(logger, "Generated invoice HTML", log_extra):
+        if is_debit_note:
+            invoice_html = _generate_debit_note_html(invoice, batch)
+        else:
+            invoice_html = _generate_invoice_html(invoice, batch)
+    return invoice, batch, invoice_html
+
 
+def _get_invoice_batch(invoice: models.Invoice) -> models.CashflowBatch:
     # The cashflows all come from the same cashflow batch,
     # so batch_id should be the same for every cashflow
-    batch = (
+    return (
         db.session.query(models.CashflowBatch)
         .join(models.Cashflow.batch)
         .join(models.Cashflow.invoices)
         .filter(models.Invoice.id == invoice.id)
     ).one()
 
-    with log_elapsed(logger, "Generated invoice HTML", log_extra):
-        if is_debit_note:
-            invoice_html = _generate_debit_note_html(invoice, batch)
-        else:
-            invoice_html = _generate_invoice_html(invoice, batch)
+
+def store_invoice_pdf_and_send_email(invoice: models.Invoice) -> None:
+    """Generate and store the PDF file of an invoice (or debit note)
+    that has already been generated, and send it to the pro.
+
+    This is used when the PDF file could not be rendered or stored
+    after the invoice was committed (see `_generate_invoices_with_pool()`).
+    """
+    batch = _get_invoice_batch(invoice)
+    if invoice.reference.startswith("A"):  # debit note
+        invoice_html = _generate_debit_note_html(invoice, batch)
+    else:
+        invoice_html = _generate_invoice_html(invoice, batch)
+    log_extra = {"invoice_id": invoice.id}
     with log_elapsed(logger, "Generated and stored PDF invoice", log_extra):
         _store_invoice_pdf(invoice_storage_id=invoice.storage_object_id, invoice_html=invoice_html)
     with log_elapsed(logger, "Sent invoice", log_extra):
@@ -3064,6 +3482,7 @@ def _create_reimbursement_rule(
     validation.validate_reimbursement_rule(rule)
     db.session.add(rule)
     db.session.commit()
+    on_commit(reimbursement_rules.CustomRuleFinder.invalidate)
     return rule
 
 
@@ -3095,6 +3514,7 @@ def edit_reimbursement_rule(
         raise
     db.session.add(rule)
     db.session.flush()
+    on_commit(reimbursement_rules.CustomRuleFinder.invalidate)
     # refresh the object to have datetimes instead of strings  in rule.timespan
     db.session.refresh(rule)
     return rule
@@ -3602,8 +4022,17 @@ def cancel_finance_incident(
     db.session.flush()
 
 
-def are_cashflows_being_generated() -> bool:
-    return bool(get_redis_client().exists(conf.REDIS_GENERATE_CASHFLOW_LOCK))
+def are_cashflows_being_generated(venue_id: int | None = None) -> bool:
+    """Return whether cashflows are being generated, or, if ``venue_id``
+    is given, whether the cashflow of this venue has not been generated
+    yet by the running generation.
+    """
+    redis_client = get_redis_client()
+    if not redis_client.exists(conf.REDIS_GENERATE_CASHFLOW_LOCK):
+        return False
+    if venue_id is None or not redis_client.exists(conf.REDIS_GENERATE_CASHFLOW_PENDING_VENUES_KNOWN):
+        return True
+    return bool(redis_client.sismember(conf.REDIS_GENERATE_CASHFLOW_PENDING_VENUES, venue_id))
 
 
 def deprecate_venue_bank_account_links(bank_account: models.BankAccount, comment: str | None = None) -> None:
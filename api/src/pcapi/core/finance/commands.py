@@ -33,21 +33,63 @@ logger = logging.getLogger(__name__)
 
 
 @blueprint.cli.command("price_finance_events")
+@click.option(
+    "--processes",
+    type=int,
+    default=1,
+    help="Number of processes that price events in parallel, each handling its own pricing points",
+)
 @cron_decorators.log_cron_with_transaction
 @cron_decorators.cron_require_feature(FeatureToggle.ENABLE_RECURRENT_CRON)
 @cron_decorators.cron_require_feature(FeatureToggle.PRICE_FINANCE_EVENTS)
-def price_finance_events() -> None:
+def price_finance_events(processes: int) -> None:
     """Price finance events that have recently been created."""
-    finance_api.price_events()
+    finance_api.price_events(processes=processes)
+
+
+@blueprint.cli.command("check_pricing_point_yearly_revenues")
+@click.option("--year", type=int, required=False, help="Only check this year (default: all years)")
+def check_pricing_point_yearly_revenues(year: int | None) -> None:
+    """Check that the revenues used to price events match the pricings."""
+    discrepancies = finance_api.get_pricing_point_yearly_revenue_discrepancies(year)
+    for discrepancy in discrepancies:
+        logger.error(
+            "Found inconsistent yearly revenue for pricing point",
+            extra={
+                "pricing_point": discrepancy.pricing_point_id,
+                "year": discrepancy.year,
+                "stored_revenue": str(discrepancy.stored_revenue),
+                "actual_revenue": str(discrepancy.actual_revenue),
+            },
+        )
+    if discrepancies:
+        sys.exit(1)
+    logger.info("Yearly revenues of pricing points are consistent", extra={"year": year})
 
 
 @blueprint.cli.command("generate_cashflows_and_payment_files")
 @click.option("--override-feature-flag", help="Override feature flag", is_flag=True)
 @click.option("--cutoff", help="Datetime cutoff to put in UTC timezone", type=datetime.datetime, required=False)
 @click.option("--without-invoices", help="Blocks invoices generation after cashflows generation", is_flag=True)
+@click.option(
+    "--processes",
+    type=int,
+    default=1,
+    help="Number of processes that generate the cashflows of bank accounts in parallel",
+)
+@click.option(
+    "--invoice-processes",
+    type=int,
+    default=1,
+    help="Number of processes that render and store invoice PDF files in parallel",
+)
 @cron_decorators.log_cron_with_transaction
 def generate_cashflows_and_payment_files(
-    override_feature_flag: bool, cutoff: datetime.datetime, without_invoices: bool
+    override_feature_flag: bool,
+    cutoff: datetime.datetime,
+    without_invoices: bool,
+    processes: int,
+    invoice_processes: int,
 ) -> None:
     flag = FeatureToggle.GENERATE_CASHFLOWS_BY_CRON
     if not override_feature_flag and not flag.is_active():
@@ -56,8 +98,23 @@ def generate_cashflows_and_payment_files(
     if not cutoff:
         last_day = datetime.date.today() - datetime.timedelta(days=1)
         cutoff = finance_utils.get_cutoff_as_datetime(last_day)
-    batch = finance_api.generate_cashflows_and_payment_files(cutoff)
-    finance_api.generate_invoices_and_debit_notes(batch)
+    batch = finance_api.generate_cashflows_and_payment_files(cutoff, processes=processes)
+    finance_api.generate_invoices_and_debit_notes(batch, processes=invoice_processes)
+
+
+@blueprint.cli.command("generate_invoice_pdfs")
+@click.option("--invoice-id", "invoice_ids", type=int, multiple=True, required=True)
+def generate_invoice_pdfs(invoice_ids: tuple[int, ...]) -> None:
+    """Generate, store and send the PDF files of invoices that have
+    been generated without their PDF file.
+    """
+    for invoice_id in invoice_ids:
+        invoice = db.session.get(finance_models.Invoice, invoice_id)
+        if not invoice:
+            logger.error("Invoice not found", extra={"invoice_id": invoice_id})
+            continue
+        finance_api.store_invoice_pdf_and_send_email(invoice)
+        db.session.commit()
 
 
 @blueprint.cli.command("add_custom_offer_reimbursement_rule")
@@ -20,6 +20,16 @@ REDIS_PUSH_BANK_ACCOUNT_LOCK_TIMEOUT = 86400  # = 60 * 60 * 24 = 24h
 # lock to forbid the backoffice any write access to the pricing while the script is running
 REDIS_GENERATE_CASHFLOW_LOCK = "pc:finance:generate_cashflow_lock"
 REDIS_GENERATE_CASHFLOW_LOCK_TIMEOUT = 60 * 60 * 24  # 24h
+# id of the CashflowBatch being generated, kept if the script fails so that the next run resumes it
+REDIS_GENERATE_CASHFLOW_BATCH = "pc:finance:generate_cashflow_batch"
+# an interrupted batch is not resumed after this delay, it must be handled manually
+REDIS_GENERATE_CASHFLOW_BATCH_TIMEOUT = REDIS_GENERATE_CASHFLOW_LOCK_TIMEOUT
+# venues whose cashflow has not been generated yet: the backoffice may modify the pricing of other venues
+REDIS_GENERATE_CASHFLOW_PENDING_VENUES = "pc:finance:generate_cashflow_pending_venues"
+# set once pending venues are known: Redis deletes the set above when its last venue is removed
+REDIS_GENERATE_CASHFLOW_PENDING_VENUES_KNOWN = "pc:finance:generate_cashflow_pending_venues_known"
+# incremented when custom reimbursement rules change, so that all processes reload them
+REDIS_CUSTOM_REIMBURSEMENT_RULES_VERSION = "pc:finance:custom_reimbursement_rules_version"
 
 # Age in days before generating a cashflow and a debit note when total pricings is positive
 DEBIT_NOTE_AGE_THRESHOLD_FOR_CASHFLOW = 90
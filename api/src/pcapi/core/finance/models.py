@@ -621,6 +621,28 @@ class PricingLog(PcObject, Model):
     )
 
 
+class PricingPointYearlyRevenue(Model):
+    """The revenue of a pricing point over a year of the accounting
+    timezone, i.e. the total amount of the individual bookings that
+    have a non-cancelled pricing for this pricing point and year.
+
+    It is maintained by triggers on the `pricing` and `booking` tables
+    (see below), so that we do not have to sum the whole history of a
+    pricing point each time we price an event.
+    """
+
+    __tablename__ = "pricing_point_yearly_revenue"
+    pricingPointId: sa_orm.Mapped[int] = sa_orm.mapped_column(
+        sa.BigInteger, sa.ForeignKey("venue.id", ondelete="CASCADE"), primary_key=True
+    )
+    year: sa_orm.Mapped[int] = sa_orm.mapped_column(sa.Integer, primary_key=True)
+    # Contrary to other amounts of this module, this is in euros, like
+    # `Booking.amount`.
+    revenue: sa_orm.Mapped[decimal.Decimal] = sa_orm.mapped_column(
+        sa.Numeric(12, 2), nullable=False, server_default="0"
+    )
+
+
 class RuleGroup(enum.Enum):
     STANDARD = dict(
         label="Barème général",
@@ -828,6 +850,75 @@ trig_venue_has_siret_ddl = sa.DDL("""
 sa_event.listen(CustomReimbursementRule.__table__, "after_create", trig_venue_has_siret_ddl)
 
 
+# The year of a pricing is computed in the accounting timezone, as in
+# `api._get_revenue_period()`.
+trig_update_pricing_point_yearly_revenue_ddl = sa.DDL("""
+    CREATE OR REPLACE FUNCTION update_pricing_point_yearly_revenue()
+    RETURNS TRIGGER AS $$
+    DECLARE
+        booking_amount numeric;
+    BEGIN
+    IF TG_OP != 'INSERT' AND OLD."bookingId" IS NOT NULL AND OLD.status != 'cancelled' THEN
+        SELECT amount * quantity INTO booking_amount FROM booking WHERE id = OLD."bookingId";
+        UPDATE pricing_point_yearly_revenue
+        SET revenue = revenue - booking_amount
+        WHERE
+            "pricingPointId" = OLD."pricingPointId"
+            AND year = date_part('year', (OLD."valueDate" AT TIME ZONE 'UTC') AT TIME ZONE 'Europe/Paris');
+    END IF;
+
+    IF TG_OP != 'DELETE' AND NEW."bookingId" IS NOT NULL AND NEW.status != 'cancelled' THEN
+        SELECT amount * quantity INTO booking_amount FROM booking WHERE id = NEW."bookingId";
+        INSERT INTO pricing_point_yearly_revenue ("pricingPointId", year, revenue)
+        VALUES (
+            NEW."pricingPointId",
+            date_part('year', (NEW."valueDate" AT TIME ZONE 'UTC') AT TIME ZONE 'Europe/Paris'),
+            booking_amount
+        )
+        ON CONFLICT ("pricingPointId", year)
+        DO UPDATE SET revenue = pricing_point_yearly_revenue.revenue + EXCLUDED.revenue;
+    END IF;
+
+    RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS pricing_update_pricing_point_yearly_revenue ON pricing;
+    CREATE TRIGGER pricing_update_pricing_point_yearly_revenue
+    AFTER INSERT OR DELETE OR UPDATE OF status, "bookingId", "pricingPointId", "valueDate"
+    ON pricing
+    FOR EACH ROW
+    EXECUTE PROCEDURE update_pricing_point_yearly_revenue();
+
+    CREATE OR REPLACE FUNCTION update_pricing_point_yearly_revenue_on_booking_amount()
+    RETURNS TRIGGER AS $$
+    BEGIN
+    UPDATE pricing_point_yearly_revenue
+    SET revenue = pricing_point_yearly_revenue.revenue + (NEW.amount * NEW.quantity) - (OLD.amount * OLD.quantity)
+    FROM pricing
+    WHERE
+        pricing."bookingId" = NEW.id
+        AND pricing.status != 'cancelled'
+        AND pricing_point_yearly_revenue."pricingPointId" = pricing."pricingPointId"
+        AND pricing_point_yearly_revenue.year = date_part('year', (pricing."valueDate" AT TIME ZONE 'UTC') AT TIME ZONE 'Europe/Paris');
+    RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS booking_update_pricing_point_yearly_revenue ON booking;
+    CREATE TRIGGER booking_update_pricing_point_yearly_revenue
+    AFTER UPDATE OF amount, quantity
+    ON booking
+    FOR EACH ROW
+    WHEN (OLD.amount * OLD.quantity IS DISTINCT FROM NEW.amount * NEW.quantity)
+    EXECUTE PROCEDURE update_pricing_point_yearly_revenue_on_booking_amount()
+    """)
+
+# The `booking` table is created before the `pricing` table (which
+# references it), so both triggers can be created here.
+sa_event.listen(Pricing.__table__, "after_create", trig_update_pricing_point_yearly_revenue_ddl)
+
+
 class InvoiceCashflow(Model):
     """An association table between invoices and cashflows for their many-to-many relationship."""
 
@@ -1,4 +1,6 @@
+import bisect
 import datetime
+import typing
 from decimal import Decimal
 
 import pcapi.core.finance.api as finance_api
@@ -6,9 +8,11 @@ import pcapi.core.finance.models as finance_models
 from pcapi.core.bookings.models import Booking
 from pcapi.core.categories import subcategories
 from pcapi.core.educational.models import CollectiveBooking
+from pcapi.core.finance import conf as finance_conf
 from pcapi.core.finance import utils as finance_utils
 from pcapi.core.offers.models import Offer
 from pcapi.models import db
+from pcapi.utils.redis import get_redis_client
 
 
 # A new set rules are in effect as of 1 September 2021 (i.e. 31 August 22:00 UTC)
@@ -217,31 +221,120 @@ assert [r.description for r in REGULAR_RULES] == [
 ]
 
 
-class CustomRuleFinder:
+class _IndexedCustomRule(typing.NamedTuple):
+    id: int
+    subcategories: list[str]
+    lower: datetime.datetime
+    upper: datetime.datetime | None
+
+
+class _CustomRuleIndex:
+    """Rules of a single offer, venue or offerer, sorted by the lower
+    bound of their timespan.
+    """
+
     def __init__(self) -> None:
-        self.rules = db.session.query(finance_models.CustomReimbursementRule).all()
-        self.rules_by_offer = self._partition_by_field("offerId")
-        self.rules_by_venue = self._partition_by_field("venueId")
-        self.rules_by_offerer = self._partition_by_field("offererId")
+        self.lowers: list[datetime.datetime] = []
+        self.rules: list[_IndexedCustomRule] = []
+
+    def add(self, rule: _IndexedCustomRule) -> None:
+        position = bisect.bisect_right(self.lowers, rule.lower)
+        self.lowers.insert(position, rule.lower)
+        self.rules.insert(position, rule)
+
+    def iter_rule_ids(self, booking: Booking, check_subcategories: bool = True) -> typing.Iterator[int]:
+        assert booking.dateUsed  # helps mypy
+        # Only rules that started before the booking was used may be
+        # active. Overlapping rules are allowed only if they apply to
+        # distinct subcategories, so at most one existing rule should
+        # match. Other ones may have been deleted since rules were loaded.
+        position = bisect.bisect_right(self.lowers, booking.dateUsed)
+        for rule in reversed(self.rules[:position]):
+            if rule.upper is not None and booking.dateUsed >= rule.upper:
+                continue
+            if check_subcategories and rule.subcategories:
+                if booking.stock.offer.subcategoryId not in rule.subcategories:
+                    continue
+            yield rule.id
+
+
+class CustomRuleFinder:
+    """Find the custom reimbursement rule that applies to a booking.
+
+    Rules are loaded once and indexed by offer, venue (pricing point)
+    and offerer, so that the same finder can be used to price many
+    events (see `finance_api.price_events()`). Rules that are created
+    or edited in the meantime through `finance_api`, even by another
+    process, are taken into account, see `invalidate()`.
+    """
 
-    def _partition_by_field(self, field: str) -> dict:
-        cache: dict[int, list[finance_models.CustomReimbursementRule]] = {}
-        for rule in self.rules:
-            cache.setdefault(getattr(rule, field), []).append(rule)
-        return cache
+    def __init__(self) -> None:
+        self._load()
+
+    @staticmethod
+    def invalidate() -> None:
+        """Make existing finders, in all processes, reload rules on
+        their next lookup. Must be called once changes are committed.
+        """
+        get_redis_client().incr(finance_conf.REDIS_CUSTOM_REIMBURSEMENT_RULES_VERSION)
+
+    @staticmethod
+    def _get_version() -> str | None:
+        return get_redis_client().get(finance_conf.REDIS_CUSTOM_REIMBURSEMENT_RULES_VERSION)
+
+    def _load(self) -> None:
+        # Read the version before the rules: a change committed in
+        # the meantime makes us reload them on the next lookup.
+        self.version = self._get_version()
+        self.rules_by_offer: dict[int, _CustomRuleIndex] = {}
+        self.rules_by_venue: dict[int, _CustomRuleIndex] = {}
+        self.rules_by_offerer: dict[int, _CustomRuleIndex] = {}
+        # Only load what we need to select a rule: rules are not
+        # added to the session, where they would be expired (and
+        # reloaded one by one) at each commit.
+        rows = db.session.query(
+            finance_models.CustomReimbursementRule.id,
+            finance_models.CustomReimbursementRule.offerId,
+            finance_models.CustomReimbursementRule.venueId,
+            finance_models.CustomReimbursementRule.offererId,
+            finance_models.CustomReimbursementRule.subcategories,
+            finance_models.CustomReimbursementRule.timespan,
+        )
+        for rule_id, offer_id, venue_id, offerer_id, rule_subcategories, timespan in rows:
+            rule = _IndexedCustomRule(rule_id, rule_subcategories, timespan.lower, timespan.upper)
+            if offer_id:
+                self.rules_by_offer.setdefault(offer_id, _CustomRuleIndex()).add(rule)
+            elif venue_id:
+                self.rules_by_venue.setdefault(venue_id, _CustomRuleIndex()).add(rule)
+            else:
+                self.rules_by_offerer.setdefault(offerer_id, _CustomRuleIndex()).add(rule)
 
     def get_rule(self, booking: Booking) -> finance_models.CustomReimbursementRule | None:
-        for rule in self.rules_by_offer.get(booking.stock.offerId, ()):
-            if rule.matches(booking, cumulative_revenue=0):  # cumulative revenue is ignored
-                return rule
-        for rule in self.rules_by_venue.get(finance_api.get_pricing_point_link(booking).pricingPointId, ()):
-            if rule.matches(booking, cumulative_revenue=0):  # cumulative revenue is ignored
-                return rule
-        for rule in self.rules_by_offerer.get(booking.offererId, ()):
-            if rule.matches(booking, cumulative_revenue=0):  # cumulative revenue is ignored
+        # A single Redis lookup is much cheaper than loading all rules.
+        if self.version != self._get_version():
+            self._load()
+        for rule_id in self._iter_rule_ids(booking):
+            # The rule may have been deleted since rules were loaded:
+            # try the next one.
+            rule = db.session.get(finance_models.CustomReimbursementRule, rule_id)
+            if rule is not None:
                 return rule
         return None
 
+    def _iter_rule_ids(self, booking: Booking) -> typing.Iterator[int]:
+        # A rule on an offer applies to all subcategories.
+        offer_rules = self.rules_by_offer.get(booking.stock.offerId)
+        if offer_rules:
+            yield from offer_rules.iter_rule_ids(booking, check_subcategories=False)
+        # Do not look for the pricing point if no venue has any rule.
+        if self.rules_by_venue:
+            venue_rules = self.rules_by_venue.get(finance_api.get_pricing_point_link(booking).pricingPointId)
+            if venue_rules:
+                yield from venue_rules.iter_rule_ids(booking)
+        offerer_rules = self.rules_by_offerer.get(booking.offererId)
+        if offerer_rules:
+            yield from offerer_rules.iter_rule_ids(booking)
+
 
 def get_reimbursement_rule(
     booking: Booking | CollectiveBooking,
@@ -6,6 +6,7 @@ import sqlalchemy as sa
 import sqlalchemy.orm as sa_orm
 
 from pcapi.core.finance import models as finance_models
+from pcapi.core.finance import reimbursement_rules
 from pcapi.core.history import models as history_models
 from pcapi.core.offerers import api as offerers_api
 from pcapi.core.offerers import models as offerers_models
@@ -14,6 +15,7 @@ from pcapi.utils import date as date_utils
 from pcapi.utils import db as db_utils
 from pcapi.utils.transaction_manager import atomic
 from pcapi.utils.transaction_manager import mark_transaction_as_invalid
+from pcapi.utils.transaction_manager import on_commit
 
 from . import models
 
@@ -328,6 +330,7 @@ def _force_close_custom_reimbursement_rules_for_venue(venue: offerers_models.Ven
             sa.func.upper(finance_models.CustomReimbursementRule.timespan) >= now,
         ),
     )
+    has_changed_rules = False
     for rule in custom_reimbursement_rules:
         if rule.timespan.lower < now:
             rule.timespan = db_utils.make_timerange(
@@ -338,6 +341,9 @@ def _force_close_custom_reimbursement_rules_for_venue(venue: offerers_models.Ven
         else:
             db.session.delete(rule)
         db.session.flush()
+        has_changed_rules = True
+    if has_changed_rules:
+        on_commit(reimbursement_rules.CustomRuleFinder.invalidate)
 
 
 def check_can_remove_pricing_point(
@@ -0,0 +1,68 @@
+"""Cache of the serialized offers sent to the native app.
+
+Serialized offers are cached under a version of their offer, which is
+bumped whenever the offer must be reindexed: every write that changes
+what the app displays (offer, stocks, venue, product, bookings) already
+asks for a reindexation.
+"""
+
+import logging
+import typing
+from collections import abc
+
+from pcapi import settings
+from pcapi.utils import cache as cache_utils
+
+
+logger = logging.getLogger(__name__)
+
+
+OFFER_RESPONSE_VERSION_KEY_TEMPLATE = "cache:native:offer:%(id)s:version"
+# Versions must outlive the cached responses, see `cache_utils.bump_cache_versions()`.
+OFFER_RESPONSE_VERSION_EXPIRATION = 24 * 60 * 60  # 24h
+
+
+def get_offer_responses(
+    name: str,
+    offer_ids: abc.Collection[int],
+    retriever: typing.Callable[[list[int]], dict[int, str]],
+) -> dict[int, str]:
+    """Return serialized offers by id.
+
+    :param name: name of the serialization, each one is cached
+        separately.
+    :param retriever: function that serializes the given offers that
+        are not cached. Offers that do not exist should be missing
+        from its result.
+    """
+    if not settings.NATIVE_OFFER_RESPONSE_CACHE_DURATION:
+        return retriever(list(dict.fromkeys(offer_ids)))
+    return cache_utils.get_many_from_versioned_cache(
+        retriever=retriever,
+        ids=offer_ids,
+        key_template=f"cache:native:offer:%(id)s:{name}:%(version)s",
+        version_key_template=OFFER_RESPONSE_VERSION_KEY_TEMPLATE,
+        expire=settings.NATIVE_OFFER_RESPONSE_CACHE_DURATION,
+    )
+
+
+def invalidate_offer_responses(offer_ids: abc.Collection[int]) -> None:
+    """Invalidate the cached serializations of the given offers.
+
+    This must be called once the modifications of the offers have
+    been committed, otherwise outdated data could be cached again
+    under the new version.
+    """
+    if not settings.NATIVE_OFFER_RESPONSE_CACHE_DURATION or not offer_ids:
+        return
+    try:
+        cache_utils.bump_cache_versions(
+            ids=offer_ids,
+            version_key_template=OFFER_RESPONSE_VERSION_KEY_TEMPLATE,
+            expire=OFFER_RESPONSE_VERSION_EXPIRATION,
+        )
+    except Exception:
+        # Outdated responses will be served until they expire.
+        logger.exception(
+            "Could not invalidate cached offer responses", extra={"partial_offer_ids": list(offer_ids)[:50]}
+        )
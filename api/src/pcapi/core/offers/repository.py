@@ -33,6 +33,7 @@ from pcapi.models import offer_mixin
 from pcapi.models.feature import FeatureToggle
 from pcapi.utils import custom_keys
 from pcapi.utils import date as date_utils
+from pcapi.utils import db as db_utils
 from pcapi.utils import string as string_utils
 from pcapi.utils.decorators import retry
 
@@ -1514,16 +1515,19 @@ def update_stock_quantity_to_dn_booked_quantity(stock_id: int | None) -> None:
     db.session.flush()
 
 
-def get_paginated_active_offer_ids(batch_size: int, page: int = 1) -> list[int]:
-    query = (
-        db.session.query(models.Offer)
-        .with_entities(models.Offer.id)
-        .filter(models.Offer.isActive)
-        .order_by(models.Offer.id)
-        .offset((page - 1) * batch_size)  # first page is 1, not 0
-        .limit(batch_size)
-    )
-    return [offer_id for (offer_id,) in query]
+def get_paginated_active_offer_ids(
+    batch_size: int,
+    start_id: int | None = None,
+    end_id: int | None = None,
+    start_page: int = 1,
+) -> typing.Iterator[list[int]]:
+    """Yield ids of active offers, by batches of ``batch_size``, in
+    ascending order. ``start_id`` and ``end_id`` are both included.
+    """
+    query = sa.select(models.Offer.id).filter(models.Offer.isActive)
+    if end_id is not None:
+        query = query.filter(models.Offer.id <= end_id)
+    yield from db_utils.yield_id_batches_by_keyset(query, models.Offer.id, batch_size, start_id, start_page)
 
 
 def get_paginated_offer_ids_by_artist_id(artist_id: str, chunk_size: int) -> typing.Iterator[list[int]]:
@@ -1552,16 +1556,17 @@ def get_offer_price_categories(offer_id: int, id_at_provider_list: list[str] | N
     return query
 
 
-def get_offer_by_venue_and_movie_uuid(venue_id: int, movie_uuid: str) -> models.Offer | None:
+def get_offers_by_venue_and_movie_uuids(venue_id: int, movie_uuids: typing.Collection[str]) -> list[models.Offer]:
     return (
         db.session.query(models.Offer)
-        .filter(models.Offer.idAtProvider == movie_uuid, models.Offer.venueId == venue_id)
-        .one_or_none()
+        .filter(models.Offer.idAtProvider.in_(movie_uuids), models.Offer.venueId == venue_id)
+        .options(sa_orm.selectinload(models.Offer.priceCategories))
+        .all()
     )
 
 
-def get_stock_by_movie_stock_uuid(stock_uuid: str) -> models.Stock | None:
-    return db.session.query(models.Stock).filter(models.Stock.idAtProviders == stock_uuid).one_or_none()
+def get_stocks_by_movie_stock_uuids(stock_uuids: typing.Collection[str]) -> list[models.Stock]:
+    return db.session.query(models.Stock).filter(models.Stock.idAtProviders.in_(stock_uuids)).all()
 
 
 def exclude_offers_from_inactive_venue_provider(query: sa_orm.Query) -> sa_orm.Query:
@@ -484,6 +484,6 @@ def _create_or_update_ean_offers(
 
     search.async_index_offer_ids(
         offers_to_index,
-        reason=IndexationReason.OFFER_UPDATE,
+        reason=IndexationReason.OFFER_BATCH_UPDATE,
         log_extra={"venue_id": venue_id, "source": "offers_public_api"},
     )
@@ -154,48 +154,72 @@ def synchronize_allocine_stocks() -> None:
 
 
 @blueprint.cli.command("synchronize_cine_office_stocks")
+@click.option(
+    "--processes",
+    type=int,
+    default=1,
+    help="Number of venue providers synchronized in parallel (capped by provider)",
+)
 @cron_decorators.log_cron_with_transaction
 @cron_decorators.cron_require_feature(FeatureToggle.ENABLE_RECURRENT_CRON)
 @cron_decorators.cron_require_feature(FeatureToggle.ENABLE_CDS_IMPLEMENTATION)
-def synchronize_cine_office_stocks() -> None:
+def synchronize_cine_office_stocks(processes: int) -> None:
     """Launch Ciné Office synchronization."""
     cine_office_stocks_provider = providers_repository.get_provider_by_local_class("CDSStocks")
     assert cine_office_stocks_provider  # helps mypy
     venue_providers = providers_repository.get_active_venue_providers_by_provider(cine_office_stocks_provider.id)
-    provider_manager.synchronize_venue_providers(venue_providers)
+    provider_manager.synchronize_venue_providers(venue_providers, processes=processes)
 
 
 @blueprint.cli.command("synchronize_boost_stocks")
+@click.option(
+    "--processes",
+    type=int,
+    default=1,
+    help="Number of venue providers synchronized in parallel (capped by provider)",
+)
 @cron_decorators.log_cron_with_transaction
 @cron_decorators.cron_require_feature(FeatureToggle.ENABLE_RECURRENT_CRON)
 @cron_decorators.cron_require_feature(FeatureToggle.ENABLE_BOOST_API_INTEGRATION)
-def synchronize_boost_stocks() -> None:
+def synchronize_boost_stocks(processes: int) -> None:
     """Launch Boost synchronization."""
     boost_stocks_provider = providers_repository.get_provider_by_local_class("BoostStocks")
     assert boost_stocks_provider  # helps mypy
     venue_providers = providers_repository.get_active_venue_providers_by_provider(boost_stocks_provider.id)
-    provider_manager.synchronize_venue_providers(venue_providers)
+    provider_manager.synchronize_venue_providers(venue_providers, processes=processes)
 
 
 @blueprint.cli.command("synchronize_cgr_stocks")
+@click.option(
+    "--processes",
+    type=int,
+    default=1,
+    help="Number of venue providers synchronized in parallel (capped by provider)",
+)
 @cron_decorators.log_cron_with_transaction
 @cron_decorators.cron_require_feature(FeatureToggle.ENABLE_RECURRENT_CRON)
 @cron_decorators.cron_require_feature(FeatureToggle.ENABLE_CGR_INTEGRATION)
-def synchronize_cgr_stocks() -> None:
+def synchronize_cgr_stocks(processes: int) -> None:
     """Launch CGR synchronization."""
     cgr_stocks_provider = providers_repository.get_provider_by_local_class("CGRStocks")
     assert cgr_stocks_provider  # helps mypy
     venue_providers = providers_repository.get_active_venue_providers_by_provider(cgr_stocks_provider.id)
-    provider_manager.synchronize_venue_providers(venue_providers)
+    provider_manager.synchronize_venue_providers(venue_providers, processes=processes)
 
 
 @blueprint.cli.command("synchronize_ems_stocks")
+@click.option(
+    "--processes",
+    type=int,
+    default=1,
+    help="Number of venue providers synchronized in parallel (capped by provider)",
+)
 @cron_decorators.log_cron_with_transaction
 @cron_decorators.cron_require_feature(FeatureToggle.ENABLE_RECURRENT_CRON)
 @cron_decorators.cron_require_feature(FeatureToggle.ENABLE_EMS_INTEGRATION)
-def synchronize_ems_stocks_on_schedule() -> None:
+def synchronize_ems_stocks_on_schedule(processes: int) -> None:
     """Launch EMS synchronization"""
-    provider_manager.synchronize_ems_venue_providers(from_last_version=True)
+    provider_manager.synchronize_ems_venue_providers(from_last_version=True, processes=processes)
 
 
 @blueprint.cli.command("update_gtl")
@@ -1,6 +1,7 @@
 import datetime
 import decimal
 import enum
+import functools
 import logging
 import typing
 
@@ -11,6 +12,7 @@ from pcapi.connectors.ems import EMSScheduleConnector
 from pcapi.core import search
 from pcapi.core.categories import subcategories
 from pcapi.core.offerers import api as offerers_api
+from pcapi.core.offerers import models as offerers_models
 from pcapi.core.offers import api as offers_api
 from pcapi.core.offers import exceptions as offers_exceptions
 from pcapi.core.offers import models as offers_models
@@ -22,6 +24,7 @@ from pcapi.core.search import models as search_models
 from pcapi.models import db
 from pcapi.utils.date import get_naive_utc_now
 from pcapi.utils.transaction_manager import atomic
+from pcapi.utils.transaction_manager import on_commit
 
 
 logger = logging.getLogger(__name__)
@@ -122,7 +125,7 @@ class CinemaETLProcessTemplate[APIClient: cinema_client.CinemaAPIClient | EMSSch
         # Step 4 : Post Load actions
         search.async_index_offer_ids(
             offers_ids,
-            reason=search_models.IndexationReason.STOCK_UPDATE,
+            reason=search_models.IndexationReason.STOCK_SYNCHRONIZATION,
             log_extra={
                 "source": "provider_api",
                 "venue_id": self.venue_provider.venueId,
@@ -157,29 +160,67 @@ class CinemaETLProcessTemplate[APIClient: cinema_client.CinemaAPIClient | EMSSch
         """
         Step 3: Load data into DB
 
+        All movies are loaded in a single transaction: existing offers (with their price categories)
+        and stocks are fetched in a few queries for the whole venue, instead of once per movie or show.
+
         :return: the set of offer_ids to be reindexed on algolia, a list of product with their
                  poster url for post load treatment.
         """
         products_with_poster: list[tuple[offers_models.Product, str]] = []
         offers_ids = set()
-        for loadable_movie in loadable_movies:
-            with atomic():
-                offer, product_with_poster = self._load_movie_and_stocks(loadable_movie)
+        with atomic():
+            offer_location = offerers_api.get_or_create_offer_location(
+                offerer_id=self.venue_provider.venue.managingOffererId,
+                venue_id=self.venue_provider.venue.id,
+                address_id=self.venue_provider.venue.offererAddress.addressId,
+                label=None,
+            )
+            offers_by_movie_uuid: dict[str, offers_models.Offer] = {
+                offer.idAtProvider: offer
+                for offer in offers_repository.get_offers_by_venue_and_movie_uuids(
+                    venue_id=self.venue_provider.venueId,
+                    movie_uuids={loadable_movie["movie_uuid"] for loadable_movie in loadable_movies},
+                )
+                if offer.idAtProvider
+            }
+            stocks_by_uuid: dict[str, offers_models.Stock] = {
+                stock.idAtProviders: stock
+                for stock in offers_repository.get_stocks_by_movie_stock_uuids(
+                    {
+                        stock_data["stock_uuid"]
+                        for loadable_movie in loadable_movies
+                        for stock_data in loadable_movie["stocks_data"]
+                    }
+                )
+                if stock.idAtProviders
+            }
+
+            for loadable_movie in loadable_movies:
+                offer, product_with_poster = self._load_movie_and_stocks(
+                    loadable_movie, offer_location, offers_by_movie_uuid, stocks_by_uuid
+                )
 
-            offers_ids.add(offer.id)
-            if product_with_poster:
-                products_with_poster.append(product_with_poster)
+                offers_ids.add(offer.id)
+                if product_with_poster:
+                    products_with_poster.append(product_with_poster)
 
         return offers_ids, products_with_poster
 
     def _load_movie_and_stocks(
-        self, loadable_movie: LoadableMovie
+        self,
+        loadable_movie: LoadableMovie,
+        offer_location: offerers_models.OffererAddress,
+        offers_by_movie_uuid: dict[str, offers_models.Offer],
+        stocks_by_uuid: dict[str, offers_models.Stock],
     ) -> tuple[offers_models.Offer, tuple[offers_models.Product, str] | None]:
         """
         This method does 3 things :
             1. Upsert movie product
             2. Upsert offer
             3. Upsert offer stocks (creating missing price categories if necessary)
+
+        Existing offers and stocks are looked up in (and new ones are added to) `offers_by_movie_uuid`
+        and `stocks_by_uuid`.
         """
         # Product - Create Or Update
         product = offers_api.upsert_movie_product_from_provider(
@@ -188,10 +229,7 @@ class CinemaETLProcessTemplate[APIClient: cinema_client.CinemaAPIClient | EMSSch
         )
 
         # Offer - Create Or Update
-        offer = offers_repository.get_offer_by_venue_and_movie_uuid(
-            venue_id=self.venue_provider.venueId,
-            movie_uuid=loadable_movie["movie_uuid"],
-        )
+        offer = offers_by_movie_uuid.get(loadable_movie["movie_uuid"])
 
         if not offer:  # create offer
             offer = offers_models.Offer()
@@ -199,6 +237,7 @@ class CinemaETLProcessTemplate[APIClient: cinema_client.CinemaAPIClient | EMSSch
             offer.venueId = self.venue_provider.venueId
             offer.isDuo = self.venue_provider.isDuoOffers or False
             db.session.add(offer)
+            offers_by_movie_uuid[loadable_movie["movie_uuid"]] = offer
 
             self._log(
                 logging.DEBUG,
@@ -210,13 +249,7 @@ class CinemaETLProcessTemplate[APIClient: cinema_client.CinemaAPIClient | EMSSch
             )
 
         # fill generic information
-        destination_oa = offerers_api.get_or_create_offer_location(
-            offerer_id=self.venue_provider.venue.managingOffererId,
-            venue_id=self.venue_provider.venue.id,
-            address_id=self.venue_provider.venue.offererAddress.addressId,
-            label=None,
-        )
-        offer.offererAddress = destination_oa
+        offer.offererAddress = offer_location
         offer.bookingEmail = self.venue_provider.venue.bookingEmail
         offer.withdrawalDetails = self.venue_provider.venue.withdrawalDetails
         offer.subcategoryId = subcategories.SEANCE_CINE.id
@@ -249,7 +282,7 @@ class CinemaETLProcessTemplate[APIClient: cinema_client.CinemaAPIClient | EMSSch
             price_categories_by_label_price[label_price_key] = price_category
 
         for stock_data in loadable_movie["stocks_data"]:
-            stock = offers_repository.get_stock_by_movie_stock_uuid(stock_data["stock_uuid"])
+            stock = stocks_by_uuid.get(stock_data["stock_uuid"])
 
             # `stock.beginningDatetime` has changed
             if stock and stock.beginningDatetime != stock_data["show_datetime"]:
@@ -262,6 +295,7 @@ class CinemaETLProcessTemplate[APIClient: cinema_client.CinemaAPIClient | EMSSch
                 stock.dnBookedQuantity = 0  # initialize value
                 stock.idAtProviders = stock_data["stock_uuid"]
                 db.session.add(stock)
+                stocks_by_uuid[stock_data["stock_uuid"]] = stock
 
                 self._log(
                     logging.DEBUG,
@@ -306,27 +340,49 @@ class CinemaETLProcessTemplate[APIClient: cinema_client.CinemaAPIClient | EMSSch
 
     def _post_load_product_poster_update(self, product_with_poster: list[tuple[offers_models.Product, str]]) -> None:
         """
-        For each product, if the product does not already have an image, this function fetches the movie poster
-        on given `poster_url` and creates a `ProductMediation` of type poster.
+        For each product, if the product does not already have an image, this function enqueues a task
+        that creates the movie poster (see `create_movie_poster()`), once the synchronization is committed.
+
+        The same movie is synchronized by many venues (and providers): the download and the image
+        conversion are done once, outside of the venue synchronization (see
+        `providers_tasks.enqueue_movie_poster_task()`).
         """
+        from pcapi.core.providers import tasks as providers_tasks  # avoid import loop
+
         for product, poster_url in product_with_poster:
             if product.productMediations:
                 continue  # we don't update movie poster for now
 
-            image = self.api_client.get_movie_poster(poster_url)
+            payload = providers_tasks.MoviePosterTaskPayload(
+                product_id=product.id,
+                venue_provider_id=self.venue_provider.id,
+                poster_url=poster_url,
+            )
+            on_commit(functools.partial(providers_tasks.enqueue_movie_poster_task, payload))
+
+    def create_movie_poster(self, product: offers_models.Product, poster_url: str) -> bool:
+        """
+        Fetch the movie poster on given `poster_url` and create a `ProductMediation` of type poster.
 
-            if image:
-                try:
-                    with atomic():
-                        offers_api.create_movie_poster(product, self.venue_provider.provider, image)
+        Return whether the poster has been created.
+        """
+        image = self.api_client.get_movie_poster(poster_url)
+        if not image:
+            return False
 
-                    self._log(
-                        logging.DEBUG,
-                        "Post load - New movie poster created",
-                        {"poster_url": poster_url, "product_id": product.id},
-                    )
-                except (offers_exceptions.ImageValidationError, PIL.UnidentifiedImageError) as e:
-                    self._log(logging.WARNING, "Post load - Failed to create movie poster", {"reason": str(e)})
+        try:
+            with atomic():
+                offers_api.create_movie_poster(product, self.venue_provider.provider, image)
+        except (offers_exceptions.ImageValidationError, PIL.UnidentifiedImageError) as e:
+            self._log(logging.WARNING, "Failed to create movie poster", {"reason": str(e)})
+            return False
+
+        self._log(
+            logging.DEBUG,
+            "New movie poster created",
+            {"poster_url": poster_url, "product_id": product.id},
+        )
+        return True
 
     def _log(self, level: int, message: str, data: dict | list | None = None) -> None:
         """
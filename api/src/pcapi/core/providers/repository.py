@@ -5,6 +5,7 @@ from typing import Sequence
 import sqlalchemy as sa
 import sqlalchemy.orm as sa_orm
 
+import pcapi.core.bookings.models as bookings_models
 import pcapi.core.offers.models as offers_models
 from pcapi.core.categories import subcategories
 from pcapi.core.offerers.models import Venue
@@ -32,6 +33,45 @@ def get_active_venue_providers_by_provider(provider_id: int) -> list[models.Venu
     return db.session.query(models.VenueProvider).filter_by(providerId=provider_id, isActive=True).all()
 
 
+def get_upcoming_stocks_stats_by_venue_and_provider(
+    venue_ids: Iterable[int],
+    booked_since: datetime.datetime,
+) -> dict[tuple[int, int], tuple[datetime.datetime, datetime.datetime | None]]:
+    """Return the date of the next show and the date of the last
+    booking of upcoming stocks (if made after `booked_since`), for each
+    venue and provider.
+    """
+    rows = (
+        db.session.query(
+            offers_models.Offer.venueId,
+            offers_models.Offer.lastProviderId,
+            sa.func.min(offers_models.Stock.beginningDatetime),
+            sa.func.max(bookings_models.Booking.dateCreated),
+        )
+        .join(offers_models.Stock.offer)
+        # Only join recent bookings, there may be many of them on
+        # popular shows.
+        .outerjoin(
+            bookings_models.Booking,
+            sa.and_(
+                bookings_models.Booking.stockId == offers_models.Stock.id,
+                bookings_models.Booking.dateCreated >= booked_since,
+            ),
+        )
+        .filter(
+            offers_models.Offer.venueId.in_(venue_ids),
+            offers_models.Offer.lastProviderId.is_not(None),
+            offers_models.Stock.beginningDatetime >= date_utils.get_naive_utc_now(),
+            offers_models.Stock.isSoftDeleted.is_(False),
+        )
+        .group_by(offers_models.Offer.venueId, offers_models.Offer.lastProviderId)
+    )
+    return {
+        (venue_id, provider_id): (next_show_datetime, last_booking_datetime)
+        for venue_id, provider_id, next_show_datetime, last_booking_datetime in rows
+    }
+
+
 def get_venue_provider_by_venue_and_provider_ids(venue_id: int, provider_id: int) -> models.VenueProvider | None:
     return db.session.query(models.VenueProvider).filter_by(venueId=venue_id, providerId=provider_id).one_or_none()
 
@@ -1,21 +1,29 @@
 import enum
+import hashlib
 import logging
 
+import sqlalchemy.orm as sa_orm
 from pydantic import BaseModel as BaseModelV2
 
 import pcapi.core.bookings.models as bookings_models
 import pcapi.core.providers.repository as providers_repository
 from pcapi.celery_tasks.tasks import celery_async_task
+from pcapi.core.offers import models as offers_models
 from pcapi.core.providers.etls.public_api_etl import batch_update_cinema_offers_etl
 from pcapi.core.providers.serialization import ExternalEventBookingRequest
+from pcapi.local_providers.provider_manager import get_cinema_etl_process
 from pcapi.local_providers.provider_manager import synchronize_ems_venue_provider
 from pcapi.local_providers.provider_manager import synchronize_venue_provider
+from pcapi.models import db
 from pcapi.routes.public.individual_offers.v1.serializers import events as events_serializers
 from pcapi.utils import requests
+from pcapi.utils.redis import get_redis_client
 
 
 logger = logging.getLogger(__name__)
 
+MOVIE_POSTER_TASK_LOCK_TIMEOUT = 60 * 60  # 1 hour
+
 
 class CinemaSynchronisationTaskPayload(BaseModelV2):
     venue_provider_id: int
@@ -95,3 +103,55 @@ class BatchUpdateOffersTaskPayload(BaseModelV2):
 )
 def batch_update_cinema_offers_task(payload: BatchUpdateOffersTaskPayload) -> None:
     batch_update_cinema_offers_etl(provider_id=payload.provider_id, request_payload=payload.request_payload)
+
+
+class MoviePosterTaskPayload(BaseModelV2):
+    product_id: int
+    venue_provider_id: int
+    poster_url: str
+
+
+def _get_movie_poster_lock_key(payload: MoviePosterTaskPayload) -> str:
+    url_hash = hashlib.sha1(payload.poster_url.encode()).hexdigest()
+    return f"cinema_etl:movie_poster:{payload.product_id}:{url_hash}"
+
+
+def enqueue_movie_poster_task(payload: MoviePosterTaskPayload) -> None:
+    """
+    Enqueue `create_movie_poster_task`, unless the same poster of the same product has already
+    been enqueued in the last `MOVIE_POSTER_TASK_LOCK_TIMEOUT` seconds (e.g. by the synchronization
+    of another venue). The lock is released by the task if the poster could not be created.
+    """
+    locked = get_redis_client().set(
+        _get_movie_poster_lock_key(payload), "locked", ex=MOVIE_POSTER_TASK_LOCK_TIMEOUT, nx=True
+    )
+    if locked:
+        create_movie_poster_task.delay(payload.model_dump())
+
+
+@celery_async_task(
+    name="tasks.providers.default.create_movie_poster",
+    model=MoviePosterTaskPayload,
+    rate_limit="300/m",
+)
+def create_movie_poster_task(payload: MoviePosterTaskPayload) -> None:
+    """
+    Create the movie poster of a product, unless the product already has an image (e.g. created
+    by another provider sync).
+    """
+    created = False
+    try:
+        product = (
+            db.session.query(offers_models.Product)
+            .filter_by(id=payload.product_id)
+            .options(sa_orm.selectinload(offers_models.Product.productMediations))
+            .one_or_none()
+        )
+        if not product or product.productMediations:
+            return
+        venue_provider = providers_repository.get_venue_provider_by_id(payload.venue_provider_id)
+        created = get_cinema_etl_process(venue_provider).create_movie_poster(product, payload.poster_url)
+    finally:
+        if not created:
+            # Let the next synchronization try again.
+            get_redis_client().delete(_get_movie_poster_lock_key(payload))
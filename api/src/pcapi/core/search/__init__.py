@@ -1,23 +1,35 @@
+import collections
+import contextlib
+import dataclasses
 import datetime
+import itertools
 import logging
+import threading
+import time
 import typing
 from collections import abc
+from concurrent import futures
 
 import sqlalchemy as sa
 import sqlalchemy.orm as sa_orm
+from flask import g
 
 from pcapi import settings
 from pcapi.connectors.big_query import queries as big_query_queries
 from pcapi.connectors.big_query.queries.last_30_days_booking import Last30DaysBookingsModel
 from pcapi.core.artist import models as artist_models
 from pcapi.core.artist import repository as artist_repository
+from pcapi.core.bookings import constants as bookings_constants
 from pcapi.core.bookings import models as bookings_models
 from pcapi.core.categories import subcategories
 from pcapi.core.criteria import models as criteria_models
 from pcapi.core.educational import models as educational_models
 from pcapi.core.offerers import models as offerers_models
+from pcapi.core.offers import cache as offers_cache
 from pcapi.core.offers import models as offers_models
 from pcapi.core.offers import repository as offers_repository
+from pcapi.core.search import models as search_models
+from pcapi.core.search import redis_queues
 from pcapi.core.search.backends import algolia
 from pcapi.core.search.models import IndexationReason
 from pcapi.models import db
@@ -26,11 +38,16 @@ from pcapi.utils import date as date_utils
 from pcapi.utils import requests
 from pcapi.utils.module_loading import import_string
 from pcapi.utils.transaction_manager import atomic
+from pcapi.utils.transaction_manager import is_managed_transaction
 from pcapi.utils.transaction_manager import mark_transaction_as_invalid
+from pcapi.utils.transaction_manager import on_commit
 
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of ids sent to indexation queues in a single Redis pipeline
+ENQUEUE_CHUNK_SIZE = 10_000
+
 
 def _get_backend() -> algolia.AlgoliaBackend:
     backend_class = import_string(settings.SEARCH_BACKEND)
@@ -86,6 +103,122 @@ def _log_indexation_error(
     )
 
 
+class _PendingEnqueues:
+    """Ids to add to indexation queues, collected to be sent to Redis
+    in a single round trip.
+    """
+
+    def __init__(self, on_commit_callbacks: list | None = None) -> None:
+        self.on_commit_callbacks = on_commit_callbacks
+        self.ids_by_queue: dict[str, set[int | str]] = collections.defaultdict(set)
+
+    def flush(self) -> None:
+        ids_by_queue, self.ids_by_queue = self.ids_by_queue, collections.defaultdict(set)
+        _enqueue_ids_by_queue(ids_by_queue)
+
+
+def _get_pending_enqueues() -> _PendingEnqueues | None:
+    """Return the ids to enqueue at the end of the current
+    `batched_async_indexation` block or managed transaction, or None
+    if ids should be enqueued right away.
+    """
+    pending = getattr(g, "_search_batched_enqueues", None)
+    if pending is not None:
+        return pending
+
+    on_commit_callbacks = getattr(g, "_on_commit_callbacks", None) if is_managed_transaction() else None
+    if on_commit_callbacks is None:
+        return None
+    pending = getattr(g, "_search_pending_enqueues", None)
+    # The callbacks list is renewed for each managed transaction.
+    if pending is None or pending.on_commit_callbacks is not on_commit_callbacks:
+        pending = _PendingEnqueues(on_commit_callbacks)
+        g._search_pending_enqueues = pending
+        on_commit(pending.flush)
+    return pending
+
+
+@contextlib.contextmanager
+def batched_async_indexation() -> abc.Generator[None, None, None]:
+    """Collect the ids given to `async_index_*` functions within this
+    block and enqueue them all at once when leaving it.
+    """
+    if getattr(g, "_search_batched_enqueues", None) is not None:  # reentrant
+        yield
+        return
+
+    pending = _PendingEnqueues()
+    g._search_batched_enqueues = pending
+    try:
+        yield
+    finally:
+        g.pop("_search_batched_enqueues", None)
+        pending.flush()
+
+
+def _enqueue_ids(queue: str, ids: abc.Collection[int | str]) -> None:
+    """Add ids to an indexation queue.
+
+    Within a managed transaction, ids are only enqueued once the
+    transaction has been committed, together with all ids enqueued
+    during that transaction.
+    """
+    if not ids:
+        return
+    pending = _get_pending_enqueues()
+    if pending is None:
+        _enqueue_ids_by_queue({queue: ids})
+    else:
+        pending.ids_by_queue[queue].update(ids)
+
+
+def _enqueue_ids_by_queue(ids_by_queue: abc.Mapping[str, abc.Collection[int | str]]) -> None:
+    # Many ids may have been collected (e.g. offers of many venues):
+    # avoid huge Redis commands and pipelines.
+    for chunk in _iter_ids_by_queue_chunks(ids_by_queue, ENQUEUE_CHUNK_SIZE):
+        _enqueue_ids_by_queue_chunk(chunk)
+
+
+def _iter_ids_by_queue_chunks(
+    ids_by_queue: abc.Mapping[str, abc.Collection[int | str]], size: int
+) -> abc.Iterator[dict[str, set[int | str]]]:
+    chunk: dict[str, set[int | str]] = {}
+    size_left = size
+    for queue, ids in ids_by_queue.items():
+        ids_iterator = iter(ids)
+        while batch := set(itertools.islice(ids_iterator, size_left)):
+            chunk.setdefault(queue, set()).update(batch)
+            size_left -= len(batch)
+            if not size_left:
+                yield chunk
+                chunk = {}
+                size_left = size
+    if chunk:
+        yield chunk
+
+
+def _enqueue_ids_by_queue_chunk(ids_by_queue: abc.Mapping[str, abc.Collection[int | str]]) -> None:
+    # Offers to reindex have been modified: their cached responses
+    # are outdated.
+    offers_cache.invalidate_offer_responses(
+        {
+            typing.cast(int, offer_id)
+            for queue in redis_queues.REDIS_OFFER_IDS_BY_LANE.values()
+            for offer_id in ids_by_queue.get(queue, ())
+        }
+    )
+    backend = _get_backend()
+    try:
+        backend.enqueue_ids_by_queue(ids_by_queue)
+    except Exception:
+        if not settings.CATCH_INDEXATION_EXCEPTIONS:
+            raise
+        logger.exception(
+            "Could not enqueue ids to index",
+            extra={"partial_ids_by_queue": {queue: list(ids)[:50] for queue, ids in ids_by_queue.items()}},
+        )
+
+
 def async_index_offer_ids(
     offer_ids: abc.Collection[int],
     reason: IndexationReason,
@@ -98,13 +231,8 @@ def async_index_offer_ids(
     done later through a cron job.
     """
     _log_async_request("offers", offer_ids, reason, log_extra)
-    backend = _get_backend()
-    try:
-        backend.enqueue_offer_ids(offer_ids)
-    except Exception:
-        if not settings.CATCH_INDEXATION_EXCEPTIONS:
-            raise
-        logger.exception("Could not enqueue offer ids to index", extra={"offers": offer_ids})
+    lane = search_models.get_offer_indexation_lane(reason)
+    _enqueue_ids(redis_queues.REDIS_OFFER_IDS_BY_LANE[lane], offer_ids)
 
 
 def async_index_collective_offer_template_ids(
@@ -119,18 +247,7 @@ def async_index_collective_offer_template_ids(
     done later through a cron job.
     """
     _log_async_request("collective offer templates", collective_offer_template_ids, reason, log_extra)
-    backend = _get_backend()
-    try:
-        backend.enqueue_collective_offer_template_ids(collective_offer_template_ids)
-    except Exception:
-        if not settings.CATCH_INDEXATION_EXCEPTIONS:
-            raise
-        logger.exception(
-            "Could not enqueue collective offer template ids to index",
-            extra={
-                "collective_offer_template_ids": collective_offer_template_ids,
-            },
-        )
+    _enqueue_ids(redis_queues.REDIS_COLLECTIVE_OFFER_TEMPLATE_IDS_TO_INDEX, collective_offer_template_ids)
 
 
 def async_index_artist_ids(
@@ -145,13 +262,7 @@ def async_index_artist_ids(
     done later through a cron job.
     """
     _log_async_request("artists", artist_ids, reason, log_extra)
-    backend = _get_backend()
-    try:
-        backend.enqueue_artist_ids(artist_ids)
-    except Exception:
-        if not settings.CATCH_INDEXATION_EXCEPTIONS:
-            raise
-        logger.exception("Could not enqueue artist ids to index", extra={"artists": artist_ids})
+    _enqueue_ids(redis_queues.REDIS_ARTIST_IDS_TO_INDEX, artist_ids)
 
 
 def async_index_venue_ids(
@@ -166,13 +277,7 @@ def async_index_venue_ids(
     done later through a cron job.
     """
     _log_async_request("venues", venue_ids, reason, log_extra)
-    backend = _get_backend()
-    try:
-        backend.enqueue_venue_ids(venue_ids)
-    except Exception:
-        if not settings.CATCH_INDEXATION_EXCEPTIONS:
-            raise
-        logger.exception("Could not enqueue venue ids to index", extra={"venues": venue_ids})
+    _enqueue_ids(redis_queues.REDIS_VENUE_IDS_TO_INDEX, venue_ids)
 
 
 def async_index_offers_of_artist_ids(
@@ -187,16 +292,7 @@ def async_index_offers_of_artist_ids(
     done later through a cron job.
     """
     _log_async_request("offers of artists", artist_ids, reason, log_extra)
-    backend = _get_backend()
-    try:
-        backend.enqueue_artist_ids_for_offers(artist_ids)
-    except Exception:
-        if not settings.CATCH_INDEXATION_EXCEPTIONS:
-            raise
-        logger.exception(
-            "Could not enqueue artist ids to index their offers",
-            extra={"artists": artist_ids},
-        )
+    _enqueue_ids(redis_queues.REDIS_ARTIST_IDS_FOR_OFFERS_NAME, artist_ids)
 
 
 def async_index_offers_of_venue_ids(
@@ -211,19 +307,14 @@ def async_index_offers_of_venue_ids(
     done later through a cron job.
     """
     _log_async_request("offers of venues", venue_ids, reason, log_extra)
-    backend = _get_backend()
-    try:
-        backend.enqueue_venue_ids_for_offers(venue_ids)
-    except Exception:
-        if not settings.CATCH_INDEXATION_EXCEPTIONS:
-            raise
-        logger.exception(
-            "Could not enqueue venue ids to index their offers",
-            extra={"venues": venue_ids},
-        )
+    _enqueue_ids(redis_queues.REDIS_VENUE_IDS_FOR_OFFERS_NAME, venue_ids)
 
 
-def index_offers_in_queue(from_error_queue: bool = False, max_batches_to_process: int | None = 100) -> None:
+def index_offers_in_queue(
+    from_error_queue: bool = False,
+    max_batches_to_process: int | None = 100,
+    workers: int | None = None,
+) -> None:
     """Pop offers from indexation queue and reindex them.
 
     If ``from_error_queue`` is True, pop offers from the error queue
@@ -239,15 +330,33 @@ def index_offers_in_queue(from_error_queue: bool = False, max_batches_to_process
     If ``max_batches_to_process`` is None (i.e. if called manually to
     process the whole queue), we pop from the queue and stop only when
     the queue is empty.
+
+    If ``workers`` is a positive number (it defaults to
+    ``settings.ALGOLIA_OFFERS_INDEXATION_WORKERS``), batches are
+    processed by a pipeline: see ``_index_offers_in_queue_pipelined``.
+
+    Unless ``from_error_queue`` is True, batches are popped from the
+    lanes of the indexation queue with weighted fairness: see
+    ``_iter_offer_indexation_lanes``.
     """
+    if not from_error_queue:
+        _log_offer_indexation_lanes_stats()
+    if workers is None:
+        workers = settings.ALGOLIA_OFFERS_INDEXATION_WORKERS
+    if workers > 0:
+        _index_offers_in_queue_pipelined(
+            from_error_queue=from_error_queue,
+            max_batches_to_process=max_batches_to_process,
+            workers=workers,
+            max_in_flight_batches=settings.ALGOLIA_OFFERS_INDEXATION_MAX_IN_FLIGHT_BATCHES,
+        )
+        return
 
     backend = _get_backend()
+    lanes = _iter_offer_indexation_lanes()
     n_batches = 1
     while True:
-        with backend.pop_offer_ids_from_queue(
-            count=settings.REDIS_OFFER_IDS_CHUNK_SIZE,
-            from_error_queue=from_error_queue,
-        ) as offer_ids:
+        with _pop_offer_ids_to_index(backend, from_error_queue, lanes) as offer_ids:
             if not offer_ids:
                 break
 
@@ -256,7 +365,9 @@ def index_offers_in_queue(from_error_queue: bool = False, max_batches_to_process
                 extra={"count": len(offer_ids), "offer_ids": offer_ids},
             )
             try:
-                with atomic():
+                # The transaction is rolled back: ids to reindex (such as
+                # venues of offers) must be enqueued regardless.
+                with batched_async_indexation(), atomic():
                     reindex_offer_ids(offer_ids, from_error_queue=from_error_queue)
                     mark_transaction_as_invalid()
             except Exception as exc:
@@ -278,6 +389,193 @@ def index_offers_in_queue(from_error_queue: bool = False, max_batches_to_process
         n_batches += 1
 
 
+def _iter_offer_indexation_lanes() -> abc.Iterator[search_models.OfferIndexationLane]:
+    """Endlessly yield the lane to pop the next batch from, following a
+    smooth weighted round-robin over ``OFFER_INDEXATION_LANE_WEIGHTS``:
+    with weights 6/3/1, each sequence of 10 batches takes 6 batches from
+    the high priority lane, 3 from the default lane and 1 from the bulk
+    lane, interleaved rather than in a row.
+    """
+    weights = redis_queues.OFFER_INDEXATION_LANE_WEIGHTS
+    total_weight = sum(weights.values())
+    current_weights = dict.fromkeys(weights, 0)
+    while True:
+        for lane, weight in weights.items():
+            current_weights[lane] += weight
+        lane = max(current_weights, key=current_weights.__getitem__)
+        current_weights[lane] -= total_weight
+        yield lane
+
+
+def _pop_offer_ids_to_index(
+    backend: algolia.AlgoliaBackend,
+    from_error_queue: bool,
+    lanes: abc.Iterator[search_models.OfferIndexationLane],
+) -> contextlib.AbstractContextManager:
+    if from_error_queue:
+        return backend.pop_offer_ids_from_queue(count=settings.REDIS_OFFER_IDS_CHUNK_SIZE, from_error_queue=True)
+    # If the scheduled lane is empty, do not wait: fall back on other
+    # lanes, by decreasing priority.
+    lane = next(lanes)
+    fallback_lanes = [other_lane for other_lane in search_models.OfferIndexationLane if other_lane is not lane]
+    return backend.pop_offer_ids_from_lanes(count=settings.REDIS_OFFER_IDS_CHUNK_SIZE, lanes=[lane, *fallback_lanes])
+
+
+def _log_offer_indexation_lanes_stats() -> None:
+    try:
+        stats = _get_backend().get_offer_lanes_stats()
+    except Exception:  # metrics must not prevent indexation
+        logger.exception("Could not get offer indexation lanes stats")
+        return
+    logger.info(
+        "Offer indexation lanes stats",
+        extra={f"{lane.value}_lane_depth": depth for lane, (depth, _age) in stats.items()}
+        | {f"{lane.value}_lane_age": age for lane, (_depth, age) in stats.items()},
+    )
+
+
+@dataclasses.dataclass
+class _IndexationStageStats:
+    offers: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        return self.offers / self.elapsed if self.elapsed else 0.0
+
+
+@dataclasses.dataclass
+class _InFlightBatch:
+    offer_ids: set[int]
+    # Keeps the processing queue alive until the batch has been pushed
+    exit_stack: contextlib.ExitStack
+    push: futures.Future
+
+
+def _index_offers_in_queue_pipelined(
+    from_error_queue: bool,
+    max_batches_to_process: int | None,
+    workers: int,
+    max_in_flight_batches: int,
+) -> None:
+    """Pop offers from indexation queue and reindex them, overlapping
+    the loading of a batch with the push of the previous ones.
+
+    Loading offers from the database and serializing them is done in
+    the calling thread, because ORM objects are bound to its session.
+    Serialized offers are then pushed to the indexation service by a
+    pool of ``workers`` threads. At most ``max_in_flight_batches``
+    batches may wait to be pushed: once this limit is reached, we wait
+    for the oldest batch before popping a new one.
+
+    Popped ids stay in their processing queue until their batch has
+    been pushed, so that a crash does not lose them (see
+    ``AlgoliaIndexingQueuesMixin._pop_ids_from_queue``). Ids that could
+    not be pushed are moved to the error queue, as in
+    ``reindex_offer_ids``.
+    """
+    backend = _get_backend()
+    lanes = _iter_offer_indexation_lanes()
+    stats = {stage: _IndexationStageStats() for stage in ("load", "serialize", "push")}
+    stats_lock = threading.Lock()
+    in_flight: collections.deque[_InFlightBatch] = collections.deque()
+
+    def push(objects: list[dict], to_delete_ids: list[int]) -> None:
+        start = time.perf_counter()
+        to_add_ids = [obj["objectID"] for obj in objects]
+        try:
+            backend.save_serialized_offers(objects)
+        except Exception as exc:
+            if not settings.CATCH_INDEXATION_EXCEPTIONS:
+                raise
+            _log_indexation_error("offers", ids=to_add_ids, exc=exc, from_error_queue=from_error_queue)
+            backend.enqueue_offer_ids_in_error(to_add_ids)
+        _unindex_offer_ids_or_enqueue_in_error(backend, to_delete_ids, from_error_queue)
+        with stats_lock:
+            stats["push"].offers += len(objects) + len(to_delete_ids)
+            stats["push"].elapsed += time.perf_counter() - start
+
+    def wait_for_oldest_batch() -> None:
+        batch = in_flight.popleft()
+        batch.push.result()  # re-raise exception if `CATCH_INDEXATION_EXCEPTIONS` is not set
+        batch.exit_stack.close()
+        logger.info(
+            "Reindexed offers from queue",
+            extra={"count": len(batch.offer_ids), "from_error_queue": from_error_queue},
+        )
+
+    start = time.perf_counter()
+    n_batches = 0
+    with futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="offer-indexation") as executor:
+        while not max_batches_to_process or n_batches < max_batches_to_process:
+            while len(in_flight) >= max_in_flight_batches:
+                wait_for_oldest_batch()
+
+            exit_stack = contextlib.ExitStack()
+            offer_ids = exit_stack.enter_context(_pop_offer_ids_to_index(backend, from_error_queue, lanes))
+            if not offer_ids:
+                exit_stack.close()
+                break
+            n_batches += 1
+
+            logger.info(
+                "Fetched offer ids from indexation queue",
+                extra={"count": len(offer_ids), "offer_ids": offer_ids},
+            )
+            try:
+                # See `index_offers_in_queue` about `batched_async_indexation`.
+                with batched_async_indexation(), atomic():
+                    step_start = time.perf_counter()
+                    to_add, to_delete_ids = _sort_offers_to_reindex(backend, offer_ids)
+                    last_x_days_bookings_count_by_offer = get_last_x_days_booking_count_by_offer(to_add)
+                    stats["load"].offers += len(offer_ids)
+                    stats["load"].elapsed += time.perf_counter() - step_start
+
+                    step_start = time.perf_counter()
+                    objects = backend.serialize_offers(to_add, last_x_days_bookings_count_by_offer)
+                    stats["serialize"].offers += len(objects)
+                    stats["serialize"].elapsed += time.perf_counter() - step_start
+
+                    # some offers changes might make some venue or artists ineligible for search
+                    _reindex_venues_from_offers(offer_ids)
+                    if FeatureToggle.ENABLE_ARTIST_INDEXATION.is_active():
+                        _reindex_artists_from_offers(offer_ids)
+                    mark_transaction_as_invalid()
+            except Exception as exc:
+                if not settings.CATCH_INDEXATION_EXCEPTIONS:
+                    raise
+                exit_stack.close()
+                logger.exception(
+                    "Exception while reindexing offers, must fix manually",
+                    extra={"exc": str(exc), "offers": offer_ids},
+                )
+                continue
+
+            in_flight.append(
+                _InFlightBatch(
+                    offer_ids=offer_ids,
+                    exit_stack=exit_stack,
+                    push=executor.submit(push, objects, to_delete_ids),
+                )
+            )
+
+        while in_flight:
+            wait_for_oldest_batch()
+
+    elapsed = time.perf_counter() - start
+    logger.info(
+        "Finished pipelined reindexation of offers from queue",
+        extra={
+            "from_error_queue": from_error_queue,
+            "batches": n_batches,
+            "workers": workers,
+            "elapsed": round(elapsed, 2),
+            "offers_per_second": round(stats["load"].offers / elapsed, 2) if elapsed else 0,
+        }
+        | {f"{stage}_offers_per_second": round(stat.throughput, 2) for stage, stat in stats.items()},
+    )
+
+
 def index_all_collective_offers_and_templates() -> None:
     """Force reindexation of all collective offers and templates."""
     backend = _get_backend()
@@ -511,6 +809,7 @@ def index_offers_of_venues_in_queue() -> None:
                     if FeatureToggle.ENABLE_EXPERIMENTAL_ASYNC_OFFER_INDEXING.is_active():
                         async_index_offer_ids(offer_ids, reason=IndexationReason.VENUE_UPDATE)
                     else:
+                        offers_cache.invalidate_offer_responses(offer_ids)
                         reindex_offer_ids(offer_ids, from_error_queue=False)
                 # TODO: remove extra data without `_id`
                 logger.info("Finished indexing offers of venue", extra={"venue": venue_id, "venue_id": venue_id})
@@ -647,10 +946,60 @@ DEFAULT_DAYS_FOR_LAST_BOOKINGS = 30
 def get_offers_booking_count_by_id(
     offer_ids: abc.Collection[int], days: int = DEFAULT_DAYS_FOR_LAST_BOOKINGS
 ) -> dict[int, int]:
+    """Return the number of non-cancelled bookings created in the last
+    `days` days, for each active offer that has such bookings.
+
+    Whole days are read from the `stock_daily_booking_count` rollup
+    table, once it has been filled with existing bookings (see
+    `WIP_ENABLE_STOCK_DAILY_BOOKING_COUNT`). Only bookings of the first
+    (partial) day are read from the `booking` table.
+    """
+    if not FeatureToggle.WIP_ENABLE_STOCK_DAILY_BOOKING_COUNT.is_active():
+        return _get_offers_booking_count_by_id_from_bookings(offer_ids, days)
+    assert days < bookings_constants.DAILY_BOOKING_COUNT_RETENTION_DAYS
+    since = date_utils.get_naive_utc_now() - datetime.timedelta(days=days)
+    first_whole_day = since.date() + datetime.timedelta(days=1)
+    whole_days_counts = (
+        sa.select(
+            offers_models.Stock.offerId.label("offer_id"),
+            bookings_models.StockDailyBookingCount.bookingCount.label("booking_count"),
+        )
+        .join(offers_models.Stock, offers_models.Stock.id == bookings_models.StockDailyBookingCount.stockId)
+        .filter(
+            offers_models.Stock.offerId.in_(offer_ids),
+            bookings_models.StockDailyBookingCount.day >= first_whole_day,
+        )
+    )
+    first_day_counts = (
+        sa.select(
+            offers_models.Stock.offerId.label("offer_id"),
+            sa.func.count(bookings_models.Booking.id).label("booking_count"),
+        )
+        .join(bookings_models.Booking.stock)
+        .filter(
+            offers_models.Stock.offerId.in_(offer_ids),
+            bookings_models.Booking.dateCreated >= since,
+            bookings_models.Booking.dateCreated < datetime.datetime.combine(first_whole_day, datetime.time.min),
+            bookings_models.Booking.status != bookings_models.BookingStatus.CANCELLED,
+        )
+        .group_by(offers_models.Stock.offerId)
+    )
+    counts = sa.union_all(whole_days_counts, first_day_counts).subquery()
+    booking_count = sa.func.sum(counts.c.booking_count)
+    offer_booked_since_x_days = db.session.execute(
+        sa.select(counts.c.offer_id, booking_count)
+        .join(offers_models.Offer, offers_models.Offer.id == counts.c.offer_id)
+        .filter(offers_models.Offer.isActive)
+        .group_by(counts.c.offer_id)
+        .having(booking_count > 0)
+    )
+    return {offer_id: int(count) for offer_id, count in offer_booked_since_x_days}
+
+
+def _get_offers_booking_count_by_id_from_bookings(offer_ids: abc.Collection[int], days: int) -> dict[int, int]:
     offer_booked_since_x_days = (
         db.session.query(offers_models.Offer.id, sa.func.count(bookings_models.Booking.id))
         .join(offers_models.Offer.stocks)
-        .outerjoin(offers_models.Offer.product)
         .join(offers_models.Stock.bookings)
         .filter(
             offers_models.Offer.id.in_(offer_ids),
@@ -739,7 +1088,7 @@ def reindex_artist_ids(artist_ids: abc.Collection[str], from_error_queue: bool =
         logger.info("Finished unindexing artists", extra={"count": len(to_delete_ids)})
 
 
-def reindex_offer_ids(offer_ids: abc.Collection[int], from_error_queue: bool = False) -> None:
+def reindex_offer_ids(offer_ids: abc.Collection[int], from_error_queue: bool = False, force: bool = False) -> None:
     """Given a list of `Offer.id`, reindex or unindex each offer
     (i.e. request the external indexation service an update or a
     removal).
@@ -747,9 +1096,47 @@ def reindex_offer_ids(offer_ids: abc.Collection[int], from_error_queue: bool = F
     This function calls the external indexation service and may thus
     be slow. It should not be called by usual code. You should rather
     call `async_index_offer_ids()` instead to return quickly.
+
+    If `force` is set, offers are pushed even if they have not changed
+    since their last indexation (see `ALGOLIA_SKIP_UNCHANGED_OFFERS`).
     """
     backend = _get_backend()
 
+    to_add, to_delete_ids = _sort_offers_to_reindex(backend, offer_ids)
+    to_add_ids = [offer.id for offer in to_add]
+
+    # Handle new or updated available offers
+    last_x_days_bookings_count_by_offer = get_last_x_days_booking_count_by_offer(to_add)
+    try:
+        backend.index_offers(to_add, last_x_days_bookings_count_by_offer, force=force)
+    except Exception as exc:
+        if not settings.CATCH_INDEXATION_EXCEPTIONS:
+            raise
+        _log_indexation_error(
+            "offers",
+            ids=to_add_ids,
+            exc=exc,
+            from_error_queue=from_error_queue,
+        )
+        backend.enqueue_offer_ids_in_error(to_add_ids)
+
+    # Handle unavailable offers (deleted, expired, sold out, etc.)
+    _unindex_offer_ids_or_enqueue_in_error(backend, to_delete_ids, from_error_queue)
+
+    # some offers changes might make some venue ineligible for search
+    _reindex_venues_from_offers(offer_ids)
+    # some offers changes might make some artists ineligible for search
+    if FeatureToggle.ENABLE_ARTIST_INDEXATION.is_active():
+        _reindex_artists_from_offers(offer_ids)
+
+
+def _sort_offers_to_reindex(
+    backend: algolia.AlgoliaBackend,
+    offer_ids: abc.Collection[int],
+) -> tuple[list[offers_models.Offer], list[int]]:
+    """Return offers that must be (re)indexed and ids of offers that
+    must be unindexed.
+    """
     to_add = []
     to_delete_ids = []
 
@@ -771,41 +1158,26 @@ def reindex_offer_ids(offer_ids: abc.Collection[int], from_error_queue: bool = F
     found_offer_ids = to_delete_ids + to_add_ids
     unfound_offer_ids = [offer_id for offer_id in offer_ids if offer_id not in found_offer_ids]
     to_delete_ids += unfound_offer_ids
+    return to_add, to_delete_ids
 
-    # Handle new or updated available offers
-    last_x_days_bookings_count_by_offer = get_last_x_days_booking_count_by_offer(to_add)
-    try:
-        backend.index_offers(to_add, last_x_days_bookings_count_by_offer)
-    except Exception as exc:
-        if not settings.CATCH_INDEXATION_EXCEPTIONS:
-            raise
-        _log_indexation_error(
-            "offers",
-            ids=to_add_ids,
-            exc=exc,
-            from_error_queue=from_error_queue,
-        )
-        backend.enqueue_offer_ids_in_error(to_add_ids)
 
-    # Handle unavailable offers (deleted, expired, sold out, etc.)
+def _unindex_offer_ids_or_enqueue_in_error(
+    backend: algolia.AlgoliaBackend,
+    offer_ids: abc.Collection[int],
+    from_error_queue: bool,
+) -> None:
     try:
-        backend.unindex_offer_ids(to_delete_ids)
+        backend.unindex_offer_ids(offer_ids)
     except Exception as exc:
         if not settings.CATCH_INDEXATION_EXCEPTIONS:
             raise
         _log_indexation_error(
             "offers",
-            ids=to_delete_ids,
+            ids=offer_ids,
             exc=exc,
             from_error_queue=from_error_queue,
         )
-        backend.enqueue_offer_ids_in_error(to_delete_ids)
-
-    # some offers changes might make some venue ineligible for search
-    _reindex_venues_from_offers(offer_ids)
-    # some offers changes might make some artists ineligible for search
-    if FeatureToggle.ENABLE_ARTIST_INDEXATION.is_active():
-        _reindex_artists_from_offers(offer_ids)
+        backend.enqueue_offer_ids_in_error(offer_ids)
 
 
 def unindex_offer_ids(offer_ids: abc.Collection[int]) -> None:
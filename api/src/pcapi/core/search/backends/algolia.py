@@ -61,17 +61,56 @@ class AlgoliaBackend(
     def index_artists(self, artists: abc.Collection[artists_models.Artist]) -> None:
         self.save_objects(settings.ALGOLIA_ARTISTS_INDEX_NAME, [self.serialize_artist(artist) for artist in artists])
 
-    def index_offers(self, offers: abc.Collection[offers_models.Offer], last_30_days_bookings: dict[int, int]) -> None:
+    def index_offers(
+        self,
+        offers: abc.Collection[offers_models.Offer],
+        last_30_days_bookings: dict[int, int],
+        force: bool = False,
+    ) -> None:
         # Warning: if you ever need to alter the DB, please make sure you take into account that
         # the calling function index_offers_in_queue does a rollback to remove any reading lock
         # during processing.
         if not offers:
             return
-        objects = [self.serialize_offer(offer, last_30_days_bookings.get(offer.id) or 0) for offer in offers]
+        self.save_serialized_offers(self.serialize_offers(offers, last_30_days_bookings), force=force)
+
+    def serialize_offers(
+        self, offers: abc.Collection[offers_models.Offer], last_30_days_bookings: dict[int, int]
+    ) -> list[dict]:
+        return [self.serialize_offer(offer, last_30_days_bookings.get(offer.id) or 0) for offer in offers]
+
+    def save_serialized_offers(self, objects: list[dict], force: bool = False) -> None:
+        """Push already serialized offers to the index.
+
+        This method does not touch the database: it can be called from
+        a thread that has no access to the session used to load offers.
+
+        Unless `force` is set, offers that have not changed since their
+        last indexation are skipped when `ALGOLIA_SKIP_UNCHANGED_OFFERS`
+        is enabled. Reindexing into a new or partially filled index
+        must be forced.
+        """
+        if not objects:
+            return
+        digests = {obj["objectID"]: serialization.get_offer_digest(obj) for obj in objects}
+        if settings.ALGOLIA_SKIP_UNCHANGED_OFFERS and not force:
+            indexed_digests = self.get_offer_digests_from_store(digests.keys())
+            changed_objects = [
+                obj for obj in objects if indexed_digests.get(obj["objectID"]) != digests[obj["objectID"]]
+            ]
+            logger.info(
+                "Skipped unchanged offers before indexation",
+                extra={"sent_count": len(changed_objects), "skipped_count": len(objects) - len(changed_objects)},
+            )
+            objects = changed_objects
+            if not objects:
+                return
         assert settings.ALGOLIA_OFFERS_INDEX_NAME
         self.save_objects(settings.ALGOLIA_OFFERS_INDEX_NAME, objects)
-        offer_ids = [offer.id for offer in offers]
-        self.add_offer_ids_to_store(offer_ids)
+        offer_ids = [obj["objectID"] for obj in objects]
+        # Digests are always stored, so that they are up-to-date when
+        # `ALGOLIA_SKIP_UNCHANGED_OFFERS` is enabled.
+        self.add_offer_ids_to_store(offer_ids, {offer_id: digests[offer_id] for offer_id in offer_ids})
 
     def index_collective_offer_templates(
         self,
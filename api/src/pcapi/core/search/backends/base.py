@@ -23,7 +23,10 @@ class SearchBackend:
         raise NotImplementedError()
 
     def index_offers(
-        self, offers: "abc.Collection[offers_models.Offer]", last_30_days_bookings: dict[int, int]
+        self,
+        offers: "abc.Collection[offers_models.Offer]",
+        last_30_days_bookings: dict[int, int],
+        force: bool = False,
     ) -> None:
         raise NotImplementedError()
 
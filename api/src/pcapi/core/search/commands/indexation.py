@@ -1,6 +1,7 @@
 import enum
 import logging
 import typing
+from collections import abc
 from itertools import islice
 
 import click
@@ -72,7 +73,13 @@ def delete_expired_collective_offers_template_in_algolia() -> None:
 @cron_decorators.cron_require_feature(FeatureToggle.ENABLE_RECURRENT_CRON)
 @click.argument("object_type", type=click.Choice(IndexableObjects, case_sensitive=False), required=True)
 @click.option("--from_error_queue", is_flag=True, help="Reindex objects from error queue")
-def reindex(object_type: IndexableObjects, from_error_queue: bool = False) -> None:
+@click.option(
+    "--workers",
+    type=int,
+    default=None,
+    help="Number of threads pushing offers to the search service (offers only, 0 to disable the pipelined mode)",
+)
+def reindex(object_type: IndexableObjects, from_error_queue: bool = False, workers: int | None = None) -> None:
     """Pop object ids from queue and reindex"""
     match object_type:
         case IndexableObjects.ARTISTS:
@@ -82,7 +89,7 @@ def reindex(object_type: IndexableObjects, from_error_queue: bool = False) -> No
         case IndexableObjects.VENUES:
             search.index_venues_in_queue(from_error_queue=from_error_queue)
         case IndexableObjects.OFFERS:
-            search.index_offers_in_queue(from_error_queue=from_error_queue, max_batches_to_process=50)
+            search.index_offers_in_queue(from_error_queue=from_error_queue, max_batches_to_process=50, workers=workers)
         case _:
             raise ValueError("Invalid `object_type`")  # should not happen
 
@@ -96,19 +103,22 @@ def _partially_index(
     starting_page: int = 1,
     last_page: int | None = None,
 ) -> None:
-    page = starting_page
-    while True:
+    # `getter` paginates with keyset pagination, and skips pages
+    # before `starting_page` without fetching them.
+    for page, ids in enumerate(getter(batch_size=batch_size, start_page=starting_page), start=starting_page):
         if last_page and page > last_page:
             break
-        ids = getter(batch_size=batch_size, page=page)
-        if not ids:
-            break
         indexation_callback_arguments = [ids]
         if "backend" in indexation_callback.__annotations__:
             indexation_callback_arguments.insert(0, search._get_backend())
         indexation_callback(*indexation_callback_arguments)
         logger.info("Indexed %d %s from page %d", len(ids), what, page)
-        page += 1
+
+
+def _force_reindex_offer_ids(offer_ids: abc.Collection[int]) -> None:
+    # The index may have been cleared, or may not contain offers that
+    # were indexed before: unchanged offers must not be skipped.
+    search.reindex_offer_ids(offer_ids, force=True)
 
 
 @blueprint.cli.command("partially_index_offers")
@@ -127,7 +137,7 @@ def partially_index_offers(
     _partially_index(
         what="offers",
         getter=offers_repository.get_paginated_active_offer_ids,
-        indexation_callback=search.reindex_offer_ids,
+        indexation_callback=_force_reindex_offer_ids,
         batch_size=batch_size,
         starting_page=starting_page,
         last_page=last_page,
@@ -206,7 +216,7 @@ def index_offers_staging(clear: bool) -> None:
 
     offer_ids_to_reindex = iter(staging_indexation.get_relevant_offers_to_index())
     while batch := tuple(islice(offer_ids_to_reindex, 1000)):
-        search.reindex_offer_ids(batch)
+        search.reindex_offer_ids(batch, force=True)
 
 
 @blueprint.cli.command("clean_indexation_processing_queues")
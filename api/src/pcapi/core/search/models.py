@@ -25,6 +25,7 @@ class IndexationReason(enum.Enum):
     OFFER_CREATION = "offer-publication"
     OFFER_PUBLICATION = "offer-publication"
     OFFER_MANUAL_REINDEXATION = "offer-manual-reindexation"
+    OFFER_QUALITY_UPDATE = "offer-quality-update"
     OFFER_REINDEXATION = "offer-reindexation"  # reason for the reindexation of venues
     OFFER_UPDATE = "offer-update"
     OFFERER_ACTIVATION = "offerer-activation"
@@ -44,3 +45,67 @@ class IndexationReason(enum.Enum):
     VENUE_BANNER_DELETION = "venue-banner-deletion"
     VENUE_BANNER_UPDATE = "venue-banner-update"
     VENUE_PROVIDER_CREATION = "venue-provider-creation"
+
+
+class OfferIndexationLane(enum.Enum):
+    """Offers to reindex are dispatched in separate queues ("lanes")
+    depending on the reason of their reindexation, so that interactive
+    edits are not stuck behind bulk provider synchronizations or
+    venue-wide reindexations.
+
+    Members are sorted by decreasing priority.
+    """
+
+    HIGH = "high"
+    DEFAULT = "default"
+    BULK = "bulk"
+
+
+HIGH_PRIORITY_INDEXATION_REASONS = frozenset(
+    {
+        IndexationReason.BOOKING_CANCELLATION,
+        IndexationReason.BOOKING_CREATION,
+        IndexationReason.BOOKING_UNCANCELLATION,
+        IndexationReason.CINEMA_STOCK_QUANTITY_UPDATE,
+        IndexationReason.MEDIATION_CREATION,
+        IndexationReason.MEDIATION_DELETION,
+        IndexationReason.OFFER_CREATION,  # also `OFFER_PUBLICATION`
+        IndexationReason.OFFER_MANUAL_REINDEXATION,
+        IndexationReason.OFFER_UPDATE,
+        IndexationReason.STOCK_CREATION,
+        IndexationReason.STOCK_DELETION,
+        IndexationReason.STOCK_UPDATE,
+    }
+)
+BULK_INDEXATION_REASONS = frozenset(
+    {
+        IndexationReason.ARTIST_BLACKLISTING,
+        IndexationReason.ARTIST_EDITION,
+        IndexationReason.ARTIST_LINKS_UPDATE,
+        IndexationReason.ARTIST_UNBLACKLISTING,
+        IndexationReason.BOOKING_COUNT_CHANGE,
+        IndexationReason.OFFER_BATCH_UPDATE,
+        IndexationReason.OFFER_BATCH_VALIDATION,
+        IndexationReason.OFFER_QUALITY_UPDATE,
+        IndexationReason.OFFER_REINDEXATION,
+        IndexationReason.OFFERER_ACTIVATION,
+        IndexationReason.OFFERER_DEACTIVATION,
+        IndexationReason.OFFERER_VALIDATION,
+        IndexationReason.PRODUCT_DEACTIVATION,
+        IndexationReason.PRODUCT_REJECTION,
+        IndexationReason.PRODUCT_UPDATE,
+        IndexationReason.PRODUCT_WHITELIST_ADDITION,
+        IndexationReason.STOCK_SYNCHRONIZATION,
+        IndexationReason.VENUE_BATCH_UPDATE,
+        IndexationReason.VENUE_PROVIDER_CREATION,
+        IndexationReason.VENUE_UPDATE,
+    }
+)
+
+
+def get_offer_indexation_lane(reason: IndexationReason) -> OfferIndexationLane:
+    if reason in HIGH_PRIORITY_INDEXATION_REASONS:
+        return OfferIndexationLane.HIGH
+    if reason in BULK_INDEXATION_REASONS:
+        return OfferIndexationLane.BULK
+    return OfferIndexationLane.DEFAULT
@@ -1,10 +1,13 @@
 import contextlib
 import logging
+import time
+import typing
 from collections import abc
 
 import redis
 
 from pcapi import settings
+from pcapi.core.search.models import OfferIndexationLane
 from pcapi.utils import date as date_utils
 from pcapi.utils.redis import get_redis_client
 
@@ -13,7 +16,21 @@ logger = logging.getLogger(__name__)
 
 
 REDIS_OFFER_IDS_NAME = "search:algolia:offer-ids:set"
+REDIS_HIGH_PRIORITY_OFFER_IDS_NAME = "search:algolia:high-priority-offer-ids:set"
+REDIS_BULK_OFFER_IDS_NAME = "search:algolia:bulk-offer-ids:set"
 REDIS_OFFER_IDS_IN_ERROR_NAME = "search:algolia:offer-ids-in-error:set"
+REDIS_OFFER_IDS_BY_LANE = {
+    OfferIndexationLane.HIGH: REDIS_HIGH_PRIORITY_OFFER_IDS_NAME,
+    OfferIndexationLane.DEFAULT: REDIS_OFFER_IDS_NAME,
+    OfferIndexationLane.BULK: REDIS_BULK_OFFER_IDS_NAME,
+}
+# Number of batches popped from each lane (when not empty) for every
+# 10 batches, see `search.index_offers_in_queue`.
+OFFER_INDEXATION_LANE_WEIGHTS = {
+    OfferIndexationLane.HIGH: 6,
+    OfferIndexationLane.DEFAULT: 3,
+    OfferIndexationLane.BULK: 1,
+}
 
 REDIS_ARTIST_IDS_FOR_OFFERS_NAME = "search:algolia:artist-ids-for-offers:set"
 REDIS_ARTIST_IDS_TO_INDEX = "search:algolia:artist-ids-to-index:set"
@@ -29,6 +46,8 @@ REDIS_COLLECTIVE_OFFER_TEMPLATE_IDS_IN_ERROR_TO_INDEX = (
 )
 QUEUES = (
     REDIS_OFFER_IDS_NAME,
+    REDIS_HIGH_PRIORITY_OFFER_IDS_NAME,
+    REDIS_BULK_OFFER_IDS_NAME,
     REDIS_OFFER_IDS_IN_ERROR_NAME,
     REDIS_ARTIST_IDS_FOR_OFFERS_NAME,
     REDIS_ARTIST_IDS_TO_INDEX,
@@ -40,19 +59,65 @@ QUEUES = (
     REDIS_COLLECTIVE_OFFER_TEMPLATE_IDS_IN_ERROR_TO_INDEX,
 )
 REDIS_HASHMAP_INDEXED_OFFERS_NAME = "indexed_offers"
+# Digest of the last serialized version of each indexed offer, see
+# `AlgoliaBackend.save_serialized_offers`.
+REDIS_HASHMAP_INDEXED_OFFERS_DIGESTS_NAME = "indexed_offers_digests"
+
+
+def _get_non_empty_since_key(queue: str) -> str:
+    """Return the key that holds the timestamp since which `queue` has
+    not been empty, an upper bound of the age of its oldest item.
+    """
+    return f"{queue}:non-empty-since"
+
+
+# Delete the "non-empty-since" key (KEYS[2]) of a queue (KEYS[1]) only
+# if the queue is still empty: ids may have been added (and the key
+# left as is) since the queue was found empty.
+_DELETE_NON_EMPTY_SINCE_IF_EMPTY_SCRIPT = """
+if redis.call("SCARD", KEYS[1]) == 0 then
+    return redis.call("DEL", KEYS[2])
+end
+return 0
+"""
 
 
 class AlgoliaIndexingQueuesMixin:
+    # (monotonic time, indexed offers, offers in indexing queue) of the
+    # last index size check, see `_get_offers_index_size`.
+    _offers_index_size_cache: typing.ClassVar[tuple[float, int, int] | None] = None
+
     def __init__(self) -> None:
         self.redis_client = get_redis_client()
         super().__init__()
 
-    def _can_enqueue_offer_ids(self, offer_ids: abc.Collection[int]) -> bool:
+    def _get_offers_index_size(self) -> tuple[int, int]:
+        """Return the number of indexed offers and the number of offers
+        in the indexing queues (all lanes).
+
+        Checking the index size on every enqueue costs two Redis
+        commands. An approximation is good enough for a limit that is
+        only a safeguard: the result is cached for a few seconds.
+        """
+        cache = AlgoliaIndexingQueuesMixin._offers_index_size_cache
+        now = time.monotonic()
+        if cache and now - cache[0] < settings.ALGOLIA_OFFERS_INDEX_SIZE_CACHE_DURATION:
+            return cache[1], cache[2]
+
+        with self.redis_client.pipeline(transaction=False) as pipeline:
+            pipeline.hlen(REDIS_HASHMAP_INDEXED_OFFERS_NAME)
+            for queue in REDIS_OFFER_IDS_BY_LANE.values():
+                pipeline.scard(queue)
+            currently_indexed_offers, *offers_in_lanes = pipeline.execute()
+        offers_in_indexing_queue = sum(offers_in_lanes)
+        AlgoliaIndexingQueuesMixin._offers_index_size_cache = (now, currently_indexed_offers, offers_in_indexing_queue)
+        return currently_indexed_offers, offers_in_indexing_queue
+
+    def _can_enqueue_offer_ids(self, offer_ids: abc.Collection[int | str]) -> bool:
         if settings.ALGOLIA_OFFERS_INDEX_MAX_SIZE < 0:
             return True
 
-        currently_indexed_offers = self.redis_client.hlen(REDIS_HASHMAP_INDEXED_OFFERS_NAME)
-        offers_in_indexing_queue = self.redis_client.scard(REDIS_OFFER_IDS_NAME)
+        currently_indexed_offers, offers_in_indexing_queue = self._get_offers_index_size()
         limit = settings.ALGOLIA_OFFERS_INDEX_MAX_SIZE
         can_enqueue = currently_indexed_offers + offers_in_indexing_queue < limit
         if not can_enqueue:
@@ -68,11 +133,38 @@ class AlgoliaIndexingQueuesMixin:
             )
         return can_enqueue
 
-    def enqueue_offer_ids(self, offer_ids: abc.Collection[int]) -> None:
+    def enqueue_offer_ids(
+        self,
+        offer_ids: abc.Collection[int],
+        lane: OfferIndexationLane = OfferIndexationLane.DEFAULT,
+    ) -> None:
         if not self._can_enqueue_offer_ids(offer_ids):
             return
 
-        self._enqueue_ids(offer_ids, REDIS_OFFER_IDS_NAME)
+        self._enqueue_ids(offer_ids, REDIS_OFFER_IDS_BY_LANE[lane])
+
+    def enqueue_ids_by_queue(self, ids_by_queue: abc.Mapping[str, abc.Collection[int | str]]) -> None:
+        """Add ids to several indexation queues in a single round trip."""
+        ids_by_queue = {queue: ids for queue, ids in ids_by_queue.items() if ids}
+        offer_queues = [queue for queue in ids_by_queue if queue in REDIS_OFFER_IDS_BY_LANE.values()]
+        offer_ids = [offer_id for queue in offer_queues for offer_id in ids_by_queue[queue]]
+        if offer_ids and not self._can_enqueue_offer_ids(offer_ids):
+            for queue in offer_queues:
+                del ids_by_queue[queue]
+        if not ids_by_queue:
+            return
+
+        try:
+            with self.redis_client.pipeline(transaction=False) as pipeline:
+                for queue, ids in ids_by_queue.items():
+                    pipeline.sadd(queue, *ids)
+                    pipeline.set(_get_non_empty_since_key(queue), date_utils.get_naive_utc_now().timestamp(), nx=True)
+                pipeline.execute()
+        except redis.exceptions.RedisError:
+            logger.exception(
+                "Could not add ids to indexation queues",
+                extra={"counts": {queue: len(ids) for queue, ids in ids_by_queue.items()}},
+            )
 
     def enqueue_offer_ids_in_error(self, offer_ids: abc.Collection[int]) -> None:
         self._enqueue_ids(offer_ids, REDIS_OFFER_IDS_IN_ERROR_NAME)
@@ -118,7 +210,10 @@ class AlgoliaIndexingQueuesMixin:
             return
 
         try:
-            self.redis_client.sadd(queue, *ids)
+            with self.redis_client.pipeline(transaction=False) as pipeline:
+                pipeline.sadd(queue, *ids)
+                pipeline.set(_get_non_empty_since_key(queue), date_utils.get_naive_utc_now().timestamp(), nx=True)
+                pipeline.execute()
         except redis.exceptions.RedisError:
             logger.exception("Could not add ids to indexation queue", extra={"ids": ids, "queue": queue})
 
@@ -133,6 +228,22 @@ class AlgoliaIndexingQueuesMixin:
             queue = REDIS_OFFER_IDS_NAME
         return self._pop_ids_from_queue(queue, count)
 
+    @contextlib.contextmanager
+    def pop_offer_ids_from_lanes(
+        self,
+        count: int,
+        lanes: abc.Sequence[OfferIndexationLane],
+    ) -> abc.Generator[set, None, None]:
+        """Pop offer ids from the first non-empty lane of ``lanes``,
+        as a context manager (see ``_pop_ids_from_queue``).
+        """
+        for lane in lanes:
+            with self._pop_ids_from_queue(REDIS_OFFER_IDS_BY_LANE[lane], count) as ids:
+                if ids:
+                    yield ids
+                    return
+        yield set()
+
     def pop_artist_ids_from_queue(
         self,
         count: int,
@@ -219,7 +330,12 @@ class AlgoliaIndexingQueuesMixin:
             with self.redis_client.pipeline(transaction=True) as pipeline:
                 for id_ in ids:
                     pipeline.smove(queue, processing_queue, id_)
-                pipeline.execute()
+                pipeline.scard(queue)
+                *_, remaining_count = pipeline.execute()
+                if not remaining_count:
+                    self.redis_client.eval(
+                        _DELETE_NON_EMPTY_SINCE_IF_EMPTY_SCRIPT, 2, queue, _get_non_empty_since_key(queue)
+                    )
                 batch = {int(id_) if cast_to_int else id_ for id_ in ids}  # str -> int
                 logger.info(
                     "Moved batch of object ids to index to processing queue",
@@ -248,18 +364,41 @@ class AlgoliaIndexingQueuesMixin:
 
     def count_offers_to_index_from_queue(self, from_error_queue: bool = False) -> int:
         if from_error_queue:
-            queue = REDIS_OFFER_IDS_IN_ERROR_NAME
+            queues = [REDIS_OFFER_IDS_IN_ERROR_NAME]
         else:
-            queue = REDIS_OFFER_IDS_NAME
+            queues = list(REDIS_OFFER_IDS_BY_LANE.values())
 
         try:
-            return self.redis_client.scard(queue)
+            with self.redis_client.pipeline(transaction=False) as pipeline:
+                for queue in queues:
+                    pipeline.scard(queue)
+                return sum(pipeline.execute())
         except redis.exceptions.RedisError:
             if settings.IS_RUNNING_TESTS:
                 raise
             logger.exception("Could not count offers left to index from queue")
             return 0
 
+    def get_offer_lanes_stats(self) -> dict[OfferIndexationLane, tuple[int, float]]:
+        """Return the depth (number of offers) and the age (in seconds)
+        of each offer indexation lane.
+
+        The age is the time elapsed since the lane was last empty,
+        which is an upper bound of the time the oldest offer of the lane
+        has been waiting for.
+        """
+        with self.redis_client.pipeline(transaction=False) as pipeline:
+            for queue in REDIS_OFFER_IDS_BY_LANE.values():
+                pipeline.scard(queue)
+                pipeline.get(_get_non_empty_since_key(queue))
+            results = pipeline.execute()
+        now = date_utils.get_naive_utc_now().timestamp()
+        stats = {}
+        for i, lane in enumerate(REDIS_OFFER_IDS_BY_LANE):
+            depth, since = results[2 * i], results[2 * i + 1]
+            stats[lane] = (depth, round(now - float(since), 1) if depth and since else 0.0)
+        return stats
+
     def check_offer_id_is_indexed(self, offer_id: int) -> bool:
         try:
             return self.redis_client.hexists(
@@ -302,6 +441,9 @@ class AlgoliaIndexingQueuesMixin:
             try:
                 for id_ in redis_client.smembers(processing_queue):
                     pipeline.smove(processing_queue, originating_queue, id_)
+                pipeline.set(
+                    _get_non_empty_since_key(originating_queue), date_utils.get_naive_utc_now().timestamp(), nx=True
+                )
                 pipeline.execute()
             except Exception:
                 # That's not critical: the processing queue will
@@ -321,10 +463,10 @@ class AlgoliaIndexingQueuesMixin:
 
     def remove_offer_ids_from_store(self, offer_ids: abc.Collection[int]) -> None:
         try:
-            self.redis_client.hdel(
-                REDIS_HASHMAP_INDEXED_OFFERS_NAME,
-                *(str(offer_id) for offer_id in offer_ids),
-            )
+            with self.redis_client.pipeline(transaction=True) as pipeline:
+                for name in (REDIS_HASHMAP_INDEXED_OFFERS_NAME, REDIS_HASHMAP_INDEXED_OFFERS_DIGESTS_NAME):
+                    pipeline.hdel(name, *(str(offer_id) for offer_id in offer_ids))
+                pipeline.execute()
         except redis.exceptions.RedisError:
             if settings.IS_RUNNING_TESTS:
                 raise
@@ -332,7 +474,7 @@ class AlgoliaIndexingQueuesMixin:
 
     def remove_all_offers_from_store(self) -> None:
         try:
-            self.redis_client.delete(REDIS_HASHMAP_INDEXED_OFFERS_NAME)
+            self.redis_client.delete(REDIS_HASHMAP_INDEXED_OFFERS_NAME, REDIS_HASHMAP_INDEXED_OFFERS_DIGESTS_NAME)
         except redis.exceptions.RedisError:
             if settings.IS_RUNNING_TESTS:
                 raise
@@ -340,7 +482,11 @@ class AlgoliaIndexingQueuesMixin:
                 "Could not clear indexed offers cache",
             )
 
-    def add_offer_ids_to_store(self, offer_ids: abc.Collection[int]) -> None:
+    def add_offer_ids_to_store(
+        self,
+        offer_ids: abc.Collection[int],
+        digests: dict[int, str] | None = None,
+    ) -> None:
         try:
             # We used to store a summary of each offer, which is why
             # we used hashmap and not a set. But since we don't need
@@ -351,8 +497,34 @@ class AlgoliaIndexingQueuesMixin:
             pipeline = self.redis_client.pipeline(transaction=True)
             for offer_id in offer_ids:
                 pipeline.hset(REDIS_HASHMAP_INDEXED_OFFERS_NAME, str(offer_id), "")
+            if digests:
+                pipeline.hset(
+                    REDIS_HASHMAP_INDEXED_OFFERS_DIGESTS_NAME,
+                    mapping={str(offer_id): digest for offer_id, digest in digests.items()},
+                )
             pipeline.execute()
         except Exception:
             logger.exception("Could not add to list of indexed offers", extra={"offers": offer_ids})
         finally:
             pipeline.reset()
+
+    def get_offer_digests_from_store(self, offer_ids: abc.Collection[int]) -> dict[int, str]:
+        """Return the digest of the last indexed version of the given
+        offers. Offers that have no known digest are omitted.
+        """
+        if not offer_ids:
+            return {}
+        offer_ids = list(offer_ids)
+        try:
+            digests = self.redis_client.hmget(
+                REDIS_HASHMAP_INDEXED_OFFERS_DIGESTS_NAME,
+                [str(offer_id) for offer_id in offer_ids],
+            )
+        except redis.exceptions.RedisError:
+            if settings.IS_RUNNING_TESTS:
+                raise
+            logger.exception("Could not get digests of indexed offers", extra={"offers": offer_ids})
+            # Without digests, all offers are considered as changed
+            # and will be sent to the indexation service.
+            return {}
+        return {offer_id: digest for offer_id, digest in zip(offer_ids, digests) if digest}
@@ -1,6 +1,8 @@
 import datetime
 import decimal
 import enum
+import hashlib
+import json
 import logging
 import re
 import typing
@@ -37,6 +39,8 @@ logger = logging.getLogger(__name__)
 DEFAULT_LONGITUDE = 2.409289
 DEFAULT_LATITUDE = 47.158459
 
+OFFER_DIGEST_IGNORED_FIELDS = {"indexedAt"}
+
 
 WORD_SPLITTER = re.compile(r"\W+")
 
@@ -459,6 +463,22 @@ def format_coordinates(latitude: Numeric | None, longitude: Numeric | None) -> d
     return {"lat": float(latitude or DEFAULT_LATITUDE), "lng": float(longitude or DEFAULT_LONGITUDE)}
 
 
+def get_offer_digest(serialized_offer: dict) -> str:
+    """Return a digest of a serialized offer, as returned by
+    `serialize_offer()`.
+
+    Fields that change at each serialization (such as `indexedAt`) are
+    ignored, so that two serializations of the same offer have the same
+    digest as long as nothing relevant has changed.
+    """
+    offer_data = {
+        key: value for key, value in serialized_offer["offer"].items() if key not in OFFER_DIGEST_IGNORED_FIELDS
+    }
+    data = serialized_offer | {"offer": offer_data}
+    payload = json.dumps(data, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
 def _transform_collective_offer_template_id(collective_offer_template_id: int) -> str:
     return f"T-{collective_offer_template_id}"
 
@@ -32,6 +32,7 @@ from pcapi import settings
 from pcapi.core import mails as mails_api
 from pcapi.core import token as token_utils
 from pcapi.core.external.attributes import api as external_attributes_api
+from pcapi.core.external.attributes import models as external_attributes_models
 from pcapi.core.external.brevo import update_contact_attributes
 from pcapi.core.finance import deposit_api
 from pcapi.core.finance import models as finance_models
@@ -430,20 +431,40 @@ def remove_external_user(user: models.User) -> bool:
         .count()
     )
 
-    # clean personal data on email partner's side
+    attributes = external_attributes_api.get_anonymized_attributes(user) if is_email_used else None
+    return remove_external_contact(
+        user_id=user.id,
+        email=user.email,
+        use_pro_subaccount=user.has_any_pro_role,
+        anonymized_attributes=attributes,
+    )
+
+
+def remove_external_contact(
+    *,
+    user_id: int,
+    email: str,
+    use_pro_subaccount: bool,
+    anonymized_attributes: external_attributes_models.UserAttributes | external_attributes_models.ProAttributes | None,
+) -> bool:
+    """Clean personal data on email partner's side.
+
+    The contact is deleted, unless anonymized attributes are given (when
+    the email is still used by a venue): the contact is then updated.
+    This function does not use the database, see `remove_external_user()`.
+    """
     try:
-        if is_email_used:
-            attributes = external_attributes_api.get_anonymized_attributes(user)
-            update_contact_attributes(user.email, attributes, asynchronous=False)
+        if anonymized_attributes:
+            update_contact_attributes(email, anonymized_attributes, asynchronous=False)
         else:
-            mails_api.delete_contact(user.email, user.has_any_pro_role)
+            mails_api.delete_contact(email, use_pro_subaccount)
     except ExternalAPIException as exc:
         # If is_retryable it is a real error. If this flag is False then it means the email is unknown for brevo.
         if exc.is_retryable:
-            logger.exception("Could not delete external user", extra={"user_id": user.id, "exc": str(exc)})
+            logger.exception("Could not delete external user", extra={"user_id": user_id, "exc": str(exc)})
             return False
     except Exception as exc:
-        logger.exception("Could not delete external user", extra={"user_id": user.id, "exc": str(exc)})
+        logger.exception("Could not delete external user", extra={"user_id": user_id, "exc": str(exc)})
         return False
 
     return True
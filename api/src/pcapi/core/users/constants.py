@@ -43,6 +43,7 @@ MAX_QF_BONUS_RETRIES = 10
 
 GDPR_EXTRACT_DATA_LOCK = "pcapi:core:users:gdpr_extract_data_lock"
 GDPR_EXTRACT_DATA_COUNTER = "pcapi:core:users:gdpr_extract_data_counter"
+GDPR_ANONYMIZATION_LAST_BENEFICIARY_ID = "pcapi:core:users:gdpr_anonymization_last_beneficiary_id"
 
 
 class SuspensionReason(enum.Enum):
@@ -542,25 +542,32 @@ def update_state(
 
 
 def archive(user_request: users_models.UserAccountUpdateRequest, *, motivation: str) -> None:
+    archive_application(user_request.dsTechnicalId, user_request.status, motivation=motivation)
+
+    db.session.delete(user_request)
+    db.session.flush()
+
+
+def archive_application(
+    application_techid: str, status: dms_models.GraphQLApplicationStates, *, motivation: str
+) -> None:
+    """Archive an application on DS, without deleting its `UserAccountUpdateRequest`."""
     ds_client = ds_api.DMSGraphQLClient()
 
-    if user_request.status in (dms_models.GraphQLApplicationStates.draft, dms_models.GraphQLApplicationStates.on_going):
+    if status in (dms_models.GraphQLApplicationStates.draft, dms_models.GraphQLApplicationStates.on_going):
         ds_client.mark_without_continuation(
-            application_techid=user_request.dsTechnicalId,
+            application_techid=application_techid,
             instructeur_techid=settings.DMS_INSTRUCTOR_ID,
             motivation=motivation,
             disable_notification=True,
-            from_draft=(user_request.status == dms_models.GraphQLApplicationStates.draft),
+            from_draft=(status == dms_models.GraphQLApplicationStates.draft),
         )
 
     ds_client.archive_application(
-        application_techid=user_request.dsTechnicalId,
+        application_techid=application_techid,
         instructeur_techid=settings.DMS_INSTRUCTOR_ID,
     )
 
-    db.session.delete(user_request)
-    db.session.flush()
-
 
 def send_user_message_with_correction(
     update_request: users_models.UserAccountUpdateRequest, instructor: users_models.User, correction_reason: str
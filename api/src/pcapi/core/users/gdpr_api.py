@@ -1,12 +1,18 @@
+import collections
+import dataclasses
 import datetime
+import functools
 import itertools
 import logging
 import random
+import time
 import typing
 import zipfile
+from concurrent import futures
 from io import BytesIO
 from pathlib import Path
 
+import flask
 import sqlalchemy as sa
 from dateutil.relativedelta import relativedelta
 from flask import render_template
@@ -26,15 +32,21 @@ import pcapi.core.users.utils as users_utils
 from pcapi import settings
 from pcapi.connectors import api_adresse
 from pcapi.connectors.dms import exceptions as dms_exceptions
+from pcapi.connectors.dms import models as dms_models
 from pcapi.core import object_storage
 from pcapi.core.chronicles import api as chronicles_api
 from pcapi.core.chronicles import constants as chronicles_constants
 from pcapi.core.chronicles import models as chronicles_models
+from pcapi.core.external.attributes import api as external_attributes_api
+from pcapi.core.external.attributes import models as external_attributes_models
 from pcapi.core.external.batch.api import delete_user_attributes
 from pcapi.core.external.beamer.api import delete_beamer_user
 from pcapi.core.external.beamer.backends.beamer import BeamerException
 from pcapi.core.finance import models as finance_models
+from pcapi.core.geography import models as geography_models
+from pcapi.core.geography.repository import get_coordinates_from_address
 from pcapi.core.geography.repository import get_iris_from_address
+from pcapi.core.geography.repository import get_iris_from_coordinates
 from pcapi.core.history.api import add_action
 from pcapi.core.mails import get_raw_contact_data
 from pcapi.core.object_storage import store_public_object
@@ -144,20 +156,7 @@ def anonymize_user(
             if not dms_api_error.is_not_found:
                 raise
 
-    user.password = b"Anonymized"  # ggignore
-    user.firstName = None
-    user.lastName = None
-    user.married_name = None
-    user.postalCode = None
-    user.phoneNumber = None
-    user.dateOfBirth = user.dateOfBirth.replace(day=1, month=1) if user.dateOfBirth else None
-    user.address = None
-    user.city = None
-    user.externalIds = {}
-    user.idPieceNumber = None
-    user.email_history = []
-    user.irisFranceId = iris.id if iris else None
-    user.validatedBirthDate = user.validatedBirthDate.replace(day=1, month=1) if user.validatedBirthDate else None
+    _anonymize_user_personal_data(user, iris)
 
     external_email_anonymized = api.remove_external_user(user)
 
@@ -190,6 +189,23 @@ def anonymize_user(
     return True
 
 
+def _anonymize_user_personal_data(user: models.User, iris: geography_models.IrisFrance | None) -> None:
+    user.password = b"Anonymized"  # ggignore
+    user.firstName = None
+    user.lastName = None
+    user.married_name = None
+    user.postalCode = None
+    user.phoneNumber = None
+    user.dateOfBirth = user.dateOfBirth.replace(day=1, month=1) if user.dateOfBirth else None
+    user.address = None
+    user.city = None
+    user.externalIds = {}
+    user.idPieceNumber = None
+    user.email_history = []
+    user.irisFranceId = iris.id if iris else None
+    user.validatedBirthDate = user.validatedBirthDate.replace(day=1, month=1) if user.validatedBirthDate else None
+
+
 @transaction_manager.atomic()
 def anonymize_non_pro_non_beneficiary_users() -> None:
     """
@@ -426,13 +442,7 @@ def has_user_pending_anonymization(user_id: int) -> bool:
     ).scalar()
 
 
-@transaction_manager.atomic()
-def anonymize_beneficiary_users() -> None:
-    """
-    Anonymize user accounts that have been beneficiaries which have not connected for at least 3
-    years, and whose deposit has been expired for at least 5 years and if they have been suspended
-    it was at least 5 years ago.
-    """
+def _get_beneficiary_ids_to_anonymize() -> list[int]:
     beneficiaries = (
         db.session.query(models.User)
         .outerjoin(
@@ -475,10 +485,326 @@ def anonymize_beneficiary_users() -> None:
             ),
         )
     )
-    for user in itertools.chain(beneficiaries, beneficiaries_tagged_to_anonymize):
+    user_ids = {
+        user_id
+        for (user_id,) in itertools.chain(
+            beneficiaries.with_entities(models.User.id),
+            beneficiaries_tagged_to_anonymize.with_entities(models.User.id),
+        )
+    }
+    return sorted(user_ids)
+
+
+def anonymize_beneficiary_users() -> None:
+    """
+    Anonymize user accounts that have been beneficiaries which have not connected for at least 3
+    years, and whose deposit has been expired for at least 5 years and if they have been suspended
+    it was at least 5 years ago.
+
+    Users are anonymized by chunks, each one in its own transaction: a chunk that fails is logged
+    and skipped, its users will be anonymized by the next run. An interrupted run is resumed by the
+    next one, after the last processed chunk.
+    """
+    redis_client = get_redis_client()
+    last_user_id = int(redis_client.get(constants.GDPR_ANONYMIZATION_LAST_BENEFICIARY_ID) or 0)
+    user_ids = [user_id for user_id in _get_beneficiary_ids_to_anonymize() if user_id > last_user_id]
+    if last_user_id:
+        logger.info(
+            "Resuming anonymization of beneficiaries",
+            extra={"last_user_id": last_user_id, "remaining_users": len(user_ids)},
+        )
+
+    start = time.perf_counter()
+    total_anonymized = 0
+    with futures.ThreadPoolExecutor(
+        max_workers=settings.GDPR_ANONYMIZATION_MAX_WORKERS, thread_name_prefix="gdpr-anonymization"
+    ) as executor:
+        for chunk in itertools.batched(user_ids, settings.GDPR_ANONYMIZATION_CHUNK_SIZE):
+            chunk_start = time.perf_counter()
+            try:
+                with transaction_manager.atomic():
+                    anonymized = _anonymize_beneficiaries_chunk(executor, chunk)
+            except Exception:
+                logger.exception("Could not anonymize chunk of beneficiaries", extra={"user_ids": chunk})
+                anonymized = 0
+            total_anonymized += anonymized
+            redis_client.set(constants.GDPR_ANONYMIZATION_LAST_BENEFICIARY_ID, chunk[-1], ex=7 * 24 * 60 * 60)
+            chunk_elapsed = time.perf_counter() - chunk_start
+            logger.info(
+                "Anonymized chunk of beneficiaries",
+                extra={
+                    "last_user_id": chunk[-1],
+                    "users": len(chunk),
+                    "anonymized": anonymized,
+                    "users_per_second": round(len(chunk) / chunk_elapsed, 2) if chunk_elapsed else 0,
+                },
+            )
+
+    redis_client.delete(constants.GDPR_ANONYMIZATION_LAST_BENEFICIARY_ID)
+    elapsed = time.perf_counter() - start
+    logger.info(
+        "Finished anonymization of beneficiaries",
+        extra={
+            "users": len(user_ids),
+            "anonymized": total_anonymized,
+            "elapsed": round(elapsed, 2),
+            "users_per_second": round(len(user_ids) / elapsed, 2) if elapsed else 0,
+        },
+    )
+
+
+@dataclasses.dataclass(frozen=True)
+class _ExternalUserData:
+    user_id: int
+    email: str
+    address: str | None
+    postal_code: str | None
+    use_pro_subaccount: bool
+    contact_attributes: external_attributes_models.UserAttributes | external_attributes_models.ProAttributes | None
+    ds_applications: list[tuple[str, dms_models.GraphQLApplicationStates]]
+
+
+@dataclasses.dataclass(frozen=True)
+class _ExternalAnonymizationResult:
+    anonymizable: bool
+    coordinates: dict[str, float] | None = None
+    external_email_anonymized: bool = False
+
+
+def _anonymize_external_user_data(app: flask.Flask, data: _ExternalUserData) -> _ExternalAnonymizationResult:
+    """Call external services as `anonymize_user()` does, without using the database.
+
+    This is run in worker threads, which have their own application
+    context and thus must not touch objects of the main session.
+    """
+    with app.app_context():
+        coordinates = None
+        if data.address:
+            try:
+                coordinates = get_coordinates_from_address(data.address, data.postal_code)
+            except (api_adresse.AdresseApiException, api_adresse.InvalidFormatException):
+                pass
+
+        try:
+            delete_user_attributes(user_id=data.user_id, can_be_asynchronously_retried=True)
+        except ExternalAPIException as exc:
+            # If is_retryable it is a real error. If this flag is False then it means the email is unknown for brevo.
+            if exc.is_retryable:
+                logger.error("Could not anonymize user", extra={"user_id": data.user_id, "exc": str(exc)})
+                return _ExternalAnonymizationResult(anonymizable=False)
+        except Exception as exc:
+            logger.error("Could not anonymize user", extra={"user_id": data.user_id, "exc": str(exc)})
+            return _ExternalAnonymizationResult(anonymizable=False)
+
+        for application_techid, status in data.ds_applications:
+            try:
+                users_ds.archive_application(application_techid, status, motivation="Anonymisation du compte")
+            except Exception as exc:
+                # Ignore not found: the application is already deleted or on staging after dump/restore with fake id
+                if isinstance(exc, dms_exceptions.DmsGraphQLApiError) and exc.is_not_found:
+                    continue
+                logger.exception(
+                    "Could not archive account update request of user", extra={"user_id": data.user_id, "exc": str(exc)}
+                )
+                return _ExternalAnonymizationResult(anonymizable=False)
+
+        external_email_anonymized = api.remove_external_contact(
+            user_id=data.user_id,
+            email=data.email,
+            use_pro_subaccount=data.use_pro_subaccount,
+            anonymized_attributes=data.contact_attributes,
+        )
+        return _ExternalAnonymizationResult(
+            anonymizable=True, coordinates=coordinates, external_email_anonymized=external_email_anonymized
+        )
+
+
+def _truncate_to_first_day_of_year(column: typing.Any) -> typing.Any:
+    # same as `.replace(day=1, month=1)`: the time of the day is kept
+    return sa.func.date_trunc("year", column) + (column - sa.func.date_trunc("day", column))
+
+
+def _anonymize_beneficiaries_chunk(executor: futures.Executor, user_ids: typing.Sequence[int]) -> int:
+    """Anonymize users as `anonymize_user()` does, with a single statement per table.
+
+    Return the number of anonymized users.
+    """
+    users = [
+        user
+        for user in db.session.query(models.User)
+        .filter(models.User.id.in_(user_ids))
+        .options(sa_orm.selectinload(models.User.gdprUserDataExtracts))
+        .order_by(models.User.id)
+        if not has_unprocessed_extract(user)
+    ]
+    if not users:
+        return 0
+
+    used_emails = {
+        email
+        for (email,) in db.session.query(offerers_models.Venue.bookingEmail).filter(
+            offerers_models.Venue.bookingEmail.in_([user.email for user in users])
+        )
+    }
+    update_requests = (
+        db.session.query(models.UserAccountUpdateRequest)
+        .filter(models.UserAccountUpdateRequest.userId.in_([user.id for user in users]))
+        .all()
+    )
+    ds_applications = collections.defaultdict(list)
+    for update_request in update_requests:
+        ds_applications[update_request.userId].append((update_request.dsTechnicalId, update_request.status))
+
+    app = flask.current_app._get_current_object()
+    external_data = [
+        _ExternalUserData(
+            user_id=user.id,
+            email=user.email,
+            address=user.address,
+            postal_code=user.postalCode,
+            use_pro_subaccount=user.has_any_pro_role,
+            contact_attributes=(
+                external_attributes_api.get_anonymized_attributes(user) if user.email in used_emails else None
+            ),
+            ds_applications=ds_applications[user.id],
+        )
+        for user in users
+    ]
+    results = dict(
+        zip(
+            [user.id for user in users],
+            executor.map(functools.partial(_anonymize_external_user_data, app), external_data),
+        )
+    )
+    users = [user for user in users if results[user.id].anonymizable]
+    if not users:
+        return 0
+    irises = {user.id: _get_anonymized_user_iris(user, results[user.id].coordinates) for user in users}
+
+    # External data of these users is already deleted: a database failure must not
+    # prevent the others from being anonymized, so retry user by user.
+    try:
         with transaction_manager.atomic():
-            if not anonymize_user(user):
-                transaction_manager.mark_transaction_as_invalid()
+            return _anonymize_beneficiaries_in_db(users, results, irises, update_requests)
+    except Exception:
+        logger.warning(
+            "Could not anonymize chunk of beneficiaries at once, anonymizing them one by one",
+            extra={"user_ids": [user.id for user in users]},
+            exc_info=True,
+        )
+
+    anonymized = 0
+    for user in users:
+        try:
+            with transaction_manager.atomic():
+                anonymized += _anonymize_beneficiaries_in_db([user], results, irises, update_requests)
+        except Exception:
+            logger.exception("Could not anonymize user", extra={"user_id": user.id})
+    return anonymized
+
+
+def _get_anonymized_user_iris(
+    user: models.User, coordinates: dict[str, float] | None
+) -> geography_models.IrisFrance | None:
+    if coordinates:
+        return get_iris_from_coordinates(lon=coordinates["longitude"], lat=coordinates["latitude"])
+    if user.address and not user.postalCode:
+        # the address has not been looked up without postal code
+        try:
+            return get_iris_from_address(address=user.address, postcode=None)
+        except (api_adresse.AdresseApiException, api_adresse.InvalidFormatException):
+            pass
+    return None
+
+
+def _anonymize_beneficiaries_in_db(
+    users: typing.Sequence[models.User],
+    results: dict[int, _ExternalAnonymizationResult],
+    irises: dict[int, geography_models.IrisFrance | None],
+    update_requests: typing.Sequence[models.UserAccountUpdateRequest],
+) -> int:
+    user_ids = [user.id for user in users]
+    emails = [user.email for user in users]
+
+    for user in users:
+        for extract in user.gdprUserDataExtracts:
+            delete_gdpr_extract(extract.id)
+        _anonymize_user_personal_data(user, irises[user.id])
+
+    db.session.query(subscription_models.BeneficiaryFraudCheck).filter(
+        subscription_models.BeneficiaryFraudCheck.userId.in_(user_ids)
+    ).update(
+        {
+            "resultContent": None,
+            "reason": "Anonymized",
+            "dateCreated": _truncate_to_first_day_of_year(subscription_models.BeneficiaryFraudCheck.dateCreated),
+        },
+        synchronize_session=False,
+    )
+    db.session.query(subscription_models.BeneficiaryFraudReview).filter(
+        subscription_models.BeneficiaryFraudReview.userId.in_(user_ids)
+    ).update(
+        {
+            "reason": "Anonymized",
+            "dateReviewed": _truncate_to_first_day_of_year(subscription_models.BeneficiaryFraudReview.dateReviewed),
+        },
+        synchronize_session=False,
+    )
+    db.session.query(finance_models.Deposit).filter(finance_models.Deposit.userId.in_(user_ids)).update(
+        {"source": "Anonymized"}, synchronize_session=False
+    )
+    db.session.query(models.GdprUserAnonymization).filter(models.GdprUserAnonymization.userId.in_(user_ids)).delete(
+        synchronize_session=False
+    )
+    db.session.query(chronicles_models.Chronicle).filter(chronicles_models.Chronicle.userId.in_(user_ids)).update(
+        {
+            "userId": None,
+            "email": chronicles_constants.ANONYMIZED_EMAIL,
+        },
+        synchronize_session=False,
+    )
+    # UserAccountUpdateRequest objects are deleted after being archived in DS
+    db.session.query(models.UserAccountUpdateRequest).filter(
+        models.UserAccountUpdateRequest.id.in_(
+            [update_request.id for update_request in update_requests if update_request.userId in user_ids]
+        )
+    ).delete(synchronize_session=False)
+    db.session.query(models.TrustedDevice).filter(models.TrustedDevice.userId.in_(user_ids)).delete(
+        synchronize_session=False
+    )
+    db.session.query(models.LoginDeviceHistory).filter(models.LoginDeviceHistory.userId.in_(user_ids)).delete(
+        synchronize_session=False
+    )
+    db.session.query(history_models.ActionHistory).filter(
+        history_models.ActionHistory.userId.in_(user_ids),
+        history_models.ActionHistory.offererId.is_(None),
+    ).delete(synchronize_session=False)
+    db.session.query(offerers_models.OffererInvitation).filter(
+        offerers_models.OffererInvitation.email.in_(emails)
+    ).delete(synchronize_session=False)
+    bo_user_ids = set(
+        db.session.execute(
+            sa.delete(permissions_models.BackOfficeUserProfile)
+            .where(permissions_models.BackOfficeUserProfile.userId.in_(user_ids))
+            .returning(permissions_models.BackOfficeUserProfile.userId)
+            .execution_options(synchronize_session=False)
+        ).scalars()
+    )
+
+    for user in users:
+        if results[user.id].external_email_anonymized:
+            user.replace_roles_by_anonymized_role()
+            user.email = (
+                f"{'ex_backoffice_user' if user.id in bo_user_ids else 'anonymous'}_{user.id}@anonymized.passculture"
+            )
+            db.session.add(
+                history_models.ActionHistory(
+                    actionType=history_models.ActionType.USER_ANONYMIZED,
+                    userId=user.id,
+                )
+            )
+    db.session.flush()
+    return len(users)
 
 
 def _get_anonymize_pro_query(time_clause: sa.sql.elements.ColumnElement[bool]) -> typing.Any:
@@ -99,6 +99,7 @@ tables_to_clean: list[type[Model]] = [
     finance_models.PricingLine,
     finance_models.PricingLog,
     finance_models.Pricing,
+    finance_models.PricingPointYearlyRevenue,
     finance_models.InvoiceLine,
     finance_models.Invoice,
     finance_models.InvoiceSettlement,
@@ -120,6 +121,7 @@ tables_to_clean: list[type[Model]] = [
     bookings_models.ExternalBooking,
     bookings_models.FraudulentBookingTag,
     bookings_models.Booking,
+    bookings_models.StockDailyBookingCount,
     educational_models.CollectiveAdditionalFee,
     educational_models.CollectiveStock,
     offers_models.Stock,
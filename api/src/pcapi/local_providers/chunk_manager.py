@@ -1,5 +1,8 @@
+import collections
 import datetime
 
+import sqlalchemy as sa
+
 import pcapi.core.offers.models as offers_models
 from pcapi.local_providers.providable_info import ProvidableInfo
 from pcapi.models import Model
@@ -20,23 +23,30 @@ def get_object_from_current_chunks(
 
 
 def insert_chunk(chunk_to_insert: dict[str, Model]) -> None:
+    # New objects are not autoflushed while the chunk is built (see
+    # `LocalProvider.get_existing_object`), so they are all pending here: the
+    # flush sends one multi-row `INSERT ... RETURNING` per model instead
+    # of one `INSERT` per object.
     db.session.add_all(chunk_to_insert.values())
     db.session.commit()
 
 
 def update_chunk(chunk_to_update: dict[str, Model]) -> None:
-    # Access `Model.registry` here, not at module-scope,
-    # because it may not be populated yet if this module is imported too early.
-    MODELS = {mapper.class_.__name__: mapper.class_ for mapper in Model.registry.mappers}
-
-    models_in_chunk: set[str] = set(_extract_model_name_from_chunk_key(key) for key in chunk_to_update.keys())
-
-    for model_in_chunk in models_in_chunk:
-        matching_tuples_in_chunk = _filter_matching_pc_object_in_chunk(model_in_chunk, chunk_to_update)
-        values_to_update_in_chunk = _extract_dict_values_from_chunk(matching_tuples_in_chunk)
-        model_to_update = MODELS[model_in_chunk]
-
-        db.session.bulk_update_mappings(model_to_update, values_to_update_in_chunk)
+    # Objects attached to the session are written by the flush, most of
+    # them have already been autoflushed while looking up the next
+    # providable infos. Do not write them a second time: only bulk
+    # update the columns that are still modified.
+    db.session.flush()
+    rows_by_model: dict[type[Model], list[dict]] = collections.defaultdict(list)
+    for pc_object in chunk_to_update.values():
+        row = _get_modified_columns(pc_object)
+        if row:
+            rows_by_model[type(pc_object)].append(row)
+
+    for model, rows in rows_by_model.items():
+        # ORM bulk UPDATE by primary key: rows sharing the same set of
+        # modified columns are sent in a single executemany.
+        db.session.execute(sa.update(model), rows)
     db.session.commit()
 
 
@@ -48,16 +58,22 @@ def save_chunks(chunk_to_insert: dict[str, Model], chunk_to_update: dict[str, Mo
         update_chunk(chunk_to_update)
 
 
-def _filter_matching_pc_object_in_chunk(
-    model_in_chunk: str, chunk_to_update: dict[str, Model]
-) -> list[tuple[str, Model]]:
-    return list(
-        filter(lambda item: _extract_model_name_from_chunk_key(item[0]) == model_in_chunk, chunk_to_update.items())
-    )
-
-
-def _extract_dict_values_from_chunk(matching_tuples_in_chunk: list[tuple[str, Model]]) -> list[dict]:
-    return list(dictify_pc_object(pc_object_item) for pc_object_key, pc_object_item in matching_tuples_in_chunk)
+def _get_modified_columns(pc_object: Model) -> dict:
+    """Return the primary key and the modified columns of `pc_object`,
+    or an empty dict if it has no modified columns.
+    """
+    state = sa.inspect(pc_object)
+    row = {
+        prop.key: state.dict[prop.key]
+        for prop in state.mapper.column_attrs
+        if prop.key in state.dict and state.attrs[prop.key].history.has_changes()
+    }
+    if not row:
+        return {}
+    for column in state.mapper.primary_key:
+        key = state.mapper.get_property_by_column(column).key
+        row[key] = state.dict[key]
+    return row
 
 
 def get_last_update_for_provider(
@@ -67,24 +83,3 @@ def get_last_update_for_provider(
     if pc_obj and pc_obj.lastProviderId == provider_id:
         return pc_obj.dateModifiedAtLastProvider
     return None
-
-
-def dictify_pc_object(object_to_update: Model) -> dict:
-    dict_to_update = object_to_update.__dict__.copy()
-    if "_sa_instance_state" in dict_to_update:
-        del dict_to_update["_sa_instance_state"]
-    if "datePublished" in dict_to_update:
-        del dict_to_update["datePublished"]
-    if "venue" in dict_to_update:
-        del dict_to_update["venue"]
-    if "offer" in dict_to_update:
-        del dict_to_update["offer"]
-    if "stocks" in dict_to_update:
-        del dict_to_update["stocks"]
-    if "remainingQuantity" in dict_to_update:
-        del dict_to_update["remainingQuantity"]
-    return dict_to_update
-
-
-def _extract_model_name_from_chunk_key(chunk_key: str) -> str:
-    return chunk_key.split("|")[1]
@@ -193,7 +193,11 @@ class LocalProvider(Iterator):
         if model_type == offers_models.Stock:
             query = query.with_for_update()
 
-        return typing.cast(offers_models.Offer | offers_models.Stock | None, query.one_or_none())
+        # Objects created since the last chunk are looked up in the chunks
+        # first: do not autoflush them one by one here, `save_chunks()`
+        # inserts them all at once.
+        with db.session.no_autoflush:
+            return typing.cast(offers_models.Offer | offers_models.Stock | None, query.one_or_none())
 
     def get_existing_pc_obj(
         self, providable_info: ProvidableInfo, chunk_to_insert: dict, chunk_to_update: dict
@@ -352,7 +356,7 @@ def _reindex_offers(
             offer_ids.add(obj.id)
     search.async_index_offer_ids(
         offer_ids,
-        reason=IndexationReason.STOCK_UPDATE,
+        reason=IndexationReason.STOCK_SYNCHRONIZATION,
         log_extra={
             "source": "provider_api",
             "venue_id": venue_provider.venueId if venue_provider else None,
@@ -1,14 +1,22 @@
+import datetime
+import functools
 import logging
+import multiprocessing
+import multiprocessing.pool
 from typing import Type
 
 from urllib3 import exceptions as urllib3_exceptions
 
 import pcapi.connectors.ems as ems_connectors
+from pcapi import settings
+from pcapi.connectors.serialization import ems_serializers
 from pcapi.core.providers import models as provider_models
 from pcapi.core.providers import repository as providers_repository
 from pcapi.core.providers.etls.boost_etl import BoostExtractTransformLoadProcess
 from pcapi.core.providers.etls.cgr_etl import CGRExtractTransformLoadProcess
 from pcapi.core.providers.etls.cine_office_etl import CineOfficeExtractTransformLoadProcess
+from pcapi.core.providers.etls.cinema_etl_template import CinemaETLProcessTemplate
+from pcapi.core.providers.etls.ems_etl import EMSExtractTransformLoadProcess
 from pcapi.local_providers.allocine.allocine_stocks import AllocineStocks
 from pcapi.local_providers.cinema_providers.boost.boost_stocks import BoostStocks
 from pcapi.local_providers.cinema_providers.cds.cds_stocks import CDSStocks
@@ -17,6 +25,7 @@ from pcapi.local_providers.cinema_providers.ems.ems_stocks import EMSStocks
 from pcapi.local_providers.local_provider import LocalProvider
 from pcapi.models import db
 from pcapi.utils import cron
+from pcapi.utils import date as date_utils
 from pcapi.utils import logging as logging_utils
 from pcapi.utils import requests
 from pcapi.utils.repository import transaction
@@ -42,6 +51,19 @@ _LOCAL_CLASS_NAME_TO_ETL_CLASS: dict[
     "CGRStocks": CGRExtractTransformLoadProcess,
 }
 
+# Maximum number of venue providers synchronized at the same time, per
+# provider. Providers that are not listed here are synchronized one
+# venue at a time.
+_MAX_CONCURRENT_SYNCS_BY_LOCAL_CLASS = {
+    "BoostStocks": settings.BOOST_MAX_CONCURRENT_SYNCS,
+    "CDSStocks": settings.CDS_MAX_CONCURRENT_SYNCS,
+    "CGRStocks": settings.CGR_MAX_CONCURRENT_SYNCS,
+    "EMSStocks": settings.EMS_MAX_CONCURRENT_SYNCS,
+}
+# See `_sort_venue_providers_by_priority()`.
+IMMINENT_SHOWS_DELAY = datetime.timedelta(hours=48)
+RECENTLY_BOOKED_SHOWS_DELAY = datetime.timedelta(hours=24)
+
 
 def synchronize_data_for_provider(provider_name: str, limit: int | None = None) -> None:
     provider_class = _NAME_TO_LOCAL_PROVIDER_CLASS[provider_name]
@@ -53,24 +75,126 @@ def synchronize_data_for_provider(provider_name: str, limit: int | None = None)
         logger.exception(cron.build_cron_log_message(name=provider_name, status=cron.CronStatus.FAILED))
 
 
-def synchronize_venue_providers(venue_providers: list[provider_models.VenueProvider], limit: int | None = None) -> None:
-    for venue_provider in venue_providers:
-        log_data = {
-            "venue_provider_id": venue_provider.id,
-            "venue_id": venue_provider.venueId,
-            "provider_id": venue_provider.providerId,
-            # TODO: remove extra data without `_id`
-            "venue_provider": venue_provider.id,
-            "venue": venue_provider.venueId,
-            "provider": venue_provider.providerId,
-        }
-        try:
-            with transaction():
-                synchronize_venue_provider(venue_provider, limit)
-        except (urllib3_exceptions.HTTPError, requests.exceptions.RequestException) as exception:
-            logger.error("Connexion error while synchronizing venue_provider", extra=log_data | {"exc": exception})
-        except Exception:
-            logger.exception("Unexpected error while synchronizing venue provider", extra=log_data)
+def synchronize_venue_providers(
+    venue_providers: list[provider_models.VenueProvider],
+    limit: int | None = None,
+    processes: int = 1,
+) -> None:
+    """Synchronize venue providers, most urgent first (see
+    `_sort_venue_providers_by_priority()`).
+
+    If ``processes`` is greater than 1, venue providers are
+    synchronized by a pool of worker processes, within the limit of
+    the number of concurrent synchronizations allowed for each
+    provider API.
+    """
+    venue_providers = _sort_venue_providers_by_priority(venue_providers)
+    processes = min(processes, len(venue_providers))
+    if processes > 1:
+        processes = min(processes, _get_max_concurrent_syncs(venue_providers))
+    if processes <= 1:
+        for venue_provider in venue_providers:
+            _synchronize_venue_provider_and_log_errors(venue_provider, limit)
+        return
+
+    venue_provider_ids = [venue_provider.id for venue_provider in venue_providers]
+    logger.info(
+        "Synchronizing venue providers in parallel",
+        extra={"venue_providers": len(venue_provider_ids), "processes": processes},
+    )
+    synchronize = functools.partial(_synchronize_venue_provider_by_id, limit)
+    with _get_worker_pool(processes) as pool:
+        # Tasks are started in the order of `venue_provider_ids`.
+        for _ in pool.imap_unordered(synchronize, venue_provider_ids):
+            pass
+
+
+def _synchronize_venue_provider_and_log_errors(
+    venue_provider: provider_models.VenueProvider,
+    limit: int | None = None,
+) -> None:
+    log_data = {
+        "venue_provider_id": venue_provider.id,
+        "venue_id": venue_provider.venueId,
+        "provider_id": venue_provider.providerId,
+        # TODO: remove extra data without `_id`
+        "venue_provider": venue_provider.id,
+        "venue": venue_provider.venueId,
+        "provider": venue_provider.providerId,
+    }
+    try:
+        with transaction():
+            synchronize_venue_provider(venue_provider, limit)
+    except (urllib3_exceptions.HTTPError, requests.exceptions.RequestException) as exception:
+        logger.error("Connexion error while synchronizing venue_provider", extra=log_data | {"exc": exception})
+    except Exception:
+        logger.exception("Unexpected error while synchronizing venue provider", extra=log_data)
+
+
+def _synchronize_venue_provider_by_id(limit: int | None, venue_provider_id: int) -> None:
+    try:
+        venue_provider = providers_repository.get_venue_provider_by_id(venue_provider_id)
+        _synchronize_venue_provider_and_log_errors(venue_provider, limit)
+    finally:
+        db.session.close()
+
+
+def _get_worker_pool(processes: int) -> multiprocessing.pool.Pool:
+    # Make sure that no connection is inherited by child processes.
+    db.session.close()
+    db.engine.dispose()
+    return multiprocessing.get_context("fork").Pool(processes, initializer=_init_worker)
+
+
+def _init_worker() -> None:
+    # Connections must not be shared with the parent process, see
+    # https://docs.sqlalchemy.org/en/20/core/pooling.html#using-connection-pools-with-multiprocessing-or-os-fork
+    db.engine.dispose(close=False)
+
+
+def _get_max_concurrent_syncs(venue_providers: list[provider_models.VenueProvider]) -> int:
+    local_classes = {venue_provider.provider.localClass for venue_provider in venue_providers}
+    return min(
+        (_MAX_CONCURRENT_SYNCS_BY_LOCAL_CLASS.get(local_class or "", 1) for local_class in local_classes),
+        default=1,
+    )
+
+
+def _sort_venue_providers_by_priority(
+    venue_providers: list[provider_models.VenueProvider],
+) -> list[provider_models.VenueProvider]:
+    """Sort venue providers so that the most urgent ones are
+    synchronized first:
+
+    1. venue providers that have never been synchronized;
+    2. venues with a show in the next hours, or whose upcoming shows
+       have recently been booked (their remaining quantity at the
+       provider has probably changed);
+    3. other venues.
+
+    Within each group, venues with the soonest show come first.
+    """
+    if len(venue_providers) <= 1:
+        return venue_providers
+    now = date_utils.get_naive_utc_now()
+    stats = providers_repository.get_upcoming_stocks_stats_by_venue_and_provider(
+        {venue_provider.venueId for venue_provider in venue_providers},
+        booked_since=now - RECENTLY_BOOKED_SHOWS_DELAY,
+    )
+
+    def get_priority(venue_provider: provider_models.VenueProvider) -> tuple[int, datetime.datetime]:
+        next_show_datetime, last_booking_datetime = stats.get(
+            (venue_provider.venueId, venue_provider.providerId), (None, None)
+        )
+        if venue_provider.lastSyncDate is None:
+            group = 0
+        elif (next_show_datetime and next_show_datetime < now + IMMINENT_SHOWS_DELAY) or last_booking_datetime:
+            group = 1
+        else:
+            group = 2
+        return group, next_show_datetime or datetime.datetime.max
+
+    return sorted(venue_providers, key=get_priority)
 
 
 def new_etl_integration_can_be_enabled(venue_provider: provider_models.VenueProvider) -> bool:
@@ -107,6 +231,13 @@ def synchronize_venue_provider(venue_provider: provider_models.VenueProvider, li
     )
 
 
+def get_cinema_etl_process(venue_provider: provider_models.VenueProvider) -> CinemaETLProcessTemplate:
+    assert venue_provider.provider.localClass  # to make mypy happy
+    if venue_provider.provider.localClass == "EMSStocks":
+        return EMSExtractTransformLoadProcess(venue_provider)
+    return _LOCAL_CLASS_NAME_TO_ETL_CLASS[venue_provider.provider.localClass](venue_provider)
+
+
 def execute_cinema_etl_process(venue_provider: provider_models.VenueProvider, *, debug: bool = False) -> None:
     logging_level = logging.DEBUG if debug else logging.INFO
     pcapi_logger = logging.getLogger("pcapi")
@@ -117,7 +248,7 @@ def execute_cinema_etl_process(venue_provider: provider_models.VenueProvider, *,
         ETLProcess(venue_provider).execute()
 
 
-def synchronize_ems_venue_providers(from_last_version: bool = False) -> None:
+def synchronize_ems_venue_providers(from_last_version: bool = False, processes: int = 1) -> None:
     connector = ems_connectors.EMSScheduleConnector()
     last_version = providers_repository.get_ems_oldest_sync_version() if from_last_version else 0
     ems_provider = providers_repository.get_provider_by_local_class("EMSStocks")
@@ -139,32 +270,70 @@ def synchronize_ems_venue_providers(from_last_version: bool = False) -> None:
         venue_provider_by_site_id[active_venue_provider.venueIdAtOfferProvider] = active_venue_provider
         venues_provider_to_sync.add(active_venue_provider.id)
 
+    site_by_venue_provider_id = {}
     for site in cinemas_programs.sites:
         venue_provider = venue_provider_by_site_id.get(site.id)
         if not venue_provider:
             logger.info("Venue provider for EMS site id %s not found", site.id)
             continue
-        log_data = {
-            "venue_provider": venue_provider.id,
-            "venue": venue_provider.venueId,
-            "provider": venue_provider.providerId,
-        }
-        try:
-            with transaction():
-                ems_stocks = EMSStocks(connector=connector, venue_provider=venue_provider, site=site)
-                ems_stocks.synchronize()
-        except (urllib3_exceptions.HTTPError, requests.exceptions.RequestException) as exception:
-            logger.error("Connexion error while synchronizing venue_provider", extra=log_data | {"exc": exception})
-            venues_provider_to_sync.discard(venue_provider.id)
-        except Exception:
-            logger.exception("Unexpected error while synchronizing venue provider", extra=log_data)
-            venues_provider_to_sync.discard(venue_provider.id)
+        site_by_venue_provider_id[venue_provider.id] = site
+    venue_providers = _sort_venue_providers_by_priority(
+        [venue_provider for venue_provider in active_venues_provider if venue_provider.id in site_by_venue_provider_id]
+    )
+
+    processes = min(processes, len(venue_providers), _MAX_CONCURRENT_SYNCS_BY_LOCAL_CLASS["EMSStocks"])
+    if processes <= 1:
+        for venue_provider in venue_providers:
+            site = site_by_venue_provider_id[venue_provider.id]
+            if not _synchronize_ems_site(connector, venue_provider, site):
+                venues_provider_to_sync.discard(venue_provider.id)
+    else:
+        tasks = [
+            (venue_provider.id, site_by_venue_provider_id[venue_provider.id]) for venue_provider in venue_providers
+        ]
+        logger.info("Synchronizing EMS sites in parallel", extra={"sites": len(tasks), "processes": processes})
+        with _get_worker_pool(processes) as pool:
+            for venue_provider_id, success in pool.imap_unordered(_synchronize_ems_site_by_venue_provider_id, tasks):
+                if not success:
+                    venues_provider_to_sync.discard(venue_provider_id)
 
     with transaction():
         providers_repository.bump_ems_sync_version(new_version, venues_provider_to_sync)
         db.session.commit()
 
 
+def _synchronize_ems_site(
+    connector: ems_connectors.EMSScheduleConnector,
+    venue_provider: provider_models.VenueProvider,
+    site: ems_serializers.SiteWithEvents,
+) -> bool:
+    log_data = {
+        "venue_provider": venue_provider.id,
+        "venue": venue_provider.venueId,
+        "provider": venue_provider.providerId,
+    }
+    try:
+        with transaction():
+            ems_stocks = EMSStocks(connector=connector, venue_provider=venue_provider, site=site)
+            ems_stocks.synchronize()
+    except (urllib3_exceptions.HTTPError, requests.exceptions.RequestException) as exception:
+        logger.error("Connexion error while synchronizing venue_provider", extra=log_data | {"exc": exception})
+        return False
+    except Exception:
+        logger.exception("Unexpected error while synchronizing venue provider", extra=log_data)
+        return False
+    return True
+
+
+def _synchronize_ems_site_by_venue_provider_id(task: tuple[int, ems_serializers.SiteWithEvents]) -> tuple[int, bool]:
+    venue_provider_id, site = task
+    try:
+        venue_provider = providers_repository.get_venue_provider_by_id(venue_provider_id)
+        return venue_provider_id, _synchronize_ems_site(ems_connectors.EMSScheduleConnector(), venue_provider, site)
+    finally:
+        db.session.close()
+
+
 def synchronize_ems_venue_provider(
     venue_provider: provider_models.VenueProvider,
     target_version: int | None = None,
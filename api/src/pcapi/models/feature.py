@@ -153,6 +153,12 @@ class FeatureToggle(enum.Enum):
         "Génère les filtres en fonction du statut pour la liste des offres du portail pro"
     )
     WIP_ENABLE_NEW_COLLECTIVE_PRICE_DETAILS = "Active la nouvelle logique de détail du prix d'une offre réservable"
+    WIP_ENABLE_PRICING_POINT_YEARLY_REVENUE = (
+        "Lit le chiffre d'affaires annuel des points de valorisation depuis la table maintenue par triggers"
+    )
+    WIP_ENABLE_STOCK_DAILY_BOOKING_COUNT = (
+        "Lit le nombre de réservations récentes des offres indexées depuis la table de compteurs journaliers"
+    )
     WIP_NEW_PRO_ADVICE_ACCESS = "Active les nouveaux points d'accès pour la mise à la une et l'ajout de recommendation"
 
     def is_active(self) -> bool:
@@ -213,6 +219,8 @@ FEATURES_DISABLED_BY_DEFAULT: tuple[FeatureToggle, ...] = (
     FeatureToggle.WIP_ENABLE_CULTURAL_OUTREACH,
     FeatureToggle.WIP_ENABLE_FINANCE_SETTLEMENTS,
     FeatureToggle.WIP_ENABLE_NEW_BREVO_RECOMMENDATION_WEBHOOK,
+    FeatureToggle.WIP_ENABLE_PRICING_POINT_YEARLY_REVENUE,
+    FeatureToggle.WIP_ENABLE_STOCK_DAILY_BOOKING_COUNT,
     FeatureToggle.WIP_NEW_PRO_ADVICE_ACCESS,
     FeatureToggle.WIP_PRE_SIGNUP_SIMULATION,
     # Please keep alphabetic order
@@ -228,13 +228,13 @@ def download_invoices(bank_account_id: int) -> response_utils.BackofficeResponse
     invoice_pdf_urls = [invoice.url for invoice in invoices]
 
     try:
-        export_data = pdf.merge_pdf_files(invoice_pdf_urls)
+        merged_pdf = pdf.merge_pdf_files(invoice_pdf_urls)
     except FileNotFoundError as exc:
         flash(Markup("Échec de téléchargement du justificatif {url}").format(url=exc), "warning")
         return _redirect_to_invoices(bank_account_id)
 
     return send_file(
-        BytesIO(export_data),
+        merged_pdf,
         as_attachment=True,
         download_name=f"justificatifs_{bank_account_id}.pdf",
         mimetype="application/pdf; charset=utf-8;",
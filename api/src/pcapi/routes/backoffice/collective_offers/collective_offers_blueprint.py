@@ -909,7 +909,7 @@ def _is_collective_offer_price_editable(collective_offer: educational_models.Col
         return False
 
     # cannot update an offer's price while the cashflow generation script is running
-    if finance_api.are_cashflows_being_generated():
+    if finance_api.are_cashflows_being_generated(venue_id=collective_offer.venueId):
         return False
 
     # cannot update an offer's stock if it already has a pricing
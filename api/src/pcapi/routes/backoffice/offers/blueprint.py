@@ -1750,7 +1750,7 @@ def get_offer_details(offer_id: int) -> response_utils.BackofficeResponse:
         raise NotFound()
 
     editable_stock_ids = set()
-    if offer.isEvent and not finance_api.are_cashflows_being_generated():
+    if offer.isEvent and not finance_api.are_cashflows_being_generated(venue_id=offer.venueId):
         # store the ids in a set as we will use multiple in on it
         editable_stock_ids = _get_editable_stock(offer_id)
 
@@ -1826,6 +1826,14 @@ def _is_stock_editable(offer_id: int, stock_id: int) -> bool:
     return stock_id in _get_editable_stock(offer_id)
 
 
+def _are_cashflows_being_generated_for_offer(offer_id: int) -> bool:
+    # the venue is only needed when the cashflow generation script is running
+    if not finance_api.are_cashflows_being_generated():
+        return False
+    venue_id = db.session.query(offers_models.Offer.venueId).filter_by(id=offer_id).scalar()
+    return finance_api.are_cashflows_being_generated(venue_id=venue_id)
+
+
 def _manage_price_category(stock: offers_models.Stock, new_price: float) -> bool:
     if stock.priceCategory is None:
         return False
@@ -1870,7 +1878,7 @@ def edit_offer_stock(offer_id: int, stock_id: int) -> response_utils.BackofficeR
         mark_transaction_as_invalid()
         flash("L'offer_id et le stock_id ne sont pas cohérents.", "warning")
         return redirect(url_for("backoffice_web.offer.get_offer_details", offer_id=offer_id), 303)
-    if finance_api.are_cashflows_being_generated():
+    if _are_cashflows_being_generated_for_offer(offer_id):
         mark_transaction_as_invalid()
         flash("Le script de génération des cashflows est en cours, veuillez réessayer plus tard.", "warning")
         return redirect(url_for("backoffice_web.offer.get_offer_details", offer_id=offer_id), 303)
@@ -1923,7 +1931,7 @@ def confirm_offer_stock(offer_id: int, stock_id: int) -> response_utils.Backoffi
     if stock.offerId != offer_id:
         alert = "L'offer_id et le stock_id ne sont pas cohérents."
         return _generate_offer_stock_edit_form(offer_id, stock_id, alert=alert)
-    if finance_api.are_cashflows_being_generated():
+    if _are_cashflows_being_generated_for_offer(offer_id):
         alert = "Le script de génération des cashflows est en cours, veuillez réessayer plus tard."
         return _generate_offer_stock_edit_form(offer_id, stock_id, alert=alert)
 
@@ -1977,7 +1985,7 @@ def get_offer_stock_edit_form(
     stock_id: int,
     form: forms.EditStockForm | None = None,
 ) -> response_utils.BackofficeResponse:
-    if finance_api.are_cashflows_being_generated():
+    if _are_cashflows_being_generated_for_offer(offer_id):
         return render_template(
             "components/dynamic/modal_form.html",
             div_id=f"edit-offer-stock-modal-{stock_id}",
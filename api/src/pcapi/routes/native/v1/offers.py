@@ -1,15 +1,12 @@
+import flask
 import sqlalchemy as sa
 from flask_login import current_user
 from sqlalchemy.orm import joinedload
 
 import pcapi.core.chronicles.api as chronicles_api
 import pcapi.core.mails.transactional as transactional_mails
-from pcapi.core.categories import subcategories
-from pcapi.core.categories.app_search_tree import NATIVE_CATEGORIES
-from pcapi.core.categories.app_search_tree import SEARCH_GROUPS
-from pcapi.core.categories.app_search_tree import SEARCH_NODES
-from pcapi.core.categories.models import GenreType
 from pcapi.core.external.batch import transactional_notifications
+from pcapi.core.offers import cache as offers_cache
 from pcapi.core.offers import repository
 from pcapi.core.offers.models import Offer
 from pcapi.models import db
@@ -19,6 +16,8 @@ from pcapi.models.utils import first_or_404
 from pcapi.models.utils import get_or_404
 from pcapi.routes.native.security import authenticated_and_active_user_required
 from pcapi.serialization.decorator import spectree_serialize
+from pcapi.serialization.spec_tree import UnvalidatedResponse
+from pcapi.serialization.utils import PrecomputedJsonResponse
 from pcapi.utils.transaction_manager import atomic
 
 from .. import blueprint
@@ -27,13 +26,25 @@ from .serialization import subcategories_v2 as subcategories_v2_serializers
 
 
 @blueprint.native_route("/offers/stocks", methods=["POST"], version="v2")
-@spectree_serialize(response_model=serializers.OffersStocksResponseV2, api=blueprint.api)
-def get_offers_and_stocks(body: serializers.OffersStocksRequest) -> serializers.OffersStocksResponseV2:
-    offer_ids = body.offer_ids
+@spectree_serialize(response_model=serializers.OffersStocksResponseV2, api=blueprint.api, raw_response=True)
+def get_offers_and_stocks(body: serializers.OffersStocksRequest) -> flask.Response:
+    offer_ids = list(dict.fromkeys(body.offer_ids))
+    serialized_offers = offers_cache.get_offer_responses("v2", offer_ids, _serialize_offers_v2)
+    # Offers are already serialized: only wrap them in the JSON
+    # serialization of `OffersStocksResponseV2`.
+    content = '{"offers":[%s]}' % ",".join(
+        serialized_offers[offer_id] for offer_id in offer_ids if offer_id in serialized_offers
+    )
+    response = flask.make_response(content)
+    response.mimetype = "application/json"
+    return response
+
+
+def _serialize_offers_v2(offer_ids: list[int]) -> dict[int, str]:
     query = repository.get_offers_details(offer_ids)
-    serialized_offers = [serializers.OfferResponseV2.build(offer) for offer in query]
-    offers_response = serializers.OffersStocksResponseV2(offers=serialized_offers)
-    return offers_response
+    return {
+        offer.id: serializers.OfferResponseV2.build(offer).json(exclude_none=False, by_alias=True) for offer in query
+    }
 
 
 @blueprint.native_route("/offer/<int:offer_id>/chronicles", methods=["GET"])
@@ -110,33 +121,26 @@ def send_offer_link_by_push(offer_id: int) -> None:
     transactional_notifications.send_offer_link_by_push(user_id=current_user.id, offer=offer)
 
 
+# These responses only depend on constants: they are serialized once for all.
+_SUBCATEGORIES_V2_RESPONSE = PrecomputedJsonResponse(subcategories_v2_serializers.SubcategoriesResponseModelv2.build())
+_CATEGORIES_RESPONSE = PrecomputedJsonResponse(subcategories_v2_serializers.CategoriesResponseModel.build())
+
+
 @blueprint.native_route("/subcategories/v2", methods=["GET"])
-@spectree_serialize(api=blueprint.api, response_model=subcategories_v2_serializers.SubcategoriesResponseModelv2)
-def get_subcategories_v2() -> subcategories_v2_serializers.SubcategoriesResponseModelv2:
-    return subcategories_v2_serializers.SubcategoriesResponseModelv2(
-        subcategories=[
-            subcategories_v2_serializers.SubcategoryResponseModelv2.build(subcategory)
-            for subcategory in subcategories.ALL_SUBCATEGORIES
-        ],
-        searchGroups=[
-            subcategories_v2_serializers.SearchGroupResponseModelv2.model_validate(search_group)
-            for search_group in SEARCH_GROUPS
-        ],
-        homepageLabels=[
-            subcategories_v2_serializers.HomepageLabelResponseModelv2.model_validate(homepage_label_name)
-            for homepage_label_name in subcategories.HomepageLabels
-        ],
-        nativeCategories=[
-            subcategories_v2_serializers.NativeCategoryResponseModelv2.build(native_category)
-            for native_category in NATIVE_CATEGORIES
-        ],
-        genreTypes=[subcategories_v2_serializers.GenreTypeModel.model_validate(genre_type) for genre_type in GenreType],
-    )
+@spectree_serialize(
+    api=blueprint.api,
+    raw_response=True,
+    resp=UnvalidatedResponse(HTTP_200=subcategories_v2_serializers.SubcategoriesResponseModelv2, HTTP_403=None),
+)
+def get_subcategories_v2() -> flask.Response:
+    return _SUBCATEGORIES_V2_RESPONSE.make_response()
 
 
 @blueprint.native_route("/categories", methods=["GET"])
-@spectree_serialize(api=blueprint.api, response_model=subcategories_v2_serializers.CategoriesResponseModel)
-def get_categories() -> subcategories_v2_serializers.CategoriesResponseModel:
-    return subcategories_v2_serializers.CategoriesResponseModel(
-        categories=[subcategories_v2_serializers.CategoryResponseModel.build(node) for node in SEARCH_NODES]
-    )
+@spectree_serialize(
+    api=blueprint.api,
+    raw_response=True,
+    resp=UnvalidatedResponse(HTTP_200=subcategories_v2_serializers.CategoriesResponseModel, HTTP_403=None),
+)
+def get_categories() -> flask.Response:
+    return _CATEGORIES_RESPONSE.make_response()
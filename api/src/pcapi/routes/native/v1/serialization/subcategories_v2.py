@@ -2,6 +2,7 @@ from pcapi.core.categories import models as categories_models
 from pcapi.core.categories import subcategories
 from pcapi.core.categories.app_search_tree import NATIVE_CATEGORIES
 from pcapi.core.categories.app_search_tree import SEARCH_GROUPS
+from pcapi.core.categories.app_search_tree import SEARCH_NODES
 from pcapi.core.categories.genres.book import BookType
 from pcapi.core.categories.genres.movie import MovieType
 from pcapi.core.categories.genres.music import MusicType
@@ -99,6 +100,23 @@ class SubcategoriesResponseModelv2(HttpBodyModel):
     nativeCategories: list[NativeCategoryResponseModelv2]
     genreTypes: list[GenreTypeModel]
 
+    @classmethod
+    def build(cls) -> "SubcategoriesResponseModelv2":
+        return cls(
+            subcategories=[
+                SubcategoryResponseModelv2.build(subcategory) for subcategory in subcategories.ALL_SUBCATEGORIES
+            ],
+            searchGroups=[SearchGroupResponseModelv2.model_validate(search_group) for search_group in SEARCH_GROUPS],
+            homepageLabels=[
+                HomepageLabelResponseModelv2.model_validate(homepage_label_name)
+                for homepage_label_name in subcategories.HomepageLabels
+            ],
+            nativeCategories=[
+                NativeCategoryResponseModelv2.build(native_category) for native_category in NATIVE_CATEGORIES
+            ],
+            genreTypes=[GenreTypeModel.model_validate(genre_type) for genre_type in categories_models.GenreType],
+        )
+
 
 class CategoryResponseModel(HttpBodyModel):
     label: str
@@ -123,3 +141,7 @@ class CategoryResponseModel(HttpBodyModel):
 
 class CategoriesResponseModel(HttpBodyModel):
     categories: list[CategoryResponseModel]
+
+    @classmethod
+    def build(cls) -> "CategoriesResponseModel":
+        return cls(categories=[CategoryResponseModel.build(node) for node in SEARCH_NODES])
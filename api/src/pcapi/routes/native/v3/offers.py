@@ -1,3 +1,6 @@
+import flask
+
+from pcapi.core.offers import cache as offers_cache
 from pcapi.core.offers import repository
 from pcapi.models.utils import first_or_404
 from pcapi.serialization.decorator import spectree_serialize
@@ -8,10 +11,19 @@ from .serialization import offers as serializers
 
 
 @blueprint.native_route("/offer/<int:offer_id>", version="v3", methods=["GET"])
-@spectree_serialize(response_model=serializers.OfferResponse, api=blueprint.api, on_error_statuses=[404])
+@spectree_serialize(
+    response_model=serializers.OfferResponse, api=blueprint.api, on_error_statuses=[404], raw_response=True
+)
 @atomic()
-def get_offer_v3(offer_id: int) -> serializers.OfferResponse:
-    query = repository.get_offers_details([int(offer_id)])
+def get_offer_v3(offer_id: int) -> flask.Response:
+    serialized_offers = offers_cache.get_offer_responses("v3", [int(offer_id)], _serialize_offer)
+    response = flask.make_response(serialized_offers[int(offer_id)])
+    response.mimetype = "application/json"
+    return response
+
+
+def _serialize_offer(offer_ids: list[int]) -> dict[int, str]:
+    query = repository.get_offers_details(offer_ids)
     offer = first_or_404(query)
 
-    return serializers.OfferResponse.build(offer)
+    return {offer.id: serializers.OfferResponse.build(offer).json(exclude_none=False, by_alias=True)}
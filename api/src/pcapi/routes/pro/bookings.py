@@ -1,8 +1,10 @@
 import math
 from datetime import date
+from typing import Iterator
 from typing import cast
 from zoneinfo import ZoneInfo
 
+import flask
 from flask_login import current_user
 from flask_login import login_required
 
@@ -39,6 +41,7 @@ from pcapi.serialization.decorator import spectree_serialize
 from pcapi.serialization.spec_tree import ExtendResponse
 from pcapi.utils.rest import check_user_has_access_to_offerer
 from pcapi.utils.transaction_manager import atomic
+from pcapi.utils.transaction_manager import mark_transaction_as_invalid
 
 from . import blueprint
 
@@ -90,36 +93,27 @@ def get_user_has_bookings() -> UserHasBookingResponse:
     return UserHasBookingResponse(has_bookings=booking_repository.user_has_bookings(user))
 
 
+OFFER_BOOKINGS_CSV_EXPORT_HEADERS = {
+    "Content-Type": "text/csv; charset=utf-8;",
+    "Content-Disposition": "attachment; filename=reservations_pass_culture.csv",
+}
+OFFER_BOOKINGS_EXCEL_EXPORT_HEADERS = {
+    "Content-Type": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "Content-Disposition": "attachment; filename=reservations_pass_culture.xlsx",
+}
+
+
 @private_api.route("/bookings/offer/<int:offer_id>/csv", methods=["GET"])
 @atomic()
 @login_required
 @spectree_serialize(
     json_format=False,
-    response_headers={
-        "Content-Type": "text/csv; charset=utf-8;",
-        "Content-Disposition": "attachment; filename=reservations_pass_culture.csv",
-    },
+    raw_response=True,
+    response_headers=OFFER_BOOKINGS_CSV_EXPORT_HEADERS,
     api=blueprint.pro_private_schema,
 )
-def export_bookings_for_offer_as_csv(offer_id: int, query: BookingsExportQueryModel) -> bytes:
-    user = current_user._get_current_object()
-    offer = get_or_404(Offer, offer_id)
-
-    check_user_has_access_to_offerer(user, offer.venue.managingOffererId)
-
-    if query.status == BookingsExportStatusFilter.VALIDATED:
-        return cast(
-            str,
-            booking_repository.export_validated_bookings_by_offer_id(
-                offer_id, event_beginning_date=query.event_date, export_type=BookingExportType.CSV
-            ),
-        ).encode("utf-8-sig")
-    return cast(
-        str,
-        booking_repository.export_bookings_by_offer_id(
-            offer_id, event_beginning_date=query.event_date, export_type=BookingExportType.CSV
-        ),
-    ).encode("utf-8-sig")
+def export_bookings_for_offer_as_csv(offer_id: int, query: BookingsExportQueryModel) -> flask.Response:
+    return _stream_offer_bookings_export(offer_id, query, BookingExportType.CSV, OFFER_BOOKINGS_CSV_EXPORT_HEADERS)
 
 
 @private_api.route("/bookings/offer/<int:offer_id>/excel", methods=["GET"])
@@ -127,31 +121,48 @@ def export_bookings_for_offer_as_csv(offer_id: int, query: BookingsExportQueryMo
 @login_required
 @spectree_serialize(
     json_format=False,
-    response_headers={
-        "Content-Type": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        "Content-Disposition": "attachment; filename=reservations_pass_culture.xlsx",
-    },
+    raw_response=True,
+    response_headers=OFFER_BOOKINGS_EXCEL_EXPORT_HEADERS,
     api=blueprint.pro_private_schema,
 )
-def export_bookings_for_offer_as_excel(offer_id: int, query: BookingsExportQueryModel) -> bytes:
+def export_bookings_for_offer_as_excel(offer_id: int, query: BookingsExportQueryModel) -> flask.Response:
+    return _stream_offer_bookings_export(offer_id, query, BookingExportType.EXCEL, OFFER_BOOKINGS_EXCEL_EXPORT_HEADERS)
+
+
+def _stream_offer_bookings_export(
+    offer_id: int, query: BookingsExportQueryModel, export_type: BookingExportType, headers: dict[str, str]
+) -> flask.Response:
     user = current_user._get_current_object()
     offer = get_or_404(Offer, offer_id)
 
     check_user_has_access_to_offerer(user, offer.venue.managingOffererId)
 
-    if query.status == BookingsExportStatusFilter.VALIDATED:
-        return cast(
-            bytes,
-            booking_repository.export_validated_bookings_by_offer_id(
-                offer_id, event_beginning_date=query.event_date, export_type=BookingExportType.EXCEL
-            ),
-        )
-    return cast(
-        bytes,
-        booking_repository.export_bookings_by_offer_id(
-            offer_id, event_beginning_date=query.event_date, export_type=BookingExportType.EXCEL
-        ),
+    # The export is written while it is sent, so that large exports
+    # are never held in memory.
+    export = booking_repository.stream_bookings_by_offer_id(
+        offer_id,
+        event_beginning_date=query.event_date,
+        export_type=export_type,
+        validated_only=query.status == BookingsExportStatusFilter.VALIDATED,
     )
+    return flask.Response(flask.stream_with_context(_iter_in_short_transactions(export)), headers=headers)
+
+
+def _iter_in_short_transactions(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Yield chunks of a streamed response, computing each of them in
+    its own transaction.
+
+    The response is sent after the transaction of the view has ended.
+    The database connection is released after each chunk, instead of
+    being held while the client downloads the response.
+    """
+    while True:
+        with atomic():
+            chunk = next(chunks, None)
+            mark_transaction_as_invalid()  # read-only
+        if chunk is None:
+            return
+        yield chunk
 
 
 @private_api.route("/bookings/csv", methods=["GET"])
@@ -1,5 +1,6 @@
 import datetime
 
+import flask
 import sqlalchemy.orm as sa_orm
 from flask_login import current_user
 from flask_login import login_required
@@ -79,13 +80,14 @@ def has_invoice(query: finance_serialize.HasInvoiceQueryModel) -> finance_serial
 @spectree_serialize(
     api=blueprint.pro_private_schema,
     json_format=False,
+    raw_response=True,
     response_headers={
         "Content-Type": "application/pdf; charset=utf-8;",
         "Content-Disposition": "attachment; filename=justificatifs_de_remboursement.pdf",
     },
     query_params_as_list=["invoiceReferences"],
 )
-def get_combined_invoices(query: finance_serialize.GetCombinedInvoicesQueryModel) -> bytes:
+def get_combined_invoices(query: finance_serialize.GetCombinedInvoicesQueryModel) -> flask.Response:
     invoices = (
         db.session.query(finance_models.Invoice)
         .filter(finance_models.Invoice.reference.in_(query.invoice_references))
@@ -120,10 +122,18 @@ def get_combined_invoices(query: finance_serialize.GetCombinedInvoicesQueryModel
 
     invoice_pdf_urls = [invoice.url for invoice in invoices]
     try:
-        return pdf.merge_pdf_files(invoice_pdf_urls)
+        merged_pdf = pdf.merge_pdf_files(invoice_pdf_urls)
     except FileNotFoundError as exc:
         raise ApiErrors({"invoice": f"Failed to fetch invoice PDF from url: {exc}"}, status_code=424)
 
+    # The merged file is streamed from disk, and deleted once sent.
+    return flask.send_file(
+        merged_pdf,
+        as_attachment=True,
+        download_name="justificatifs_de_remboursement.pdf",
+        mimetype="application/pdf; charset=utf-8;",
+    )
+
 
 @private_api.route("/finance/bank-accounts", methods=["GET"])
 @atomic()
@@ -1,109 +1,253 @@
+import dataclasses
 import datetime
+import functools
 import logging
-import statistics
+import multiprocessing
 import time
 
 import click
 import pytz
 
 import pcapi.core.offers.models as offers_models
+import pcapi.core.offers.repository as offers_repository
 from pcapi.core import search
 from pcapi.core.search.backends import algolia
+from pcapi.models import db
 from pcapi.utils import date as date_utils
 from pcapi.utils.blueprint import Blueprint
+from pcapi.utils.redis import get_redis_client
+from pcapi.utils.transaction_manager import atomic
+from pcapi.utils.transaction_manager import mark_transaction_as_invalid
 
 
 BATCH_SIZE = 1_000
-REPORT_EVERY = 10_000
+SHARD_SIZE = 100_000
+MAX_ATTEMPTS = 3
+
+# Both keys are specific to a `start-end` range, so that an interrupted
+# run can be resumed by running the same command again.
+REDIS_CHECKPOINTS_KEY = "search:algolia:full-index-offers:%d-%d:checkpoints"
+REDIS_FAILED_BATCHES_KEY = "search:algolia:full-index-offers:%d-%d:failed-batches"
 
 logger = logging.getLogger(__name__)
 blueprint = Blueprint(__name__, __name__)
 
 
-def _get_eta(end: int, current: int, elapsed_per_batch: list[int]) -> str:
-    left_to_do = end - current
-    eta_seconds = left_to_do / BATCH_SIZE * statistics.mean(elapsed_per_batch)
-    eta_datetime = date_utils.get_naive_utc_now() + datetime.timedelta(seconds=eta_seconds)
-    eta_datetime = eta_datetime.astimezone(pytz.timezone("Europe/Paris"))
-    return eta_datetime.strftime("%d/%m/%Y %H:%M:%S")
+@dataclasses.dataclass
+class ShardResult:
+    processed_ids: int
+    indexed_offers: int
+    failed_batches: int
+
+
+@dataclasses.dataclass
+class Progress:
+    ids_to_process: int
+    processed_ids: int = 0
+    indexed_offers: int = 0
+    failed_batches: int = 0
+    start_time: float = dataclasses.field(default_factory=time.perf_counter)
+
+    def update(self, result: ShardResult) -> None:
+        self.processed_ids += result.processed_ids
+        self.indexed_offers += result.indexed_offers
+        self.failed_batches += result.failed_batches
+
+    def report(self) -> str:
+        elapsed = time.perf_counter() - self.start_time
+        ids_per_second = self.processed_ids / elapsed if elapsed else 0
+        offers_per_second = self.indexed_offers / elapsed if elapsed else 0
+        return (
+            f"  => {self.processed_ids}/{self.ids_to_process} ids"
+            f" | {self.indexed_offers} offers indexed ({offers_per_second:.0f}/s, {ids_per_second:.0f} ids/s)"
+            f" | {self.failed_batches} failed batches"
+            f" | eta = {self._get_eta(ids_per_second)}"
+        )
+
+    def _get_eta(self, ids_per_second: float) -> str:
+        if not ids_per_second:
+            return "unknown"
+        eta_seconds = (self.ids_to_process - self.processed_ids) / ids_per_second
+        eta_datetime = date_utils.make_timezone_aware_utc(
+            date_utils.get_naive_utc_now() + datetime.timedelta(seconds=eta_seconds)
+        )
+        eta_datetime = eta_datetime.astimezone(pytz.timezone("Europe/Paris"))
+        return eta_datetime.strftime("%d/%m/%Y %H:%M:%S")
+
+
+def _index_batch(backend: algolia.AlgoliaBackend, start: int, end: int) -> int:
+    """Index bookable offers whose id is between `start` and `end`
+    (both included), and return the number of indexed offers.
+    """
+    with atomic():
+        offers = (
+            search.get_base_query_for_offer_indexation()
+            .filter(
+                offers_models.Offer.isActive,
+                offers_models.Offer.id.between(start, end),
+            )
+            .order_by(offers_models.Offer.id)
+            .all()
+        )
+        offers = [offer for offer in offers if offer.is_eligible_for_search]
+        last_x_days_bookings_count_by_offer = search.get_last_x_days_booking_count_by_offer(offers)
+        # The index may not contain offers that were indexed before.
+        backend.index_offers(offers, last_x_days_bookings_count_by_offer, force=True)
+        mark_transaction_as_invalid()
+    return len(offers)
+
+
+def _index_batch_with_retries(backend: algolia.AlgoliaBackend, start: int, end: int) -> int:
+    for attempt in range(1, MAX_ATTEMPTS):
+        try:
+            return _index_batch(backend, start, end)
+        except Exception as exc:
+            logger.info(
+                "Full offer reindexation: error while reindexing from %d to %d, will retry: %s",
+                start,
+                end,
+                exc,
+                extra={"attempt": attempt},
+            )
+            time.sleep(2**attempt)
+    return _index_batch(backend, start, end)
+
+
+def _index_shard(run: tuple[int, int], shard: tuple[int, int]) -> ShardResult:
+    """Index all offers of a shard, from its last checkpoint if the
+    shard has already been partially processed.
+    """
+    redis_client = get_redis_client()
+    backend = search._get_backend()
+    checkpoints_key = REDIS_CHECKPOINTS_KEY % run
+    shard_key = f"{shard[0]}-{shard[1]}"
+    checkpoint = redis_client.hget(checkpoints_key, shard_key)
+    batch_start = int(checkpoint) + 1 if checkpoint else shard[0]
+
+    result = ShardResult(processed_ids=0, indexed_offers=0, failed_batches=0)
+    # Batches hold `BATCH_SIZE` active offers, whatever the density of
+    # ids in the shard.
+    active_offer_ids = offers_repository.get_paginated_active_offer_ids(
+        batch_size=BATCH_SIZE, start_id=batch_start, end_id=shard[1]
+    )
+    for offer_ids in active_offer_ids:
+        batch_end = offer_ids[-1]
+        try:
+            result.indexed_offers += _index_batch_with_retries(backend, batch_start, batch_end)
+        except Exception as exc:
+            logger.exception(
+                "Full offer reindexation: error while reindexing from %d to %d: %s", batch_start, batch_end, exc
+            )
+            redis_client.sadd(REDIS_FAILED_BATCHES_KEY % run, f"{batch_start}-{batch_end}")
+            result.failed_batches += 1
+        redis_client.hset(checkpoints_key, shard_key, batch_end)
+        result.processed_ids += batch_end - batch_start + 1
+        batch_start = batch_end + 1
+    if batch_start <= shard[1]:
+        redis_client.hset(checkpoints_key, shard_key, shard[1])
+        result.processed_ids += shard[1] - batch_start + 1
+    return result
+
+
+def _retry_failed_batches(run: tuple[int, int]) -> int:
+    """Retry batches that failed during the run, and return the number
+    of batches that still fail.
+    """
+    redis_client = get_redis_client()
+    backend = search._get_backend()
+    failed_batches_key = REDIS_FAILED_BATCHES_KEY % run
+    for failed_batch in sorted(redis_client.smembers(failed_batches_key)):
+        start, end = (int(bound) for bound in failed_batch.split("-"))
+        try:
+            _index_batch_with_retries(backend, start, end)
+        except Exception as exc:
+            logger.exception("Full offer reindexation: batch from %d to %d failed again: %s", start, end, exc)
+        else:
+            redis_client.srem(failed_batches_key, failed_batch)
+    return redis_client.scard(failed_batches_key)
+
+
+def _get_ids_to_process(run: tuple[int, int], shards: list[tuple[int, int]]) -> int:
+    checkpoints = get_redis_client().hgetall(REDIS_CHECKPOINTS_KEY % run)
+    ids_to_process = 0
+    for shard in shards:
+        checkpoint = checkpoints.get(f"{shard[0]}-{shard[1]}")
+        ids_to_process += shard[1] - (int(checkpoint) if checkpoint else shard[0] - 1)
+    return ids_to_process
+
+
+def _init_worker() -> None:
+    # Connections must not be shared with the parent process, see
+    # https://docs.sqlalchemy.org/en/20/core/pooling.html#using-connection-pools-with-multiprocessing-or-os-fork
+    db.engine.dispose(close=False)
 
 
 @blueprint.cli.command("full_index_offers")
 @click.argument("start", type=int, required=True)
 @click.argument("end", type=int, required=True)
-def full_index_offers(start: int, end: int) -> None:
-    """Reindex all bookable offers.
-
-    The script iterates over all active offers. For each offer, it
-    indexes it on the backend (Algolia) if the offer is bookable.
-    Otherwise, the offer is NOT unindexed, as we suppose that the
-    offer has already been unindexed through the normally-run
+@click.option("--processes", type=int, default=4, help="Number of processes that index shards in parallel")
+@click.option("--shard-size", type=int, default=SHARD_SIZE, help="Number of offer ids per shard")
+@click.option("--restart", is_flag=True, help="Ignore checkpoints of a previous run on the same range")
+def full_index_offers(start: int, end: int, processes: int, shard_size: int, restart: bool) -> None:
+    """Reindex all bookable offers whose id is between START and END.
+
+    The id range is split into shards of `--shard-size` ids, that are
+    processed in parallel by `--processes` processes. For each active
+    offer, the script indexes it on the backend (Algolia) if the offer
+    is bookable. Otherwise, the offer is NOT unindexed, as we suppose
+    that the offer has already been unindexed through the normally-run
     code. That way, this script skips a lot of unnecessary
     unindexation requests.
 
-    This script processes batches of 1.000 offers and reports back
-    every 10.000 offers.
+    Each shard processes batches of 1.000 active offers and stores a
+    checkpoint in Redis after each batch. If the script is interrupted, running it
+    again with the same START and END resumes from the checkpoints
+    (unless `--restart` is given).
 
-    Errors are logged and are not blocking. You MUST check the logs
-    for batches that failed and MUST re-run all these batches.
-
-    Obviously, the script takes a lot of time. You should run multiple
-    instances of it at the same time. 4 concurrent instances looks
-    like a good compromise.
+    Batches that fail are retried a few times. Batches that still fail
+    are retried once more at the end of the run. If some batches still
+    fail after that, they are listed and will be retried by the next
+    run of the script on the same range.
 
     Usage:
 
-        $ flask full_index_offers.py 10_000_000 20_000_000
+        $ flask full_index_offers 0 20_000_000 --processes 4
 
     Using "_" as thousands separator is supported (and encouraged for
     clarity).
     """
     if start > end:
         raise ValueError('"start" must be less than "end"')
-    backend = algolia.AlgoliaBackend()
-
-    queue: list[tuple] = []
-
-    def enqueue_or_index(
-        q: list,
-        offer: offers_models.Offer | None,
-        last_30_days_bookings: dict[int, int] | None,
-        force_index: bool = False,
-    ) -> None:
-        if offer and last_30_days_bookings is not None:
-            q.append((offer, last_30_days_bookings.get(offer.id) or 0))
-        if force_index or len(q) > BATCH_SIZE:
-            try:
-                backend.index_offers([offer for offer, _ in q], {offer.id: n_bookings for offer, n_bookings in q})
-            except Exception as exc:
-                logger.exception(
-                    "Full offer reindexation: error while reindexing from %d to %d: %s", q[0][0].id, q[-1][0].id, exc
-                )
-            q.clear()
-
-    to_report = 0
-    elapsed_per_batch = []
-
-    while start <= end:
-        start_time = time.perf_counter()
-        offers = (
-            search.get_base_query_for_offer_indexation()
-            .filter(
-                offers_models.Offer.isActive,
-                offers_models.Offer.id.between(start, min(start + BATCH_SIZE, end)),
-            )
-            .order_by(offers_models.Offer.id)
-        )
-        last_x_days_bookings_count_by_offer = search.get_last_x_days_booking_count_by_offer(offers)
-        for offer in offers:
-            if offer.is_eligible_for_search:
-                enqueue_or_index(queue, offer, last_x_days_bookings_count_by_offer)
-        elapsed_per_batch.append(int(time.perf_counter() - start_time))
-        start = start + BATCH_SIZE
-        eta = _get_eta(end, start, elapsed_per_batch)
-        to_report += BATCH_SIZE
-        if to_report >= REPORT_EVERY:
-            to_report = 0
-            print(f"  => OK: {start} | eta = {eta}")
-    enqueue_or_index(queue, offer=None, last_30_days_bookings=None, force_index=True)
+    run = (start, end)
+    redis_client = get_redis_client()
+    if restart:
+        redis_client.delete(REDIS_CHECKPOINTS_KEY % run, REDIS_FAILED_BATCHES_KEY % run)
+
+    shards = [
+        (shard_start, min(shard_start + shard_size - 1, end)) for shard_start in range(start, end + 1, shard_size)
+    ]
+    progress = Progress(ids_to_process=_get_ids_to_process(run, shards))
+    index_shard = functools.partial(_index_shard, run)
+
+    if processes > 1:
+        # Make sure that no connection is inherited by child processes.
+        db.session.close()
+        db.engine.dispose()
+        with multiprocessing.get_context("fork").Pool(processes, initializer=_init_worker) as pool:
+            for result in pool.imap_unordered(index_shard, shards):
+                progress.update(result)
+                print(progress.report())
+    else:
+        for shard in shards:
+            progress.update(index_shard(shard))
+            print(progress.report())
+
+    still_failing_batches = _retry_failed_batches(run)
+    if still_failing_batches:
+        print(f"{still_failing_batches} batches still fail, run the same command again to retry them:")
+        for failed_batch in sorted(redis_client.smembers(REDIS_FAILED_BATCHES_KEY % run)):
+            print(f"  - {failed_batch}")
+        return
+
+    redis_client.delete(REDIS_CHECKPOINTS_KEY % run, REDIS_FAILED_BATCHES_KEY % run)
     print("Done")
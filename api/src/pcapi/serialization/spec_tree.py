@@ -137,3 +137,16 @@ def _is_same_enum(current_definition: dict, incoming_definition: dict) -> bool:
 class ExtendResponse(Response):
     def generate_spec(self, _naming_strategy: Callable[[type[BaseModel]], str] | None = None) -> dict[str, Any]:
         return super().generate_spec(naming_strategy=get_model_key)
+
+
+class UnvalidatedResponse(ExtendResponse):
+    """Document the responses of a route without validating them.
+
+    Only meant for routes that serve payloads which have already been
+    validated, e.g. serialized once for all at startup.
+    """
+
+    def find_model(self, code: int) -> Any:
+        # spectree only looks for the model of a status code to validate
+        # the response, the documentation relies on `code_models`.
+        return None
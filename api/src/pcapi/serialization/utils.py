@@ -1,5 +1,6 @@
 import datetime
 import decimal
+import hashlib
 import ipaddress
 import typing
 from functools import partial
@@ -330,3 +331,20 @@ def _validate_nullable_phone_number(number: str | None) -> str | None:
 def phone_number_validator(field_name: str, nullable: bool = False) -> classmethod:
     func = _validate_nullable_phone_number if nullable else _validate_phone_number
     return validator(field_name, allow_reuse=True)(func)
+
+
+class PrecomputedJsonResponse:
+    """JSON response whose content never changes while the application
+    runs: it is serialized once, and served with a strong ETag so that
+    clients which already have it get a "304 Not Modified" response.
+    """
+
+    def __init__(self, content: pydantic_v2.BaseModel) -> None:
+        self.data = content.model_dump_json(by_alias=True).encode("utf-8")
+        self.etag = hashlib.sha256(self.data).hexdigest()
+
+    def make_response(self) -> flask.Response:
+        response = flask.Response(self.data, mimetype="application/json")
+        response.set_etag(self.etag)
+        response.make_conditional(flask.request)
+        return response
@@ -103,6 +103,9 @@ LOG_PLAIN_TEXT = bool(int(os.environ.get("LOG_PLAIN_TEXT", 0)))
 NATIVE_APP_MINIMAL_CLIENT_VERSION = semver.VersionInfo.parse(
     os.environ.get("NATIVE_APP_MINIMAL_CLIENT_VERSION", "1.132.1")
 )
+# seconds during which the serialized offers sent to the native app are
+# cached (unless they are modified). 0 disables the cache.
+NATIVE_OFFER_RESPONSE_CACHE_DURATION = int(os.environ.get("NATIVE_OFFER_RESPONSE_CACHE_DURATION", 60))
 
 
 # REDIS
@@ -175,6 +178,8 @@ ALGOLIA_DELETING_COLLECTIVE_OFFERS_CHUNK_SIZE = int(
     os.environ.get("ALGOLIA_DELETING_COLLECTIVE_OFFERS_CHUNK_SIZE", 10000)
 )
 ALGOLIA_OFFERS_INDEX_MAX_SIZE = int(os.environ.get("ALGOLIA_OFFERS_INDEX_MAX_SIZE", -1))
+# seconds during which the size of the offers index is not checked again
+ALGOLIA_OFFERS_INDEX_SIZE_CACHE_DURATION = int(os.environ.get("ALGOLIA_OFFERS_INDEX_SIZE_CACHE_DURATION", 10))
 
 ALGOLIA_ARTIST_MIN_APP_SEARCH_SCORE = int(os.environ.get("ALGOLIA_ARTIST_MIN_APP_SEARCH_SCORE", 2))
 ALGOLIA_OFFERS_BY_ARTIST_CHUNK_SIZE = int(os.environ.get("ALGOLIA_OFFERS_BY_ARTIST_CHUNK_SIZE", 10000))
@@ -182,6 +187,15 @@ ALGOLIA_OFFERS_BY_VENUE_CHUNK_SIZE = int(os.environ.get("ALGOLIA_OFFERS_BY_VENUE
 ALGOLIA_LAST_30_DAYS_BOOKINGS_RANGE_THRESHOLDS = utils.env_get_list(
     "ALGOLIA_LAST_30_DAYS_BOOKINGS_RANGE_THRESHOLDS", type_=int
 )
+# Number of threads that push offers to Algolia when reindexing offers
+# from the queue. 0 disables the pipelined mode.
+ALGOLIA_OFFERS_INDEXATION_WORKERS = int(os.environ.get("ALGOLIA_OFFERS_INDEXATION_WORKERS", 0))
+ALGOLIA_OFFERS_INDEXATION_MAX_IN_FLIGHT_BATCHES = int(
+    os.environ.get("ALGOLIA_OFFERS_INDEXATION_MAX_IN_FLIGHT_BATCHES", 4)
+)
+# Do not send offers whose serialized version has not changed since
+# their last indexation.
+ALGOLIA_SKIP_UNCHANGED_OFFERS = bool(int(os.environ.get("ALGOLIA_SKIP_UNCHANGED_OFFERS", 0)))
 CATCH_INDEXATION_EXCEPTIONS = bool(int(os.environ.get("CATCH_INDEXATION_EXCEPTIONS", 1)))
 ENABLE_UNINDEXING_ALL = bool(int(os.environ.get("ENABLE_UNINDEXING_ALL", 0)))
 ENABLE_INDEXATION_CHERRY_PICK_FOR_STAGING = bool(int(os.environ.get("ENABLE_INDEXATION_CHERRY_PICK_FOR_STAGING", 0)))
@@ -305,6 +319,12 @@ EMS_GOOGLE_DRIVE_FOLDER = os.environ.get("EMS_GOOGLE_DRIVE_FOLDER", "")
 CDS_SUPPORT_EMAIL_ADDRESS = os.environ.get("CDS_SUPPORT_EMAIL_ADDRESS", "")
 CGR_SUPPORT_EMAIL_ADDRESS = os.environ.get("CGR_SUPPORT_EMAIL_ADDRESS", "")
 EMS_SUPPORT_EMAIL_ADDRESS = os.environ.get("EMS_SUPPORT_EMAIL_ADDRESS", "")
+# Maximum number of venues synchronized at the same time with the API of
+# each cinema provider, so that we stay below their rate limits.
+BOOST_MAX_CONCURRENT_SYNCS = int(os.environ.get("BOOST_MAX_CONCURRENT_SYNCS", 2))
+CDS_MAX_CONCURRENT_SYNCS = int(os.environ.get("CDS_MAX_CONCURRENT_SYNCS", 4))
+CGR_MAX_CONCURRENT_SYNCS = int(os.environ.get("CGR_MAX_CONCURRENT_SYNCS", 2))
+EMS_MAX_CONCURRENT_SYNCS = int(os.environ.get("EMS_MAX_CONCURRENT_SYNCS", 4))
 
 # DEMARCHES SIMPLIFIEES
 DMS_VENUE_PROCEDURE_ID_V4 = os.environ.get("DEMARCHES_SIMPLIFIEES_RIB_VENUE_PROCEDURE_ID_V4", 0)
@@ -614,6 +634,9 @@ PG_STAT_FOLDER_ID = secrets_utils.get("PG_STAT_FOLDER_ID", "")
 # GDPR configuration
 GDPR_MAX_EXTRACT_PER_DAY = int(os.environ.get("GDPR_MAX_EXTRACT_PER_DAY", "10"))
 GDPR_LOCK_TIMEOUT = int(os.environ.get("GDPR_LOCK_TIMEOUT", "900"))
+# beneficiaries are anonymized by chunks, with concurrent calls to external services
+GDPR_ANONYMIZATION_CHUNK_SIZE = int(os.environ.get("GDPR_ANONYMIZATION_CHUNK_SIZE", "200"))
+GDPR_ANONYMIZATION_MAX_WORKERS = int(os.environ.get("GDPR_ANONYMIZATION_MAX_WORKERS", "10"))
 
 # DISCORD pass culture bot
 DISCORD_CLIENT_SECRET = secrets_utils.get("DISCORD_CLIENT_SECRET")
@@ -637,6 +660,12 @@ CLICKHOUSE_BACKEND = os.environ.get(
 CLICKHOUSE_IP = secrets_utils.get("CLICKHOUSE_IP", "127.0.0.1")
 CLICKHOUSE_USER = secrets_utils.get("CLICKHOUSE_USER", "default")
 CLICKHOUSE_PASSWORD = secrets_utils.get("CLICKHOUSE_PASSWORD")
+# seconds during which the results of ClickHouse queries are cached. They
+# are never kept beyond the next daily refresh of the analytics tables,
+# which is done at CLICKHOUSE_ANALYTICS_REFRESH_HOUR (UTC). 0 disables
+# the cache.
+CLICKHOUSE_QUERY_CACHE_DURATION = int(os.environ.get("CLICKHOUSE_QUERY_CACHE_DURATION", 6 * 60 * 60))
+CLICKHOUSE_ANALYTICS_REFRESH_HOUR = int(os.environ.get("CLICKHOUSE_ANALYTICS_REFRESH_HOUR", 5))
 
 
 # CEGID
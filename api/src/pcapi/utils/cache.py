@@ -4,6 +4,7 @@ from functools import wraps
 from hashlib import sha256
 from typing import Any
 from typing import Callable
+from typing import Collection
 from typing import Iterable
 from typing import cast
 
@@ -73,6 +74,69 @@ def get_from_cache(
     return cast(pydantic_v1.BaseModel, _CacheProxy(data=data))
 
 
+def get_many_from_versioned_cache(
+    *,
+    retriever: Callable[[list[Any]], dict[Any, str]],
+    ids: Collection[Any],
+    key_template: str,
+    version_key_template: str,
+    expire: int,
+) -> dict[Any, str]:
+    """
+    Retrieve the data of many objects from cache if available else use the retriever callable to retrieve the
+    missing data and store them in cache.
+
+    The data of an object is stored under the current version of this object, see `bump_cache_versions()`. Data
+    stored after the version has been bumped (e.g. retrieved by a concurrent request from outdated rows) are thus
+    never read.
+
+    :param retriever: Function to call with the list of ids that are not in the cache. It must return a `dict` of
+        serialized data by id. Missing ids are not cached.
+    :param ids: ids of the objects to retrieve.
+    :param key_template: A template to generate the key of the data of an object, filled with its `id` and
+        `version`.
+    :param version_key_template: A template to generate the key of the version of an object, filled with its `id`.
+    :param expire: The number of seconds before the cached data expire.
+    """
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        return {}
+
+    redis_client = get_redis_client()
+    versions = redis_client.mget([version_key_template % {"id": id_} for id_ in ids])
+    keys = {id_: key_template % {"id": id_, "version": version or 0} for id_, version in zip(ids, versions)}
+    cached = redis_client.mget(list(keys.values()))
+    data = {id_: value for id_, value in zip(ids, cached) if value is not None}
+
+    missing_ids = [id_ for id_ in ids if id_ not in data]
+    if missing_ids:
+        retrieved = {id_: value for id_, value in retriever(missing_ids).items() if id_ in keys}
+        if retrieved:
+            with redis_client.pipeline(transaction=False) as pipeline:
+                for id_, value in retrieved.items():
+                    pipeline.set(keys[id_], value, ex=expire)
+                pipeline.execute()
+        data.update(retrieved)
+    return data
+
+
+def bump_cache_versions(*, ids: Collection[Any], version_key_template: str, expire: int) -> None:
+    """
+    Invalidate the data cached by `get_many_from_versioned_cache()` for the given ids.
+
+    :param expire: The number of seconds before the versions expire. It must be greater than the expiration of the
+        cached data, otherwise outdated data could be read again once the version has expired.
+    """
+    if not ids:
+        return
+    with get_redis_client().pipeline(transaction=False) as pipeline:
+        for id_ in ids:
+            version_key = version_key_template % {"id": id_}
+            pipeline.incr(version_key)
+            pipeline.expire(version_key, expire)
+        pipeline.execute()
+
+
 def cached_view(
     *,
     prefix: str = "default",
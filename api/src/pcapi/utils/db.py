@@ -157,6 +157,42 @@ def make_inclusive_daterange(
     )
 
 
+def yield_id_batches_by_keyset(
+    query: sa.Select[tuple[int]],
+    id_column: sa.orm.InstrumentedAttribute[int],
+    batch_size: int,
+    start_id: int | None = None,
+    start_page: int = 1,
+) -> typing.Iterator[list[int]]:
+    """Yield ids returned by ``query``, by batches of ``batch_size``,
+    in ascending order.
+
+    Unlike OFFSET-based pagination, each batch is fetched by looking
+    for ids greater than the last id of the previous batch: the cost
+    of fetching a batch does not depend on its position.
+
+    If ``start_page`` is given, previous batches are skipped with a
+    single query, that only fetches the first id of this page.
+    """
+    if start_id is not None:
+        query = query.filter(id_column >= start_id)
+    if start_page > 1:
+        first_id = db.session.scalar(query.order_by(id_column).offset((start_page - 1) * batch_size).limit(1))
+        if first_id is None:
+            return
+        query = query.filter(id_column >= first_id)
+    first_page = query.order_by(id_column).limit(batch_size)
+    # The bound is a parameter, so that the statement is the same for
+    # all pages (and can be cached).
+    next_page = query.filter(id_column > sa.bindparam("last_id")).order_by(id_column).limit(batch_size)
+    ids = list(db.session.scalars(first_page))
+    while ids:
+        yield ids
+        if len(ids) < batch_size:
+            return
+        ids = list(db.session.scalars(next_page, {"last_id": ids[-1]}))
+
+
 class BadSortError(Exception):
     pass
 
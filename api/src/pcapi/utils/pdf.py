@@ -1,13 +1,15 @@
+import contextlib
 import json
+import os
 import pathlib
 import shutil
 import tempfile
 import threading
 import typing
 import urllib.parse
+from concurrent import futures
 from dataclasses import dataclass
 from datetime import datetime
-from io import BytesIO
 
 import weasyprint
 from pypdf import PdfReader
@@ -19,6 +21,8 @@ from pcapi.utils import requests
 
 PDF_AUTHOR = "Pass Culture"
 url_fetcher_container = threading.local()
+MERGE_PDF_MAX_WORKERS = 8
+MERGE_PDF_DOWNLOAD_CHUNK_SIZE = 64 * 1024
 
 
 @dataclass
@@ -57,6 +61,12 @@ class CachingUrlFetcher(weasyprint.URLFetcher):
         except Exception:
             pass
 
+    def _write_atomically(self, path: pathlib.Path, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(data)
+        os.replace(tmp_path, path)
+
     def fetch(self, url: str, headers: dict | None = None) -> weasyprint.urls.URLFetcherResponse:
         base_cache_key = urllib.parse.quote_plus(url)
         content_cache_key = base_cache_key + ".content"
@@ -73,10 +83,12 @@ class CachingUrlFetcher(weasyprint.URLFetcher):
         result = super().fetch(url, headers)
 
         content = result.read()
-        with content_path.open("bx") as fp:
-            fp.write(content)
-        with headers_path.open("tx", encoding="utf-8") as fp:
-            fp.write(json.dumps(dict(result.headers)))
+        # The cache may be shared by several processes (see
+        # `create_shared_url_fetcher_cache()`): write each file
+        # atomically, and the content last since it is what tells
+        # whether an URL is cached.
+        self._write_atomically(headers_path, json.dumps(dict(result.headers)).encode("utf-8"))
+        self._write_atomically(content_path, content)
         if result._file_obj.seekable():
             result._file_obj.seek(0)
             return result
@@ -90,6 +102,14 @@ def _get_url_fetcher() -> CachingUrlFetcher:
     return url_fetcher_container.fetcher
 
 
+def create_shared_url_fetcher_cache() -> None:
+    """Create the cache of the URL fetcher of the current thread, so
+    that processes that are forked afterwards share it instead of each
+    fetching the same assets and filling its own cache.
+    """
+    _get_url_fetcher()
+
+
 def generate_pdf_from_html(html_content: str, metadata: PdfMetadata | None = None) -> bytes:
     fetcher = _get_url_fetcher()
     document = weasyprint.HTML(string=html_content, url_fetcher=fetcher).render()
@@ -103,18 +123,49 @@ def generate_pdf_from_html(html_content: str, metadata: PdfMetadata | None = Non
     return document.write_pdf()
 
 
-def merge_pdf_files(pdf_urls: list[str]) -> bytes:
+def _download_pdf(pdf_url: str) -> typing.IO[bytes]:
+    file = tempfile.TemporaryFile()
+    try:
+        with requests.Session() as session, session.get(pdf_url, stream=True) as response:
+            for chunk in response.iter_content(chunk_size=MERGE_PDF_DOWNLOAD_CHUNK_SIZE):
+                file.write(chunk)
+    except Exception:
+        file.close()
+        raise FileNotFoundError(pdf_url)
+    file.seek(0)
+    return file
+
+
+def merge_pdf_files(pdf_urls: list[str]) -> typing.IO[bytes]:
+    """Download PDF files and merge them, in the given order.
+
+    Files are downloaded concurrently and spooled to disk, and so is
+    the merged file, which is returned as an open temporary file (that
+    is deleted once closed), ready to be streamed to the client.
+    """
+    merged_file = tempfile.TemporaryFile()
     merger = PdfWriter()
-    tmp = BytesIO()
+    with contextlib.ExitStack() as exit_stack:
+        with futures.ThreadPoolExecutor(max_workers=MERGE_PDF_MAX_WORKERS) as executor:
+            downloads = [executor.submit(_download_pdf, pdf_url) for pdf_url in pdf_urls]
+        # Downloaded files are deleted once closed.
+        for download in downloads:
+            if not download.exception():
+                exit_stack.callback(download.result().close)
 
-    for pdf_url in pdf_urls:
         try:
-            pdf_reader = PdfReader(BytesIO(requests.get(pdf_url).content))
+            for pdf_url, download in zip(pdf_urls, downloads):
+                try:
+                    pdf_reader = PdfReader(download.result())
+                except Exception:
+                    raise FileNotFoundError(pdf_url)
+                merger.append(pdf_reader)
+            merger.write(merged_file)
         except Exception:
+            merged_file.close()
+            raise
+        finally:
             merger.close()
-            raise FileNotFoundError(pdf_url)
-        merger.append(pdf_reader)
 
-    merger.write(tmp)
-    merger.close()
-    return tmp.getvalue()
+    merged_file.seek(0)
+    return merged_file
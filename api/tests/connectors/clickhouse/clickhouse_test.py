@@ -2,9 +2,11 @@ import datetime
 from unittest import mock
 
 import pytest
+import time_machine
 
 from pcapi.connectors.clickhouse import queries as clickhouse_queries
 from pcapi.connectors.clickhouse import query_mock
+from pcapi.connectors.clickhouse.queries import base as base_queries
 
 
 class GetYearlyAggregatedOffererRevenueTest:
@@ -110,3 +112,40 @@ class OfferCumulativeViewCountsTest:
         empty = clickhouse_queries.OfferCumulativeViewCounts([])
         assert empty.count_at(datetime.datetime(2026, 1, 1)) is None
         assert empty.count_on_period(datetime.datetime(2026, 1, 1), datetime.datetime(2026, 3, 1)) is None
+
+
+class QueryCacheTest:
+    @pytest.mark.settings(CLICKHOUSE_QUERY_CACHE_DURATION=3600, CLICKHOUSE_ANALYTICS_REFRESH_HOUR=5)
+    @time_machine.travel("2026-01-01 12:00:00")
+    def test_results_are_cached(self):
+        with mock.patch("pcapi.connectors.clickhouse.testing_backend.TestingBackend.run_query") as mock_run_query:
+            mock_run_query.return_value = query_mock.AGGREGATED_TOTAL_VENUE_REVENUE
+            results = clickhouse_queries.AggregatedTotalRevenueQuery().execute({"venue_ids": (1, 2)})
+            cached_results = clickhouse_queries.AggregatedTotalRevenueQuery().execute({"venue_ids": (2, 1, 2)})
+            other_results = clickhouse_queries.AggregatedTotalRevenueQuery().execute({"venue_ids": (1,)})
+
+        assert mock_run_query.call_count == 2
+        assert cached_results == results
+        assert other_results == results
+
+    @pytest.mark.parametrize(
+        "now,expected_expiration",
+        [
+            ("2026-01-01 04:00:00", 3600),
+            ("2026-01-01 04:30:00", 1800),
+            ("2026-01-01 05:00:00", 3600),
+            ("2026-01-01 23:00:00", 3600),
+        ],
+    )
+    @pytest.mark.settings(CLICKHOUSE_QUERY_CACHE_DURATION=3600, CLICKHOUSE_ANALYTICS_REFRESH_HOUR=5)
+    def test_cache_expires_at_analytics_refresh(self, now, expected_expiration):
+        with time_machine.travel(now):
+            assert base_queries.get_cache_expiration() == expected_expiration
+
+    def test_cache_disabled(self):
+        with mock.patch("pcapi.connectors.clickhouse.testing_backend.TestingBackend.run_query") as mock_run_query:
+            mock_run_query.return_value = query_mock.AGGREGATED_TOTAL_VENUE_REVENUE
+            clickhouse_queries.AggregatedTotalRevenueQuery().execute({"venue_ids": (1, 2)})
+            clickhouse_queries.AggregatedTotalRevenueQuery().execute({"venue_ids": (1, 2)})
+
+        assert mock_run_query.call_count == 2
@@ -1,6 +1,5 @@
 import logging
 import uuid
-from unittest.mock import call
 from unittest.mock import patch
 
 import pytest
@@ -290,8 +289,10 @@ class UpdateArtistScoresTest:
         self, mock_async_index_artist_ids, mock_query, caplog
     ):
         artist = ArtistFactory(app_search_score=0.0, pro_search_score=0.0)
+        unchanged_artist = ArtistFactory(app_search_score=1.0, pro_search_score=2.0)
         fake_bq_data = [
             ArtistScoresModel(id=artist.id, app_search_score=8.5, pro_search_score=9.0),
+            ArtistScoresModel(id=unchanged_artist.id, app_search_score=1.0, pro_search_score=2.0),
             ArtistScoresModel(id="unknown-id-123", app_search_score=50.0, pro_search_score=50.0),
         ]
         mock_query.return_value = fake_bq_data
@@ -300,40 +301,11 @@ class UpdateArtistScoresTest:
             importer = ArtistScoresImporter()
             importer.run_scores_update(batch_size=1)
 
+        db.session.expire_all()
         assert artist.app_search_score == 8.5
         assert artist.pro_search_score == 9.0
-        assert db.session.query(Artist).count() == 1
-        assert "Skipping scores update for missing artist" in caplog.text
+        assert unchanged_artist.app_search_score == 1.0
+        assert db.session.query(Artist).count() == 2
         assert "Finished artist scores update" in caplog.text
-        mock_async_index_artist_ids.assert_has_calls(
-            [
-                call([artist.id], reason=search.IndexationReason.ARTIST_EDITION),
-                call(["unknown-id-123"], reason=search.IndexationReason.ARTIST_EDITION),
-            ],
-            any_order=True,
-        )
-
-    @patch("pcapi.connectors.big_query.queries.artist.ArtistScoresQuery.execute")
-    def test_batch_transaction_failure_triggers_individual_retry_success(self, mock_bq_execute, caplog):
-        artist_1 = ArtistFactory(app_search_score=0.0, pro_search_score=0.0)
-        artist_2 = ArtistFactory(app_search_score=0.0, pro_search_score=0.0)
-        bq_item1 = ArtistScoresModel(id=artist_1.id, app_search_score=10.0, pro_search_score=5.0)
-        bq_item2 = ArtistScoresModel(id=artist_2.id, app_search_score=9.87, pro_search_score=8.0)
-        mock_bq_execute.return_value = iter([bq_item1, bq_item2])
-
-        with patch("pcapi.models.db.session.commit") as mock_commit:
-            mock_commit.side_effect = [
-                sa_exc.SQLAlchemyError("Simulated Batch Commit Failure"),
-                None,
-                None,
-            ]
-            importer = ArtistScoresImporter()
-            importer.run_scores_update(batch_size=2)
-
-            assert mock_commit.call_count == 3
-            assert "Batch update failed" in caplog.text
-            assert "Retrying one by one" in caplog.text
-            assert artist_1.app_search_score == 10.0
-            assert artist_1.pro_search_score == 5.0
-            assert artist_2.app_search_score == 9.87
-            assert artist_2.pro_search_score == 8.0
+        # only artists whose scores have changed are reindexed
+        mock_async_index_artist_ids.assert_called_once_with([artist.id], reason=search.IndexationReason.ARTIST_EDITION)
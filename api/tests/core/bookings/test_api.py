@@ -2131,6 +2131,17 @@ class ArchiveOldBookingsTest:
         assert old_booking.displayAsEnded
 
 
+@pytest.mark.usefixtures("db_session")
+def test_delete_old_stock_daily_booking_counts():
+    now = date_utils.get_naive_utc_now()
+    recent_booking = bookings_factories.BookingFactory(dateCreated=now - timedelta(days=30))
+    bookings_factories.BookingFactory(stock=recent_booking.stock, dateCreated=now - timedelta(days=40))
+
+    api.delete_old_stock_daily_booking_counts()
+
+    assert db.session.query(models.StockDailyBookingCount.day).all() == [(recent_booking.dateCreated.date(),)]
+
+
 @pytest.mark.usefixtures("db_session")
 class CancelExpiredBookingsTest:
     def test_should_cancel_old_thing_that_can_expire_booking(self, app) -> None:
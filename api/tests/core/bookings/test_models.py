@@ -61,6 +61,40 @@ def test_save_cancellation_date_postgresql_function():
     assert booking.cancellationDate is None
 
 
+def test_update_stock_daily_booking_count_postgresql_function():
+    def get_counts():
+        return {
+            (row.stockId, row.day): row.bookingCount for row in db.session.query(models.StockDailyBookingCount).all()
+        }
+
+    yesterday = date_utils.get_naive_utc_now() - timedelta(days=1)
+    booking = factories.BookingFactory()
+    stock_id = booking.stockId
+    factories.BookingFactory(stock=booking.stock)
+    factories.BookingFactory(stock=booking.stock, dateCreated=yesterday)
+    factories.CancelledBookingFactory(stock=booking.stock)
+    today_key = (stock_id, booking.dateCreated.date())
+    yesterday_key = (stock_id, yesterday.date())
+    assert get_counts() == {today_key: 2, yesterday_key: 1}
+
+    booking.status = BookingStatus.USED
+    db.session.flush()
+    assert get_counts() == {today_key: 2, yesterday_key: 1}
+
+    booking.status = BookingStatus.CANCELLED
+    db.session.flush()
+    assert get_counts() == {today_key: 1, yesterday_key: 1}
+
+    booking.status = BookingStatus.CONFIRMED
+    db.session.flush()
+    assert get_counts() == {today_key: 2, yesterday_key: 1}
+
+    other_stock = factories.BookingFactory().stock
+    booking.stock = other_stock
+    db.session.flush()
+    assert get_counts() == {today_key: 1, yesterday_key: 1, (other_stock.id, today_key[1]): 2}
+
+
 def test_booking_completed_url_gets_normalized():
     booking = factories.BookingFactory(
         token="ABCDEF",
@@ -683,6 +683,15 @@ class FindByVenueTest:
 
 
 class GetOfferBookingsByStatusCSVTest:
+    def _export_csv(self, offer_id: int, event_beginning_date: date, validated_only: bool) -> str:
+        export = booking_repository.stream_bookings_by_offer_id(
+            offer_id=offer_id,
+            event_beginning_date=event_beginning_date,
+            export_type=BookingExportType.CSV,
+            validated_only=validated_only,
+        )
+        return b"".join(export).decode("utf-8-sig")
+
     def _validate_csv_row(
         self, data_dict: dict, beneficiary: User, offer: Offer, venue: Venue, booking: Booking, status: str, duo: str
     ):
@@ -769,10 +778,10 @@ class GetOfferBookingsByStatusCSVTest:
 
         offer_id = offer.id
         with assert_num_queries(queries):
-            bookings_csv = booking_repository.export_validated_bookings_by_offer_id(
+            bookings_csv = self._export_csv(
                 offer_id=offer_id,
                 event_beginning_date=date.today() + timedelta(days=10),
-                export_type=BookingExportType.CSV,
+                validated_only=True,
             )
 
         headers, *data = csv.reader(StringIO(bookings_csv), delimiter=";")
@@ -824,10 +833,10 @@ class GetOfferBookingsByStatusCSVTest:
 
         offer_id = offer.id
         with assert_num_queries(queries):
-            bookings_csv = booking_repository.export_validated_bookings_by_offer_id(
+            bookings_csv = self._export_csv(
                 offer_id=offer_id,
                 event_beginning_date=date.today() + timedelta(days=10),
-                export_type=BookingExportType.CSV,
+                validated_only=True,
             )
 
         headers, *data = csv.reader(StringIO(bookings_csv), delimiter=";")
@@ -869,10 +878,10 @@ class GetOfferBookingsByStatusCSVTest:
         bookings_factories.UsedBookingFactory(stock=stock_2, user=beneficiary_2)
         bookings_factories.BookingFactory(stock=stock_2)
 
-        bookings_csv = booking_repository.export_validated_bookings_by_offer_id(
+        bookings_csv = self._export_csv(
             offer_id=offer.id,
             event_beginning_date=date.today() + timedelta(days=5),
-            export_type=BookingExportType.CSV,
+            validated_only=True,
         )
 
         headers, *data = csv.reader(StringIO(bookings_csv), delimiter=";")
@@ -918,10 +927,10 @@ class GetOfferBookingsByStatusCSVTest:
         reimbursed_booking = bookings_factories.ReimbursedBookingFactory(user=beneficiary_3, stock=stock)
         new_booking = bookings_factories.BookingFactory(user=beneficiary_4, stock=stock)
 
-        bookings_csv = booking_repository.export_bookings_by_offer_id(
+        bookings_csv = self._export_csv(
             offer_id=offer.id,
             event_beginning_date=date.today() + timedelta(days=10),
-            export_type=BookingExportType.CSV,
+            validated_only=False,
         )
 
         headers, *data = csv.reader(StringIO(bookings_csv), delimiter=";")
@@ -962,10 +971,10 @@ class GetOfferBookingsByStatusCSVTest:
         reimbursed_booking = bookings_factories.ReimbursedBookingFactory(user=beneficiary, stock=stock)
         new_booking = bookings_factories.BookingFactory(user=beneficiary_2, stock=stock, quantity=2)
 
-        bookings_csv = booking_repository.export_bookings_by_offer_id(
+        bookings_csv = self._export_csv(
             offer_id=offer.id,
             event_beginning_date=date.today() + timedelta(days=5),
-            export_type=BookingExportType.CSV,
+            validated_only=False,
         )
 
         headers, *data = csv.reader(StringIO(bookings_csv), delimiter=";")
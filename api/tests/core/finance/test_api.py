@@ -1,6 +1,7 @@
 import csv
 import datetime
 import io
+import multiprocessing.pool
 import pathlib
 import zipfile
 from decimal import Decimal
@@ -20,9 +21,11 @@ from pcapi.core.educational import factories as educational_factories
 from pcapi.core.educational import models as educational_models
 from pcapi.core.educational.validation import check_institution_fund
 from pcapi.core.finance import api
+from pcapi.core.finance import conf
 from pcapi.core.finance import exceptions
 from pcapi.core.finance import factories
 from pcapi.core.finance import models
+from pcapi.core.finance import reimbursement_rules
 from pcapi.core.finance import utils
 from pcapi.core.history import models as history_models
 from pcapi.core.object_storage.testing import recursive_listdir
@@ -44,6 +47,9 @@ import tests
 from tests.routes.backoffice.helpers import html_parser
 
 
+STORAGE_DIR = pathlib.Path(tests.__path__[0]) / ".." / "src" / "pcapi" / "static" / "object_store_data"
+
+
 pytestmark = pytest.mark.usefixtures("db_session")
 
 
@@ -922,6 +928,53 @@ class PriceEventTest:
         assert pricing2.revenue == 3000
         assert pricing3.revenue == 3000  # collective bookings are not included in revenue
 
+    @pytest.mark.features(WIP_ENABLE_PRICING_POINT_YEARLY_REVENUE=True)
+    def test_read_revenue_from_yearly_revenue_table(self):
+        event1 = self._make_individual_event(price=10)
+        venue = event1.booking.venue
+        api.price_event(event1)
+        db.session.query(models.PricingPointYearlyRevenue).filter_by(pricingPointId=venue.id).update({"revenue": 500})
+        event2 = self._make_individual_event(venue=venue, price=20)
+
+        pricing2 = api.price_event(event2)
+
+        assert pricing2.revenue == 520_00
+
+    @pytest.mark.features(WIP_ENABLE_PRICING_POINT_YEARLY_REVENUE=False)
+    def test_sum_revenue_from_pricings_until_yearly_revenues_are_filled(self):
+        event1 = self._make_individual_event(price=10)
+        venue = event1.booking.venue
+        api.price_event(event1)
+        # as if the pricing existed before the table was created
+        db.session.query(models.PricingPointYearlyRevenue).delete()
+        event2 = self._make_individual_event(venue=venue, price=20)
+
+        pricing2 = api.price_event(event2)
+
+        assert pricing2.revenue == 30_00
+
+    def test_revenue_excludes_cancelled_and_deleted_pricings(self):
+        event1 = self._make_individual_event(price=10)
+        venue = event1.booking.venue
+        event2 = self._make_individual_event(venue=venue, price=20)
+        api.price_event(event1)
+        api.price_event(event2)
+        year = api._get_revenue_year(event1.valueDate)
+        yearly_revenue = db.session.query(models.PricingPointYearlyRevenue).filter_by(pricingPointId=venue.id).one()
+        assert yearly_revenue.year == year
+        assert yearly_revenue.revenue == 30
+
+        # Cancelling the first pricing deletes the (dependent) second one.
+        api.force_event_repricing(event1, models.PricingLogReason.MARK_AS_UNUSED)
+        db.session.flush()
+        db.session.refresh(yearly_revenue)
+        assert yearly_revenue.revenue == 0
+
+        event3 = self._make_individual_event(venue=venue, price=40)
+        pricing3 = api.price_event(event3)
+        assert pricing3.revenue == 4000
+        assert api.get_pricing_point_yearly_revenue_discrepancies() == []
+
     def test_price_with_dependent_event(self):
         event1 = self._make_individual_event()
         api.price_event(event1)
@@ -1033,7 +1086,7 @@ class PriceEventsTest:
         assert event1.status == models.FinanceEventStatus.PRICED
         assert event2.status == models.FinanceEventStatus.PRICED
 
-    @mock.patch("pcapi.core.finance.api.price_event", lambda booking: None)
+    @mock.patch("pcapi.core.finance.api.price_event", lambda event, rule_finder: None)
     def test_num_queries(self):
         factories.UsedBookingFinanceEventFactory(
             booking__dateUsed=self.few_minutes_ago,
@@ -1045,11 +1098,45 @@ class PriceEventsTest:
         )
 
         n_queries = 0
+        n_queries += 1  # select custom reimbursement rules
         n_queries += 1  # count of events to price
         n_queries += 1  # select events
         with assert_num_queries(n_queries):
             api.price_events(min_date=self.few_minutes_ago)
 
+    def test_load_custom_rules_once(self):
+        for _ in range(3):
+            factories.UsedBookingFinanceEventFactory(
+                booking__dateUsed=self.few_minutes_ago,
+                booking__stock__offer__venue__pricing_point="self",
+            )
+
+        with mock.patch.object(
+            reimbursement_rules.CustomRuleFinder,
+            "_load",
+            autospec=True,
+            side_effect=reimbursement_rules.CustomRuleFinder._load,
+        ) as load_rules:
+            api.price_events(min_date=self.few_minutes_ago)
+
+        assert db.session.query(models.Pricing).count() == 3
+        assert load_rules.call_count == 1
+
+    def test_price_events_of_a_single_pricing_point(self):
+        event1 = factories.UsedBookingFinanceEventFactory(
+            booking__dateUsed=self.few_minutes_ago,
+            booking__stock__offer__venue__pricing_point="self",
+        )
+        event2 = factories.UsedBookingFinanceEventFactory(
+            booking__dateUsed=self.few_minutes_ago,
+            booking__stock__offer__venue__pricing_point="self",
+        )
+        window = (self.few_minutes_ago, date_utils.get_naive_utc_now())
+        api._price_events_in_window(window, batch_size=10, pricing_point_id=event1.pricingPointId)
+
+        assert event1.status == models.FinanceEventStatus.PRICED
+        assert event2.status == models.FinanceEventStatus.READY
+
 
 class AddEventTest:
     def test_used(self):
@@ -1590,6 +1677,44 @@ class GetRevenuePeriodTest:
         assert period == (start, end)
 
 
+class GetPricingPointYearlyRevenueDiscrepanciesTest:
+    def test_revenue_is_maintained_by_year(self):
+        venue = offerers_factories.VenueFactory(pricing_point="self")
+        # Year is 2022 in CET.
+        factories.PricingFactory(
+            pricingPoint=venue,
+            valueDate=datetime.datetime(2021, 12, 31, 23, 30),
+            booking__amount=10,
+            booking__stock__offer__venue=venue,
+        )
+        factories.PricingFactory(
+            pricingPoint=venue,
+            valueDate=datetime.datetime(2022, 1, 2),
+            booking__amount=20,
+            booking__stock__offer__venue=venue,
+        )
+        factories.PricingFactory(
+            pricingPoint=venue,
+            status=models.PricingStatus.CANCELLED,
+            valueDate=datetime.datetime(2022, 1, 2),
+            booking__amount=40,
+            booking__stock__offer__venue=venue,
+        )
+
+        yearly_revenues = db.session.query(models.PricingPointYearlyRevenue).all()
+        assert [(r.pricingPointId, r.year, r.revenue) for r in yearly_revenues] == [(venue.id, 2022, 30)]
+        assert api.get_pricing_point_yearly_revenue_discrepancies() == []
+
+    def test_discrepancy(self):
+        pricing = factories.PricingFactory(booking__amount=10)
+        year = api._get_revenue_year(pricing.valueDate)
+        db.session.query(models.PricingPointYearlyRevenue).update({"revenue": 12})
+
+        discrepancies = api.get_pricing_point_yearly_revenue_discrepancies()
+        assert discrepancies == [(pricing.pricingPointId, year, Decimal(12), Decimal(10))]
+        assert api.get_pricing_point_yearly_revenue_discrepancies(year - 1) == []
+
+
 def test_get_next_cashflow_batch_label():
     label = api._get_next_cashflow_batch_label()
     assert label == "VIR1"
@@ -1900,6 +2025,116 @@ class GenerateCashflowsTest:
 
         assert db.session.query(models.Cashflow).count() == 2
 
+    def test_resume_interrupted_generation(self, app):
+        venue = offerers_factories.VenueFactory(pricing_point="self", bank_account=factories.BankAccountFactory())
+        pricing = factories.PricingFactory(
+            status=models.PricingStatus.VALIDATED,
+            booking__stock__offer__venue=venue,
+        )
+        interrupted_batch = factories.CashflowBatchFactory(cutoff=date_utils.get_naive_utc_now())
+        app.redis_client.set(conf.REDIS_GENERATE_CASHFLOW_BATCH, interrupted_batch.id)
+
+        batch = api.generate_cashflows(cutoff=date_utils.get_naive_utc_now() + datetime.timedelta(days=1))
+
+        assert batch == interrupted_batch
+        assert db.session.query(models.CashflowBatch).count() == 1
+        cashflow = db.session.query(models.Cashflow).one()
+        assert cashflow.batch == interrupted_batch
+        assert cashflow.pricings == [pricing]
+        assert not app.redis_client.exists(conf.REDIS_GENERATE_CASHFLOW_BATCH)
+        assert not app.redis_client.exists(conf.REDIS_GENERATE_CASHFLOW_LOCK)
+
+    @pytest.mark.parametrize(
+        "batch_kwargs,cashflow_status",
+        [
+            # Payment files have already been generated by hand
+            ({}, models.CashflowStatus.UNDER_REVIEW),
+            # Interrupted for too long
+            ({"creationDate": datetime.datetime(2020, 1, 1)}, models.CashflowStatus.PENDING),
+        ],
+    )
+    def test_do_not_resume_interrupted_generation(self, app, batch_kwargs, cashflow_status):
+        venue = offerers_factories.VenueFactory(pricing_point="self", bank_account=factories.BankAccountFactory())
+        pricing = factories.PricingFactory(
+            status=models.PricingStatus.VALIDATED,
+            booking__stock__offer__venue=venue,
+        )
+        interrupted_batch = factories.CashflowBatchFactory(
+            cutoff=date_utils.get_naive_utc_now() - datetime.timedelta(days=1), **batch_kwargs
+        )
+        factories.CashflowFactory(batch=interrupted_batch, status=cashflow_status)
+        app.redis_client.set(conf.REDIS_GENERATE_CASHFLOW_BATCH, interrupted_batch.id)
+
+        batch = api.generate_cashflows(cutoff=date_utils.get_naive_utc_now() + datetime.timedelta(days=1))
+
+        assert batch != interrupted_batch
+        cashflow = db.session.query(models.Cashflow).filter_by(batch=batch).one()
+        assert cashflow.pricings == [pricing]
+        assert not app.redis_client.exists(conf.REDIS_GENERATE_CASHFLOW_BATCH)
+
+    def test_release_venues_once_processed(self, app):
+        venue1 = offerers_factories.VenueFactory(pricing_point="self", bank_account=factories.BankAccountFactory())
+        venue2 = offerers_factories.VenueFactory(pricing_point="self", bank_account=factories.BankAccountFactory())
+        factories.PricingFactory(status=models.PricingStatus.VALIDATED, booking__stock__offer__venue=venue1)
+        batch = factories.CashflowBatchFactory(cutoff=date_utils.get_naive_utc_now())
+        app.redis_client.set(conf.REDIS_GENERATE_CASHFLOW_LOCK, "1")
+
+        with mock.patch("pcapi.core.finance.api._generate_bank_account_cashflow") as generate_bank_account_cashflow:
+            api._generate_cashflows(batch)
+        assert generate_bank_account_cashflow.call_count == 1
+        # The cashflow of venue1 is pending, venue2 has nothing to reimburse.
+        assert api.are_cashflows_being_generated()
+        assert api.are_cashflows_being_generated(venue_id=venue1.id)
+        assert not api.are_cashflows_being_generated(venue_id=venue2.id)
+
+        api._generate_cashflows(batch)
+        assert api.are_cashflows_being_generated()
+        assert not api.are_cashflows_being_generated(venue_id=venue1.id)
+
+    def _mock_worker_pool(self):
+        # Run the workers in the test process, where the data of the test is visible.
+        context = mock.MagicMock()
+        context.Pool.return_value.__enter__.return_value.imap_unordered.side_effect = map
+        return mock.patch("pcapi.core.finance.api.multiprocessing.get_context", return_value=context)
+
+    def test_generate_in_worker_processes(self, app):
+        venue1 = offerers_factories.VenueFactory(pricing_point="self", bank_account=factories.BankAccountFactory())
+        venue2 = offerers_factories.VenueFactory(pricing_point="self", bank_account=factories.BankAccountFactory())
+        venue_ids = [venue1.id, venue2.id]
+        factories.PricingFactory(status=models.PricingStatus.VALIDATED, booking__stock__offer__venue=venue1)
+        factories.PricingFactory(status=models.PricingStatus.VALIDATED, booking__stock__offer__venue=venue2)
+        batch = factories.CashflowBatchFactory(cutoff=date_utils.get_naive_utc_now())
+        app.redis_client.set(conf.REDIS_GENERATE_CASHFLOW_LOCK, "1")
+
+        with self._mock_worker_pool() as get_context, mock.patch.object(db.engine, "dispose") as dispose:
+            api._generate_cashflows(batch, processes=2)
+
+        get_context.return_value.Pool.assert_called_once_with(2, initializer=api._init_worker_process)
+        dispose.assert_called_once_with()
+        assert db.session.query(models.Cashflow).count() == 2
+        assert api.are_cashflows_being_generated()
+        for venue_id in venue_ids:
+            assert not api.are_cashflows_being_generated(venue_id=venue_id)
+
+    @pytest.mark.settings(IS_RUNNING_TESTS=False)
+    def test_release_venues_of_failed_bank_account_in_worker_processes(self, app):
+        venue = offerers_factories.VenueFactory(pricing_point="self", bank_account=factories.BankAccountFactory())
+        venue_id = venue.id
+        factories.PricingFactory(status=models.PricingStatus.VALIDATED, booking__stock__offer__venue=venue)
+        batch = factories.CashflowBatchFactory(cutoff=date_utils.get_naive_utc_now())
+        app.redis_client.set(conf.REDIS_GENERATE_CASHFLOW_LOCK, "1")
+
+        with (
+            self._mock_worker_pool(),
+            mock.patch.object(db.engine, "dispose"),
+            mock.patch("pcapi.core.finance.api._mark_pricings_as_processed", side_effect=Exception("failure")),
+        ):
+            api._generate_cashflows(batch, processes=2)
+
+        assert db.session.query(models.Cashflow).count() == 0
+        assert api.are_cashflows_being_generated()
+        assert not api.are_cashflows_being_generated(venue_id=venue_id)
+
     def test_reimbursement_suspended(self):
         offerer = offerers_factories.OffererFactory()
         bank_account = factories.BankAccountFactory(offerer=offerer)
@@ -2408,7 +2643,7 @@ def test_generate_payments_file(clean_temp_files):
     cutoff = datetime.datetime(actual_year, 2, 15)
     batch = api.generate_cashflows(cutoff)
 
-    n_queries = 3  # select pricings + select batch
+    n_queries = 2  # select batch + select amounts
     with assert_num_queries(n_queries):
         path = api._generate_payments_file(batch)
 
@@ -3362,6 +3597,72 @@ class GenerateInvoicesTest:
         assert invoiced_bookings == {booking1, booking2}
         assert {invoice.status for invoice in invoices} == {models.InvoiceStatus.PENDING}
 
+    @mock.patch("pcapi.core.finance.api._generate_invoice_html", return_value="<html></html>")
+    @mock.patch("pcapi.core.finance.api._store_invoice_pdf")
+    @mock.patch("pcapi.core.finance.api.transactional_mails.send_invoice_available_to_pro_email")
+    def test_store_pdf_files_in_pool(self, mocked_send_email, mocked_store_invoice_pdf, _mocked_generate_html):
+        for _ in range(3):
+            finance_event = factories.UsedBookingFinanceEventFactory(booking__stock__offer__venue__pricing_point="self")
+            bank_account = factories.BankAccountFactory()
+            offerers_factories.VenueBankAccountLinkFactory(venue=finance_event.booking.venue, bankAccount=bank_account)
+            api.price_event(finance_event)
+        batch = api.generate_cashflows_and_payment_files(date_utils.get_naive_utc_now())
+        rows = [(False, row) for row in api._get_cashflows_by_bank_accounts(batch)]
+
+        with multiprocessing.pool.ThreadPool(2) as pool:
+            count = api._generate_invoices_with_pool(batch.id, rows, pool, max_in_flight=2)
+
+        assert count == 3
+        invoices = db.session.query(models.Invoice).all()
+        assert len(invoices) == 3
+        stored_storage_ids = {call.args[0] for call in mocked_store_invoice_pdf.call_args_list}
+        assert stored_storage_ids == {invoice.storage_object_id for invoice in invoices}
+        assert {call.args[0] for call in mocked_send_email.call_args_list} == set(invoices)
+
+    @mock.patch("pcapi.core.finance.api._generate_invoice_html", return_value="<html></html>")
+    @mock.patch("pcapi.core.finance.api._store_invoice_pdf")
+    @mock.patch("pcapi.core.finance.api.transactional_mails.send_invoice_available_to_pro_email")
+    def test_store_pdf_file_again_if_worker_fails(
+        self, mocked_send_email, mocked_store_invoice_pdf, _mocked_generate_html
+    ):
+        for _ in range(3):
+            finance_event = factories.UsedBookingFinanceEventFactory(booking__stock__offer__venue__pricing_point="self")
+            bank_account = factories.BankAccountFactory()
+            offerers_factories.VenueBankAccountLinkFactory(venue=finance_event.booking.venue, bankAccount=bank_account)
+            api.price_event(finance_event)
+        batch = api.generate_cashflows_and_payment_files(date_utils.get_naive_utc_now())
+        rows = [(False, row) for row in api._get_cashflows_by_bank_accounts(batch)]
+        mocked_store_invoice_pdf.side_effect = [ConnectionError(), None, None, None]
+
+        with multiprocessing.pool.ThreadPool(1) as pool:
+            count = api._generate_invoices_with_pool(batch.id, rows, pool, max_in_flight=1)
+
+        assert count == 3
+        invoices = db.session.query(models.Invoice).all()
+        assert mocked_store_invoice_pdf.call_count == 4  # including the retry of the first invoice
+        assert {call.args[0] for call in mocked_send_email.call_args_list} == set(invoices)
+
+    @pytest.mark.settings(OBJECT_STORAGE_URL=STORAGE_DIR)
+    @mock.patch("pcapi.core.finance.api._generate_invoice_html", return_value="<p>Trust me, I am an invoice.<p>")
+    @mock.patch("pcapi.core.finance.api.transactional_mails.send_invoice_available_to_pro_email")
+    def test_store_pdf_files_in_worker_processes(
+        self, mocked_send_email, _mocked_generate_html, clear_tests_invoices_bucket
+    ):
+        for _ in range(3):
+            finance_event = factories.UsedBookingFinanceEventFactory(booking__stock__offer__venue__pricing_point="self")
+            bank_account = factories.BankAccountFactory()
+            offerers_factories.VenueBankAccountLinkFactory(venue=finance_event.booking.venue, bankAccount=bank_account)
+            api.price_event(finance_event)
+        batch = api.generate_cashflows_and_payment_files(date_utils.get_naive_utc_now())
+
+        api.generate_invoices_and_debit_notes(batch, processes=2)
+
+        invoices = db.session.query(models.Invoice).all()
+        assert len(invoices) == 3
+        for invoice in invoices:
+            assert (STORAGE_DIR / "invoices" / invoice.storage_object_id).exists()
+        assert {call.args[0] for call in mocked_send_email.call_args_list} == set(invoices)
+
     @mock.patch("pcapi.core.finance.api._generate_invoice_html")
     @mock.patch("pcapi.core.finance.api._store_invoice_pdf")
     def test_invoice_cashflows_with_0_amount(self, _generate_invoice_html, _store_invoice_pdf):
@@ -1,18 +1,24 @@
+from datetime import datetime
+from datetime import time
 from datetime import timedelta
 from decimal import Decimal
 
 import pytest
+import pytz
 
 import pcapi.core.bookings.factories as bookings_factories
 import pcapi.core.educational.factories as educational_factories
+import pcapi.core.finance.api as finance_api
 import pcapi.core.finance.factories as finance_factories
 import pcapi.core.finance.models as finance_models
+import pcapi.core.finance.siret_api as siret_api
 import pcapi.core.offerers.factories as offerers_factories
 import pcapi.core.offers.factories as offers_factories
 import pcapi.core.users.factories as users_factories
 from pcapi.core.bookings.models import Booking
 from pcapi.core.categories import subcategories
 from pcapi.core.finance import reimbursement_rules
+from pcapi.models import db
 from pcapi.utils import date as date_utils
 
 
@@ -465,6 +471,84 @@ class CustomRuleFinderTest:
         assert finder.get_rule(ancient_booking) is None  # outside `rule.timespan`
         assert finder.get_rule(another_booking) is None  # no rule for this offer
 
+    def test_overlapping_rules_with_distinct_subcategories(self):
+        a_month_ago = date_utils.get_naive_utc_now() - timedelta(days=30)
+        yesterday = date_utils.get_naive_utc_now() - timedelta(days=1)
+        cinema_booking = bookings_factories.UsedBookingFactory(
+            stock__offer__subcategoryId=subcategories.FESTIVAL_CINE.id, stock__offer__venue__pricing_point="self"
+        )
+        offerer = cinema_booking.offerer
+        book_booking = bookings_factories.UsedBookingFactory(
+            stock__offer__subcategoryId=subcategories.LIVRE_PAPIER.id,
+            stock__offer__venue=cinema_booking.venue,
+        )
+        cinema_rule = finance_factories.CustomReimbursementRuleFactory(
+            offerer=offerer, subcategories=[subcategories.FESTIVAL_CINE.id], timespan=(a_month_ago, None)
+        )
+        book_rule = finance_factories.CustomReimbursementRuleFactory(
+            offerer=offerer, subcategories=[subcategories.LIVRE_PAPIER.id], timespan=(yesterday, None)
+        )
+
+        finder = reimbursement_rules.CustomRuleFinder()
+        assert finder.get_rule(cinema_booking) == cinema_rule
+        assert finder.get_rule(book_booking) == book_rule
+
+    def test_reload_rules_after_creation(self):
+        start = pytz.utc.localize(datetime.combine(date_utils.get_naive_utc_now().date(), time.min) + timedelta(days=2))
+        booking = bookings_factories.UsedBookingFactory(
+            dateUsed=start.replace(tzinfo=None) + timedelta(days=1), stock__offer__venue__pricing_point="self"
+        )
+        finder = reimbursement_rules.CustomRuleFinder()
+        assert finder.get_rule(booking) is None
+
+        rule = finance_api.create_offer_reimbursement_rule(booking.stock.offerId, amount=Decimal(12), start_date=start)
+        assert finder.get_rule(booking) == rule
+
+    def test_reload_rules_after_edition(self):
+        a_month_ago = date_utils.get_naive_utc_now() - timedelta(days=30)
+        booking = bookings_factories.UsedBookingFactory(
+            dateUsed=date_utils.get_naive_utc_now() + timedelta(days=10), stock__offer__venue__pricing_point="self"
+        )
+        rule = finance_factories.CustomReimbursementRuleFactory(offer=booking.stock.offer, timespan=(a_month_ago, None))
+        finder = reimbursement_rules.CustomRuleFinder()
+        assert finder.get_rule(booking) == rule
+
+        end = pytz.utc.localize(datetime.combine(date_utils.get_naive_utc_now().date(), time.min) + timedelta(days=2))
+        finance_api.edit_reimbursement_rule(rule, end_date=end)
+        db.session.commit()
+        assert finder.get_rule(booking) is None
+
+    def test_reload_rules_after_closing_venue_rules(self):
+        a_month_ago = date_utils.get_naive_utc_now() - timedelta(days=30)
+        booking = bookings_factories.UsedBookingFactory(
+            dateUsed=date_utils.get_naive_utc_now() + timedelta(days=10), stock__offer__venue__pricing_point="self"
+        )
+        venue = booking.venue
+        rule = finance_factories.CustomReimbursementRuleFactory(venue=venue, timespan=(a_month_ago, None))
+        finder = reimbursement_rules.CustomRuleFinder()
+        assert finder.get_rule(booking) == rule
+
+        siret_api._force_close_custom_reimbursement_rules_for_venue(venue)
+        db.session.commit()
+        assert finder.get_rule(booking) is None
+
+    def test_ignore_deleted_rule(self):
+        a_month_ago = date_utils.get_naive_utc_now() - timedelta(days=30)
+        booking = bookings_factories.UsedBookingFactory(stock__offer__venue__pricing_point="self")
+        offer_rule = finance_factories.CustomReimbursementRuleFactory(
+            offer=booking.stock.offer, timespan=(a_month_ago, None)
+        )
+        offerer_rule = finance_factories.CustomReimbursementRuleFactory(
+            offerer=booking.offerer, timespan=(a_month_ago, None)
+        )
+        finder = reimbursement_rules.CustomRuleFinder()
+        assert finder.get_rule(booking) == offer_rule
+
+        # deleted without invalidating finders
+        db.session.delete(offer_rule)
+        db.session.flush()
+        assert finder.get_rule(booking) == offerer_rule
+
 
 def assert_total_reimbursement(booking_reimbursement, rule, booking):
     assert booking_reimbursement.booking == booking
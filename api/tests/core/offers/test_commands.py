@@ -3,7 +3,6 @@ import logging
 from unittest import mock
 
 import pytest
-from sqlalchemy import exc as sa_exc
 
 import pcapi.core.chronicles.factories as chronicles_factories
 import pcapi.core.offers.factories as offers_factories
@@ -97,6 +96,8 @@ class UpdateOfferQualityTest:
         offer_no_score = offers_factories.OfferFactory()
         offer_with_score = offers_factories.OfferFactory()
         offers_factories.OfferQualityFactory(offer=offer_with_score, completionScore=5.0)
+        offer_with_same_score = offers_factories.OfferFactory()
+        offers_factories.OfferQualityFactory(offer=offer_with_same_score, completionScore=7.0)
 
         fake_bq_data = [
             OfferQualityModel(
@@ -105,6 +106,7 @@ class UpdateOfferQualityTest:
             ),
             OfferQualityModel(offer_id=offer_no_score.id, completion_score=8.5),
             OfferQualityModel(offer_id=offer_with_score.id, completion_score=4.0),
+            OfferQualityModel(offer_id=offer_with_same_score.id, completion_score=7.0),
         ]
         mock_query.return_value = fake_bq_data
 
@@ -112,42 +114,18 @@ class UpdateOfferQualityTest:
             importer = OfferQualityImporter()
             importer.run_offer_quality_update(batch_size=1)
 
+        db.session.expire_all()
         assert offer_no_score.quality.completionScore == 8.5
         assert offer_with_score.quality.completionScore == 4.0
-        assert db.session.query(offers_models.OfferQuality).count() == 2
-        assert "Skipping scores update for missing offer" in caplog.text
+        assert offer_with_same_score.quality.completionScore == 7.0
+        assert db.session.query(offers_models.OfferQuality).count() == 3
         assert "Finished offer quality scores update" in caplog.text
-        mock_async_index_offer_ids.assert_has_calls(
-            [
-                mock.call([offer_no_score.id], reason=search.IndexationReason.OFFER_UPDATE),
-                mock.call([offer_with_score.id], reason=search.IndexationReason.OFFER_UPDATE),
-            ],
-            any_order=True,
-        )
-
-    @mock.patch("pcapi.connectors.big_query.queries.offer_quality.OfferQualityQuery.execute")
-    def test_run_offer_quality_update_batch_failure_retries_individually(self, mock_bq_execute, caplog):
-        offer_1 = offers_factories.OfferFactory()
-        offers_factories.OfferQualityFactory(offer=offer_1, completionScore=2.0)
-        offer_2 = offers_factories.OfferFactory()
-
-        bq_item1 = OfferQualityModel(offer_id=offer_1.id, completion_score=10.0)
-        bq_item2 = OfferQualityModel(offer_id=offer_2.id, completion_score=8.5)
-        mock_bq_execute.return_value = iter([bq_item1, bq_item2])
-        with mock.patch("pcapi.models.db.session.commit") as mock_commit:
-            mock_commit.side_effect = [
-                sa_exc.SQLAlchemyError("Simulated Batch Commit Failure"),
-                None,
-                None,
-            ]
-            importer = OfferQualityImporter()
-            importer.run_offer_quality_update(batch_size=2)
-
-        assert mock_commit.call_count == 3
-        assert "Batch update failed. Retrying one by one" in caplog.text
-        assert "Successfully updated offer quality batch scores" not in caplog.text
-        assert offer_1.quality.completionScore == 10.0
-        assert offer_2.quality.completionScore == 8.5
+        finished_record = next(r for r in caplog.records if r.message == "Finished offer quality scores update")
+        assert finished_record.extra == {"total_processed": 4, "total_updated": 2}
+        # only offers whose score has changed are reindexed
+        mock_async_index_offer_ids.assert_called_once()
+        assert set(mock_async_index_offer_ids.call_args.args[0]) == {offer_no_score.id, offer_with_score.id}
+        assert mock_async_index_offer_ids.call_args.kwargs == {"reason": search.IndexationReason.OFFER_QUALITY_UPDATE}
 
     @mock.patch("pcapi.connectors.big_query.queries.offer_quality.OfferQualityQuery.execute")
     def test_run_update_respects_start_from_id(self, mock_bq_execute):
@@ -160,5 +138,26 @@ class UpdateOfferQualityTest:
         importer = OfferQualityImporter()
         importer.run_offer_quality_update(start_from_id=15)
 
+        db.session.expire_all()
         assert offer_ignored.quality.completionScore == 1.0
         assert offer_updated.quality.completionScore == 9.9
+
+    @mock.patch("pcapi.connectors.big_query.queries.offer_quality.OfferQualityQuery.execute")
+    @mock.patch("pcapi.core.search.async_index_offer_ids")
+    @mock.patch.object(OfferQualityImporter, "chunk_size", 2)
+    def test_run_update_by_chunks(self, mock_async_index_offer_ids, mock_query, caplog):
+        offers = offers_factories.OfferFactory.create_batch(3)
+        mock_query.return_value = iter([OfferQualityModel(offer_id=offer.id, completion_score=5.0) for offer in offers])
+
+        with caplog.at_level(logging.INFO):
+            OfferQualityImporter().run_offer_quality_update(batch_size=1)
+
+        db.session.expire_all()
+        assert all(offer.quality.completionScore == 5.0 for offer in offers)
+        assert [set(call.args[0]) for call in mock_async_index_offer_ids.call_args_list] == [
+            {offers[0].id, offers[1].id},
+            {offers[2].id},
+        ]
+        # each chunk logs the id from which the import can be resumed
+        chunk_records = [r for r in caplog.records if r.message == "Applied chunk of rows from staging table"]
+        assert [r.extra["last_processed_id"] for r in chunk_records] == [offers[1].id, offers[2].id]
@@ -1339,24 +1339,44 @@ class UpdateStockQuantityToDnBookedQuantityTest:
 
 @pytest.mark.usefixtures("db_session")
 class GetPaginatedActiveOfferIdsTest:
-    def test_limit_and_page_arguments(self):
+    def test_batch_size_argument(self):
         venue = offerers_factories.VenueFactory()
         offer1 = factories.OfferFactory(venue=venue)
         offer2 = factories.OfferFactory(venue=venue)
         offer3 = factories.OfferFactory(venue=venue)
 
-        assert repository.get_paginated_active_offer_ids(batch_size=2, page=1) == [
-            offer1.id,
-            offer2.id,
+        assert list(repository.get_paginated_active_offer_ids(batch_size=2)) == [
+            [offer1.id, offer2.id],
+            [offer3.id],
         ]
-        assert repository.get_paginated_active_offer_ids(batch_size=2, page=2) == [offer3.id]
+
+    def test_start_and_end_ids(self):
+        venue = offerers_factories.VenueFactory()
+        _offer1 = factories.OfferFactory(venue=venue)
+        offer2 = factories.OfferFactory(venue=venue)
+        offer3 = factories.OfferFactory(venue=venue)
+        _offer4 = factories.OfferFactory(venue=venue)
+
+        batches = repository.get_paginated_active_offer_ids(batch_size=1, start_id=offer2.id, end_id=offer3.id)
+
+        assert list(batches) == [[offer2.id], [offer3.id]]
+
+    def test_start_page(self):
+        venue = offerers_factories.VenueFactory()
+        _offer1 = factories.OfferFactory(venue=venue)
+        offer2 = factories.OfferFactory(venue=venue)
+        offer3 = factories.OfferFactory(venue=venue)
+
+        assert list(repository.get_paginated_active_offer_ids(batch_size=1, start_page=2)) == [[offer2.id], [offer3.id]]
+        assert list(repository.get_paginated_active_offer_ids(batch_size=1, start_page=4)) == []
 
     def test_exclude_inactive_offers(self):
         venue = offerers_factories.VenueFactory()
         offer1 = factories.OfferFactory(venue=venue, isActive=True)
         _offer2 = factories.OfferFactory(venue=venue, isActive=False)
+        offer3 = factories.OfferFactory(venue=venue, isActive=True)
 
-        assert repository.get_paginated_active_offer_ids(batch_size=2, page=1) == [offer1.id]
+        assert list(repository.get_paginated_active_offer_ids(batch_size=2)) == [[offer1.id, offer3.id]]
 
 
 @pytest.mark.usefixtures("db_session")
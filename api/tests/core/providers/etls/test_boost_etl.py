@@ -12,6 +12,7 @@ from dateutil.relativedelta import relativedelta
 import pcapi.core.bookings.factories as bookings_factories
 import pcapi.core.offers.factories as offers_factories
 import pcapi.core.offers.models as offers_models
+import pcapi.core.offers.repository as offers_repository
 import pcapi.core.providers.exceptions as providers_exceptions
 import pcapi.core.providers.factories as providers_factories
 import pcapi.utils.date as date_utils
@@ -533,6 +534,33 @@ class BoostExtractTransformLoadProcessTest:
         # should have been called because beginningDatetime has changed
         update_finance_event_pricing_date_mock.assert_called_once_with(stock_1)
 
+    @time_machine.travel(datetime.datetime(2023, 8, 12, 12, 41, 30), tick=False)
+    def test_load_should_fetch_existing_offers_and_stocks_once(self, requests_mock):
+        venue_provider = self.setup_cinema_objects()
+        self.setup_requests_mock(requests_mock)
+
+        etl_process = BoostExtractTransformLoadProcess(venue_provider)
+        transform_result = etl_process._transform(extract_result=etl_process._extract())
+        first_offers_id, _ = etl_process._load(transform_result)
+
+        with (
+            mock.patch(
+                "pcapi.core.offers.repository.get_offers_by_venue_and_movie_uuids",
+                wraps=offers_repository.get_offers_by_venue_and_movie_uuids,
+            ) as get_offers_mock,
+            mock.patch(
+                "pcapi.core.offers.repository.get_stocks_by_movie_stock_uuids",
+                wraps=offers_repository.get_stocks_by_movie_stock_uuids,
+            ) as get_stocks_mock,
+        ):
+            second_offers_id, _ = etl_process._load(transform_result)
+
+        assert second_offers_id == first_offers_id
+        assert get_offers_mock.call_count == 1
+        assert get_stocks_mock.call_count == 1
+        assert db.session.query(offers_models.Offer).count() == 2
+        assert db.session.query(offers_models.Stock).count() == 3
+
     @time_machine.travel(datetime.datetime(2023, 8, 12, 12, 41, 30), tick=False)
     @mock.patch("pcapi.core.search.async_index_offer_ids")
     def test_execute_should_create_and_index_offer(self, async_index_offer_ids_mock, requests_mock):
@@ -626,7 +654,7 @@ class BoostExtractTransformLoadProcessTest:
 
         async_index_offer_ids_mock.assert_called_once_with(
             set([offer_1.id, offer_2.id]),
-            reason=search_models.IndexationReason.STOCK_UPDATE,
+            reason=search_models.IndexationReason.STOCK_SYNCHRONIZATION,
             log_extra={
                 "source": "provider_api",
                 "venue_id": venue_provider.venueId,
@@ -255,7 +255,7 @@ class CGRExtractTransformLoadProcessTest:
 
         async_index_offer_ids_mock.assert_called_once_with(
             set([offer_1.id]),
-            reason=search_models.IndexationReason.STOCK_UPDATE,
+            reason=search_models.IndexationReason.STOCK_SYNCHRONIZATION,
             log_extra={
                 "source": "provider_api",
                 "venue_id": venue_provider.venueId,
@@ -576,7 +576,7 @@ class CineOfficeExtractTransformLoadProcessTest:
 
         async_index_offer_ids_mock.assert_called_once_with(
             set([offer_1.id, offer_2.id]),
-            reason=search_models.IndexationReason.STOCK_UPDATE,
+            reason=search_models.IndexationReason.STOCK_SYNCHRONIZATION,
             log_extra={
                 "source": "provider_api",
                 "venue_id": venue_provider.venueId,
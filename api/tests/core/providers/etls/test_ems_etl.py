@@ -344,7 +344,7 @@ class EMSExtractTransformLoadProcessTest:
 
         async_index_offer_ids_mock.assert_called_once_with(
             set([offer_1.id, offer_2.id]),
-            reason=search_models.IndexationReason.STOCK_UPDATE,
+            reason=search_models.IndexationReason.STOCK_SYNCHRONIZATION,
             log_extra={
                 "source": "provider_api",
                 "venue_id": venue_provider.venueId,
@@ -364,6 +364,33 @@ class EMSExtractTransformLoadProcessTest:
         created_price_category = db.session.query(offers_models.PriceCategory).all()
         assert len(created_price_category) == 2
 
+    @mock.patch("pcapi.core.providers.tasks.create_movie_poster_task.delay")
+    def test_should_enqueue_movie_poster_once_across_synchronizations(
+        self, create_movie_poster_task_mock, requests_mock
+    ):
+        requests_mock.get("https://fake_url.com?version=0", json=ems_fixtures.DATA_VERSION_0)
+        venue_provider = self.setup_cinema_objects()
+
+        EMSExtractTransformLoadProcess(venue_provider).execute()
+        EMSExtractTransformLoadProcess(venue_provider).execute()
+
+        poster_urls = [call.args[0]["poster_url"] for call in create_movie_poster_task_mock.call_args_list]
+        assert sorted(poster_urls) == [
+            "https://example.com/FR/poster/5F988F1C/600/SHJRH.jpg",
+            "https://example.com/FR/poster/D7C57D16/600/FGMSE.jpg",
+        ]
+
+    def test_should_fetch_movie_poster_again_after_failure(self, requests_mock):
+        requests_mock.get("https://fake_url.com?version=0", json=ems_fixtures.DATA_VERSION_0)
+        get_image_adapter = requests_mock.get("https://example.com/FR/poster/5F988F1C/600/SHJRH.jpg", status_code=502)
+        requests_mock.get("https://example.com/FR/poster/D7C57D16/600/FGMSE.jpg", content=bytes())
+        venue_provider = self.setup_cinema_objects()
+
+        EMSExtractTransformLoadProcess(venue_provider).execute()
+        EMSExtractTransformLoadProcess(venue_provider).execute()
+
+        assert get_image_adapter.call_count == 2
+
     def test_should_create_product_mediation(self, requests_mock):
         requests_mock.get("https://fake_url.com?version=0", json=ems_fixtures.DATA_VERSION_0)
 
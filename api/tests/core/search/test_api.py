@@ -4,6 +4,7 @@ from unittest import mock
 
 import pytest
 import sqlalchemy as sa
+import time_machine
 
 import pcapi.core.artist.factories as artists_factories
 import pcapi.core.offerers.factories as offerers_factories
@@ -19,6 +20,7 @@ from pcapi.core.educational import models as educational_models
 from pcapi.core.educational.factories import create_collective_offer_template_by_status
 from pcapi.core.offerers import models as offerers_models
 from pcapi.core.offers import models as offers_models
+from pcapi.core.search import models as search_models
 from pcapi.core.search import redis_queues
 from pcapi.core.search import serialization
 from pcapi.core.search.models import IndexationReason
@@ -26,6 +28,8 @@ from pcapi.core.testing import assert_no_duplicated_queries
 from pcapi.core.testing import assert_num_queries
 from pcapi.models import db
 from pcapi.utils import date as date_utils
+from pcapi.utils.transaction_manager import atomic
+from pcapi.utils.transaction_manager import mark_transaction_as_invalid
 
 
 pytestmark = pytest.mark.usefixtures("db_session")
@@ -86,10 +90,74 @@ def fail(*args, **kwargs):
 
 def test_async_index_offer_ids(app, clear_redis):
     search.async_index_offer_ids({1, 2}, reason=IndexationReason.OFFER_UPDATE)
-    queue = redis_queues.REDIS_OFFER_IDS_NAME
+    queue = redis_queues.REDIS_HIGH_PRIORITY_OFFER_IDS_NAME
     assert app.redis_client.smembers(queue) == {"1", "2"}
 
 
+@pytest.mark.parametrize(
+    "reason,queue",
+    [
+        (IndexationReason.OFFER_UPDATE, redis_queues.REDIS_HIGH_PRIORITY_OFFER_IDS_NAME),
+        (IndexationReason.BOOKING_CREATION, redis_queues.REDIS_HIGH_PRIORITY_OFFER_IDS_NAME),
+        (IndexationReason.CRITERIA_LINK, redis_queues.REDIS_OFFER_IDS_NAME),
+        (IndexationReason.STOCK_SYNCHRONIZATION, redis_queues.REDIS_BULK_OFFER_IDS_NAME),
+        (IndexationReason.OFFER_QUALITY_UPDATE, redis_queues.REDIS_BULK_OFFER_IDS_NAME),
+        (IndexationReason.OFFER_BATCH_UPDATE, redis_queues.REDIS_BULK_OFFER_IDS_NAME),
+        (IndexationReason.VENUE_UPDATE, redis_queues.REDIS_BULK_OFFER_IDS_NAME),
+    ],
+)
+def test_async_index_offer_ids_lane(app, clear_redis, reason, queue):
+    search.async_index_offer_ids({1}, reason=reason)
+    assert app.redis_client.smembers(queue) == {"1"}
+
+
+def test_async_index_offer_ids_within_transaction(app, clear_redis):
+    queue = redis_queues.REDIS_HIGH_PRIORITY_OFFER_IDS_NAME
+    with atomic():
+        search.async_index_offer_ids({1, 2}, reason=IndexationReason.OFFER_UPDATE)
+        search.async_index_offer_ids({2, 3}, reason=IndexationReason.STOCK_UPDATE)
+        search.async_index_venue_ids({4}, reason=IndexationReason.VENUE_UPDATE)
+        assert app.redis_client.scard(queue) == 0
+
+    assert app.redis_client.smembers(queue) == {"1", "2", "3"}
+    assert app.redis_client.smembers(redis_queues.REDIS_VENUE_IDS_TO_INDEX) == {"4"}
+
+
+def test_async_index_offer_ids_within_rolled_back_transaction(app, clear_redis):
+    with atomic():
+        search.async_index_offer_ids({1, 2}, reason=IndexationReason.OFFER_UPDATE)
+        mark_transaction_as_invalid()
+
+    assert app.redis_client.scard(redis_queues.REDIS_HIGH_PRIORITY_OFFER_IDS_NAME) == 0
+
+
+def test_batched_async_indexation(app, clear_redis):
+    queue = redis_queues.REDIS_HIGH_PRIORITY_OFFER_IDS_NAME
+    with mock.patch.object(redis_queues.AlgoliaIndexingQueuesMixin, "enqueue_ids_by_queue") as mocked_enqueue:
+        with search.batched_async_indexation():
+            search.async_index_offer_ids({1, 2}, reason=IndexationReason.OFFER_UPDATE)
+            search.async_index_offer_ids({3}, reason=IndexationReason.OFFER_UPDATE)
+            mocked_enqueue.assert_not_called()
+
+    mocked_enqueue.assert_called_once_with({queue: {1, 2, 3}})
+
+
+def test_batched_async_indexation_enqueues_by_chunks(app, clear_redis):
+    queue = redis_queues.REDIS_HIGH_PRIORITY_OFFER_IDS_NAME
+    with (
+        mock.patch.object(search, "ENQUEUE_CHUNK_SIZE", 2),
+        mock.patch.object(redis_queues.AlgoliaIndexingQueuesMixin, "enqueue_ids_by_queue") as mocked_enqueue,
+    ):
+        with search.batched_async_indexation():
+            search.async_index_offer_ids({1, 2, 3}, reason=IndexationReason.OFFER_UPDATE)
+            search.async_index_venue_ids({4}, reason=IndexationReason.VENUE_UPDATE)
+
+    chunks = [call.args[0] for call in mocked_enqueue.call_args_list]
+    assert [sum(len(ids) for ids in chunk.values()) for chunk in chunks] == [2, 2]
+    assert set().union(*(chunk.get(queue, set()) for chunk in chunks)) == {1, 2, 3}
+    assert set().union(*(chunk.get(redis_queues.REDIS_VENUE_IDS_TO_INDEX, set()) for chunk in chunks)) == {4}
+
+
 def test_async_index_offers_of_venue_ids(app, clear_redis):
     search.async_index_offers_of_venue_ids({1, 2}, reason=IndexationReason.VENUE_UPDATE)
     queue = redis_queues.REDIS_VENUE_IDS_FOR_OFFERS_NAME
@@ -165,9 +233,9 @@ def test_index_offers_of_venues_in_queue(app, clear_redis):
     search.index_offers_of_venues_in_queue()
     assert app.redis_client.scard(redis_queues.REDIS_VENUE_IDS_FOR_OFFERS_NAME) == 0
 
-    assert app.redis_client.sismember(redis_queues.REDIS_OFFER_IDS_NAME, bookable_offer.id)
-    assert app.redis_client.sismember(redis_queues.REDIS_OFFER_IDS_NAME, unbookable_offer.id)
-    assert app.redis_client.sismember(redis_queues.REDIS_OFFER_IDS_NAME, closed_offer.id)
+    assert app.redis_client.sismember(redis_queues.REDIS_BULK_OFFER_IDS_NAME, bookable_offer.id)
+    assert app.redis_client.sismember(redis_queues.REDIS_BULK_OFFER_IDS_NAME, unbookable_offer.id)
+    assert app.redis_client.sismember(redis_queues.REDIS_BULK_OFFER_IDS_NAME, closed_offer.id)
 
 
 @pytest.mark.settings(REDIS_VENUE_IDS_CHUNK_SIZE=1)
@@ -551,6 +619,88 @@ class IndexOffersInQueueTest:
         assert app.redis_client.scard(queue) == 2
         assert app.redis_client.smembers(queue) <= set(str(id_) for id_ in items)
 
+    def test_high_priority_lane_is_indexed_first(self, mocked_reindex_offer_ids, app, clear_redis):
+        app.redis_client.sadd(redis_queues.REDIS_BULK_OFFER_IDS_NAME, 1, 2, 3)
+        app.redis_client.sadd(redis_queues.REDIS_HIGH_PRIORITY_OFFER_IDS_NAME, 4, 5, 6)
+
+        search.index_offers_in_queue(max_batches_to_process=1)
+
+        mocked_reindex_offer_ids.assert_called_once()
+        assert set(mocked_reindex_offer_ids.call_args.args[0]) == {4, 5, 6}
+        assert app.redis_client.scard(redis_queues.REDIS_BULK_OFFER_IDS_NAME) == 3
+
+    def test_fall_back_on_other_lanes_when_empty(self, mocked_reindex_offer_ids, app, clear_redis):
+        app.redis_client.sadd(redis_queues.REDIS_BULK_OFFER_IDS_NAME, 1, 2, 3, 4)
+
+        search.index_offers_in_queue(max_batches_to_process=2)
+
+        assert mocked_reindex_offer_ids.call_count == 2
+        assert app.redis_client.scard(redis_queues.REDIS_BULK_OFFER_IDS_NAME) == 0
+
+
+@pytest.mark.features(ENABLE_VENUE_STRICT_SEARCH=True)
+@pytest.mark.parametrize("workers", [0, 2])
+def test_index_offers_in_queue_reindexes_venues(app, clear_redis, workers):
+    # Offers are indexed within a transaction that is always rolled
+    # back: venues to reindex must be enqueued anyway.
+    offer = make_bookable_offer()
+    app.redis_client.sadd(redis_queues.REDIS_OFFER_IDS_NAME, offer.id)
+
+    search.index_offers_in_queue(workers=workers)
+
+    assert offer.id in search_testing.search_store[settings.ALGOLIA_OFFERS_INDEX_NAME]
+    assert app.redis_client.smembers(redis_queues.REDIS_VENUE_IDS_TO_INDEX) == {str(offer.venueId)}
+
+
+def test_iter_offer_indexation_lanes():
+    lanes = list(itertools.islice(search._iter_offer_indexation_lanes(), 10))
+
+    assert lanes.count(search_models.OfferIndexationLane.HIGH) == 6
+    assert lanes.count(search_models.OfferIndexationLane.DEFAULT) == 3
+    assert lanes.count(search_models.OfferIndexationLane.BULK) == 1
+    assert lanes[0] == search_models.OfferIndexationLane.HIGH
+    # Lanes are interleaved rather than served in a row.
+    assert lanes[:3] != [search_models.OfferIndexationLane.HIGH] * 3
+
+
+@pytest.mark.settings(REDIS_OFFER_IDS_CHUNK_SIZE=2, ALGOLIA_OFFERS_INDEXATION_MAX_IN_FLIGHT_BATCHES=2)
+class IndexOffersInQueuePipelinedTest:
+    def test_index_and_unindex_offers(self, app, clear_redis):
+        bookable_offers = [make_bookable_offer() for _ in range(3)]
+        unbookable_offer = make_unbookable_offer()
+        search_testing.search_store[settings.ALGOLIA_OFFERS_INDEX_NAME][unbookable_offer.id] = "dummy"
+        app.redis_client.hset(redis_queues.REDIS_HASHMAP_INDEXED_OFFERS_NAME, unbookable_offer.id, "")
+        queue = redis_queues.REDIS_OFFER_IDS_NAME
+        app.redis_client.sadd(queue, *[offer.id for offer in bookable_offers], unbookable_offer.id)
+
+        search.index_offers_in_queue(max_batches_to_process=None, workers=2)
+
+        assert set(search_testing.search_store[settings.ALGOLIA_OFFERS_INDEX_NAME]) == {
+            offer.id for offer in bookable_offers
+        }
+        assert app.redis_client.scard(queue) == 0
+        assert app.redis_client.keys(f"{queue}:processing:*") == []
+
+    def test_stop_when_limit_is_set(self, app, clear_redis):
+        queue = redis_queues.REDIS_OFFER_IDS_NAME
+        app.redis_client.sadd(queue, *[make_bookable_offer().id for _ in range(5)])
+
+        search.index_offers_in_queue(max_batches_to_process=2, workers=2)
+
+        assert len(search_testing.search_store[settings.ALGOLIA_OFFERS_INDEX_NAME]) == 4
+        assert app.redis_client.scard(queue) == 1
+
+    @mock.patch("pcapi.core.search.backends.testing.TestingBackend.save_objects", fail)
+    @pytest.mark.settings(CATCH_INDEXATION_EXCEPTIONS=True)
+    def test_handle_indexation_error(self, app, clear_redis):
+        offer = make_bookable_offer()
+        app.redis_client.sadd(redis_queues.REDIS_OFFER_IDS_NAME, offer.id)
+
+        search.index_offers_in_queue(workers=1)
+
+        assert search_testing.search_store[settings.ALGOLIA_OFFERS_INDEX_NAME] == {}
+        assert app.redis_client.smembers(redis_queues.REDIS_OFFER_IDS_IN_ERROR_NAME) == {str(offer.id)}
+
 
 @pytest.mark.features(ENABLE_VENUE_STRICT_SEARCH=True)
 def test_unindex_offer_ids(app, clear_redis):
@@ -672,6 +822,43 @@ def test_booking_count_for_movies():
     )
 
 
+@pytest.mark.parametrize("use_daily_booking_counts", [True, False])
+def test_get_offers_booking_count_by_id_matches_booking_table(features, use_daily_booking_counts):
+    features.WIP_ENABLE_STOCK_DAILY_BOOKING_COUNT = use_daily_booking_counts
+    now = date_utils.get_naive_utc_now()
+    offers = [make_booked_offer(), make_booked_offer(), make_bookable_offer()]
+    offers_factories.StockFactory(offer=offers[0])
+    for days_ago in (0, 1, 15, 29, 40):
+        bookings_factories.BookingFactory(
+            stock=offers[0].stocks[-1], dateCreated=now - datetime.timedelta(days=days_ago)
+        )
+    bookings_factories.CancelledBookingFactory(stock=offers[1].stocks[0], dateCreated=now)
+    inactive_offer = make_booked_offer()
+    inactive_offer.isActive = False
+    offers.append(inactive_offer)
+    db.session.flush()
+    offer_ids = [offer.id for offer in offers]
+
+    # Count bookings straight from the booking table, as it used to be
+    expected = dict(
+        db.session.query(offers_models.Offer.id, sa.func.count(bookings_models.Booking.id))
+        .join(offers_models.Offer.stocks)
+        .join(offers_models.Stock.bookings)
+        .filter(
+            offers_models.Offer.id.in_(offer_ids),
+            offers_models.Offer.isActive,
+            bookings_models.Booking.dateCreated >= now - datetime.timedelta(days=30),
+            bookings_models.Booking.status != bookings_models.BookingStatus.CANCELLED,
+        )
+        .group_by(offers_models.Offer.id)
+        .all()
+    )
+
+    with time_machine.travel(now, tick=False):
+        assert search.get_offers_booking_count_by_id(offer_ids) == expected
+    assert set(expected) == {offers[0].id, offers[1].id}
+
+
 def test_reindex_collective_offer_template_ids():
     offer_by_status = {
         status: create_collective_offer_template_by_status(status)
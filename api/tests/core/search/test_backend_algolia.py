@@ -14,6 +14,7 @@ import pcapi.core.offers.factories as offers_factories
 from pcapi.core.search import redis_queues
 from pcapi.core.search import serialization
 from pcapi.core.search.backends import algolia
+from pcapi.core.search.models import OfferIndexationLane
 from pcapi.utils import date as date_utils
 
 
@@ -124,6 +125,52 @@ def test_count_offers_to_index_from_queue(app):
     app.redis_client.sadd(redis_queues.REDIS_OFFER_IDS_NAME, 1, 2, 3)
     assert backend.count_offers_to_index_from_queue() == 3
 
+    app.redis_client.sadd(redis_queues.REDIS_BULK_OFFER_IDS_NAME, 4, 5)
+    assert backend.count_offers_to_index_from_queue() == 5
+
+
+def test_get_offer_lanes_stats(app):
+    backend = get_backend()
+    with time_machine.travel("2026-01-01 12:00:00", tick=False):
+        backend.enqueue_offer_ids([1, 2], lane=OfferIndexationLane.BULK)
+    with time_machine.travel("2026-01-01 12:01:00", tick=False):
+        backend.enqueue_offer_ids([3], lane=OfferIndexationLane.BULK)
+    with time_machine.travel("2026-01-01 12:02:00", tick=False):
+        stats = backend.get_offer_lanes_stats()
+
+    assert stats == {
+        OfferIndexationLane.HIGH: (0, 0.0),
+        OfferIndexationLane.DEFAULT: (0, 0.0),
+        OfferIndexationLane.BULK: (3, 120.0),
+    }
+
+    with backend.pop_offer_ids_from_lanes(count=3, lanes=[OfferIndexationLane.BULK]):
+        pass
+    assert backend.get_offer_lanes_stats()[OfferIndexationLane.BULK] == (0, 0.0)
+
+
+def test_keep_lane_age_of_ids_enqueued_while_popping(app):
+    backend = get_backend()
+    with time_machine.travel("2026-01-01 12:00:00", tick=False):
+        backend.enqueue_offer_ids([1, 2], lane=OfferIndexationLane.BULK)
+
+    real_eval = backend.redis_client.eval
+
+    def enqueue_then_eval(*args):
+        # Another process enqueues an id right after the lane has
+        # been found empty.
+        with time_machine.travel("2026-01-01 12:01:00", tick=False):
+            backend.enqueue_offer_ids([3], lane=OfferIndexationLane.BULK)
+        return real_eval(*args)
+
+    with mock.patch.object(backend.redis_client, "eval", side_effect=enqueue_then_eval):
+        with backend.pop_offer_ids_from_lanes(count=2, lanes=[OfferIndexationLane.BULK]):
+            pass
+
+    with time_machine.travel("2026-01-01 12:02:00", tick=False):
+        stats = backend.get_offer_lanes_stats()
+    assert stats[OfferIndexationLane.BULK] == (1, 120.0)
+
 
 def test_count_offers_to_index_from_error_queue(app):
     backend = get_backend()
@@ -170,9 +217,61 @@ def test_index_offers(app):
     assert backend.check_offer_id_is_indexed(offer.id)
 
 
+@pytest.mark.usefixtures("db_session")
+@pytest.mark.settings(ALGOLIA_SKIP_UNCHANGED_OFFERS=True)
+def test_index_offers_skips_unchanged_offers(app):
+    backend = get_backend()
+    offer = offers_factories.StockFactory().offer
+    other_offer = offers_factories.StockFactory().offer
+    with requests_mock.Mocker() as mocker:
+        posted = mocker.post(
+            "https://dummy-app-id.algolia.net/1/indexes/offers/batch",
+            json={"task_id": 123, "object_ids": []},
+        )
+        backend.index_offers([offer], {offer.id: 0})
+        assert posted.call_count == 1
+
+        # Nothing has changed: no request is sent
+        backend.index_offers([offer], {offer.id: 0})
+        assert posted.call_count == 1
+
+        # Only changed and new offers are sent
+        backend.index_offers([offer, other_offer], {offer.id: 12, other_offer.id: 0})
+        assert posted.call_count == 2
+        posted_json = posted.last_request.json()
+        assert {request["body"]["objectID"] for request in posted_json["requests"]} == {offer.id, other_offer.id}
+
+        backend.index_offers([offer, other_offer], {offer.id: 12, other_offer.id: 0})
+        assert posted.call_count == 2
+
+
+@pytest.mark.usefixtures("db_session")
+@pytest.mark.settings(ALGOLIA_SKIP_UNCHANGED_OFFERS=True)
+def test_index_offers_sends_unchanged_offers_if_forced(app):
+    backend = get_backend()
+    offer = offers_factories.StockFactory().offer
+    with requests_mock.Mocker() as mocker:
+        posted = mocker.post(
+            "https://dummy-app-id.algolia.net/1/indexes/offers/batch",
+            json={"task_id": 123, "object_ids": []},
+        )
+        backend.index_offers([offer], {offer.id: 0})
+        backend.index_offers([offer], {offer.id: 0}, force=True)
+        assert posted.call_count == 2
+
+
+def test_get_offer_digest_ignores_indexation_date():
+    serialized_offer = {"objectID": 1, "offer": {"name": "Offre", "indexedAt": "2026-01-01T00:00:00"}}
+    digest = serialization.get_offer_digest(serialized_offer)
+
+    assert serialization.get_offer_digest(serialized_offer | {"offer": {"name": "Offre"}}) == digest
+    assert serialization.get_offer_digest(serialized_offer | {"offer": {"name": "Autre offre"}}) != digest
+
+
 def test_unindex_offer_ids(app):
     backend = get_backend()
     app.redis_client.hset("indexed_offers", "1", "")
+    app.redis_client.hset("indexed_offers_digests", "1", "digest")
     with requests_mock.Mocker() as mocker:
         posted = mocker.post(
             "https://dummy-app-id.algolia.net/1/indexes/offers/batch",
@@ -183,6 +282,7 @@ def test_unindex_offer_ids(app):
         assert posted_json["requests"][0]["action"] == "deleteObject"
         assert posted_json["requests"][0]["body"]["objectID"] == "1"
     assert not backend.check_offer_id_is_indexed(1)
+    assert backend.get_offer_digests_from_store([1]) == {}
 
 
 def test_unindex_all_offers(app):
@@ -310,6 +410,27 @@ class IndexationLimitTest:
         backend.enqueue_offer_ids([1, 2, 3])
         assert backend.redis_client.smembers(redis_queues.REDIS_OFFER_IDS_NAME) == {"1", "2", "3"}
 
+    @pytest.mark.settings(ALGOLIA_OFFERS_INDEX_MAX_SIZE=2, ALGOLIA_OFFERS_INDEX_SIZE_CACHE_DURATION=60)
+    def should_check_index_size_once_during_cache_duration(self, monkeypatch):
+        monkeypatch.setattr(redis_queues.AlgoliaIndexingQueuesMixin, "_offers_index_size_cache", None)
+        backend = get_backend()
+        backend.enqueue_offer_ids([1, 2, 3])
+        # the queue is now full, but the index size is not checked again yet
+        backend.enqueue_offer_ids([4])
+        assert backend.redis_client.smembers(redis_queues.REDIS_OFFER_IDS_NAME) == {"1", "2", "3", "4"}
+
+    @pytest.mark.settings(ALGOLIA_OFFERS_INDEX_MAX_SIZE=0)
+    def should_not_enqueue_offers_in_batch_if_limit_is_already_exceeded(self):
+        backend = get_backend()
+        backend.enqueue_ids_by_queue(
+            {
+                redis_queues.REDIS_OFFER_IDS_NAME: [1],
+                redis_queues.REDIS_VENUE_IDS_TO_INDEX: [2],
+            }
+        )
+        assert backend.redis_client.smembers(redis_queues.REDIS_OFFER_IDS_NAME) == set()
+        assert backend.redis_client.smembers(redis_queues.REDIS_VENUE_IDS_TO_INDEX) == {"2"}
+
 
 class ProcessingQueueTest:
     class CustomError(Exception):  # an error that only our tests can raise
@@ -373,7 +494,7 @@ class ProcessingQueueTest:
         # Items of the old processing queue have been moved to the
         # main queue. The recent processing queue has been left
         # intact.
-        assert set(redis.keys()) == {main_queue, processing_too_recent}
+        assert set(redis.keys()) == {main_queue, f"{main_queue}:non-empty-since", processing_too_recent}
 
         assert redis.smembers(main_queue) == {"1", "2", "3"}
         assert redis.smembers(processing_too_recent) == {"4", "5", "6"}
@@ -58,11 +58,11 @@ def test_offer_indexation_on_artist_cycle(app, clear_redis):
     stock = offers_factories.StockFactory(offer__product=product)
     offer = stock.offer
 
-    assert not app.redis_client.smembers(search.redis_queues.REDIS_OFFER_IDS_NAME)
+    assert not app.redis_client.smembers(search.redis_queues.REDIS_BULK_OFFER_IDS_NAME)
     search.async_index_offers_of_artist_ids([artist.id], reason=IndexationReason.ARTIST_LINKS_UPDATE)
     assert app.redis_client.smembers(search.redis_queues.REDIS_ARTIST_IDS_FOR_OFFERS_NAME)
     search.index_offers_of_artists_in_queue()
-    assert app.redis_client.sismember(search.redis_queues.REDIS_OFFER_IDS_NAME, offer.id)
+    assert app.redis_client.sismember(search.redis_queues.REDIS_BULK_OFFER_IDS_NAME, offer.id)
     search.index_offers_in_queue()
     assert not app.redis_client.smembers(search.redis_queues.REDIS_ARTIST_IDS_FOR_OFFERS_NAME)
 
@@ -87,11 +87,11 @@ def test_offer_indexation_on_venue_cycle(app, clear_redis):
     offer = stock.offer
     venue = offer.venue
 
-    assert not app.redis_client.smembers(search.redis_queues.REDIS_OFFER_IDS_NAME)
+    assert not app.redis_client.smembers(search.redis_queues.REDIS_BULK_OFFER_IDS_NAME)
     search.async_index_offers_of_venue_ids([venue.id], reason=IndexationReason.VENUE_UPDATE)
     assert app.redis_client.smembers(search.redis_queues.REDIS_VENUE_IDS_FOR_OFFERS_NAME)
     search.index_offers_of_venues_in_queue()
-    assert app.redis_client.sismember(search.redis_queues.REDIS_OFFER_IDS_NAME, offer.id)
+    assert app.redis_client.sismember(search.redis_queues.REDIS_BULK_OFFER_IDS_NAME, offer.id)
     search.index_offers_in_queue()
     assert not app.redis_client.smembers(search.redis_queues.REDIS_VENUE_IDS_FOR_OFFERS_NAME)
 
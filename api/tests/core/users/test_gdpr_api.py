@@ -46,6 +46,7 @@ from pcapi.core.users import testing as brevo_testing
 from pcapi.models import db
 from pcapi.models.validation_status_mixin import ValidationStatus
 from pcapi.utils import date as date_utils
+from pcapi.utils.requests import ExternalAPIException
 
 import tests
 from tests.test_utils import StorageFolderManager
@@ -1111,7 +1112,7 @@ class AnonymizeBeneficiaryUsersTest(StorageFolderManager):
         ):
             pass
 
-        with mock.patch("pcapi.core.users.gdpr_api.get_iris_from_address", return_value=iris):
+        with mock.patch("pcapi.core.users.gdpr_api.get_iris_from_coordinates", return_value=iris):
             gdpr_api.anonymize_beneficiary_users()
 
         db.session.refresh(user_beneficiary_to_anonymize)
@@ -1227,7 +1228,7 @@ class AnonymizeBeneficiaryUsersTest(StorageFolderManager):
         self.import_iris()
         iris = db.session.query(geography_models.IrisFrance).first()
 
-        with mock.patch("pcapi.core.users.gdpr_api.get_iris_from_address", return_value=iris):
+        with mock.patch("pcapi.core.users.gdpr_api.get_iris_from_coordinates", return_value=iris):
             gdpr_api.anonymize_beneficiary_users()
 
         db.session.refresh(user_beneficiary_to_anonymize)
@@ -1429,6 +1430,110 @@ class AnonymizeBeneficiaryUsersTest(StorageFolderManager):
         assert user_to_anonymize.firstName != "user_to_anonymize"
         assert db.session.query(users_models.GdprUserAnonymization).count() == 0
 
+    def _create_beneficiary_to_anonymize(self, **kwargs):
+        return users_factories.BeneficiaryFactory(
+            age=18,
+            lastConnectionDate=date_utils.get_naive_utc_now() - relativedelta(years=3, days=1),
+            deposit__expirationDate=date_utils.get_naive_utc_now() - relativedelta(years=5, days=1),
+            **kwargs,
+        )
+
+    @pytest.mark.settings(GDPR_ANONYMIZATION_CHUNK_SIZE=1)
+    def test_resume_interrupted_anonymization(self) -> None:
+        already_processed_user = self._create_beneficiary_to_anonymize(firstName="already_processed")
+        user_to_anonymize = self._create_beneficiary_to_anonymize(firstName="user_to_anonymize")
+        current_app.redis_client.set(users_constants.GDPR_ANONYMIZATION_LAST_BENEFICIARY_ID, already_processed_user.id)
+
+        gdpr_api.anonymize_beneficiary_users()
+
+        db.session.refresh(already_processed_user)
+        db.session.refresh(user_to_anonymize)
+        assert already_processed_user.firstName == "already_processed"
+        assert user_to_anonymize.firstName is None
+        assert current_app.redis_client.get(users_constants.GDPR_ANONYMIZATION_LAST_BENEFICIARY_ID) is None
+
+    @pytest.mark.settings(GDPR_ANONYMIZATION_CHUNK_SIZE=1)
+    def test_failing_chunk_does_not_stop_anonymization(self, caplog) -> None:
+        failing_user = self._create_beneficiary_to_anonymize(firstName="failing_user")
+        failing_user_id = failing_user.id
+        failing_user_email = failing_user.email
+        user_to_anonymize = self._create_beneficiary_to_anonymize(firstName="user_to_anonymize")
+        user_to_anonymize_id = user_to_anonymize.id
+        anonymize_external_user_data = gdpr_api._anonymize_external_user_data
+
+        def anonymize_or_fail(app, data):
+            if data.user_id == failing_user_id:
+                raise Exception("Simulated failure")
+            return anonymize_external_user_data(app, data)
+
+        redis_client = current_app.redis_client
+        with (
+            mock.patch("pcapi.core.users.gdpr_api._anonymize_external_user_data", side_effect=anonymize_or_fail),
+            mock.patch.object(redis_client, "set", wraps=redis_client.set) as redis_set,
+        ):
+            gdpr_api.anonymize_beneficiary_users()
+
+        assert "Could not anonymize chunk of beneficiaries" in caplog.text
+        # the cursor moves past the failed chunk, then past the next one
+        assert [
+            call.args[1]
+            for call in redis_set.call_args_list
+            if call.args[:1] == (users_constants.GDPR_ANONYMIZATION_LAST_BENEFICIARY_ID,)
+        ] == [failing_user_id, user_to_anonymize_id]
+        db.session.refresh(failing_user)
+        db.session.refresh(user_to_anonymize)
+        assert failing_user.firstName == "failing_user"
+        assert failing_user.email == failing_user_email
+        assert user_to_anonymize.firstName is None
+        assert user_to_anonymize.email == f"anonymous_{user_to_anonymize.id}@anonymized.passculture"
+        assert current_app.redis_client.get(users_constants.GDPR_ANONYMIZATION_LAST_BENEFICIARY_ID) is None
+
+    def test_failing_user_does_not_stop_anonymization_of_its_chunk(self) -> None:
+        failing_user = self._create_beneficiary_to_anonymize(firstName="failing_user")
+        failing_user_id = failing_user.id
+        user_to_anonymize = self._create_beneficiary_to_anonymize(firstName="user_to_anonymize")
+        anonymize_user_personal_data = gdpr_api._anonymize_user_personal_data
+
+        def anonymize_or_fail(user, iris):
+            if user.id == failing_user_id:
+                raise Exception("Simulated failure")
+            anonymize_user_personal_data(user, iris)
+
+        with mock.patch("pcapi.core.users.gdpr_api._anonymize_user_personal_data", side_effect=anonymize_or_fail):
+            gdpr_api.anonymize_beneficiary_users()
+
+        db.session.refresh(failing_user)
+        db.session.refresh(user_to_anonymize)
+        assert failing_user.firstName == "failing_user"
+        assert user_to_anonymize.firstName is None
+        assert user_to_anonymize.email == f"anonymous_{user_to_anonymize.id}@anonymized.passculture"
+
+    def test_anonymize_beneficiary_without_postal_code_with_iris(self) -> None:
+        user = self._create_beneficiary_to_anonymize(address="1 rue de la paix", postalCode=None)
+        self.import_iris()
+        iris = db.session.query(geography_models.IrisFrance).first()
+
+        with mock.patch("pcapi.core.users.gdpr_api.get_iris_from_address", return_value=iris) as get_iris_mock:
+            gdpr_api.anonymize_beneficiary_users()
+
+        get_iris_mock.assert_called_once_with(address="1 rue de la paix", postcode=None)
+        db.session.refresh(user)
+        assert user.firstName is None
+        assert user.irisFranceId == iris.id
+
+    def test_do_not_anonymize_user_if_batch_deletion_fails(self) -> None:
+        user = self._create_beneficiary_to_anonymize(firstName="user")
+
+        with mock.patch(
+            "pcapi.core.users.gdpr_api.delete_user_attributes",
+            side_effect=ExternalAPIException(is_retryable=True),
+        ):
+            gdpr_api.anonymize_beneficiary_users()
+
+        db.session.refresh(user)
+        assert user.firstName == "user"
+        assert len(brevo_testing.brevo_requests) == 0
+
 
 class AnonymizeUserDepositsTest:
     def test_anonymize_user_deposits(self) -> None:
@@ -4,6 +4,7 @@ import pcapi.core.offerers.factories as offerers_factories
 import pcapi.core.offers.factories as offers_factories
 from pcapi.core.offers.models import Offer
 from pcapi.core.offers.models import Stock
+from pcapi.core.testing import assert_num_queries
 from pcapi.local_providers.chunk_manager import save_chunks
 from pcapi.models import db
 
@@ -98,3 +99,44 @@ def test_save_chunks_update_2_offers_and_1_stock_in_chunk():
     assert all(offer.isDuo for offer in offers)
     stock = db.session.query(Stock).one()
     assert stock.quantity == 2
+
+
+def test_save_chunks_update_offers_in_one_query():
+    offers = offers_factories.OfferFactory.create_batch(3, isDuo=False)
+    for offer in offers:
+        db.session.refresh(offer)
+        offer.isDuo = True
+        db.session.expunge(offer)
+    chunk_to_update = {f"{offer.id}|Offer": offer for offer in offers}
+
+    with assert_num_queries(1):
+        save_chunks(chunk_to_insert={}, chunk_to_update=chunk_to_update)
+
+    assert db.session.query(Offer).filter(Offer.isDuo.is_(True)).count() == 3
+
+
+def test_save_chunks_does_not_update_flushed_objects_again():
+    offer = offers_factories.OfferFactory(isDuo=False)
+    offer.isDuo = True
+    db.session.flush()
+
+    with assert_num_queries(0, expire_session=False):
+        save_chunks(chunk_to_insert={}, chunk_to_update={"1|Offer": offer})
+
+    assert db.session.get(Offer, offer.id).isDuo
+
+
+def test_save_chunks_insert_stocks_in_one_query():
+    product = offers_factories.ProductFactory()
+    venue = offerers_factories.VenueFactory()
+    offer = offers_factories.OfferFactory.build(idAtProvider="1%12345678912345", product=product, venue=venue)
+    chunk_to_insert = {"1|Offer": offer}
+    for i in range(3):
+        chunk_to_insert[f"{i}|Stock"] = Stock(offer=offer, price=10, idAtProviders=f"{i}")
+
+    n_queries = 1  # insert offer
+    n_queries += 1  # insert stocks
+    with assert_num_queries(n_queries, expire_session=False):
+        save_chunks(chunk_to_insert, chunk_to_update={})
+
+    assert db.session.query(Stock).filter(Stock.offerId == offer.id).count() == 3
@@ -1,9 +1,13 @@
+import datetime
 import logging
+import multiprocessing.pool
 from unittest.mock import patch
 
 import pytest
 import requests_mock
 
+import pcapi.core.bookings.factories as bookings_factories
+import pcapi.core.offers.factories as offers_factories
 import pcapi.core.providers.factories as providers_factories
 from pcapi.core.offers.models import Offer
 from pcapi.core.providers.repository import get_provider_by_local_class
@@ -12,6 +16,7 @@ from pcapi.local_providers.provider_manager import synchronize_ems_venue_provide
 from pcapi.local_providers.provider_manager import synchronize_venue_provider
 from pcapi.local_providers.provider_manager import synchronize_venue_providers
 from pcapi.models import db
+from pcapi.utils import date as date_utils
 
 from tests.connectors.cgr import soap_definitions
 from tests.local_providers.cinema_providers.ems import fixtures as ems_fixtures
@@ -128,6 +133,63 @@ class SynchronizeVenueProvidersTest:
         synchronize_venue_providers([venue_provider_1, venue_provider_2], 10)
         assert mock_synchronize_venue_provider.call_count == 2
 
+    @pytest.mark.usefixtures("db_session")
+    @patch("pcapi.local_providers.provider_manager.synchronize_venue_provider")
+    def test_synchronize_most_urgent_venue_providers_first(self, mock_synchronize_venue_provider):
+        now = date_utils.get_naive_utc_now()
+        provider = providers_factories.ProviderFactory()
+        synced_recently = providers_factories.VenueProviderFactory(provider=provider, lastSyncDate=now)
+        with_imminent_show = providers_factories.VenueProviderFactory(provider=provider, lastSyncDate=now)
+        offers_factories.EventStockFactory(
+            offer__venue=with_imminent_show.venue,
+            offer__lastProvider=provider,
+            beginningDatetime=now + datetime.timedelta(hours=2),
+        )
+        # Synchronizations update `dateModifiedAtLastProvider` of all
+        # stocks, it does not make a venue more urgent.
+        recently_modified = providers_factories.VenueProviderFactory(provider=provider, lastSyncDate=now)
+        offers_factories.EventStockFactory(
+            offer__venue=recently_modified.venue,
+            offer__lastProvider=provider,
+            beginningDatetime=now + datetime.timedelta(days=5),
+            dateModifiedAtLastProvider=now,
+        )
+        recently_booked = providers_factories.VenueProviderFactory(provider=provider, lastSyncDate=now)
+        bookings_factories.BookingFactory(
+            stock__offer__venue=recently_booked.venue,
+            stock__offer__lastProvider=provider,
+            stock__beginningDatetime=now + datetime.timedelta(days=10),
+            dateCreated=now - datetime.timedelta(hours=1),
+        )
+        never_synced = providers_factories.VenueProviderFactory(provider=provider, lastSyncDate=None)
+
+        synchronize_venue_providers(
+            [synced_recently, recently_modified, recently_booked, with_imminent_show, never_synced]
+        )
+
+        synchronized = [call.args[0] for call in mock_synchronize_venue_provider.call_args_list]
+        assert synchronized == [never_synced, with_imminent_show, recently_booked, recently_modified, synced_recently]
+
+    @pytest.mark.usefixtures("db_session")
+    @patch("pcapi.local_providers.provider_manager.synchronize_venue_provider")
+    @patch("pcapi.local_providers.provider_manager._MAX_CONCURRENT_SYNCS_BY_LOCAL_CLASS", {"TestStocks": 2})
+    # Workers share the session of the test: use a single thread.
+    @patch(
+        "pcapi.local_providers.provider_manager._get_worker_pool",
+        side_effect=lambda processes: multiprocessing.pool.ThreadPool(1),
+    )
+    def test_synchronize_venue_providers_in_parallel(self, mock_get_worker_pool, mock_synchronize_venue_provider):
+        provider = providers_factories.ProviderFactory(localClass="TestStocks")
+        venue_providers = providers_factories.VenueProviderFactory.create_batch(3, provider=provider)
+
+        synchronize_venue_providers(venue_providers, processes=4)
+
+        # Processes are capped by the number of concurrent
+        # synchronizations allowed by the provider.
+        mock_get_worker_pool.assert_called_once_with(2)
+        synchronized_ids = {call.args[0].id for call in mock_synchronize_venue_provider.call_args_list}
+        assert synchronized_ids == {venue_provider.id for venue_provider in venue_providers}
+
 
 class SynchronizeDataForProviderTest:
     @patch("pcapi.local_providers.local_provider.LocalProvider.updateObjects")
@@ -39,6 +39,16 @@ class SubcategoriesTest:
         expected_genre_types = {x.name for x in categories_models.GenreType}
         assert found_genre_types == expected_genre_types
 
+    def test_get_subcategories_v2_not_modified(self, client):
+        response = client.get("/native/v1/subcategories/v2")
+        etag = response.headers["ETag"]
+
+        with assert_num_queries(0):
+            response = client.get("/native/v1/subcategories/v2", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.data == b""
+
     def test_search_groups(self, client):
         with assert_num_queries(0):
             response = client.get("/native/v1/subcategories/v2")
@@ -2141,3 +2151,14 @@ class CategoriesTest:
         response = client.get("/native/v1/categories")
 
         assert response.status_code == 200
+
+    def test_returns_304_if_not_modified(self, client):
+        response = client.get("/native/v1/categories")
+        etag = response.headers["ETag"]
+
+        response = client.get("/native/v1/categories", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+        response = client.get("/native/v1/categories", headers={"If-None-Match": '"outdated"'})
+        assert response.status_code == 200
+        assert response.headers["ETag"] == etag
@@ -269,6 +269,24 @@ class OffersStocksV2Test:
         assert response_offer["publicationDate"] == None
         assert response_offer["bookingAllowedDatetime"] == None
 
+    @pytest.mark.settings(NATIVE_OFFER_RESPONSE_CACHE_DURATION=60)
+    def test_return_cached_offers(self, client):
+        offer1_id = offers_factories.ThingStockFactory().offerId
+        offer2_id = offers_factories.ThingStockFactory().offerId
+        response = client.post("/native/v2/offers/stocks", json={"offer_ids": [offer1_id]})
+        assert response.status_code == 200
+
+        # offer1 is cached, offer2 and the unknown offer are not
+        response = client.post("/native/v2/offers/stocks", json={"offer_ids": [offer2_id, offer1_id, 123456789]})
+        assert response.status_code == 200
+        assert [offer["id"] for offer in response.json["offers"]] == [offer2_id, offer1_id]
+
+        with assert_num_queries(0):
+            response = client.post("/native/v2/offers/stocks", json={"offer_ids": [offer1_id, offer2_id]})
+            assert response.status_code == 200
+
+        assert [offer["id"] for offer in response.json["offers"]] == [offer1_id, offer2_id]
+
 
 class SendOfferWebAppLinkTest:
     def test_brevo_send_offer_webapp_link_by_email(self, client):
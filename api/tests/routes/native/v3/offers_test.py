@@ -12,6 +12,7 @@ import pcapi.core.offers.factories as offers_factories
 import pcapi.core.providers.factories as providers_factories
 import pcapi.local_providers.cinema_providers.constants as cinema_providers_constants
 from pcapi import settings
+from pcapi.core import search
 from pcapi.core.artist.models import ArtistType
 from pcapi.core.bookings.factories import BookingFactory
 from pcapi.core.categories import subcategories
@@ -23,7 +24,9 @@ from pcapi.core.providers.constants import BookFormat
 from pcapi.core.providers.repository import get_provider_by_local_class
 from pcapi.core.reactions.factories import ReactionFactory
 from pcapi.core.reactions.models import ReactionTypeEnum
+from pcapi.core.search.models import IndexationReason
 from pcapi.core.testing import assert_num_queries
+from pcapi.models import db
 from pcapi.models.offer_mixin import OfferValidationStatus
 from pcapi.routes.native.v1.serialization.offers import MAX_PREVIEW_CHRONICLES
 from pcapi.utils import date as date_utils
@@ -362,6 +365,27 @@ class OffersV3Test:
 
         assert response.status_code == 404
 
+    @pytest.mark.settings(NATIVE_OFFER_RESPONSE_CACHE_DURATION=60)
+    def test_get_cached_offer(self, client):
+        stock = offers_factories.ThingStockFactory(price=12.34, offer__venue__isPermanent=True)
+        offer_id = stock.offerId
+        with assert_num_queries(self.base_num_queries):
+            response = client.get(f"/native/v3/offer/{offer_id}")
+            assert response.status_code == 200
+
+        stock.price = 10
+        db.session.flush()
+        with assert_num_queries(0):
+            response = client.get(f"/native/v3/offer/{offer_id}")
+            assert response.status_code == 200
+        assert response.json["stocks"][0]["price"] == 1234
+
+        search.async_index_offer_ids([offer_id], reason=IndexationReason.STOCK_UPDATE)
+        with assert_num_queries(self.base_num_queries):
+            response = client.get(f"/native/v3/offer/{offer_id}")
+            assert response.status_code == 200
+        assert response.json["stocks"][0]["price"] == 1000
+
     @pytest.mark.parametrize(
         "validation", [OfferValidationStatus.DRAFT, OfferValidationStatus.PENDING, OfferValidationStatus.REJECTED]
     )
@@ -1,6 +1,7 @@
 import csv
 from datetime import timedelta
 from io import StringIO
+from unittest import mock
 
 import pytest
 
@@ -46,6 +47,27 @@ class Returns200Test:
                 == f"{venue1.publicName} - {venue1.offererAddress.address.street} {venue1.offererAddress.address.postalCode} {venue1.offererAddress.address.city}"
             )
 
+    # Bookings are fetched by chunks of 2
+    @mock.patch("pcapi.core.bookings.repository.EXPORT_CHUNK_SIZE", 2)
+    def test_export_offer_bookings_is_streamed(self, client):
+        pro_user = users_factories.ProFactory()
+        offerer = offerers_factories.UserOffererFactory(user=pro_user).offerer
+        stock = offers_factories.EventStockFactory(
+            offer__venue__managingOfferer=offerer,
+            beginningDatetime=date_utils.get_naive_utc_now() + timedelta(days=10),
+        )
+        bookings = bookings_factories.BookingFactory.create_batch(3, stock=stock)
+
+        client = client.with_session_auth(pro_user.email)
+        event_date = stock.beginningDatetime.date().isoformat()
+        response = client.get(f"/bookings/offer/{stock.offerId}/csv?event_date={event_date}&status=all")
+
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.headers["Content-Type"] == "text/csv; charset=utf-8;"
+        reader = csv.DictReader(StringIO(response.data.decode("utf-8-sig")), delimiter=";")
+        assert [row["Contremarque"] for row in reader] == [booking.token for booking in bookings]
+
 
 class Returns404Test:
     def test_return_404_if_user_is_not_authorized(self, client):
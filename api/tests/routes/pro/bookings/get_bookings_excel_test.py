@@ -1,14 +1,43 @@
+from datetime import timedelta
+from io import BytesIO
+
+import openpyxl
 import pytest
 
 import pcapi.core.offerers.factories as offerers_factories
+from pcapi.core.bookings import factories as bookings_factories
 from pcapi.core.offers import factories as offers_factories
 from pcapi.core.testing import assert_num_queries
+from pcapi.core.users import factories as users_factories
 from pcapi.models.api_errors import OBJECT_NOT_FOUND_ERROR_MESSAGE
+from pcapi.utils import date as date_utils
 
 
 pytestmark = pytest.mark.usefixtures("db_session")
 
 
+class Returns200Test:
+    def test_export_offer_bookings_is_streamed(self, client):
+        pro_user = users_factories.ProFactory()
+        offerer = offerers_factories.UserOffererFactory(user=pro_user).offerer
+        stock = offers_factories.EventStockFactory(
+            offer__venue__managingOfferer=offerer,
+            beginningDatetime=date_utils.get_naive_utc_now() + timedelta(days=10),
+        )
+        bookings = bookings_factories.BookingFactory.create_batch(3, stock=stock)
+
+        client = client.with_session_auth(pro_user.email)
+        event_date = stock.beginningDatetime.date().isoformat()
+        response = client.get(f"/bookings/offer/{stock.offerId}/excel?event_date={event_date}&status=all")
+
+        assert response.status_code == 200
+        assert response.is_streamed
+        worksheet = openpyxl.load_workbook(BytesIO(response.data)).active
+        assert [row[10] for row in worksheet.iter_rows(min_row=2, values_only=True)] == [
+            booking.token for booking in bookings
+        ]
+
+
 class Returns404Test:
     def test_return_404_if_user_is_not_authorized(self, client):
         user_offerer = offerers_factories.UserOffererFactory()
@@ -0,0 +1,60 @@
+from unittest import mock
+
+import pytest
+
+from pcapi.core.offers import factories as offers_factories
+from pcapi.core.search import testing as search_testing
+from pcapi.scripts import full_index_offers
+
+from tests.test_utils import run_command
+
+
+@pytest.mark.usefixtures("clean_database")
+class FullIndexOffersTest:
+    def test_index_bookable_offers(self, app, clear_redis):
+        bookable_offer = offers_factories.StockFactory().offer
+        other_bookable_offer = offers_factories.StockFactory().offer
+        _unbookable_offer = offers_factories.OfferFactory()
+        _inactive_offer = offers_factories.StockFactory(offer__isActive=False).offer
+
+        # fmt: off
+        result = run_command(
+            app,
+            "full_index_offers", bookable_offer.id, other_bookable_offer.id + 10,
+            "--processes", 1,
+            "--shard-size", 5,
+            raise_on_error=True,
+        )
+        # fmt: on
+
+        assert set(search_testing.search_store["offers"]) == {bookable_offer.id, other_bookable_offer.id}
+        assert result.output.endswith("Done\n")
+        assert app.redis_client.keys("search:algolia:full-index-offers:*") == []
+
+    def test_resume_from_checkpoints(self, app, clear_redis):
+        already_indexed_offer = offers_factories.StockFactory().offer
+        offer = offers_factories.StockFactory().offer
+        start, end = already_indexed_offer.id, offer.id + 10
+        checkpoints_key = full_index_offers.REDIS_CHECKPOINTS_KEY % (start, end)
+        app.redis_client.hset(checkpoints_key, f"{start}-{end}", already_indexed_offer.id)
+
+        run_command(app, "full_index_offers", start, end, "--processes", 1, raise_on_error=True)
+
+        assert set(search_testing.search_store["offers"]) == {offer.id}
+
+    @mock.patch("pcapi.scripts.full_index_offers.time.sleep")
+    def test_failed_batches_are_kept_for_next_run(self, _mocked_sleep, app, clear_redis):
+        offer = offers_factories.StockFactory().offer
+        start, end = offer.id, offer.id + 10
+
+        with mock.patch("pcapi.core.search.backends.testing.TestingBackend.save_objects", side_effect=ValueError):
+            result = run_command(app, "full_index_offers", start, end, "--processes", 1, raise_on_error=True)
+
+        assert "1 batches still fail" in result.output
+        failed_batches_key = full_index_offers.REDIS_FAILED_BATCHES_KEY % (start, end)
+        assert app.redis_client.smembers(failed_batches_key) == {f"{start}-{offer.id}"}
+
+        run_command(app, "full_index_offers", start, end, "--processes", 1, raise_on_error=True)
+
+        assert set(search_testing.search_store["offers"]) == {offer.id}
+        assert app.redis_client.keys("search:algolia:full-index-offers:*") == []
@@ -4,8 +4,10 @@ from pcapi.routes.serialization import BaseModel
 from pcapi.utils.cache import _CacheProxy
 from pcapi.utils.cache import _compute_arguments_hash
 from pcapi.utils.cache import _view_retriever
+from pcapi.utils.cache import bump_cache_versions
 from pcapi.utils.cache import cached_view
 from pcapi.utils.cache import get_from_cache
+from pcapi.utils.cache import get_many_from_versioned_cache
 
 
 class DummySerializer(BaseModel):
@@ -172,3 +174,34 @@ class GetFromCacheTest:
         assert result1 != result2
         assert result2 == "pouet2"
         retriever.assert_called_once()
+
+
+class GetManyFromVersionedCacheTest:
+    def _get_many(self, retriever, ids):
+        return get_many_from_versioned_cache(
+            retriever=retriever,
+            ids=ids,
+            key_template="test_versioned:%(id)s:%(version)s",
+            version_key_template="test_versioned:%(id)s:version",
+            expire=60,
+        )
+
+    def test_retrieve_missing_ids_only(self):
+        self._get_many(MagicMock(return_value={1: "one"}), [1])
+
+        retriever = MagicMock(return_value={2: "two"})
+        result = self._get_many(retriever, [1, 2, 3, 2])
+
+        assert result == {1: "one", 2: "two"}
+        retriever.assert_called_once_with([2, 3])
+
+    def test_bump_versions(self):
+        self._get_many(MagicMock(return_value={1: "one", 2: "two"}), [1, 2])
+
+        bump_cache_versions(ids=[1], version_key_template="test_versioned:%(id)s:version", expire=120)
+
+        retriever = MagicMock(return_value={1: "new one"})
+        result = self._get_many(retriever, [1, 2])
+
+        assert result == {1: "new one", 2: "two"}
+        retriever.assert_called_once_with([1])
@@ -2,12 +2,15 @@ import logging
 import os
 import pathlib
 import time
+from io import BytesIO
 from unittest import mock
 
 import pytest
+from pypdf import PdfReader
 
 from pcapi.utils import date as date_utils
 from pcapi.utils import pdf
+from pcapi.utils import requests
 
 import tests
 
@@ -59,3 +62,32 @@ class GeneratePdfFromHtmlTest:
 
         # Exceptions are caught with "Failed to load stylesheet at ..." error trace so that they would be silent
         assert len(caplog.records) == 0
+
+
+class MergePdfFilesTest:
+    def test_merge_in_order(self, requests_mock):
+        invoice_1 = (TEST_FILES_PATH / "pdf" / "invoice_1_example.pdf").read_bytes()  # 1 page
+        invoice_2 = (TEST_FILES_PATH / "pdf" / "invoice_2_example.pdf").read_bytes()  # 2 pages
+        requests_mock.get("https://example.com/1.pdf", content=invoice_1)
+        requests_mock.get("https://example.com/2.pdf", content=invoice_2)
+
+        with pdf.merge_pdf_files(["https://example.com/2.pdf", "https://example.com/1.pdf"]) as merged_pdf:
+            reader = PdfReader(merged_pdf)
+            assert reader.get_num_pages() == 3
+            assert reader.pages[2].extract_text() == PdfReader(BytesIO(invoice_1)).pages[0].extract_text()
+
+    def test_download_failure(self, requests_mock):
+        requests_mock.get(
+            "https://example.com/1.pdf",
+            content=(TEST_FILES_PATH / "pdf" / "invoice_1_example.pdf").read_bytes(),
+        )
+        requests_mock.get("https://example.com/2.pdf", exc=requests.exceptions.ConnectionError)
+
+        with pytest.raises(FileNotFoundError, match="https://example.com/2.pdf"):
+            pdf.merge_pdf_files(["https://example.com/1.pdf", "https://example.com/2.pdf"])
+
+    def test_invalid_pdf(self, requests_mock):
+        requests_mock.get("https://example.com/1.pdf", content=b"not a PDF")
+
+        with pytest.raises(FileNotFoundError, match="https://example.com/1.pdf"):
+            pdf.merge_pdf_files(["https://example.com/1.pdf"])